@@ -0,0 +1,240 @@
+import datetime
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import pandas as pd
+from features.features import FeatureCreation
+from features.instrumentation import RunReport, StageMeter
+from features.scheduler import StageScheduler
+from .synthetic_fights import SyntheticFights
+
+class BenchmarkSuite():
+    """
+    Usage:
+        suite = BenchmarkSuite(sizes=[10_000], stages=['elo', 'fight_stats'])
+        results = suite.run()
+        suite.save(results, 'benchmarks/results')
+        regressions = compare_results(results, load_results('benchmarks/baseline.json'))
+
+        Times the feature pipeline on synthetic fight histories. For every size a history is written as the scraped
+        CSVs into a scratch directory and the pipeline runs there end to end, from reading and cleaning the CSV to the
+        assembled feature table, while a RunReport measures every feature stage. The wall times of two runs are
+        compared per size and stage.
+    """
+
+    def __init__(self, sizes, stages=None, seed=0, max_workers=1, row_workers=None, row_mode=None, progress=False, workdir=None):
+        """
+        Parameters:
+            sizes (list): Numbers of fights of the histories
+            stages (list): Names of the stages to run, with the stages they require, None for every stage
+            seed (int): Seed of the synthetic histories
+            max_workers (int): Number of processes running stages, 1 to run them one after another
+            row_workers (int): Number of threads or processes the row-wise applies of every stage run in
+            row_mode (str): How the row-wise applies run, one of RowExecutor.MODES
+            progress (bool): Whether to report the progress of every stage
+            workdir (str): Directory to write the histories into and keep, None for a temporary directory
+        """
+
+        self.sizes = list(sizes)
+        self.stages = stages
+        self.seed = seed
+        self.max_workers = max_workers
+        self.row_workers = row_workers
+        self.row_mode = row_mode
+        self.progress = progress
+        self.workdir = workdir
+
+    def run(self):
+        """
+        Runs the benchmarks of every size.
+
+        Returns:
+            dict: The environment and settings of the run and the results of every size
+        """
+
+        results = {
+            'started_at' : datetime.datetime.now().isoformat(timespec='seconds'),
+            'python' : platform.python_version(),
+            'pandas' : pd.__version__,
+            'cpus' : os.cpu_count(),
+            'settings' : {'seed' : self.seed, 'stages' : self.stages, 'max_workers' : self.max_workers, 'row_workers' : self.row_workers, 'row_mode' : self.row_mode},
+            'sizes' : {}
+        }
+
+        for size in self.sizes:
+            workdir = self.workdir if self.workdir is not None else tempfile.mkdtemp(prefix='octapicks_bench_')
+            try:
+                results['sizes'][str(size)] = self.run_size(size, os.path.join(workdir, str(size)))
+            finally:
+                if self.workdir is None:
+                    shutil.rmtree(workdir, ignore_errors=True)
+
+        return results
+
+    def run_size(self, size, directory):
+        """
+        Generates a history and times the pipeline on it.
+
+        Parameters:
+            size (int): Number of fights
+            directory (str): Scratch directory of the run
+
+        Returns:
+            dict: Generation time, the end to end metrics of the pipeline and the metrics of every stage
+        """
+
+        start = time.perf_counter()
+        SyntheticFights(seed=self.seed).write(os.path.join(directory, 'data'), size)
+        generate_s = time.perf_counter() - start
+
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            # Tracing allocations would slow the stages down, the peak RSS is measured without it
+            report = RunReport(os.path.join(directory, 'report.json'), trace_memory=False)
+            scheduler = StageScheduler(self.max_workers, None, self.row_workers, self.row_mode, self.progress, report)
+            feature_creation = FeatureCreation(use_cache=False)
+            stages = self.__select_stages(feature_creation.create_stages())
+
+            with StageMeter('pipeline', size, trace_memory=False) as meter:
+                cleaned_df = feature_creation.load_cleaned_fights()
+                features_df = scheduler.run(cleaned_df, stages)
+        finally:
+            os.chdir(cwd)
+
+        return {
+            'fights' : size,
+            'generate_s' : generate_s,
+            'pipeline' : meter.finish(features_df),
+            'stages' : {stage['stage'] : stage for stage in report.to_dict()['stages']}
+        }
+
+    def save(self, results, directory):
+        """
+        Saves results as a timestamped JSON file.
+
+        Parameters:
+            results (dict): Results of run
+            directory (str): Directory of the results, created when missing
+
+        Returns:
+            str: Path of the saved results
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"benchmark_{results['started_at'].replace(':', '')}.json")
+        write_results(results, path)
+        return path
+
+    def __select_stages(self, stages):
+        """
+        Selects the requested stages and the stages they require, in pipeline order.
+
+        Parameters:
+            stages (list): Every stage
+
+        Returns:
+            list: The selected stages
+        """
+
+        if self.stages is None:
+            return stages
+
+        by_name = {stage.name : stage for stage in stages}
+        unknown = [name for name in self.stages if name not in by_name]
+        if unknown:
+            raise ValueError(f'Unknown stages {unknown}, expected some of {list(by_name)}')
+
+        selected = set()
+        pending = list(self.stages)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(by_name[name].requires)
+
+        return [stage for stage in stages if stage.name in selected]
+
+def compare_results(results, baseline, threshold=0.2, min_delta_s=0.05):
+    """
+    Compares the wall times of a run with a baseline run, for every size, stage and the whole pipeline both ran.
+
+    Parameters:
+        results (dict): Results of the run
+        baseline (dict): Results of the baseline run
+        threshold (float): Relative slowdown above which a time is a regression
+        min_delta_s (float): Smallest slowdown in seconds that is a regression, so noise on fast stages isn't flagged
+
+    Returns:
+        list: Every compared time with its size, name, baseline and current seconds, ratio and whether it regressed
+    """
+
+    comparisons = []
+    for size, size_results in results['sizes'].items():
+        baseline_size = baseline['sizes'].get(size)
+        if baseline_size is None:
+            continue
+
+        timings = [('pipeline', size_results['pipeline'], baseline_size['pipeline'])]
+        timings += [(name, stage, baseline_size['stages'][name]) for name, stage in size_results['stages'].items()
+                    if name in baseline_size['stages'] and stage['source'] == 'run' and baseline_size['stages'][name]['source'] == 'run']
+
+        for name, current, previous in timings:
+            ratio = current['wall_s'] / previous['wall_s'] if previous['wall_s'] > 0 else float('inf')
+            comparisons.append({
+                'size' : int(size),
+                'name' : name,
+                'baseline_s' : previous['wall_s'],
+                'current_s' : current['wall_s'],
+                'ratio' : ratio,
+                'regression' : ratio > 1 + threshold and current['wall_s'] - previous['wall_s'] > min_delta_s
+            })
+
+    return comparisons
+
+def format_comparisons(comparisons):
+    """
+    Formats comparisons as a table.
+
+    Parameters:
+        comparisons (list): Comparisons of compare_results
+
+    Returns:
+        str: One line per comparison, regressions marked
+    """
+
+    lines = [f"{'size':>9}  {'name':<22}{'baseline s':>12}{'current s':>12}{'ratio':>8}"]
+    for comparison in comparisons:
+        lines.append(f"{comparison['size']:>9}  {comparison['name']:<22}{comparison['baseline_s']:>12.3f}{comparison['current_s']:>12.3f}"
+                     f"{comparison['ratio']:>8.2f}" + ('  REGRESSION' if comparison['regression'] else ''))
+    return '\n'.join(lines)
+
+def load_results(path):
+    """
+    Parameters:
+        path (str): Path of saved results
+
+    Returns:
+        dict: The results
+    """
+
+    with open(path) as f:
+        return json.load(f)
+
+def write_results(results, path):
+    """
+    Writes results as JSON.
+
+    Parameters:
+        results (dict): The results
+        path (str): Path of the JSON file
+    """
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=4)
@@ -0,0 +1,412 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from scripts.scrape_fights import COLS, FIGHTER_COLS, ROUND_COLS, STAT_COLS, TARGET_COLS
+
+# Size presets of the benchmarks
+SIZES = {'10k' : 10_000, '100k' : 100_000, '1m' : 1_000_000}
+
+# Division, share of the fighters and mean height in inches
+DIVISIONS = [
+    ('Flyweight', 0.07, 65), ('Bantamweight', 0.12, 67), ('Featherweight', 0.13, 68), ('Lightweight', 0.19, 69),
+    ('Welterweight', 0.17, 71), ('Middleweight', 0.13, 72), ('Light Heavyweight', 0.10, 74), ('Heavyweight', 0.09, 75)
+]
+
+LOCATIONS = [
+    ('Las Vegas, Nevada, USA', 610.0), ('Denver, Colorado, USA', 1609.0), ('Mexico City, Distrito Federal, Mexico', 2240.0),
+    ('London, England, United Kingdom', 11.0), ('Abu Dhabi, Abu Dhabi, United Arab Emirates', 5.0),
+    ('Rio de Janeiro, Rio de Janeiro, Brazil', 2.0), ('Newark, New Jersey, USA', 3.0), ('Salt Lake City, Utah, USA', 1288.0),
+    ('Sydney, New South Wales, Australia', 19.0), ('Toronto, Ontario, Canada', 76.0)
+]
+
+# Outcome method and its share of the fights, draws and overturned results have no winner
+METHODS = [
+    ('KO/TKO', 0.31), ('Submission', 0.20), ('Decision - Unanimous', 0.34), ('Decision - Split', 0.09),
+    ('Decision - Majority', 0.02), ("TKO - Doctor's Stoppage", 0.02), ('Overturned', 0.01), ('Decision - Draw', 0.01)
+]
+
+REFEREES = ['Herb Dean', 'Marc Goddard', 'Jason Herzog', 'Keith Peterson', 'Mike Beltran', 'Dan Miragliotta']
+STANCES = ['Orthodox', 'Southpaw', 'Switch']
+
+# Share of significant strikes thrown at the head, body and legs, and from distance, in the clinch and on the ground
+TARGET_SHARES = {'position' : [0.75, 0.13, 0.12], 'target' : [0.70, 0.15, 0.15]}
+
+ROUND_SECONDS = 300
+
+class SyntheticFights():
+    """
+    Usage:
+        fights_df, fighters_df = SyntheticFights(seed=0).generate(10_000)
+        SyntheticFights(seed=0).write('bench/data', SIZES['1m'])
+
+        Generates fight histories with the columns and cell formats of the scraped CSVs, so they go through CleanData
+        and every feature stage like scraped fights. Fighters have a power-law number of fights, a career of spaced
+        fights, a division, a skill that decides their results and their own striking pace, accuracy and wrestling.
+        Opponents are fighters of the same division fighting around the same time, and fights are grouped into weekly
+        events in chronological order.
+
+        The round stats are generated in chunks of chunk_size fights, each with its own random stream, so write streams
+        a large history to disk with the same fights generate returns.
+    """
+
+    def __init__(self, seed=0, activity_exponent=2.1, max_fights=45, years=30, chunk_size=50_000):
+        """
+        Parameters:
+            seed (int): Seed of the random streams
+            activity_exponent (float): Exponent of the power law of the number of fights per fighter
+            max_fights (int): Most fights of one fighter
+            years (int): Years the history covers
+            chunk_size (int): Number of fights whose stats are generated at once
+        """
+
+        self.seed = seed
+        self.activity_exponent = activity_exponent
+        self.max_fights = max_fights
+        self.years = years
+        self.chunk_size = chunk_size
+
+    def generate(self, n_fights):
+        """
+        Generates a fight history.
+
+        Parameters:
+            n_fights (int): Number of fights
+
+        Returns:
+            tuple: The fights with the columns of the scraped fights CSV, in date order, and the fighters with the
+                   columns of the scraped fighters CSV
+        """
+
+        fights_df, fighters_df, attributes = self.__create_schedule(n_fights)
+        chunks = [self.__create_stats(fights_df.iloc[start:start + self.chunk_size], attributes, start) for start in range(0, n_fights, self.chunk_size)]
+        stats_df = pd.concat(chunks) if chunks else pd.DataFrame(index=fights_df.index)
+        return pd.concat([fights_df, stats_df], axis=1).reindex(columns=COLS), fighters_df
+
+    def write(self, directory, n_fights):
+        """
+        Writes a fight history as ufc_men_fights.csv and ufc_men_fighters.csv, a chunk of fights at a time.
+
+        Parameters:
+            directory (str): Directory of the CSVs, created when missing
+            n_fights (int): Number of fights
+
+        Returns:
+            tuple: Paths of the fights and the fighters CSVs
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        fights_path = os.path.join(directory, 'ufc_men_fights.csv')
+        fighters_path = os.path.join(directory, 'ufc_men_fighters.csv')
+
+        fights_df, fighters_df, attributes = self.__create_schedule(n_fights)
+        fighters_df.to_csv(fighters_path, index=False)
+        pd.DataFrame(columns=COLS).to_csv(fights_path, index=False)
+        for start in range(0, n_fights, self.chunk_size):
+            chunk_df = fights_df.iloc[start:start + self.chunk_size]
+            chunk_df = pd.concat([chunk_df, self.__create_stats(chunk_df, attributes, start)], axis=1).reindex(columns=COLS)
+            chunk_df.to_csv(fights_path, mode='a', header=False, index=False)
+
+        return fights_path, fighters_path
+
+    def __create_schedule(self, n_fights):
+        """
+        Creates the fighters and pairs their career fights into dated fights with outcomes.
+
+        Parameters:
+            n_fights (int): Number of fights
+
+        Returns:
+            tuple: The match columns of the fights, the fighters CSV and the attributes of every fighter
+        """
+
+        rng = np.random.default_rng([self.seed, 0])
+
+        # Pareto draws rounded down follow a discrete power law, the last fighter keeps the fights left over
+        draws = np.floor(rng.random(2 * n_fights) ** (-1 / (self.activity_exponent - 1))).astype(np.int64)
+        fight_counts = np.minimum(draws, self.max_fights)
+        n_fighters = int(np.searchsorted(np.cumsum(fight_counts), 2 * n_fights)) + 1
+        fight_counts = fight_counts[:n_fighters]
+        fight_counts[-1] -= fight_counts.sum() - 2 * n_fights
+
+        attributes = self.__create_attributes(rng, n_fighters)
+
+        # Career fights about every five months, careers start anywhere they end within the history
+        span = 365 * self.years
+        gaps = rng.gamma(3, 50, fight_counts.sum())
+        fighter_slots = np.repeat(np.arange(n_fighters), fight_counts)
+        career_starts = np.cumsum(fight_counts) - fight_counts
+        offsets = np.cumsum(gaps) - np.repeat(np.cumsum(gaps)[career_starts] - gaps[career_starts], fight_counts)
+        careers = np.maximum(offsets[np.cumsum(fight_counts) - 1], 1)
+        first_days = rng.random(n_fighters) * np.maximum(span - careers, 0)
+        slot_days = np.repeat(first_days, fight_counts) + offsets
+
+        # Opponents are neighbours in time within a division
+        order = np.lexsort((slot_days, attributes['division'][fighter_slots]))
+        fighter_slots, slot_days = fighter_slots[order], slot_days[order]
+        fighter_a, fighter_b = fighter_slots[0::2].copy(), fighter_slots[1::2].copy()
+        self.__separate_self_fights(fighter_a, fighter_b)
+        days = np.maximum(slot_days[0::2], slot_days[1::2])
+
+        swap = rng.random(n_fights) < 0.5
+        fighter_a, fighter_b = np.where(swap, fighter_b, fighter_a), np.where(swap, fighter_a, fighter_b)
+
+        # Events every Saturday, the fights of an event share its location
+        order = np.argsort(days, kind='stable')
+        fighter_a, fighter_b, days = fighter_a[order], fighter_b[order], days[order]
+        weeks = (days // 7).astype(np.int64)
+        events, event_numbers = np.unique(weeks, return_inverse=True)
+        event_locations = rng.integers(len(LOCATIONS), size=len(events))[event_numbers]
+        dates = pd.Timestamp('1993-11-13') + pd.to_timedelta(weeks * 7, unit='D')
+
+        fights_df = pd.DataFrame({
+            'fight_night_title' : [f'UFC Fight Night {number + 1}' for number in event_numbers],
+            'date' : dates.strftime('%B %d, %Y'),
+            'location' : np.array([location for location, _ in LOCATIONS])[event_locations],
+            'elevation' : np.array([elevation for _, elevation in LOCATIONS])[event_locations],
+            'fighter_a' : attributes['name'][fighter_a],
+            'fighter_a_id' : attributes['id'][fighter_a],
+            'fighter_b' : attributes['name'][fighter_b],
+            'fighter_b_id' : attributes['id'][fighter_b],
+            'division' : np.array([division for division, _, _ in DIVISIONS])[attributes['division'][fighter_a]],
+            'referee' : np.array(REFEREES)[rng.integers(len(REFEREES), size=n_fights)]
+        })
+        fights_df['_fighter_a'] = fighter_a
+        fights_df['_fighter_b'] = fighter_b
+        self.__add_outcomes(rng, fights_df, attributes)
+
+        fighters_df = self.__create_fighters_csv(rng, attributes, pd.Timestamp('1993-11-13') + pd.to_timedelta(first_days, unit='D'))
+        return fights_df, fighters_df, attributes
+
+    def __create_attributes(self, rng, n_fighters):
+        """
+        Draws the attributes of every fighter.
+
+        Parameters:
+            rng (np.random.Generator): Random stream
+            n_fighters (int): Number of fighters
+
+        Returns:
+            dict: Array of every attribute, indexed by fighter number
+        """
+
+        shares = np.array([share for _, share, _ in DIVISIONS])
+        return {
+            'id' : np.array([f'{value:016x}' for value in rng.integers(0, 2 ** 63, n_fighters)]),
+            'name' : np.array([f'Fighter {number}' for number in range(n_fighters)]),
+            'division' : rng.choice(len(DIVISIONS), size=n_fighters, p=shares / shares.sum()),
+            'skill' : rng.normal(0, 1, n_fighters),
+            'pace' : rng.gamma(6, 7, n_fighters),
+            'accuracy' : rng.beta(9, 11, n_fighters),
+            'wrestling' : rng.gamma(1.2, 0.8, n_fighters),
+            'power' : rng.gamma(2, 0.004, n_fighters)
+        }
+
+    def __separate_self_fights(self, fighter_a, fighter_b):
+        """
+        Swaps the opponent of every fight of a fighter against themselves with the opponent of the nearest fight
+        neither of whose fighters is that fighter, so the fights stay close in time.
+
+        Parameters:
+            fighter_a (np.ndarray): Fighter a of every fight, changed in place
+            fighter_b (np.ndarray): Fighter b of every fight, changed in place
+        """
+
+        n = len(fighter_a)
+        for distance in range(1, n):
+            same = np.flatnonzero(fighter_a == fighter_b)
+            if len(same) == 0:
+                return
+
+            for step in [distance, -distance]:
+                other = same + step
+                valid = (other >= 0) & (other < n)
+                same_valid, other = same[valid], other[valid]
+                swappable = (fighter_a[other] != fighter_a[same_valid]) & (fighter_b[other] != fighter_a[same_valid]) & \
+                            (fighter_a[other] != fighter_b[other])
+
+                # Fights are swapped once per step so two self fights never trade with the same fight
+                other, first = np.unique(other[swappable], return_index=True)
+                same_valid = same_valid[swappable][first]
+                keep = ~np.isin(other, same_valid)
+                same_valid, other = same_valid[keep], other[keep]
+                fighter_b[same_valid], fighter_b[other] = fighter_b[other], fighter_b[same_valid].copy()
+                same = np.flatnonzero(fighter_a == fighter_b)
+
+    def __add_outcomes(self, rng, fights_df, attributes):
+        """
+        Adds the winner, method, round, time and format of every fight, the better fighter winning more often.
+
+        Parameters:
+            rng (np.random.Generator): Random stream
+            fights_df (pd.DataFrame): The fights, changed in place
+            attributes (dict): Attributes of every fighter
+        """
+
+        n = len(fights_df)
+        fighter_a, fighter_b = fights_df['_fighter_a'].to_numpy(), fights_df['_fighter_b'].to_numpy()
+        a_wins = rng.random(n) < 1 / (1 + np.exp(attributes['skill'][fighter_b] - attributes['skill'][fighter_a]))
+
+        shares = np.array([share for _, share in METHODS])
+        methods = np.array([method for method, _ in METHODS])[rng.choice(len(METHODS), size=n, p=shares / shares.sum())]
+        no_winner = np.isin(methods, ['Overturned', 'Decision - Draw'])
+
+        # The first fights predate five round main events and are scraped with "No" time limit
+        early = np.arange(n) < n * 0.02
+        rounds = np.where((rng.random(n) < 0.15) & ~early, 5, 3)
+        decision = np.char.startswith(methods.astype(str), 'Decision')
+        finish_round = np.minimum((rng.random(n) * rounds).astype(np.int64) + 1, rounds)
+        outcome_round = np.where(decision, rounds, finish_round)
+        finish_seconds = np.where(decision, ROUND_SECONDS, rng.integers(5, ROUND_SECONDS, n))
+
+        fights_df['winner'] = np.where(no_winner, None, np.where(a_wins, fights_df['fighter_a'], fights_df['fighter_b']))
+        fights_df['winner_id'] = np.where(no_winner, None, np.where(a_wins, fights_df['fighter_a_id'], fights_df['fighter_b_id']))
+        fights_df['outcome_method'] = methods
+        fights_df['outcome_round'] = outcome_round
+        fights_df['outcome_time'] = format_durations(finish_seconds)
+        fights_df['outcome_format'] = np.where(early, 'No', rounds.astype(str))
+        fights_df['outcome_detail'] = np.where(decision, 'Judges decision', 'Stoppage')
+        fights_df['_seconds'] = finish_seconds
+
+    def __create_stats(self, fights_df, attributes, start):
+        """
+        Generates the round and total stats of a chunk of fights.
+
+        Parameters:
+            fights_df (pd.DataFrame): The chunk of fights
+            attributes (dict): Attributes of every fighter
+            start (int): Position of the first fight of the chunk, which seeds its random stream
+
+        Returns:
+            pd.DataFrame: The stat columns of the fights
+        """
+
+        rng = np.random.default_rng([self.seed, 1, start])
+        n = len(fights_df)
+        outcome_round = fights_df['outcome_round'].to_numpy()
+        last_seconds = fights_df['_seconds'].to_numpy()
+        columns = {}
+
+        for f in FIGHTER_COLS:
+            fighter = fights_df[f'_fighter_{f}'].to_numpy()
+            totals = {}
+            for r in ROUND_COLS:
+                fought = outcome_round >= r
+                share = np.where(outcome_round == r, last_seconds / ROUND_SECONDS, 1.0) * fought
+
+                sig_attempted = rng.poisson(attributes['pace'][fighter] * share)
+                sig_landed = rng.binomial(sig_attempted, attributes['accuracy'][fighter])
+                extra = rng.poisson(8 * share)
+                td_attempted = rng.poisson(attributes['wrestling'][fighter] * share)
+                td_landed = rng.binomial(td_attempted, 0.4)
+                ctrl = np.minimum((rng.gamma(1.5, 20, n) * (td_landed + 0.3)).astype(np.int64), (share * ROUND_SECONDS).astype(np.int64))
+                stats = {
+                    'kd' : np.minimum(rng.poisson(attributes['power'][fighter] * sig_landed), sig_landed),
+                    'sig_str_landed' : sig_landed,
+                    'sig_str_attempted' : sig_attempted,
+                    'total_str_landed' : sig_landed + rng.binomial(extra, 0.7),
+                    'td_landed' : td_landed,
+                    'td_attempted' : td_attempted,
+                    'sub_att' : rng.poisson(0.15 * share),
+                    'rev' : rng.poisson(0.03 * share),
+                    'ctrl' : ctrl
+                }
+                stats['total_str_attempted'] = sig_attempted + extra
+
+                for split, shots in [('target', TARGET_COLS[:3]), ('position', TARGET_COLS[3:])]:
+                    landed = rng.multinomial(sig_landed, TARGET_SHARES[split])
+                    missed = rng.multinomial(sig_attempted - sig_landed, TARGET_SHARES[split])
+                    for i, shot in enumerate(shots):
+                        stats[f'{shot}_shots_landed'] = landed[:, i]
+                        stats[f'{shot}_shots_attempted'] = landed[:, i] + missed[:, i]
+
+                for stat, values in stats.items():
+                    totals[stat] = totals.get(stat, 0) + values
+                for stat, values in self.__format_stats(stats).items():
+                    columns[f'fighter_{f}_round_{r}_{stat}'] = values.where(fought) if isinstance(values, pd.Series) else pd.Series(values, index=fights_df.index).where(fought)
+
+            for stat, values in self.__format_stats(totals).items():
+                columns[f'fighter_{f}_total_{stat}'] = pd.Series(values, index=fights_df.index)
+
+        return pd.DataFrame(columns, index=fights_df.index)
+
+    def __format_stats(self, stats):
+        """
+        Formats stats like the scraped cells: counts as integers, percentages as "45%" or "---" without attempts and
+        control time as "m:ss".
+
+        Parameters:
+            stats (dict): Array of every count stat
+
+        Returns:
+            dict: Formatted column of every stat of STAT_COLS and the target columns
+        """
+
+        formatted = {}
+        for stat, values in stats.items():
+            formatted[stat] = pd.array(values, dtype='Int64') if stat != 'ctrl' else format_durations(values)
+
+        formatted['sig_str_pct'] = format_percents(stats['sig_str_landed'], stats['sig_str_attempted'])
+        formatted['td_pct'] = format_percents(stats['td_landed'], stats['td_attempted'])
+        return formatted
+
+    def __create_fighters_csv(self, rng, attributes, debuts):
+        """
+        Creates the fighters CSV of the fighters.
+
+        Parameters:
+            rng (np.random.Generator): Random stream
+            attributes (dict): Attributes of every fighter
+            debuts (pd.DatetimeIndex): Date of the first fight of every fighter
+
+        Returns:
+            pd.DataFrame: The fighters with the columns of the scraped fighters CSV
+        """
+
+        n = len(attributes['id'])
+        heights = np.round(np.array([height for _, _, height in DIVISIONS])[attributes['division']] + rng.normal(0, 1.5, n)).astype(np.int64)
+        reaches = heights + np.round(rng.normal(1, 2, n)).astype(np.int64)
+        births = debuts - pd.to_timedelta(rng.uniform(21, 32, n) * 365.25, unit='D')
+        hometowns = rng.integers(len(LOCATIONS), size=n)
+
+        return pd.DataFrame({
+            'Name' : attributes['name'],
+            'Height' : [f'{height // 12}\' {height % 12}"' for height in heights],
+            'Reach' : [f'{reach}"' for reach in reaches],
+            'STANCE' : np.array(STANCES)[rng.choice(len(STANCES), size=n, p=[0.72, 0.22, 0.06])],
+            'DOB' : births.strftime('%b %d, %Y'),
+            'ID' : attributes['id'],
+            'Hometown' : np.array([location for location, _ in LOCATIONS])[hometowns],
+            'Hometown_Elevation' : np.array([elevation for _, elevation in LOCATIONS])[hometowns],
+            'Trains_Out_Of' : None
+        })
+
+def format_durations(seconds):
+    """
+    Formats durations in seconds as "m:ss".
+
+    Parameters:
+        seconds (np.ndarray): The durations
+
+    Returns:
+        np.ndarray: The formatted durations
+    """
+
+    seconds = np.asarray(seconds, dtype=np.int64)
+    return np.char.add(np.char.add((seconds // 60).astype(str), ':'), np.char.zfill((seconds % 60).astype(str), 2)).astype(object)
+
+def format_percents(landed, attempted):
+    """
+    Formats accuracies like the scraped cells, "45%" or "---" without attempts.
+
+    Parameters:
+        landed (np.ndarray): Landed counts
+        attempted (np.ndarray): Attempted counts
+
+    Returns:
+        np.ndarray: The formatted accuracies
+    """
+
+    percents = np.round(100 * landed / np.maximum(attempted, 1)).astype(np.int64)
+    return np.where(attempted > 0, np.char.add(percents.astype(str), '%'), '---').astype(object)
@@ -0,0 +1,446 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+from functools import partial
+import numpy as np
+import pandas as pd
+from pandas.core.internals import BlockManager
+from pandas.core.internals.api import make_block
+
+CACHE_DIR = 'data/.cache'
+
+# Bump when the on-disk layout below changes
+CACHE_FORMAT_VERSION = 1
+
+# Size the stage cache is evicted down to, least recently used entries first
+STAGE_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+class CleanedDataCache():
+    """
+    Usage:
+        cache = CleanedDataCache()
+        df = cache.load_or_clean('data/ufc_men_fights.csv', CleanData())
+
+        Caches the cleaned fights as a directory of .npy arrays keyed by a hash of the CSV contents and the
+        cleaning code. Numeric columns are stored as one 2D array per dtype and memory-mapped on load, object
+        columns are stored as int32 codes plus their unique values.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = os.path.join(cache_dir, 'cleaned')
+
+    def load_or_clean(self, csv_path, cleaner):
+        """
+        Loads the cleaned fights from the cache, cleaning and caching the CSV on a miss.
+
+        Parameters:
+            csv_path (str): Path to the raw fights CSV
+            cleaner (CleanData): Cleaner used on a cache miss, its source code is part of the cache key
+
+        Returns:
+            pd.DataFrame: The cleaned fights
+        """
+
+        key = self.create_key(csv_path, cleaner)
+        entry_dir = os.path.join(self.cache_dir, key)
+
+        if os.path.exists(os.path.join(entry_dir, 'columns.json')):
+            return self.load(entry_dir)
+
+        df = cleaner.clean_data(pd.read_csv(csv_path, encoding='latin-1'))
+        self.save(df, entry_dir, csv_path)
+        return df
+
+    def create_key(self, csv_path, cleaner):
+        """
+        Hashes the CSV contents together with the source code of the cleaner.
+
+        Parameters:
+            csv_path (str): Path to the raw fights CSV
+            cleaner (CleanData): Cleaner whose module source is part of the key
+
+        Returns:
+            str: Hex digest identifying the cleaned data
+        """
+
+        digest = hashlib.sha256()
+        digest.update(str(CACHE_FORMAT_VERSION).encode())
+
+        with open(inspect.getfile(type(cleaner)), 'rb') as source_file:
+            digest.update(source_file.read())
+
+        with open(csv_path, 'rb') as csv_file:
+            for chunk in iter(lambda: csv_file.read(1 << 20), b''):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def save(self, df, entry_dir, csv_path):
+        """
+        Writes the dataframe to entry_dir and removes older entries built from the same CSV.
+
+        Parameters:
+            df (pd.DataFrame): The cleaned fights
+            entry_dir (str): Directory of the cache entry
+            csv_path (str): Path to the raw fights CSV the entry was built from
+        """
+
+        self.__remove_entries(csv_path)
+
+        save_frame(df, entry_dir, {'csv_path' : os.path.abspath(csv_path)})
+
+    def load(self, entry_dir):
+        """
+        Loads a cache entry, memory-mapping the numeric blocks copy-on-write.
+
+        Parameters:
+            entry_dir (str): Directory of the cache entry
+
+        Returns:
+            pd.DataFrame: The cleaned fights
+        """
+
+        return load_frame(entry_dir)
+
+    def __remove_entries(self, csv_path):
+        """
+        Removes cache entries that were built from csv_path.
+
+        Parameters:
+            csv_path (str): Path to the raw fights CSV
+        """
+
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        for entry in os.listdir(self.cache_dir):
+            columns_path = os.path.join(self.cache_dir, entry, 'columns.json')
+            if not os.path.exists(columns_path):
+                continue
+            with open(columns_path) as columns_file:
+                if json.load(columns_file)['csv_path'] == os.path.abspath(csv_path):
+                    shutil.rmtree(os.path.join(self.cache_dir, entry), ignore_errors=True)
+
+class StageCache():
+    """
+    Usage:
+        cache = StageCache()
+        key = cache.create_key(stage, stage_input)
+        output = cache.load(key, stage_input.index)
+        cache.save(key, output, stage.name)
+
+        Content-addressed cache of the output columns of feature stages. An entry is keyed by a hash of the stage's
+        input dataframe, its parameters (args and the state of the object the stage function is bound to) and the
+        source of its module and the package modules it uses, so editing one stage only invalidates the stages that
+        depend on it. Loading an entry marks it as used and the least recently used entries are evicted once the
+        cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=STAGE_CACHE_MAX_BYTES):
+        self.cache_dir = os.path.join(cache_dir, 'stages')
+        self.max_bytes = max_bytes
+
+    def create_key(self, stage, df):
+        """
+        Hashes the input, parameters and source code of a stage.
+
+        Parameters:
+            stage (Stage): The feature stage
+            df (pd.DataFrame): Input dataframe of the stage
+
+        Returns:
+            str: Hex digest identifying the stage output
+        """
+
+        digest = hashlib.sha256()
+        digest.update(f'{CACHE_FORMAT_VERSION}:{stage.name}'.encode())
+
+        for source_path in self.__get_source_files(stage.func):
+            with open(source_path, 'rb') as source_file:
+                digest.update(source_file.read())
+
+        self.__hash_value(digest, stage.func)
+        self.__hash_value(digest, stage.args)
+        self.__hash_value(digest, df)
+        return digest.hexdigest()
+
+    def load(self, key, index):
+        """
+        Loads the output of a stage and marks the entry as recently used.
+
+        Parameters:
+            key (str): Key of the entry
+            index (pd.Index): Index of the stage input
+
+        Returns:
+            pd.DataFrame: The cached output columns, None on a miss
+        """
+
+        entry_dir = os.path.join(self.cache_dir, key)
+        columns_path = os.path.join(entry_dir, 'columns.json')
+        if not os.path.exists(columns_path):
+            return None
+
+        os.utime(columns_path)
+        df = load_frame(entry_dir)
+        df.index = index
+        return df
+
+    def save(self, key, df, stage_name):
+        """
+        Saves the output of a stage and evicts the least recently used entries past max_bytes.
+        Outputs that cannot be stored column by column are not cached.
+
+        Parameters:
+            key (str): Key of the entry
+            df (pd.DataFrame): Output columns of the stage
+            stage_name (str): Name of the stage, kept for inspecting the cache
+        """
+
+        if not df.columns.is_unique:
+            return
+
+        entry_dir = os.path.join(self.cache_dir, key)
+        try:
+            save_frame(df, entry_dir, {'stage' : stage_name})
+        except (TypeError, ValueError):
+            shutil.rmtree(f'{entry_dir}.tmp{os.getpid()}', ignore_errors=True)
+            return
+
+        self.evict(keep=key)
+
+    def entries(self):
+        """
+        Lists the cache entries from the most to the least recently used.
+
+        Returns:
+            list: One dict per entry with its key, stage, rows, columns, size in bytes and last use time
+        """
+
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, key)
+            columns_path = os.path.join(entry_dir, 'columns.json')
+            if not os.path.exists(columns_path):
+                continue
+
+            with open(columns_path) as columns_file:
+                meta = json.load(columns_file)
+            size = sum(os.path.getsize(os.path.join(entry_dir, file)) for file in os.listdir(entry_dir))
+            entries.append({'key' : key, 'stage' : meta['stage'], 'rows' : meta['rows'], 'columns' : len(meta['columns']),
+                            'bytes' : size, 'last_used' : os.path.getmtime(columns_path)})
+
+        return sorted(entries, key=lambda entry: entry['last_used'], reverse=True)
+
+    def evict(self, keep=None):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+
+        Parameters:
+            keep (str): Key of an entry that is never evicted, e.g. the one just written
+        """
+
+        entries = self.entries()
+        total = sum(entry['bytes'] for entry in entries)
+        for entry in reversed(entries):
+            if total <= self.max_bytes:
+                break
+            if entry['key'] == keep:
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, entry['key']), ignore_errors=True)
+            total -= entry['bytes']
+
+    def clear(self, stage_name=None):
+        """
+        Removes the cache entries of a stage, or every entry.
+
+        Parameters:
+            stage_name (str): Name of the stage to clear, None clears the whole cache
+
+        Returns:
+            int: Number of entries removed
+        """
+
+        removed = 0
+        for entry in self.entries():
+            if stage_name is None or entry['stage'] == stage_name:
+                shutil.rmtree(os.path.join(self.cache_dir, entry['key']), ignore_errors=True)
+                removed += 1
+        return removed
+
+    def __get_source_files(self, func):
+        """
+        Finds the source files of the module defining a stage function and of the package modules it uses.
+
+        Parameters:
+            func (callable): Stage function, a bound method or a partial of one
+
+        Returns:
+            list: Paths of the source files, sorted by module name
+        """
+
+        while isinstance(func, partial):
+            func = func.func
+        owner = type(func.__self__) if inspect.ismethod(func) else func
+        package = owner.__module__.split('.')[0]
+
+        sources = {}
+        pending = [sys.modules[owner.__module__]]
+        while pending:
+            module = pending.pop()
+            if module.__name__ in sources:
+                continue
+            sources[module.__name__] = inspect.getfile(module)
+
+            for value in vars(module).values():
+                name = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+                if isinstance(name, str) and name.split('.')[0] == package and name in sys.modules:
+                    pending.append(sys.modules[name])
+
+        return [sources[name] for name in sorted(sources)]
+
+    def __hash_value(self, digest, value):
+        """
+        Feeds a stage parameter into the digest: dataframes by their contents, callables by their qualified name
+        and objects by their attributes.
+
+        Parameters:
+            digest (hashlib._Hash): Digest to update
+            value (object): The parameter
+        """
+
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            frame = value.to_frame() if isinstance(value, pd.Series) else value
+            digest.update(repr([(col, str(dtype)) for col, dtype in frame.dtypes.items()]).encode())
+            digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+        elif isinstance(value, np.ndarray):
+            digest.update(value.dtype.str.encode())
+            digest.update(repr(value.tolist()).encode() if value.dtype == object else value.tobytes())
+        elif isinstance(value, partial):
+            for part in [value.func, value.args, value.keywords]:
+                self.__hash_value(digest, part)
+        elif inspect.ismethod(value):
+            self.__hash_value(digest, value.__self__)
+            digest.update(value.__func__.__qualname__.encode())
+        elif isinstance(value, dict):
+            for item_key in sorted(value, key=repr):
+                digest.update(repr(item_key).encode())
+                self.__hash_value(digest, value[item_key])
+        elif isinstance(value, (list, tuple, set)):
+            digest.update(type(value).__name__.encode())
+            for item in sorted(value, key=repr) if isinstance(value, set) else value:
+                self.__hash_value(digest, item)
+        elif callable(value) and hasattr(value, '__qualname__'):
+            digest.update(f'{value.__module__}.{value.__qualname__}'.encode())
+        elif hasattr(value, '__dict__'):
+            digest.update(type(value).__qualname__.encode())
+            self.__hash_value(digest, vars(value))
+        else:
+            digest.update(repr(value).encode())
+
+def save_frame(df, entry_dir, meta):
+    """
+    Writes a dataframe to entry_dir as .npy arrays. Numeric columns are stored as one 2D array per dtype, object
+    and extension columns as int32 codes plus their unique values and categorical columns as codes plus categories.
+    The entry is written to a temporary directory first and moved into place once complete.
+
+    Parameters:
+        df (pd.DataFrame): Dataframe to save
+        entry_dir (str): Directory of the cache entry
+        meta (dict): Extra fields stored in columns.json
+    """
+
+    tmp_dir = f'{entry_dir}.tmp{os.getpid()}'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    blocks = {}
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            columns.append({'name' : col, 'kind' : 'category', 'file' : column_file(col, len(columns)), 'ordered' : bool(values.cat.ordered)})
+            np.save(os.path.join(tmp_dir, f"{columns[-1]['file']}.codes.npy"), values.cat.codes.to_numpy().astype(np.int32))
+            np.save(os.path.join(tmp_dir, f"{columns[-1]['file']}.values.npy"), values.cat.categories.to_numpy(), allow_pickle=True)
+        elif values.dtype == object or not isinstance(values.dtype, np.dtype):
+            columns.append({'name' : col, 'kind' : 'object', 'file' : column_file(col, len(columns))})
+            codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=True)
+            np.save(os.path.join(tmp_dir, f"{columns[-1]['file']}.codes.npy"), codes.astype(np.int32))
+            np.save(os.path.join(tmp_dir, f"{columns[-1]['file']}.values.npy"), np.asarray(uniques, dtype=object), allow_pickle=True)
+        else:
+            dtype = values.dtype.str
+            blocks.setdefault(dtype, []).append(col)
+            columns.append({'name' : col, 'kind' : 'block', 'dtype' : dtype, 'position' : len(blocks[dtype]) - 1})
+
+    # One (n_columns, n_rows) array per dtype so every column is contiguous on disk
+    block_files = {}
+    for i, (dtype, cols) in enumerate(blocks.items()):
+        block_files[dtype] = f'block_{i}.npy'
+        np.save(os.path.join(tmp_dir, block_files[dtype]), np.ascontiguousarray(df[cols].to_numpy(dtype=dtype).T))
+
+    with open(os.path.join(tmp_dir, 'columns.json'), 'w') as columns_file:
+        json.dump({**meta, 'rows' : len(df), 'blocks' : block_files, 'columns' : columns}, columns_file)
+
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+
+def load_frame(entry_dir):
+    """
+    Loads a dataframe written by save_frame, memory-mapping the numeric blocks copy-on-write.
+
+    Parameters:
+        entry_dir (str): Directory of the cache entry
+
+    Returns:
+        pd.DataFrame: The dataframe with a RangeIndex
+    """
+
+    with open(os.path.join(entry_dir, 'columns.json')) as columns_file:
+        meta = json.load(columns_file)
+
+    blocks = {dtype : np.load(os.path.join(entry_dir, file), mmap_mode='c') for dtype, file in meta['blocks'].items()}
+
+    # Every memory-mapped array becomes one pandas block as is, the DataFrame constructor would consolidate the
+    # columns into new blocks and copy them. This is the pandas internals API pyarrow builds its frames with.
+    placements = {dtype : [] for dtype in blocks}
+    frame_blocks = []
+    for i, col in enumerate(meta['columns']):
+        if col['kind'] == 'block':
+            placements[col['dtype']].append(i)
+            continue
+
+        codes = np.load(os.path.join(entry_dir, f"{col['file']}.codes.npy"))
+        uniques = np.load(os.path.join(entry_dir, f"{col['file']}.values.npy"), allow_pickle=True)
+        if col['kind'] == 'category':
+            frame_blocks.append(make_block(pd.Categorical.from_codes(codes, categories=uniques, ordered=col['ordered']), placement=[i], ndim=2))
+        else:
+            values = uniques.take(codes, mode='clip') if len(uniques) else np.full(len(codes), np.nan, dtype=object)
+            values[codes < 0] = np.nan
+            frame_blocks.append(make_block(values.reshape(1, -1), placement=[i]))
+
+    # save_frame stores the columns of a block in column order, so a block's placement is its columns in order
+    frame_blocks += [make_block(np.asarray(blocks[dtype]), placement=placements[dtype]) for dtype in blocks]
+
+    axes = [pd.Index([col['name'] for col in meta['columns']]), pd.RangeIndex(meta['rows'])]
+    manager = BlockManager(frame_blocks, axes)
+    return pd.DataFrame._from_mgr(manager, axes=manager.axes)
+
+def column_file(col, position):
+    """
+    Creates a file name for a column that is safe on every filesystem.
+
+    Parameters:
+        col (str): Column name
+        position (int): Position of the column in the dataframe
+
+    Returns:
+        str: File name prefix for the column
+    """
+
+    return f'col_{position}_' + hashlib.sha1(str(col).encode()).hexdigest()[:8]
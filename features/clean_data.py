@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 class CleanData():
@@ -22,6 +23,31 @@ class CleanData():
 					[f'fighter_{f}_round_{r}_{shot}_{acc}' for f in self.fighter_cols for r in self.round_cols for shot in self.target_cols for acc in self.target_accuracy_cols] + \
 					[f'fighter_{f}_total_{shot}_{acc}' for f in self.fighter_cols for shot in self.target_cols for acc in self.target_accuracy_cols]
 
+        # Target dtype and parse rule of every stat, counts fit comfortably in int16
+        self.stat_types = {stat : ('int16', 'count') for stat in self.stat_cols + self.target_accuracy_cols}
+        self.stat_types.update({
+            'sig_str_pct' : ('float32', 'percent'),
+            'td_pct' : ('float32', 'percent'),
+            'ctrl' : ('int16', 'duration')
+        })
+        self.schema = self.create_schema()
+        self.parse_rules = {
+            'count' : self.__parse_count,
+            'percent' : self.__parse_percent,
+            'duration' : self.__parse_duration
+        }
+        self.rejected_cells = {}
+
+        # Columns in the same group share one lookup table so their codes can be compared with each other
+        self.category_groups = {
+            'fighter_id' : ['fighter_a_id', 'fighter_b_id', 'winner_id'],
+            'division' : ['division'],
+            'location' : ['location'],
+            'referee' : ['referee'],
+            'outcome_method' : ['outcome_method']
+        }
+        self.categories = {}
+
     def clean_data(self, df):
         self.df = df
         self.convert_to_datetime()
@@ -30,6 +56,7 @@ class CleanData():
         self.replace_outdated_rounds()
         self.enforce_types()
         self.replace_divisions()
+        self.intern_categories()
         self.rename_data()
         return self.df
 
@@ -61,16 +88,116 @@ class CleanData():
 
         self.df['outcome_format'] = self.df['outcome_format'].apply(lambda x: 3 if x == 'No' or int(x) < 3 else int(x))
 
+    def create_schema(self):
+        """
+        Creates the schema for the stat columns.
+
+        Returns:
+            dict: Mapping of column name to a (dtype, parse rule) tuple
+        """
+
+        schema = {}
+        for f in self.fighter_cols:
+            for period in [f'round_{r}' for r in self.round_cols] + ['total']:
+                for stat in self.stat_cols:
+                    schema[f'fighter_{f}_{period}_{stat}'] = self.stat_types[stat]
+                for shot in self.target_cols:
+                    for acc in self.target_accuracy_cols:
+                        schema[f'fighter_{f}_{period}_{shot}_{acc}'] = self.stat_types[acc]
+        return schema
+
     def enforce_types(self):
         """
-        Enforce types for columns that should be numeric.
+        Enforce the schema types for columns that should be numeric.
+        Columns are parsed in one vectorized pass per (parse rule, dtype), cells a rule can't parse are set to 0
+        and counted in self.rejected_cells.
+        """
+
+        groups = {}
+        for col, (dtype, rule) in self.schema.items():
+            groups.setdefault((rule, dtype), []).append(col)
+
+        self.rejected_cells = {rule : 0 for rule in self.parse_rules}
+        blocks = []
+        for (rule, dtype), cols in groups.items():
+            values = pd.Series(self.df[cols].to_numpy(dtype=object).ravel())
+            if rule == 'percent':
+                # The scale of the percentages is decided per column, the values are raveled row by row
+                parsed = self.__parse_percent(values, np.tile(np.arange(len(cols)), len(self.df)))
+            else:
+                parsed = self.parse_rules[rule](values)
+
+            self.rejected_cells[rule] += int((parsed.isna() & values.notna()).sum())
+
+            parsed = parsed.fillna(0).to_numpy().reshape(len(self.df), len(cols))
+            blocks.append(pd.DataFrame(parsed.astype(dtype), index=self.df.index, columns=cols))
+
+        typed_cols = list(self.schema)
+        self.df = pd.concat([self.df.drop(typed_cols, axis=1)] + blocks, axis=1)[self.df.columns]
+
+    def __parse_count(self, values):
+        """
+        Parses counts, either numbers or "x of y" strings (x is kept).
+
+        Parameters:
+            values (pd.Series): Raw cell values
+
+        Returns:
+            pd.Series: Parsed values, NaN where the value couldn't be parsed
+        """
+
+        parsed = pd.to_numeric(values, errors='coerce')
+        unparsed = parsed.isna() & values.notna()
+        if unparsed.any():
+            landed = values[unparsed].astype(str).str.extract(r'^\s*(\d+)\s+of\s+\d+\s*$')[0]
+            parsed[unparsed] = pd.to_numeric(landed)
+        return parsed
+
+    def __parse_percent(self, values, columns=None):
         """
+        Parses percentages into fractions, either "45%" or "x of y" strings or numbers. The scale of the numbers is
+        decided once per column: when any number is above 1 they are all percentages, otherwise all fractions, so a
+        number 1 is 1% in a column of percentages and 100% in a column of fractions. Fractions outside [0, 1] are
+        rejected.
+
+        Parameters:
+            values (pd.Series): Raw cell values
+            columns (np.ndarray): Column of every value, None when they are all of one column
 
-        for col in self.cols:
-            # Convert to numeric, all that can't be converted convert to NaN
-            self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
-            self.df = self.df.fillna(0)
-            self.df[col] = self.df[col].astype(int)
+        Returns:
+            pd.Series: Parsed values, NaN where the value couldn't be parsed
+        """
+
+        parsed = pd.to_numeric(values, errors='coerce')
+        unparsed = parsed.isna() & values.notna()
+        columns = np.zeros(len(values), dtype=np.int64) if columns is None else np.asarray(columns)
+        percent_columns = np.bincount(columns[(parsed > 1).to_numpy()], minlength=columns.max(initial=0) + 1) > 0
+        parsed = parsed.where(~percent_columns[columns], parsed / 100)
+        if unparsed.any():
+            strings = values[unparsed].astype(str)
+            percent = pd.to_numeric(strings.str.extract(r'^\s*(\d+(?:\.\d+)?)\s*%\s*$')[0]) / 100
+            ratio = strings.str.extract(r'^\s*(\d+)\s+of\s+(\d+)\s*$').apply(pd.to_numeric)
+            ratio = ratio[0] / ratio[1].where(ratio[1] > 0)
+            parsed[unparsed] = percent.fillna(ratio)
+        return parsed.where(parsed.between(0, 1))
+
+    def __parse_duration(self, values):
+        """
+        Parses "m:ss" durations into seconds.
+
+        Parameters:
+            values (pd.Series): Raw cell values
+
+        Returns:
+            pd.Series: Parsed values, NaN where the value couldn't be parsed
+        """
+
+        parsed = pd.to_numeric(values, errors='coerce')
+        unparsed = parsed.isna() & values.notna()
+        if unparsed.any():
+            time = values[unparsed].astype(str).str.extract(r'^\s*(\d+):(\d{2})\s*$').apply(pd.to_numeric)
+            parsed[unparsed] = time[0] * 60 + time[1]
+        return parsed
 
     def replace_divisions(self):
         """
@@ -177,6 +304,18 @@ class CleanData():
             'Catch Weight' : 'Catchweight'
         })
 
+    def intern_categories(self):
+        """
+        Intern fighter IDs, divisions, locations, referees and outcome methods into pandas Categoricals.
+        Equality masks and groupbys on these columns then compare int codes instead of strings.
+        """
+
+        for group, cols in self.category_groups.items():
+            # First-appearance order, the imputed 0 can't be sorted together with strings
+            self.categories[group] = pd.Index(pd.unique(self.df[cols].to_numpy(dtype=object).ravel('F')), dtype=object)
+            for col in cols:
+                self.df[col] = pd.Categorical(self.df[col], categories=self.categories[group])
+
     def rename_data(self):
         """
         Rename the following columns to be used as features.
@@ -1,15 +1,11 @@
 import pandas as pd
 import numpy as np
-import googlemaps
-from geopy.distance import geodesic
-import requests
-from bs4 import BeautifulSoup
-from tqdm import tqdm
-import swifter
+from .gazetteer import Gazetteer, haversine_km
+from .keyed_counters import lookup_codes
 
 class DateFeatures():
-    def __init__(self) -> None:
-        pass
+    def __init__(self, gazetteer=None) -> None:
+        self.gazetteer = gazetteer if gazetteer is not None else Gazetteer()
 
     def create_date_features(self, df):
         """
@@ -32,107 +28,114 @@ class DateFeatures():
 
         return df
 
-    # def create_home_adv_features(self, fighter_df, fights_df, include_progress_bar=True):
-    #     """
-    #     Adds 'fighter_A_home_advantage' and 'fighter_B_home_advantage' features to the fights_df.
-    #     These features indicate whether the fight location is within 20 km of the fighter's hometown.
-
-    #     Parameters:
-    #         fighter_df (pd.DataFrame): DataFrame containing all the fighters in the dataset
-    #         fights_df (pd.DataFrame): DataFrame containing all the fights in the dataset
-    #         include_progress_bar (bool): Whether or not to include a progress bar
-
-    #     Returns:
-    #         pd.DataFrame: DataFrame containing the home advantage features for each fight in the dataset
-    #     """
-
-    #     # Initialize Google Maps client
-    #     gmaps = googlemaps.Client(key=self.gmaps_key)
-
-    #     # Enable progress bar if required
-    #     if include_progress_bar:
-    #         tqdm.pandas(desc="Calculating home advantage")
-
-    #     # Apply the function to calculate home advantage for fighter A
-    #     if include_progress_bar:
-
-    #         fights_df['fighter_a_home_advantage'] = fights_df.progress_apply(lambda row: self.calculate_home_advantage(row['fighter_a_id'], row['location'], fighter_df, gmaps), axis=1)
-    #     else:
-    #         fights_df['fighter_A_home_advantage'] = fights_df.apply(lambda row: self.calculate_home_advantage(row['fighter_a_id'], row['location'], fighter_df, gmaps), axis=1)
-
-    #     # Apply the function to calculate home advantage for fighter B
-    #     if include_progress_bar:
-    #         fights_df['fighter_B_home_advantage'] = fights_df.progress_apply(lambda row: self.calculate_home_advantage(row['fighter_b_id'], row['location'], fighter_df, gmaps), axis=1)
-    #     else:
-    #         fights_df['fighter_B_home_advantage'] = fights_df.apply(lambda row: self.calculate_home_advantage(row['fighter_b_id'], row['location'], fighter_df, gmaps), axis=1)
-
-    #     return fights_df
-
-    # def calculate_home_advantage(self, fighter_id, fight_location, fighter_df, gmaps, log_csv_path='missing_data_log.csv'):
-    #     """
-    #     Calculates the home advantage for a given fighter in a given fight.
-
-    #     Parameters:
-    #         fighter_id (str): ID of the fighter
-    #         fight_location (str): Location of the fight
-    #         fighter_df (pd.DataFrame): DataFrame containing all the fighters in the dataset
-    #         gmaps (googlemaps.Client): Google Maps client instance
-    #         log_csv_path (str): Path to the CSV file containing the names of the fighters whose hometowns could not be found
-
-    #     Returns:
-    #         int: 1 if the fighter has home advantage, 0 otherwise
-    #     """
-
-    #     if fighter_id not in fighter_df['ID'].values:
-    #         return 0
-
-    #     filtered_df = fighter_df.loc[fighter_df['ID'] == fighter_id, 'Hometown']
-
-    #     # Check if hometown exists for the fighter
-    #     if filtered_df.empty or pd.isna(filtered_df.iloc[0]):
-    #         return 0
-    #     fighter_hometown = filtered_df.iloc[0]
-    #     # Get coordinates for fighter's hometown and fight location
-    #     hometown_coords = self.get_coords(fighter_hometown, gmaps)
-    #     location_coords = self.get_coords(fight_location, gmaps)
-
-    #     # Calculate distance and check if it's within 20 km
-    #     ht_adv = 0
-    #     if self.calculate_distance(hometown_coords, location_coords) <= 20:
-    #         ht_adv = 1
-
-    #     return ht_adv
-
-    # def get_coords(location, gmaps):
-    #     """
-    #     Retrieves the coordinates of a given location.
-
-    #     Parameters:
-    #         location (str): The location to get coordinates for.
-    #         gmaps (googlemaps.Client): Google Maps client instance.
-
-    #     Returns:
-    #         tuple: A tuple containing the latitude and longitude of the location.
-    #     """
-
-    #     geocode_result = gmaps.geocode(location)
-    #     if geocode_result:
-    #         return (geocode_result[0]['geometry']['location']['lat'],
-    #                 geocode_result[0]['geometry']['location']['lng'])
-    #     return None
-
-    # def calculate_distance(self, fighter_hometown_coords, fight_location_coords):
-    #     """
-    #     Calculate the distance between two locations. take in coordinates as tuples
-
-    #     Parameters:
-    #         fighter_hometown_coords (tuple): Coordinates of the fighter's hometown
-    #         fight_location_coords (tuple): Coordinates of the fight location
-
-    #     Returns:
-    #         float: Distance between the two locations in kilometers
-    #     """
-
-    #     if fighter_hometown_coords and fight_location_coords:
-    #         return geodesic(fighter_hometown_coords, fight_location_coords).kilometers
-    #     return float('inf')
\ No newline at end of file
+    def create_matchup_date_features(self, states, bouts):
+        """
+        Creates the date features of upcoming bouts, they only depend on the date of the bout.
+
+        Parameters:
+            states (None): The date features keep no fighter states
+            bouts (pd.DataFrame): The bouts, with the date column
+
+        Returns:
+            pd.DataFrame: The date features of every bout
+        """
+
+        dates = pd.DatetimeIndex(bouts['date'])
+        day_of_year = dates.day_of_year.to_numpy()
+
+        return pd.DataFrame({
+            'year' : dates.year.to_numpy(),
+            'day_cos' : np.cos(day_of_year * 2 * np.pi / 365.25),
+            'day_sin' : np.sin(day_of_year * 2 * np.pi / 365.25)
+        }, index=bouts.index)
+
+    def create_home_adv_features(self, fighter_df, fights_df, radius_km=20):
+        """
+        Adds the home advantage and travel distance features to the fights_df.
+        A fighter has home advantage when the fight location is within radius_km of their hometown. Places missing
+        from the gazetteer get a NaN travel distance and no home advantage, scripts/build_gazetteer.py fills them in.
+
+        Parameters:
+            fighter_df (pd.DataFrame): DataFrame containing all the fighters in the dataset
+            fights_df (pd.DataFrame): DataFrame containing all the fights in the dataset
+            radius_km (float): Maximum distance in kilometers between hometown and venue to count as home advantage
+
+        Returns:
+            pd.DataFrame: DataFrame containing the home advantage features for each fight in the dataset
+        """
+
+        hometowns = fighter_df.drop_duplicates('ID').set_index('ID')['Hometown']
+        fighter_a_hometowns = fights_df['fighter_a_id'].astype(object).map(hometowns)
+        fighter_b_hometowns = fights_df['fighter_b_id'].astype(object).map(hometowns)
+
+        # Resolve every distinct venue and hometown once
+        n = len(fights_df)
+        places = np.concatenate([fights_df['location'].to_numpy(dtype=object), fighter_a_hometowns.to_numpy(dtype=object), fighter_b_hometowns.to_numpy(dtype=object)])
+        coords = self.gazetteer.resolve(places)
+
+        location_coords, fighter_a_coords, fighter_b_coords = coords[:n], coords[n:2 * n], coords[2 * n:]
+
+        for col, values in self.__get_home_adv_values(location_coords, fighter_a_coords, fighter_b_coords, radius_km).items():
+            fights_df[col] = values
+
+        return fights_df
+
+    def get_home_adv_states(self, fighter_df, fights_df):
+        """
+        Resolves the hometown of every fighter once, the state the home advantage features of upcoming bouts read.
+
+        Parameters:
+            fighter_df (pd.DataFrame): DataFrame containing all the fighters in the dataset
+            fights_df (pd.DataFrame): DataFrame containing all the fights in the dataset, hometowns don't depend on them
+
+        Returns:
+            pd.DataFrame: The latitude and longitude of the hometown of every fighter, indexed by ID, NaN when unknown
+        """
+
+        hometowns = fighter_df.drop_duplicates('ID').set_index('ID')['Hometown']
+        return pd.DataFrame(self.gazetteer.resolve(hometowns.to_numpy(dtype=object)), index=hometowns.index.astype(object), columns=['latitude', 'longitude'])
+
+    def create_matchup_home_adv_features(self, states, bouts, radius_km=20):
+        """
+        Creates the home advantage and travel distance features of upcoming bouts from the hometowns of both fighters.
+
+        Parameters:
+            states (pd.DataFrame): The hometown coordinates of every fighter, from get_home_adv_states
+            bouts (pd.DataFrame): The bouts, with the fighter_a_id, fighter_b_id and location columns
+            radius_km (float): Maximum distance in kilometers between hometown and venue to count as home advantage
+
+        Returns:
+            pd.DataFrame: The home advantage features of every bout
+        """
+
+        # Fighters missing from the fighters read the appended unknown hometown
+        coords = np.append(states.to_numpy(dtype=float), [[np.nan, np.nan]], axis=0)
+        codes = lookup_codes(states.index, bouts['fighter_a_id'], bouts['fighter_b_id'])
+        fighter_a_coords, fighter_b_coords = coords[codes[:, 0]], coords[codes[:, 1]]
+        location_coords = self.gazetteer.resolve(bouts['location'].to_numpy(dtype=object))
+
+        return pd.DataFrame(self.__get_home_adv_values(location_coords, fighter_a_coords, fighter_b_coords, radius_km), index=bouts.index)
+
+    def __get_home_adv_values(self, location_coords, fighter_a_coords, fighter_b_coords, radius_km):
+        """
+        Computes the travel distances of both fighters and whether they fight at home.
+
+        Parameters:
+            location_coords (np.ndarray): Latitude and longitude of the venues, shape (n, 2)
+            fighter_a_coords (np.ndarray): Latitude and longitude of the hometowns of fighter a, shape (n, 2)
+            fighter_b_coords (np.ndarray): Latitude and longitude of the hometowns of fighter b, shape (n, 2)
+            radius_km (float): Maximum distance in kilometers between hometown and venue to count as home advantage
+
+        Returns:
+            dict: The home advantage feature columns
+        """
+
+        fighter_a_distance = haversine_km(fighter_a_coords[:, 0], fighter_a_coords[:, 1], location_coords[:, 0], location_coords[:, 1])
+        fighter_b_distance = haversine_km(fighter_b_coords[:, 0], fighter_b_coords[:, 1], location_coords[:, 0], location_coords[:, 1])
+
+        return {
+            'fighter_a_travel_distance' : fighter_a_distance,
+            'fighter_b_travel_distance' : fighter_b_distance,
+            'fighter_a_home_advantage' : (fighter_a_distance <= radius_km).astype(int),
+            'fighter_b_home_advantage' : (fighter_b_distance <= radius_km).astype(int)
+        }
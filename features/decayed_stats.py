@@ -0,0 +1,96 @@
+import numpy as np
+
+# Default half-lives in days of the exponentially decayed stats
+DECAY_HALF_LIVES = [180, 365, 730]
+
+class DecayedStats():
+    """
+    Usage:
+        decayed = DecayedStats(half_lives=[180, 365], n_values=3)
+        sums = decayed.sweep(fighters, dates, values, order)
+        decayed.update(fighter, date, fight_values)
+
+        Keeps exponentially time-decayed sums of fight values per fighter and half-life. A fight first decays the
+        sums by 2^(-days / half_life) since the fighter's previous fight and then adds its values, so reading and
+        updating cost O(1) per fight and half-life and the sums can be kept up to date online.
+    """
+
+    def __init__(self, half_lives=DECAY_HALF_LIVES, n_values=1):
+        self.half_lives = np.asarray(half_lives, dtype=float)
+        self.n_values = n_values
+        self.sums = {}
+        self.last_dates = {}
+
+    def read(self, fighter, date):
+        """
+        Reads the decayed sums of a fighter as of a date.
+
+        Parameters:
+            fighter (int): Code of the fighter
+            date (np.datetime64): Date to decay the sums to
+
+        Returns:
+            np.ndarray: Array of shape (n_half_lives, n_values), zeros for a fighter without fights
+        """
+
+        sums = self.sums.get(fighter)
+        if sums is None:
+            return np.zeros((len(self.half_lives), self.n_values))
+
+        return sums * self.__decay(date - self.last_dates[fighter])[:, None]
+
+    def update(self, fighter, date, values):
+        """
+        Adds the values of a fight to the decayed sums of a fighter.
+
+        Parameters:
+            fighter (int): Code of the fighter
+            date (np.datetime64): Date of the fight, not before the fighter's previous fight
+            values (np.ndarray): Array of shape (n_values,)
+        """
+
+        self.sums[fighter] = self.read(fighter, date) + np.asarray(values, dtype=float)
+        self.last_dates[fighter] = date
+
+    def sweep(self, fighters, dates, values, order=None):
+        """
+        Sweeps the fights and returns the decayed sums of both fighters going into every fight.
+
+        Parameters:
+            fighters (np.ndarray): Array of shape (n_fights, 2) with the codes of fighter a and fighter b
+            dates (np.ndarray): Fight dates as datetime64 values
+            values (np.ndarray): Array of shape (n_fights, 2, n_values) with each fighter's values of the fight
+            order (np.ndarray): Order to sweep the fights in, must be chronological, defaults to the row order
+
+        Returns:
+            np.ndarray: Array of shape (n_fights, 2, n_half_lives, n_values) with the pre-fight decayed sums
+        """
+
+        n = len(fighters)
+        order = range(n) if order is None else np.asarray(order).tolist()
+        fighter_list = np.asarray(fighters).tolist()
+        dates = np.asarray(dates, dtype='datetime64[ns]')
+        values = np.asarray(values, dtype=float)
+
+        res = np.zeros((n, 2, len(self.half_lives), self.n_values))
+        for i in order:
+            for side, fighter in enumerate(fighter_list[i]):
+                res[i, side] = self.read(fighter, dates[i])
+            for side, fighter in enumerate(fighter_list[i]):
+                self.update(fighter, dates[i], values[i, side])
+
+        return res
+
+    def __decay(self, elapsed):
+        """
+        Computes the decay factor of every half-life.
+
+        Parameters:
+            elapsed (np.timedelta64): Time since the previous fight
+
+        Returns:
+            np.ndarray: Decay factor per half-life
+        """
+
+        days = elapsed / np.timedelta64(1, 'D')
+        return np.exp2(-days / self.half_lives)
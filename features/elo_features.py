@@ -1,4 +1,6 @@
 import math
+import numpy as np
+import pandas as pd
 
 class Elo():
     def __init__(self):
@@ -15,76 +17,124 @@ class Elo():
     Public Function
     """
     def compute_elo_features(self, df):
-        target_df = df
+        """
+        Computes the pre-fight Glicko-2 rating, RD and volatility of both fighters for every fight in row order.
+        Each fighter's rating after their latest fight is kept in a dict, so the fights are swept once.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
 
-        # Compute Glicko ratings for every match
-        for index, row in target_df.iterrows():
-            fighter_a_updated_rating, fighter_a_updated_rd, fighter_a_updated_vol = self.__compute_elo_ratings(target_df, row['fighter_a_id'], index)
-            fighter_b_updated_rating, fighter_b_updated_rd, fighter_b_updated_vol = self.__compute_elo_ratings(target_df, row['fighter_b_id'], index)
+        Returns:
+            pd.DataFrame: The same DataFrame with the fighter_{a,b}_elo_{rating,rd,vol} columns set
+        """
 
-            target_df.at[index, 'fighter_a_elo_rating'] = fighter_a_updated_rating
-            target_df.at[index, 'fighter_a_elo_rd'] = fighter_a_updated_rd
-            target_df.at[index, 'fighter_a_elo_vol'] = fighter_a_updated_vol
-            target_df.at[index, 'fighter_b_elo_rating'] = fighter_b_updated_rating
-            target_df.at[index, 'fighter_b_elo_rd'] = fighter_b_updated_rd
-            target_df.at[index, 'fighter_b_elo_vol'] = fighter_b_updated_vol
+        target_df = df
+        fighter_a_ratings, fighter_b_ratings, _ = self.__sweep(target_df)
+
+        fighter_a_ratings = np.array(fighter_a_ratings, dtype=float).reshape(-1, 3)
+        fighter_b_ratings = np.array(fighter_b_ratings, dtype=float).reshape(-1, 3)
+        for fighter, fighter_ratings in [('fighter_a', fighter_a_ratings), ('fighter_b', fighter_b_ratings)]:
+            target_df[f'{fighter}_elo_rating'] = fighter_ratings[:, 0]
+            target_df[f'{fighter}_elo_rd'] = fighter_ratings[:, 1]
+            target_df[f'{fighter}_elo_vol'] = fighter_ratings[:, 2]
 
         return target_df
 
-    """
-    Private Functions
-    """
+    def get_ratings(self, df):
+        """
+        Computes the Glicko-2 rating, RD and volatility of every fighter after their latest fight.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+
+        Returns:
+            dict: (rating, RD, volatility) of every fighter ID
+        """
+
+        return self.__sweep(df)[2]
 
-    def __compute_elo_ratings(self, df, p_id, index):
-        # Find all the previous fights
-        all_prev_games = df.iloc[:index]
+    def create_matchup_elo_features(self, ratings, bouts):
+        """
+        Reads the pre-fight Glicko-2 rating, RD and volatility of both fighters of upcoming bouts from their ratings
+        after their latest fight.
 
-        # If there have been fights before this fight ->
-        if not all_prev_games.empty:
+        Parameters:
+            ratings (dict): (rating, RD, volatility) of every fighter ID, from get_ratings
+            bouts (pd.DataFrame): The bouts, with the fighter_a_id and fighter_b_id columns
 
-            # Get the ID values of fighter 1 and fighter 2
-            fighter_a_id_vals = all_prev_games.fighter_a_id.values
-            fighter_b_id_vals = all_prev_games.fighter_b_id.values
+        Returns:
+            pd.DataFrame: The fighter_{a,b}_elo_{rating,rd,vol} columns of every bout
+        """
 
-            # Get the fights where fighter 1 and fighter 2 have fought
-            prev_games = all_prev_games[((fighter_a_id_vals == p_id) | (fighter_b_id_vals == p_id))]
+        initial = (self.RATING_INIT, self.RD_INIT, self.VOL_INIT)
+        result_features = {}
+        for fighter in ['fighter_a', 'fighter_b']:
+            fighter_ratings = [ratings.get(fighter_id, initial) if not pd.isna(fighter_id) else initial for fighter_id in bouts[f'{fighter}_id']]
+            fighter_ratings = np.array(fighter_ratings, dtype=float).reshape(-1, 3)
+            result_features[f'{fighter}_elo_rating'] = fighter_ratings[:, 0]
+            result_features[f'{fighter}_elo_rd'] = fighter_ratings[:, 1]
+            result_features[f'{fighter}_elo_vol'] = fighter_ratings[:, 2]
+
+        return pd.DataFrame(result_features, index=bouts.index)
+
+    def win_probability(self, fighter_a_rating, fighter_b_rating):
+        """
+        Computes the expected score of fighter a against fighter b, the uncertainty of both ratings widening the
+        logistic curve.
+
+        Parameters:
+            fighter_a_rating (tuple): (rating, RD, volatility) of fighter a, None for a fighter without fights
+            fighter_b_rating (tuple): (rating, RD, volatility) of fighter b, None for a fighter without fights
+
+        Returns:
+            float: The probability that fighter a wins
+        """
+
+        initial = (self.RATING_INIT, self.RD_INIT, self.VOL_INIT)
+        fighter_a_rating = fighter_a_rating or initial
+        fighter_b_rating = fighter_b_rating or initial
+
+        combined_rd = math.sqrt(fighter_a_rating[1] ** 2 + fighter_b_rating[1] ** 2) / self.GLICKO_SCALE_FACTOR
+        return self.__E((fighter_a_rating[0] - self.RATING_INIT) / self.GLICKO_SCALE_FACTOR, (fighter_b_rating[0] - self.RATING_INIT) / self.GLICKO_SCALE_FACTOR, combined_rd)
+
+    """
+    Private Functions
+    """
 
-            # Set default initial Glicko2 elo
-            player_elo_rating = self.RATING_INIT
-            player_elo_rd = self.RD_INIT
-            player_elo_vol = self.VOL_INIT
+    def __sweep(self, df):
+        """
+        Sweeps the fights in row order, keeping the rating of every fighter after their latest fight in a dict.
 
-            # If the fighters have fought prior ->
-            if not prev_games.empty:
+        Parameters:
+            df (pd.DataFrame): DataFrame containing the fights
 
-                # Find the result of the last fight
-                last_game = prev_games.iloc[-1]
-                res = self.WIN if p_id == last_game['winner_id'] else self.LOSS
+        Returns:
+            tuple: The pre-fight ratings of fighter a and of fighter b of every fight, and the final ratings
+        """
 
-                # Set fighter and opponent variables accordingly
-                if p_id == last_game['fighter_a_id']:
-                    player = "fighter_a"
-                    opp = "fighter_b"
-                else:
-                    player = "fighter_b"
-                    opp = "fighter_a"
+        fighter_a_ids = df['fighter_a_id'].tolist()
+        fighter_b_ids = df['fighter_b_id'].tolist()
+        winner_ids = df['winner_id'].tolist()
 
-                # Get the Glicko2 elo prior to the last fight
-                player_rating = last_game[f'{player}_elo_rating']
-                player_rd = last_game[f'{player}_elo_rd']
-                player_vol = last_game[f'{player}_elo_vol']
-                opp_rating = last_game[f'{opp}_elo_rating']
-                opp_rd = last_game[f'{opp}_elo_rd']
+        # Rating, RD and volatility of every fighter after their latest fight
+        ratings = {}
+        initial = (self.RATING_INIT, self.RD_INIT, self.VOL_INIT)
 
-                # Update the rating based on previous match results
-                updated_rating, updated_rd, updated_vol = self.__get_updated_rating(player_rating, player_rd, player_vol, opp_rating, opp_rd, res)
+        fighter_a_ratings, fighter_b_ratings = [], []
+        for fighter_a_id, fighter_b_id, winner_id in zip(fighter_a_ids, fighter_b_ids, winner_ids):
+            fighter_a_rating = ratings.get(fighter_a_id, initial) if not pd.isna(fighter_a_id) else initial
+            fighter_b_rating = ratings.get(fighter_b_id, initial) if not pd.isna(fighter_b_id) else initial
+            fighter_a_ratings.append(fighter_a_rating)
+            fighter_b_ratings.append(fighter_b_rating)
 
-                player_elo_rating = updated_rating
-                player_elo_rd = updated_rd
-                player_elo_vol = updated_vol
+            if not pd.isna(fighter_a_id):
+                res = self.WIN if fighter_a_id == winner_id else self.LOSS
+                ratings[fighter_a_id] = self.__get_updated_rating(*fighter_a_rating, fighter_b_rating[0], fighter_b_rating[1], res)
+            if not pd.isna(fighter_b_id):
+                res = self.WIN if fighter_b_id == winner_id else self.LOSS
+                ratings[fighter_b_id] = self.__get_updated_rating(*fighter_b_rating, fighter_a_rating[0], fighter_a_rating[1], res)
 
-            return player_elo_rating, player_elo_rd, player_elo_vol
-        return self.RATING_INIT, self.RD_INIT, self.VOL_INIT
+        return fighter_a_ratings, fighter_b_ratings, ratings
 
     def __get_updated_rating(self, player_rating, player_rd, player_vol, opp_rating, opp_rd, res):
         player_elo_rating = (player_rating - self.RATING_INIT) / self.GLICKO_SCALE_FACTOR
@@ -0,0 +1,170 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+import numpy as np
+import pandas as pd
+from .progress import StageProgress
+
+# RowExecutor the row-wise applies of the running stage use, None to apply in the current thread
+ROW_EXECUTOR = ContextVar('row_executor', default=None)
+
+# StageProgress of the running stage, None outside of a stage
+STAGE_PROGRESS = ContextVar('stage_progress', default=None)
+
+class RowExecutor():
+    """
+    Usage:
+        with RowExecutor('threads', max_workers=4) as executor:
+            res = executor.map_rows(target_df, self.__compute_knockdowns, df, kwargs={'last_fights' : 3})
+            res = executor.apply(target_df, lambda row: row['kd'] * 2)
+            res = executor.map_blocks(target_df, compute_block)
+
+        Runs row-wise and block-wise kernels in one of three modes:
+            serial      in the current thread
+            threads     over contiguous blocks of rows in a thread pool
+            processes   over contiguous shards of rows in a process pool, the history dataframe in shared memory
+
+        Results are identical in every mode. Fight kernels passed to map_rows and block functions passed to
+        map_blocks must be picklable in processes mode, bound methods of the feature classes are. Row functions
+        passed to apply are usually closures, so they run in the current thread in processes mode.
+    """
+
+    MODES = ['serial', 'threads', 'processes']
+
+    def __init__(self, mode='serial', max_workers=None):
+        """
+        Parameters:
+            mode (str): One of MODES
+            max_workers (int): Number of threads or processes, None for the number of CPUs
+        """
+
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown row execution mode {mode}, expected one of {self.MODES}')
+
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pool = None
+        self.shared_rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Shuts the pools down.
+        """
+
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+        if self.shared_rows is not None:
+            self.shared_rows.close()
+            self.shared_rows = None
+
+    def map_rows(self, df, kernel, history_df, args=(), kwargs=None, progress=None):
+        """
+        Applies a fight kernel to every row of df, the result of
+        kernel(history_df, row['fighter_a_id'], row['fighter_b_id'], row.name, *args, **kwargs) for every row.
+
+        Parameters:
+            df (pd.DataFrame): Rows to apply the kernel to
+            kernel (callable): Function or bound method computing the features of one fight
+            history_df (pd.DataFrame): DataFrame of all the fights passed to the kernel
+            args (tuple): Extra positional arguments of the kernel
+            kwargs (dict): Extra keyword arguments of the kernel
+            progress (StageProgress): Progress the rows are counted in, None to not count them
+
+        Returns:
+            pd.DataFrame | pd.Series: The result of the row-wise apply
+        """
+
+        kwargs = kwargs or {}
+        if self.mode == 'processes':
+            if self.shared_rows is None:
+                from .shared_rows import SharedRowExecutor
+                self.shared_rows = SharedRowExecutor(self.max_workers)
+            return self.shared_rows.apply(df, kernel, history_df, args, kwargs, progress)
+
+        return self.apply(df, lambda row: kernel(history_df, row['fighter_a_id'], row['fighter_b_id'], row.name, *args, **kwargs), progress)
+
+    def apply(self, df, func, progress=None):
+        """
+        Applies func to every row of df, equivalent to df.apply(func, axis=1).
+
+        Parameters:
+            df (pd.DataFrame): DataFrame to apply func over
+            func (callable): Function taking a row (pd.Series)
+            progress (StageProgress): Progress the rows are counted in, None to not count them
+
+        Returns:
+            pd.DataFrame | pd.Series: The result of the row-wise apply
+        """
+
+        if progress is not None:
+            progress.start_pass(len(df))
+            row_func = lambda row: progress.advance(func(row))
+        else:
+            row_func = func
+
+        apply_block = lambda block: block.apply(row_func, axis=1)
+        if self.mode == 'processes':
+            return apply_block(df)
+        return self.map_blocks(df, apply_block)
+
+    def map_blocks(self, df, func):
+        """
+        Applies a block function to contiguous blocks of rows of df and concatenates the results in row order.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame to split into blocks
+            func (callable): Function taking a block of rows (pd.DataFrame) and returning a pd.DataFrame or
+                             pd.Series indexed like the block
+
+        Returns:
+            pd.DataFrame | pd.Series: The concatenated results
+        """
+
+        # The fight kernels read every earlier fight, so later rows are slower and more blocks balance the workers
+        blocks = 1 if self.mode == 'serial' else min(len(df), self.max_workers * 4)
+        if blocks <= 1:
+            return func(df)
+
+        positions = np.array_split(np.arange(len(df)), blocks)
+        return pd.concat(list(self.__get_pool().map(func, [df.iloc[block] for block in positions])))
+
+    def __get_pool(self):
+        if self.pool is None and self.mode == 'threads':
+            self.pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        elif self.pool is None:
+            # Importing the process pool loads multiprocessing, only the process mode pays for it
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self.pool
+
+@contextmanager
+def stage_execution(name, mode='serial', max_workers=None, progress=False):
+    """
+    Sets how the row-wise applies inside the block run and reports their progress on one line for the whole block.
+
+    Parameters:
+        name (str): Name of the stage shown in the progress line
+        mode (str): Row execution mode, one of RowExecutor.MODES
+        max_workers (int): Number of threads or processes, None for the number of CPUs
+        progress (bool): Whether to report the progress of the stage
+    """
+
+    stage_progress = StageProgress(name, enabled=progress)
+    with RowExecutor(mode, max_workers) as executor:
+        executor_token = ROW_EXECUTOR.set(executor if mode != 'serial' else None)
+        progress_token = STAGE_PROGRESS.set(stage_progress)
+        try:
+            yield
+        finally:
+            STAGE_PROGRESS.reset(progress_token)
+            ROW_EXECUTOR.reset(executor_token)
+
+    stage_progress.close()
@@ -0,0 +1,126 @@
+import json
+import os
+import pickle
+import pandas as pd
+from .cache import load_frame, save_frame
+
+# The table and the fighter states read from it share one ignored directory, the table directory is replaced on
+# every save so the states sit beside it
+FEATURES_DIR = 'data/features'
+TABLE_DIR = os.path.join(FEATURES_DIR, 'table')
+STATES_PATH = os.path.join(FEATURES_DIR, 'fighter_states.pkl')
+
+class FeatureStore():
+    """
+    Usage:
+        store = FeatureStore()
+        store.save(features_df)
+        features_df = store.load()
+        store.save_states(matchups.states)
+
+        Persists the feature table with the same columnar .npy layout as the caches, together with its watermark,
+        the date of the latest fight it holds, and the output columns of every feature stage. Incremental updates
+        append the features of later fights to it and recompute the rows that depend on corrected fights. The fighter
+        states MatchupFeatures reads from the table are pickled next to it, so matchup queries never read the table.
+    """
+
+    def __init__(self, path=TABLE_DIR, states_path=STATES_PATH):
+        self.path = path
+        self.states_path = states_path
+
+    def exists(self):
+        """
+        Checks whether a feature table has been saved.
+
+        Returns:
+            bool: Whether the feature table exists
+        """
+
+        return os.path.exists(os.path.join(self.path, 'columns.json'))
+
+    def load(self):
+        """
+        Loads the feature table, memory-mapping the numeric columns copy-on-write.
+
+        Returns:
+            pd.DataFrame: The feature table
+        """
+
+        return load_frame(self.path)
+
+    def save(self, df, stage_columns=None):
+        """
+        Replaces the saved feature table.
+
+        Parameters:
+            df (pd.DataFrame): The feature table, with one row per fight
+            stage_columns (dict): Output columns of every feature stage
+        """
+
+        save_frame(df, self.path, {'watermark' : str(pd.to_datetime(df['date']).max()), 'stage_columns' : stage_columns})
+
+    def states_exist(self):
+        """
+        Checks whether fighter states have been saved.
+
+        Returns:
+            bool: Whether the fighter states exist
+        """
+
+        return os.path.exists(self.states_path)
+
+    def load_states(self):
+        """
+        Loads the fighter states.
+
+        Returns:
+            dict: The fighter states of the feature table
+        """
+
+        with open(self.states_path, 'rb') as states_file:
+            return pickle.load(states_file)
+
+    def save_states(self, states):
+        """
+        Replaces the saved fighter states, writing them to a temporary file first so readers never see a partial file.
+
+        Parameters:
+            states (dict): The fighter states of the feature table, from MatchupFeatures
+        """
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.states_path)), exist_ok=True)
+        tmp_path = f'{self.states_path}.tmp{os.getpid()}'
+        with open(tmp_path, 'wb') as states_file:
+            pickle.dump(states, states_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.states_path)
+
+    def get_watermark(self):
+        """
+        Reads the date of the latest fight in the saved feature table.
+
+        Returns:
+            pd.Timestamp: The watermark, NaT for an empty table
+        """
+
+        return pd.Timestamp(self.__read_meta()['watermark'])
+
+    def get_stage_columns(self):
+        """
+        Reads the output columns of every feature stage of the saved feature table.
+
+        Returns:
+            dict: The output columns of every stage, None when they were not saved
+        """
+
+        return self.__read_meta().get('stage_columns')
+
+    def __read_meta(self):
+        """
+        Reads the fields saved next to the feature table.
+
+        Returns:
+            dict: The contents of columns.json
+        """
+
+        with open(os.path.join(self.path, 'columns.json')) as columns_file:
+            return json.load(columns_file)
@@ -1,9 +1,16 @@
+from functools import partial
 import pandas as pd
+from .cache import CleanedDataCache, StageCache
 from .clean_data import CleanData
 from .elo_features import Elo
+from .feature_store import FeatureStore
 from .fight_stats_features import FightStats
 from .frequency_stats_features import FrequencyStats
+from .instrumentation import RunReport
+from .matchup_features import MatchupFeatures
+from .scheduler import Stage, StageScheduler
 from .significant_strike_features import SignificantStrikeFeatures
+from .strength_of_schedule_features import StrengthOfSchedule
 from .date_features import DateFeatures
 from .taped_stats import TapedStats
 from .win_loss_stats_features import WinLossStats
@@ -12,30 +19,212 @@ FIGHT_CSV = 'data/ufc_men_fights.csv'
 FIGHTERS_CSV = 'data/ufc_men_fighters.csv'
 
 class FeatureCreation():
-    def __init__(self) -> None:
-        self.fights_df = pd.read_csv(FIGHT_CSV, encoding='latin-1')
+    def __init__(self, use_cache=True, max_workers=None, row_workers=None, row_mode=None, progress=True, report_path=None, profile_top=None) -> None:
         self.fighter_df = pd.read_csv(FIGHTERS_CSV, encoding='latin-1')
         self.cleaner = CleanData()
+        self.cleaned_data_cache = CleanedDataCache() if use_cache else None
         self.elo = Elo()
+        self.strength_of_schedule = StrengthOfSchedule()
         self.fight_stats = FightStats()
         self.frequency_stats = FrequencyStats()
         self.significant_strike_features = SignificantStrikeFeatures()
         self.date_features = DateFeatures()
         self.taped_stats = TapedStats()
         self.win_loss_stats = WinLossStats()
+        self.report = RunReport(report_path, profile_top=profile_top) if report_path is not None else None
+        self.scheduler = StageScheduler(max_workers, StageCache() if use_cache else None, row_workers, row_mode, progress, self.report)
+        self.feature_store = FeatureStore()
+        self.update_rows = {}
+        self.matchup_features = None
 
     def create_features(self):
         """
         This function creates features for the fights dataframe.
         """
 
-        cleaned_df = self.cleaner.clean_data(self.fights_df)
-        elo_df = self.elo.compute_elo_features(cleaned_df)
-        fight_stats_df = self.fight_stats.create_fight_stats_features(elo_df)
-        frequency_stats_df = self.frequency_stats.create_frequency_feats(fight_stats_df, True)
-        significant_strike_df = self.significant_strike_features.create_significant_strike_feats(frequency_stats_df)
-        spatial_df = self.date_features.create_date_features(significant_strike_df)
-        taped_stats_df = self.taped_stats.create_taped_stats_feats(spatial_df, self.fighter_df)
-        final_df = self.win_loss_stats.create_win_loss_stat_features(taped_stats_df)
+        cleaned_df = self.load_cleaned_fights()
+        features_df = self.scheduler.run(cleaned_df, self.create_stages())
+        self.__write_report()
+        return features_df
 
-        return final_df
\ No newline at end of file
+    def create_stages(self):
+        """
+        Declares the feature stages, the base columns they read, the stages whose columns they need and the fights
+        the features of a fight depend on. Stages are listed in the order their columns are appended to the features
+        dataframe.
+
+        Returns:
+            list: The feature stages
+        """
+
+        fight_cols = ['fighter_a_id', 'fighter_b_id', 'winner_id']
+
+        return [
+            Stage('elo', self.elo.compute_elo_features, columns=fight_cols, history='ratings',
+                  state=self.elo.get_ratings, matchup=self.elo.create_matchup_elo_features),
+            Stage('strength_of_schedule', self.strength_of_schedule.create_strength_of_schedule_feats, columns=fight_cols + ['date'], requires=['elo'], history='opponents',
+                  state=self.strength_of_schedule.get_fighter_states, matchup=self.strength_of_schedule.create_matchup_feats),
+            Stage('fight_stats', self.fight_stats.create_fight_stats_features, history='opponents',
+                  state=self.fight_stats.get_fighter_states, matchup=self.fight_stats.create_matchup_feats),
+            Stage('frequency_stats', self.frequency_stats.create_frequency_feats, args=(True,), history='fighters',
+                  state=self.frequency_stats.get_fighter_states, matchup=self.frequency_stats.create_matchup_feats),
+            Stage('significant_strikes', self.significant_strike_features.create_significant_strike_feats, history='fighters',
+                  state=self.significant_strike_features.get_fighter_states, matchup=self.significant_strike_features.create_matchup_feats),
+            Stage('date', self.date_features.create_date_features, history='fighters',
+                  matchup=self.date_features.create_matchup_date_features),
+            Stage('home_advantage', partial(self.date_features.create_home_adv_features, self.fighter_df), history='fighters',
+                  state=partial(self.date_features.get_home_adv_states, self.fighter_df), matchup=self.date_features.create_matchup_home_adv_features),
+            Stage('taped_stats', self.taped_stats.create_taped_stats_feats, args=(self.fighter_df,), history='fighters',
+                  state=partial(self.taped_stats.get_fighter_states, static_stats_df=self.fighter_df), matchup=self.taped_stats.create_matchup_feats),
+            Stage('win_loss_stats', self.win_loss_stats.create_win_loss_stat_features, args=(self.fighter_df,), history='opponents',
+                  state=partial(self.win_loss_stats.get_fighter_states, fighter_df=self.fighter_df),
+                  matchup=self.win_loss_stats.create_matchup_feats)
+        ]
+
+    def update_features(self):
+        """
+        Brings the saved feature table up to date with the cleaned fights and saves the result. Fights scraped since
+        the table was built are appended, and when earlier fights were corrected, e.g. an overturned result, only the
+        rows whose features depend on them are recomputed, by the stages that read the corrected columns. This gives
+        the same table as a full rebuild, which is done instead when there is no saved table or the fights were
+        reordered. The number of rows recomputed by every stage is printed and kept in update_rows. The fighter states
+        matchup queries read are saved with the table.
+
+        Returns:
+            pd.DataFrame: The updated feature table
+        """
+
+        cleaned_df = self.load_cleaned_fights()
+        stages = self.create_stages()
+        if not self.feature_store.exists() or not self.__can_update(cleaned_df):
+            features_df = self.scheduler.run(cleaned_df, stages)
+            self.__write_report()
+            self.update_rows = {stage.name : len(cleaned_df) for stage in stages}
+            self.feature_store.save(features_df, self.scheduler.stage_columns)
+            self.__save_states(features_df, stages)
+            return features_df
+
+        stored_df = self.feature_store.load()
+        watermark = self.feature_store.get_watermark()
+        new_rows = cleaned_df.index[len(stored_df):]
+        if (cleaned_df.loc[new_rows, 'date'] <= watermark).any():
+            raise ValueError(f'New fights must happen after the watermark {watermark.date()}, rebuild the feature table')
+
+        features_df, stage_rows = self.scheduler.recompute(cleaned_df, stages, stored_df, self.feature_store.get_stage_columns())
+        self.__write_report()
+        self.update_rows = {name : len(rows) for name, rows in stage_rows.items()}
+
+        touched = pd.Index([]).append(list(stage_rows.values())).unique()
+        print(f'Recomputed {len(touched)} of {len(features_df)} rows (' + ', '.join(f'{name}: {count}' for name, count in self.update_rows.items()) + ')')
+
+        if len(touched) > 0:
+            self.feature_store.save(features_df, self.scheduler.stage_columns)
+        if len(touched) > 0 or not self.feature_store.states_exist():
+            self.__save_states(features_df, stages)
+        return features_df
+
+    def __save_states(self, features_df, stages):
+        """
+        Reads the fighter states of every stage from the feature table, saves them and keeps them for matchup queries.
+
+        Parameters:
+            features_df (pd.DataFrame): The saved feature table
+            stages (list): The feature stages
+        """
+
+        self.matchup_features = MatchupFeatures.from_features(stages, features_df, self.feature_store.get_stage_columns())
+        self.feature_store.save_states(self.matchup_features.states)
+
+    def __write_report(self):
+        """
+        Writes the run report of the last scheduler run when a report path was given.
+        """
+
+        if self.report is None:
+            return
+
+        self.report.write()
+        print(f'Wrote the run report to {self.report.path}')
+
+    def __can_update(self, cleaned_df):
+        """
+        Checks that the saved feature table can be updated in place: it holds the stage columns, its fights still come
+        first in the cleaned fights and none of them moved to another date.
+
+        Parameters:
+            cleaned_df (pd.DataFrame): The cleaned fights
+
+        Returns:
+            bool: Whether the saved feature table can be updated
+        """
+
+        if self.feature_store.get_stage_columns() is None:
+            return False
+
+        stored_df = self.feature_store.load()
+        if len(stored_df) > len(cleaned_df) or not stored_df.index.equals(cleaned_df.index[:len(stored_df)]):
+            return False
+
+        return (pd.to_datetime(stored_df['date']) == pd.to_datetime(cleaned_df['date'].iloc[:len(stored_df)])).all()
+
+    def features_for_matchup(self, fighter_a_id, fighter_b_id, date, location, division, rounds):
+        """
+        Computes the feature vector of an upcoming bout from the saved fighter states.
+
+        Parameters:
+            fighter_a_id (str): ID of fighter a
+            fighter_b_id (str): ID of fighter b
+            date (str | pd.Timestamp): Date of the bout
+            location (str): Location of the event
+            division (str): Division of the bout
+            rounds (int): Scheduled number of rounds
+
+        Returns:
+            pd.Series: The features of the bout
+        """
+
+        return self.load_matchup_features().features_for_matchup(fighter_a_id, fighter_b_id, date, location, division, rounds)
+
+    def features_for_card(self, bouts):
+        """
+        Computes the feature vectors of every bout of a card in one call.
+
+        Parameters:
+            bouts (list | pd.DataFrame): Bouts with the fighter_a_id, fighter_b_id, date, location, division and
+                                         rounds fields
+
+        Returns:
+            pd.DataFrame: The features of every bout
+        """
+
+        return self.load_matchup_features().features_for_card(bouts)
+
+    def load_matchup_features(self):
+        """
+        Loads the fighter states saved by update_features for matchup queries, once per instance. Queries never
+        update the feature table, run update_features, e.g. with scripts/update_features.py, when new fights are
+        scraped.
+
+        Returns:
+            MatchupFeatures: The matchup features of the saved states
+        """
+
+        if self.matchup_features is None:
+            if not self.feature_store.states_exist():
+                raise FileNotFoundError(f'No fighter states at {self.feature_store.states_path}, run update_features first')
+            self.matchup_features = MatchupFeatures(self.create_stages(), self.feature_store.load_states())
+
+        return self.matchup_features
+
+    def load_cleaned_fights(self):
+        """
+        Loads the cleaned fights, reusing the cached copy when the CSV and the cleaning code are unchanged.
+
+        Returns:
+            pd.DataFrame: The cleaned fights dataframe
+        """
+
+        if self.cleaned_data_cache is None:
+            return self.cleaner.clean_data(pd.read_csv(FIGHT_CSV, encoding='latin-1'))
+
+        return self.cleaned_data_cache.load_or_clean(FIGHT_CSV, self.cleaner)
@@ -1,229 +1,423 @@
 import pandas as pd
 import numpy as np
-import swifter
+from .decayed_stats import DECAY_HALF_LIVES, DecayedStats
+from .keyed_counters import lookup_codes, shared_codes
+from .opponent_adjusted import OpponentAdjustedStats
+from .stat_tensor import FightStatTensor, last_fights_sums, next_fight_sums
 
 class FightStats:
-    def __init__(self) -> None:
-        pass
+    def __init__(self, half_lives=DECAY_HALF_LIVES) -> None:
+        self.half_lives = list(half_lives)
 
     def create_fight_stats_features(self, df):
         df = self.create_knockdown_feats(df)
         df = self.create_significant_strikes_feats(df)
         df = self.create_takedown_feats(df)
+        df = self.create_decayed_stats_feats(df)
+        df = self.create_opponent_adjusted_feats(df)
 
         return df
 
-    def create_knockdown_feats(self, df, include_progress=False):
+    def get_fighter_states(self, df):
         """
-        Creates the knockdowns features for each fighter in the dataset
+        Gets the state of every fighter after their latest fight: their knockdown, significant strike and takedown
+        sums over their last 3 fights, last 5 fights and all fights, their decayed sums and their opponent-adjusted
+        rates.
 
         Parameters:
             df (pd.DataFrame): DataFrame containing all the fights in the dataset
 
         Returns:
-            pd.DataFrame: DataFrame containing the knockdowns features for each fighter in the dataset
+            dict: The fighter IDs and the state of every group of features
+        """
+
+        fighter_a_codes, fighter_b_codes, fighter_ids = shared_codes(df['fighter_a_id'], df['fighter_b_id'], return_values=True)
+        fighters = np.column_stack([fighter_a_codes, fighter_b_codes])
+        order = np.argsort(pd.to_datetime(df['date']).to_numpy(), kind='stable')
+
+        decayed = DecayedStats(self.half_lives, 9)
+        decayed.sweep(fighters, pd.to_datetime(df['date']).to_numpy(), self.__get_decayed_values(df), order)
+        adjusted = OpponentAdjustedStats(windows=[3, 5])
+        adjusted.sweep(fighters, self.__get_adjusted_values(df), self.__get_fight_minutes(df), order)
+
+        return {
+            'fighter_ids' : fighter_ids,
+            'knockdowns' : next_fight_sums(fighters, self.__get_knockdown_values(df), [3, 5, None]),
+            'significant_strikes' : next_fight_sums(fighters, self.__get_landed_values(df, ['sig_str_landed', 'sig_str_attempted']), [3, 5, None]),
+            'takedowns' : next_fight_sums(fighters, self.__get_landed_values(df, ['td_landed', 'td_attempted']), [3, 5, None]),
+            'decayed' : decayed,
+            'adjusted' : adjusted
+        }
+
+    def create_matchup_feats(self, states, bouts):
+        """
+        Creates the fight stats features of upcoming bouts from the states of both fighters.
+
+        Parameters:
+            states (dict): The fighter states, from get_fighter_states
+            bouts (pd.DataFrame): The bouts, with the fighter_a_id, fighter_b_id and date columns
+
+        Returns:
+            pd.DataFrame: The fight stats features of every bout
         """
 
-        col_names = ['fighter_a_kd_per_sigs_l3', 'fighter_b_kd_per_sigs_l3', \
-                     'fighter_a_kd_per_sigs_l5', 'fighter_b_kd_per_sigs_l5', \
-                     'fighter_a_kd_per_sigs_alltime', 'fighter_b_kd_per_sigs_alltime', \
-                     'fighter_a_kd_per_sigs_l3_diff', 'fighter_b_kd_per_sigs_l3_diff', \
-                     'fighter_a_kd_per_sigs_l5_diff', 'fighter_b_kd_per_sigs_l5_diff', \
-                     'fighter_a_kd_per_sigs_alltime_diff', 'fighter_b_kd_per_sigs_alltime_diff']
+        fighter_ids = states['fighter_ids']
+        codes = lookup_codes(fighter_ids, bouts['fighter_a_id'], bouts['fighter_b_id'])
+        dates = bouts['date'].to_numpy()
+
+        significant_strikes, significant_strikes_counts = states['significant_strikes']
+        takedowns, takedowns_counts = states['takedowns']
+        decayed = np.array([[states['decayed'].read(code, date) for code in pair] for pair, date in zip(codes.tolist(), dates)])
+        adjusted = np.array([[states['adjusted'].read_means(code, 2) for code in pair] for pair in codes.tolist()])
+
+        return pd.concat([
+            self.__create_knockdown_cols(states['knockdowns'][0][codes], bouts.index),
+            self.__create_landed_cols(significant_strikes[codes], significant_strikes_counts[codes], bouts.index, self.__create_col_names_significant_strikes(),
+                                      self.__create_col_names_differential_significant_strikes(), 0),
+            self.__create_landed_cols(takedowns[codes], takedowns_counts[codes], bouts.index, self.__create_col_names_takedowns(),
+                                      self.__create_col_names_differential_takedowns(), np.nan),
+            self.__create_decayed_cols(decayed.reshape(len(bouts), 2, len(self.half_lives), 9), bouts.index),
+            self.__create_adjusted_cols(adjusted.reshape(len(bouts), 2, 3, 2), bouts.index)
+        ], axis=1)
+
+    def create_decayed_stats_feats(self, df):
+        """
+        Creates exponentially time-decayed significant strike and takedown stats, one set per half-life in
+        self.half_lives, along with their differentials.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+
+        Returns:
+            pd.DataFrame: DataFrame with the decayed stats features appended
+        """
 
         target_df = df.copy()
-        result_features = pd.DataFrame(columns=col_names)
+        values = self.__get_decayed_values(target_df)
 
-        result_features[['fighter_a_kd_per_sigs_l3', 'fighter_b_kd_per_sigs_l3']] = target_df.swifter.progress_bar(include_progress).apply(lambda row: self.__compute_knockdowns(df, row['fighter_a_id'], row['fighter_b_id'], row.name, last_fights=3), axis=1)
-        result_features[['fighter_a_kd_per_sigs_l5', 'fighter_b_kd_per_sigs_l5']] = target_df.swifter.progress_bar(include_progress).apply(lambda row: self.__compute_knockdowns(df, row['fighter_a_id'], row['fighter_b_id'], row.name, last_fights=5), axis=1)
-        result_features[['fighter_a_kd_per_sigs_alltime', 'fighter_b_kd_per_sigs_alltime']] = target_df.swifter.progress_bar(include_progress).apply(lambda row: self.__compute_knockdowns(df, row['fighter_a_id'], row['fighter_b_id'], row.name), axis=1)
-        result_features[['fighter_a_kd_per_sigs_l3_diff', 'fighter_b_kd_per_sigs_l3_diff']] = target_df.swifter.progress_bar(include_progress).apply(lambda row: self.__compute_knockdowns(df, row['fighter_a_id'], row['fighter_b_id'], row.name, last_fights=3, differential=True), axis=1)
-        result_features[['fighter_a_kd_per_sigs_l5_diff', 'fighter_b_kd_per_sigs_l5_diff']] = target_df.swifter.progress_bar(include_progress).apply(lambda row: self.__compute_knockdowns(df, row['fighter_a_id'], row['fighter_b_id'], row.name, last_fights=5, differential=True), axis=1)
-        result_features[['fighter_a_kd_per_sigs_alltime_diff', 'fighter_b_kd_per_sigs_alltime_diff']] = target_df.swifter.progress_bar(include_progress).apply(lambda row: self.__compute_knockdowns(df, row['fighter_a_id'], row['fighter_b_id'], row.name, differential=True), axis=1)
+        dates = pd.to_datetime(target_df['date']).to_numpy()
+        order = np.argsort(dates, kind='stable')
+        sums = DecayedStats(self.half_lives, values.shape[2]).sweep(self.__get_fighter_codes(target_df), dates, values, order)
 
-        return pd.concat([target_df, result_features], axis=1)
+        return pd.concat([target_df, self.__create_decayed_cols(sums, target_df.index)], axis=1)
 
-    def create_significant_strikes_feats(self, df):
+    def __get_decayed_values(self, df):
         """
-        Creates a dataframe with added features for significant strikes and their differentials.
+        Gets the values summed by the decayed stats: each fighter's own landed/attempted counts, the opponent's
+        landed/attempted counts and the fight time.
 
-        Args:
-            df (pd.DataFrame): The original dataframe containing fight data.
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
 
         Returns:
-            pd.DataFrame: A dataframe with additional columns for significant strike features and differentials.
+            np.ndarray: Array of shape (n_fights, 2, 9)
         """
-        # Generate column names for significant strikes and differentials
-        col_names = self.__create_col_names_significant_strikes()
-        col_names_differential = self.__create_col_names_differential_significant_strikes()
 
-        # Copy the input dataframe and calculate significant strike features
-        input_df = df.copy()
-        result_features = pd.DataFrame(columns=col_names)
-        result_features[col_names] = input_df.swifter.progress_bar(True).apply(lambda row: self.__calculate_significant_strikes(input_df, row['fighter_a_id'], row['fighter_b_id'], row.name, col_names), axis=1)
+        tensor = FightStatTensor.from_df(df)
+        stats = tensor.values[:, :, tensor.period_index('total'), [tensor.stat_index(stat) for stat in ['sig_str_landed', 'sig_str_attempted', 'td_landed', 'td_attempted']]]
+        fight_minutes = np.repeat(self.__get_fight_minutes(df)[:, None, None], 2, axis=1)
+        return np.concatenate([stats, stats[:, ::-1], fight_minutes], axis=2).astype(float)
 
-        # Combine the input dataframe with the calculated features
-        result_df = pd.concat([input_df, result_features], axis=1)
+    def __create_decayed_cols(self, sums, index):
+        """
+        Creates the decayed stats features from the decayed sums of both fighters.
 
-        # Calculate and add differential features to the dataframe
-        result_df = self.__calculate_significant_strikes_differential(result_df, col_names_differential)
+        Parameters:
+            sums (np.ndarray): Array of shape (n_fights, 2, n_half_lives, 9) with the pre-fight decayed sums
+            index (pd.Index): The index of the fights
 
-        return result_df
+        Returns:
+            pd.DataFrame: The decayed stats features and their differentials
+        """
 
-    def create_takedown_feats(self, df):
-            """
-            Creates a dataframe with added features for takedowns and their differentials.
+        landed_sig, attempted_sig, landed_td, attempted_td, absorbed_sig, faced_sig, absorbed_td, faced_td, minutes = np.moveaxis(sums, -1, 0)
+        stat_values = {
+            'significant-strikes-landed-per-minute' : self.__safe_divide(landed_sig, minutes),
+            'significant-strikes-accuracy-percentage' : self.__safe_divide(landed_sig, attempted_sig),
+            'significant-strikes-defense-percentage' : np.where(faced_sig > 0, 1 - self.__safe_divide(absorbed_sig, faced_sig), 0),
+            'significant-strikes-absorbed-per-minute' : self.__safe_divide(absorbed_sig, minutes),
+            'takedown-landed-per-minute' : self.__safe_divide(landed_td, minutes),
+            'takedown-accuracy-percentage' : self.__safe_divide(landed_td, attempted_td),
+            'takedown-defense-percentage' : np.where(faced_td > 0, 1 - self.__safe_divide(absorbed_td, faced_td), 0),
+            'takedown-absorbed-per-minute' : self.__safe_divide(absorbed_td, minutes)
+        }
+
+        col_names = []
+        values = []
+        for suffix, sign in [('', 0), ('-diff', 1)]:
+            for side, fighter in enumerate(['fighter-a', 'fighter-b']):
+                for stat, stat_value in stat_values.items():
+                    for h, half_life in enumerate(self.half_lives):
+                        values.append(stat_value[:, side, h] - sign * stat_value[:, 1 - side, h])
+                        col_names.append(f'{fighter}_{stat}{suffix}_overall_ewm-{half_life}d')
 
-            Args:
-                df (pd.DataFrame): The original dataframe containing fight data.
+        return pd.DataFrame(np.column_stack(values), index=index, columns=col_names)
 
-            Returns:
-                pd.DataFrame: A dataframe with additional columns for significant strike features and differentials.
-            """
-            # Generate column names for takedowns and differentials
-            col_names = self.__create_col_names_takedowns()
-            col_names_differential = self.__create_col_names_differential_takedowns()
+    def create_opponent_adjusted_feats(self, df):
+        """
+        Creates opponent-adjusted significant strike and takedown rates: what a fighter landed per minute in a fight
+        minus what the opponent conceded per minute before it, averaged over the last 3 fights, the last 5 fights
+        and all fights, along with their differentials.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+
+        Returns:
+            pd.DataFrame: DataFrame with the opponent-adjusted features appended
+        """
+
+        target_df = df.copy()
 
-            # Copy the input dataframe and calculate significant strike features
-            input_df = df.copy()
-            result_features = pd.DataFrame(columns=col_names)
-            result_features[col_names] = input_df.swifter.progress_bar(True).apply(lambda row: self.__calculate_takedowns(input_df, row['fighter_a_id'], row['fighter_b_id'], row.name, col_names), axis=1)
+        order = np.argsort(pd.to_datetime(target_df['date']).to_numpy(), kind='stable')
+        means = OpponentAdjustedStats(windows=[3, 5]).sweep(self.__get_fighter_codes(target_df), self.__get_adjusted_values(target_df), self.__get_fight_minutes(target_df), order)
 
-            # Combine the input dataframe with the calculated features
-            result_df = pd.concat([input_df, result_features], axis=1)
+        return pd.concat([target_df, self.__create_adjusted_cols(means, target_df.index)], axis=1)
 
-            # Calculate and add differential features to the dataframe
-            result_df = self.__calculate_takedowns_differential(result_df, col_names_differential)
+    def __get_adjusted_values(self, df):
+        """
+        Returns:
+            np.ndarray: Array of shape (n_fights, 2, 2) with the significant strikes and takedowns each fighter landed
+        """
 
-            return result_df
+        tensor = FightStatTensor.from_df(df)
+        return tensor.values[:, :, tensor.period_index('total'), [tensor.stat_index('sig_str_landed'), tensor.stat_index('td_landed')]]
 
-    def __calculate_takedowns_differential(self, df, col_names_differential):
+    def __create_adjusted_cols(self, means, index):
         """
-        Calculates the differential of takedowns statistics between two fighters.
+        Creates the opponent-adjusted features from the mean adjusted rates of both fighters.
 
-        Args:
-            df (pd.DataFrame): The dataframe containing significant strike statistics data for fighters.
-            col_names_differential (list): List of column names for differential calculations.
+        Parameters:
+            means (np.ndarray): Array of shape (n_fights, 2, 3, 2) with the mean adjusted rates over the last 3
+                                fights, the last 5 fights and all fights
+            index (pd.Index): The index of the fights
 
         Returns:
-            pd.DataFrame: A dataframe with added columns for differential significant strike features.
+            pd.DataFrame: The opponent-adjusted features and their differentials
         """
 
-        input_df = df.copy()
-        differential_features = pd.DataFrame(columns=col_names_differential)
-        for col_name in col_names_differential:
-            # Split the column name to identify the fighter, type of strike, round, and time period
-            split_name = col_name.split('_') # fighter-a_takedown-landed-differential_R1_last-3-fights
-            fighter, stat_type, round, time_period = split_name[0], split_name[1], split_name[2], split_name[3]
+        stats = ['significant-strikes-landed-per-minute-adjusted', 'takedown-landed-per-minute-adjusted']
+        col_names = []
+        values = []
+        for suffix, sign in [('', 0), ('-diff', 1)]:
+            for side, fighter in enumerate(['fighter-a', 'fighter-b']):
+                for s, stat in enumerate(stats):
+                    for w, time_period in enumerate(['l3', 'l5', 'alltime']):
+                        values.append(means[:, side, w, s] - sign * means[:, 1 - side, w, s])
+                        col_names.append(f'{fighter}_{stat}{suffix}_overall_{time_period}')
 
-            if fighter == "fighter-a":
-                # Calculate differential for fighter A
-                fighter_a_col = '_'.join(['fighter-a', '-'.join(stat_type.split('-')[:-1]), round, time_period])
-                fighter_b_col = '_'.join(['fighter-b', '-'.join(stat_type.split('-')[:-1]), round, time_period])
+        return pd.DataFrame(np.column_stack(values), index=index, columns=col_names)
 
-                differential_features[col_name] = input_df[fighter_a_col] - input_df[fighter_b_col]
+    def __get_fight_minutes(self, df):
+        """
+        Computes the length of every fight in minutes from the finish round and the time in that round.
 
-                # Calculate and set the corresponding differential for fighter B
-                fighter_b_diff_col = '_'.join(['fighter-b', stat_type, round, time_period])
-                differential_features[fighter_b_diff_col] = -differential_features[col_name]
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
 
-        result_df = pd.concat([input_df, differential_features], axis=1)
+        Returns:
+            np.ndarray: Fight length in minutes
+        """
 
-        return result_df
+        time = df['outcome_time'].astype(str).str.extract(r'^\s*(\d+):(\d+)\s*$').astype(float).fillna(0)
+        return ((df['outcome_round'].to_numpy(dtype=float) - 1) * 300 + time[0].to_numpy() * 60 + time[1].to_numpy()) / 60
 
-    def __calculate_significant_strikes_differential(self, df, col_names_differential):
+    def __safe_divide(self, numerator, denominator):
         """
-        Calculates the differential of significant strikes statistics between two fighters.
+        Divides element-wise, returning 0 where the denominator is 0.
 
-        Args:
-            df (pd.DataFrame): The dataframe containing significant strike statistics data for fighters.
-            col_names_differential (list): List of column names for differential calculations.
+        Parameters:
+            numerator (np.ndarray): Numerators
+            denominator (np.ndarray): Denominators
 
         Returns:
-            pd.DataFrame: A dataframe with added columns for differential significant strike features.
+            np.ndarray: The quotients
         """
 
-        input_df = df.copy()
-        differential_features = pd.DataFrame(columns=col_names_differential)
-        for col_name in col_names_differential:
-            # Split the column name to identify the fighter, type of strike, round, and time period
-            split_name = col_name.split('_') # fighter-a_significant-strikes-landed-differential_R1_last-3-fights
-            fighter, stat_type, round, time_period = split_name[0], split_name[1], split_name[2], split_name[3]
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator, dtype=float), where=denominator > 0)
 
-            if fighter == "fighter-a":
-                # Calculate differential for fighter A
-                fighter_a_col = '_'.join(['fighter-a', '-'.join(stat_type.split('-')[:-1]), round, time_period])
-                fighter_b_col = '_'.join(['fighter-b', '-'.join(stat_type.split('-')[:-1]), round, time_period])
+    def create_knockdown_feats(self, df, include_progress=False):
+        """
+        Creates the knockdowns features for each fighter in the dataset: knockdowns per significant strike landed
+        over the last 3 fights, the last 5 fights and all previous fights, along with their differentials.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+            include_progress (bool): Unused, the features are computed in one vectorized pass
 
-                differential_features[col_name] = input_df[fighter_a_col] - input_df[fighter_b_col]
+        Returns:
+            pd.DataFrame: DataFrame containing the knockdowns features for each fighter in the dataset
+        """
 
-                # Calculate and set the corresponding differential for fighter B
-                fighter_b_diff_col = '_'.join(['fighter-b', stat_type, round, time_period])
-                differential_features[fighter_b_diff_col] = -differential_features[col_name]
+        target_df = df.copy()
+        sums, _ = last_fights_sums(self.__get_fighter_codes(target_df), self.__get_knockdown_values(target_df), [3, 5, None])
+        return pd.concat([target_df, self.__create_knockdown_cols(sums, target_df.index)], axis=1)
 
-        result_df = pd.concat([input_df, differential_features], axis=1)
+    def __get_knockdown_values(self, df):
+        """
+        Returns:
+            np.ndarray: Array of shape (n_fights, 2, 2) with the knockdowns and significant strikes each fighter landed
+        """
 
-        return result_df
+        tensor = FightStatTensor.from_df(df)
+        return tensor.values[:, :, tensor.period_index('total'), [tensor.stat_index('kd'), tensor.stat_index('sig_str_landed')]]
 
-    def __compute_knockdowns(self, df, fighter_a_id, fighter_b_id, index, last_fights=0, differential=False):
+    def __create_knockdown_cols(self, sums, index):
         """
-        Computes the knockdowns features for a single example in the dataset
+        Creates the knockdowns features from the summed knockdowns and significant strikes of both fighters.
+
+        Parameters:
+            sums (np.ndarray): Array of shape (n_fights, 2, 3, 2) with the sums over the last 3 fights, the last 5
+                               fights and all previous fights
+            index (pd.Index): The index of the fights
+
+        Returns:
+            pd.DataFrame: The knockdowns features and their differentials
+        """
+
+        kd_per_sigs = self.__safe_divide(sums[..., 0], sums[..., 1])
+
+        col_names = []
+        values = []
+        for suffix, sign in [('', 0), ('_diff', 1)]:
+            for w, time_period in enumerate(['l3', 'l5', 'alltime']):
+                for side, fighter in enumerate(['fighter_a', 'fighter_b']):
+                    values.append(kd_per_sigs[:, side, w] - sign * kd_per_sigs[:, 1 - side, w])
+                    col_names.append(f'{fighter}_kd_per_sigs_{time_period}{suffix}')
+
+        return pd.DataFrame(np.column_stack(values), index=index, columns=col_names)
+
+    def create_significant_strikes_feats(self, df):
+        """
+        Creates a dataframe with added features for significant strikes and their differentials.
+
+        Args:
+            df (pd.DataFrame): The original dataframe containing fight data.
+
+        Returns:
+            pd.DataFrame: A dataframe with additional columns for significant strike features and differentials.
+        """
+
+        # Fighters without a previous fight get 0 for every significant strike feature
+        return self.__create_landed_feats(df, ['sig_str_landed', 'sig_str_attempted'], self.__create_col_names_significant_strikes(),
+                                          self.__create_col_names_differential_significant_strikes(), 0)
+
+    def create_takedown_feats(self, df):
+        """
+        Creates a dataframe with added features for takedowns and their differentials.
+
+        Args:
+            df (pd.DataFrame): The original dataframe containing fight data.
+
+        Returns:
+            pd.DataFrame: A dataframe with additional columns for takedown features and differentials.
+        """
+
+        # Fighters without a previous fight get NaN for every takedown feature
+        return self.__create_landed_feats(df, ['td_landed', 'td_attempted'], self.__create_col_names_takedowns(),
+                                          self.__create_col_names_differential_takedowns(), np.nan)
+
+    def __create_landed_feats(self, df, stats, col_names, col_names_differential, no_fights_value):
+        """
+        Creates the landed per minute, accuracy, defense and absorbed per minute features of a landed and attempted
+        stat for every round and overall, over the last 3 fights, the last 5 fights and all previous fights, by
+        summing the stat tensor over each fighter's previous fights.
 
         Parameters:
             df (pd.DataFrame): DataFrame containing all the fights in the dataset
-            fighter_a_id (str): ID of fighter A
-            fighter_b_id (str): ID of fighter B
-            index (int): Index of the current fight in the dataset
-            last_fights (int): Number of last fights to consider
-            differential (bool): Whether to compute the differential of the knockdowns features
+            stats (list): Names of the landed and the attempted stat in FightStatTensor.STATS
+            col_names (list): Column names ordered by fighter, stat, round and time period
+            col_names_differential (list): Differential column names in the same order
+            no_fights_value (float): Value of the features of a fighter without a previous fight
 
         Returns:
-            pd.Series: Series containing the knockdowns features for both fighters
+            pd.DataFrame: DataFrame with the features and their differentials appended
         """
 
-        all_prev_fights = df.loc[:index-1]
-        if not all_prev_fights.empty:
-            fighter_a_id_vals = all_prev_fights.fighter_a_id.values
-            fighter_b_id_vals = all_prev_fights.fighter_b_id.values
+        target_df = df.copy()
+        sums, counts = last_fights_sums(self.__get_fighter_codes(target_df), self.__get_landed_values(target_df, stats), [3, 5, None])
+        return pd.concat([target_df, self.__create_landed_cols(sums, counts, target_df.index, col_names, col_names_differential, no_fights_value)], axis=1)
 
-            fighter_a_fights = all_prev_fights[(fighter_a_id_vals == fighter_a_id) | (fighter_b_id_vals == fighter_a_id)][-last_fights:]
-            fighter_b_fights = all_prev_fights[(fighter_a_id_vals == fighter_b_id) | (fighter_b_id_vals == fighter_b_id)][-last_fights:]
+    def __get_landed_values(self, df, stats):
+        """
+        Gets each fighter's own landed, own attempted and opponent landed in every period, with the seconds fought in
+        the period.
 
-            fighter_a_kd_per_sigs = self.__get_fighter_kd_per_sigs(fighter_a_fights, fighter_a_id)
-            fighter_b_kd_per_sigs = self.__get_fighter_kd_per_sigs(fighter_b_fights, fighter_b_id)
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+            stats (list): Names of the landed and the attempted stat in FightStatTensor.STATS
 
-            if differential:
-                return pd.Series([fighter_a_kd_per_sigs - fighter_b_kd_per_sigs, fighter_b_kd_per_sigs - fighter_a_kd_per_sigs])
-            else:
-                return pd.Series([fighter_a_kd_per_sigs, fighter_b_kd_per_sigs])
+        Returns:
+            np.ndarray: Int64 array of shape (n_fights, 2, 6, 4)
+        """
 
-        return pd.Series([0, 0])
+        tensor = FightStatTensor.from_df(df)
+        landed, attempted = tensor.values[:, :, :, tensor.stat_index(stats[0])], tensor.values[:, :, :, tensor.stat_index(stats[1])]
+        seconds = np.repeat(self.__get_period_seconds(df)[:, None], 2, axis=1)
+        return np.stack([landed, attempted, landed[:, ::-1], seconds], axis=-1).astype(np.int64)
 
-    def __get_fighter_kd_per_sigs(self, fighter_past_fights, fighter_id):
+    def __create_landed_cols(self, sums, counts, index, col_names, col_names_differential, no_fights_value):
         """
-        Given a fighter's past fights, returns the number of knockdowns per significant strikes landed
+        Creates the landed features from the sums of both fighters. Defense is 1 minus the opponents' landed over
+        the fighter's own attempts, the way the features have always been defined.
 
         Parameters:
-            fighter_past_fights (pd.DataFrame): DataFrame containing the fighter's past fights
-            fighter_id (str): ID of the fighter
+            sums (np.ndarray): Array of shape (n_fights, 2, 3, 6, 4) with the sums of __get_landed_values over the
+                               last 3 fights, the last 5 fights and all previous fights
+            counts (np.ndarray): Array of shape (n_fights, 2, 3) with the number of fights summed
+            index (pd.Index): The index of the fights
+            col_names (list): Column names ordered by fighter, stat, round and time period
+            col_names_differential (list): Differential column names in the same order
+            no_fights_value (float): Value of the features of a fighter without a previous fight
 
         Returns:
-            float: Number of knockdowns per significant strikes landed
+            pd.DataFrame: The features and their differentials
         """
 
-        if fighter_past_fights.empty:
-            return 0
+        landed, attempted, absorbed, minutes = np.moveaxis(sums, -1, 0)
+        minutes = minutes / 60
+
+        # Arrays of shape (n_fights, 2, time period, period)
+        stat_values = [
+            self.__safe_divide(landed, minutes),
+            self.__safe_divide(landed, attempted),
+            1 - self.__safe_divide(absorbed, attempted),
+            self.__safe_divide(absorbed, minutes)
+        ]
+        stat_values = [np.where(counts[..., None] > 0, value, no_fights_value) for value in stat_values]
+
+        # Columns are ordered by fighter, stat, period and time period, R1 to R5 then overall as in FightStatTensor.PERIODS
+        features = np.stack(stat_values, axis=2).transpose(0, 1, 2, 4, 3).reshape(len(index), 2, -1)
+        differential = features[:, 0] - features[:, 1]
+        return pd.DataFrame(np.concatenate([features.reshape(len(index), -1), differential, -differential], axis=1), index=index,
+                            columns=col_names + col_names_differential)
+
+    def __get_period_seconds(self, df):
+        """
+        Computes the seconds fought in every round and overall: a full round before the finish round, the finish
+        time in it and nothing after it.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+
+        Returns:
+            np.ndarray: Int64 array of shape (n_fights, 6) in FightStatTensor.PERIODS order
+        """
 
-        fighter_a_id_vals = fighter_past_fights.fighter_a_id.values
-        fighter_b_id_vals = fighter_past_fights.fighter_b_id.values
+        time = df['outcome_time'].astype(str).str.extract(r'^\s*(\d+):(\d+)\s*$').astype(float).fillna(0)
+        finish = (time[0] * 60 + time[1]).to_numpy(dtype=np.int64)
+        outcome_round = df['outcome_round'].to_numpy(dtype=np.int64)
 
-        fighter_knockdowns = fighter_past_fights[fighter_a_id_vals == fighter_id]['fighter_a_total_kd'].sum() + \
-                             fighter_past_fights[fighter_b_id_vals == fighter_id]['fighter_b_total_kd'].sum()
+        rounds = np.arange(1, 6)
+        round_seconds = np.where(outcome_round[:, None] == rounds, finish[:, None], np.where(outcome_round[:, None] > rounds, 300, 0))
+        return np.column_stack([round_seconds, (outcome_round - 1) * 300 + finish])
 
-        fighter_sig_strikes = fighter_past_fights[fighter_a_id_vals == fighter_id]['fighter_a_total_sig_str_landed'].sum() + \
-                              fighter_past_fights[fighter_b_id_vals == fighter_id]['fighter_b_total_sig_str_landed'].sum()
+    def __get_fighter_codes(self, df):
+        """
+        Returns:
+            np.ndarray: Array of shape (n_fights, 2) with the shared codes of fighter a and fighter b
+        """
 
-        return fighter_knockdowns / fighter_sig_strikes if fighter_sig_strikes > 0 else 0
+        return np.column_stack(shared_codes(df['fighter_a_id'], df['fighter_b_id']))
 
     def __test_knockdown_feature(self, df):
         """
@@ -318,82 +512,6 @@ class FightStats:
                 actual = row.fighter_a_kd_per_sigs_alltime
                 assert expected == actual, f"Expected {expected}, but got {actual} on row {row.Index}"
 
-    def __calculate_significant_strikes(self, df, fighter_a_id, fighter_b_id, index, col_names):
-        """
-        Calculates significant strike features for both fighters in a match.
-
-        Args:
-            df (pd.DataFrame): The dataframe containing fight data.
-            fighter_a_id (str): The ID of fighter A.
-            fighter_b_id (str): The ID of fighter B.
-            index (int): The index of the current row in the dataframe.
-            col_names (list): List of column names to calculate.
-
-        Returns:
-            pd.Series: A series with calculated significant strike features.
-        """
-        # Initialize result list
-        res = []
-        fighter_a_last_3_fights, fighter_a_last_5_fights, fighter_a_prev_fights = self.__get_fighter_fights(df, fighter_a_id, index)
-        fighter_b_last_3_fights, fighter_b_last_5_fights, fighter_b_prev_fights = self.__get_fighter_fights(df, fighter_b_id, index)
-
-        for i in range(len(col_names)):
-            split = col_names[i].split('_')
-            fighter = split[0] # fighter-a, fighter-b
-            stat = split[1] # significant-strikes-landed, significant-strikes-accuracy, significant-strikes-defense, significant-strikes-absorbed
-            round = split[2]  # R1, R2, R3, R4, R5, overall
-            time_period = split[3] # last-3-fights, last-5-fights, alltime
-
-            # Get fights for the fighter
-            all_prev_fights = fighter_a_prev_fights if fighter == 'fighter-a' else fighter_b_prev_fights
-            last_3_fights = fighter_a_last_3_fights if fighter == 'fighter-a' else fighter_b_last_3_fights
-            last_5_fights = fighter_a_last_5_fights if fighter == 'fighter-a' else fighter_b_last_5_fights
-
-            prev_fights = pd.DataFrame()
-
-            if fighter == 'fighter-a':
-                fighter_id = fighter_a_id
-            else:
-                fighter_id = fighter_b_id
-
-            # filter based on time period
-            if time_period == 'l3':
-
-                prev_fights = last_3_fights
-
-            if time_period == 'l5':
-                prev_fights = last_5_fights
-
-            if time_period == 'alltime':
-                prev_fights = all_prev_fights
-
-            # if no fights
-            if prev_fights.empty:
-                    res.append(0)
-                    continue
-            if round == 'overall':
-                round = 0
-            else:
-                round = int(round[1])
-
-            # filter and get the stats for the specific round
-            raw_significant_strike_stats = self.__get_raw_significant_strikes_stats(prev_fights, round)
-
-            if raw_significant_strike_stats.empty:
-                res.append(0)
-                continue
-
-            if stat == "significant-strikes-landed-per-minute":
-                res.append(self.__calculate_significant_strikes_landed(raw_significant_strike_stats, fighter_id))
-            if stat == "significant-strikes-accuracy-percentage":
-                res.append(self.__calculate_significant_strikes_accuracy(raw_significant_strike_stats, fighter_id))
-            if stat == "significant-strikes-defense-percentage":
-                res.append(self.__calculate_significant_strikes_defense(raw_significant_strike_stats, fighter_id))
-            if stat == "significant-strikes-absorbed-per-minute":
-                res.append(self.__calculate_significant_strikes_absorbed(raw_significant_strike_stats, fighter_id))
-
-        return pd.Series(res)
-
     def __create_col_names_significant_strikes(self):
         """
         Generates column names for significant strike statistics.
@@ -439,276 +557,6 @@ class FightStats:
                         col_names.append(col_name)
         return col_names
 
-    def __get_raw_significant_strikes_stats(self, df, round):
-        """
-        Extracts raw significant strike stats from the dataframe for a specific round.
-
-        Args:
-            df (pd.DataFrame): The dataframe containing fight records.
-            round (str): The round for which the statistics are required.
-
-        Returns:
-            pd.DataFrame: A dataframe with raw stats for the specified round for fighters a and b.
-        """
-
-        # Define column names based on the round
-        if round == 0:
-            # Use overall stats columns
-            sig_str_cols = [
-                'fighter_a_total_sig_str_landed',
-                'fighter_a_total_sig_str_attempted',
-                'fighter_b_total_sig_str_landed',
-                'fighter_b_total_sig_str_attempted'
-            ]
-        else:
-            # Use specific round stats columns
-            sig_str_cols = [
-                f'fighter_a_round_{round}_sig_str_landed',
-                f'fighter_a_round_{round}_sig_str_attempted',
-                f'fighter_b_round_{round}_sig_str_landed',
-                f'fighter_b_round_{round}_sig_str_attempted'
-            ]
-
-        # Apply vectorization for calculating total fight time
-        total_fight_times = df.apply(lambda row: self.__get_round_time(row['outcome_round'], row['outcome_time'], round), axis=1)
-
-        # Select and rename the significant strike stats columns in the DataFrame to match the target structure
-        sig_str_stats_df = df[sig_str_cols].rename(columns={
-            sig_str_cols[0]: 'fighter_a_sig_str_landed',
-            sig_str_cols[1]: 'fighter_a_sig_str_attempted',
-            sig_str_cols[2]: 'fighter_b_sig_str_landed',
-            sig_str_cols[3]: 'fighter_b_sig_str_attempted'
-        })
-
-        # Concatenate the total fight times with the significant strike stats
-        stats_df = pd.concat([total_fight_times.rename('total_fight_time'), df[['fighter_a_id', 'fighter_b_id']], sig_str_stats_df], axis=1)
-
-        return stats_df
-
-    def __calculate_significant_strikes_landed(self, stats_by_fight_df, fighter_id):
-        """
-        Calculates the rate of significant strikes landed per minute by a fighter.
-
-        Args:
-            stats_by_fight_df (pd.DataFrame): The dataframe containing aggregated fight stats.
-            fighter_id (str): The ID of the fighter.
-
-        Returns:
-            float: The rate of significant strikes landed per minute in the given fights.
-        """
-
-        return self.__get_significant_strikes_return_values(stats_by_fight_df, fighter_id, is_percentage=False, is_defence=False)
-
-    def __calculate_significant_strikes_accuracy(self, stats_by_fight_df, fighter_id):
-        """
-        Calculates the accuracy of significant strikes for a fighter.
-
-        Args:
-            stats_df (pd.DataFrame): The dataframe containing aggregated fight stats.
-            fighter_id (str): The ID of the fighter.
-
-        Returns:
-            float: The accuracy of significant strikes as a percentage in the given fights.
-        """
-
-        return self.__get_significant_strikes_return_values(stats_by_fight_df, fighter_id, is_percentage=True, is_defence=False)
-
-    def __calculate_significant_strikes_defense(self, stats_by_fight_df, fighter_id):
-        """
-        Calculates the defense rate against significant strikes for a fighter.
-
-        Args:
-            stats_df (pd.DataFrame): The dataframe containing aggregated fight stats.
-            fighter_id (str): The ID of the fighter.
-
-        Returns:
-            float: The defense rate against significant strikes as a percentage in the given fights.
-        """
-
-        return 1 - self.__get_significant_strikes_return_values(stats_by_fight_df, fighter_id, is_percentage=True, is_defence= True)
-
-    def __calculate_significant_strikes_absorbed(self, stats_by_fight_df, fighter_id):
-        """
-        Calculates the rate of significant strikes absorbed per minute by a fighter.
-
-        Args:
-            stats_df (pd.DataFrame): The dataframe containing aggregated fight stats.
-            fighter_id (str): The ID of the fighter.
-
-        Returns:
-            float: The rate of significant strikes absorbed per minute in the given fights.
-        """
-
-        return self.__get_significant_strikes_return_values(stats_by_fight_df, fighter_id, is_percentage=False, is_defence=True)
-
-    def __convert_time_to_seconds(self, time_str):
-        """
-        Converts a time string in MM:SS format to total seconds.
-
-        Args:
-            time_str (str): The time string to convert.
-
-        Returns:
-            int: The time in total seconds.
-        """
-
-        if ':' in time_str:
-            minutes, seconds = time_str.split(':')
-            return int(minutes) * 60 + int(seconds)
-        else:
-            return int(time_str)
-
-    def __get_round_time(self, outcome_round, outcome_time, round):
-        """
-        Calculates the total fight time in a specific round.
-
-        Args:
-            outcome_round (int): The round number at the end of the fight.
-            outcome_time (str): The time at which the fight ended in the outcome round.
-            round (str): The round for which the time is to be calculated.
-
-        Returns:
-            float: The total fight time in the specified round in minutes.
-        """
-
-        # Convert outcome_time to seconds
-        outcome_time = self.__convert_time_to_seconds(outcome_time)
-
-        # Handle the "overall" case
-        if round == 0:
-            # Calculate total fight time up to the outcome round
-            total_time = 0
-
-            for r in range(1, outcome_round):
-                total_time += 300  # Add full time for each completed round
-
-            total_time += outcome_time  # Add the time of the last (outcome) round
-
-            return total_time / 60  # Convert to minutes
-
-        # Handle specific rounds
-        if outcome_round == round:
-            return outcome_time/60  # Convert to minutes
-
-        elif outcome_round > round:
-            return 300/60  # Full round time
-
-        else:
-            return 0  # Round did not occur
-
-    def __get_significant_strikes_return_values(self, stats_by_fight_df, fighter_id, is_percentage, is_defence):
-
-        """
-        Calculates either the rate or the percentage of significant strikes for a fighter.
-
-        Args:
-            stats_by_fight_df (pd.DataFrame): DataFrame containing the statistics of the fights.
-            fighter_id (str): ID of the fighter whose statistics are being calculated.
-            is_percentage (bool): Flag to indicate whether to calculate the percentage (True) or rate (False).
-            is_defence (bool): Flag to indicate whether to calculate for defence (True) or offence (False).
-
-        Returns:
-            float: Calculated rate or percentage of significant strikes.
-        """
-
-        # Get the IDs of the fighters in the fights
-        fighter_a_id_vals = stats_by_fight_df.fighter_a_id.values
-        fighter_b_id_vals = stats_by_fight_df.fighter_b_id.values
-
-
-        # Sum up significant strikes landed based on whether it's for defence or offence
-        sig_str_landed = stats_by_fight_df[fighter_a_id_vals == fighter_id][f'fighter_a_sig_str_landed' if not is_defence else f'fighter_b_sig_str_landed'].sum() + \
-                         stats_by_fight_df[fighter_b_id_vals == fighter_id][f'fighter_b_sig_str_landed' if not is_defence else f'fighter_a_sig_str_landed'].sum()
-
-        if not is_percentage:
-            # Sum total fight time and calculate rate of significant strikes landed per minute
-            total_fight_time = stats_by_fight_df['total_fight_time'].sum()
-            if total_fight_time == 0:
-                return 0
-            return sig_str_landed / total_fight_time
-        else:
-            # Sum up significant strikes attempted and calculate the accuracy percentage
-            sig_str_attempted = stats_by_fight_df[fighter_a_id_vals == fighter_id]['fighter_a_sig_str_attempted'].sum() + stats_by_fight_df[fighter_b_id_vals == fighter_id]['fighter_b_sig_str_attempted'].sum()
-            if sig_str_attempted == 0:
-                return 0
-            return sig_str_landed / sig_str_attempted
-
-    def __calculate_takedowns(self, df, fighter_a_id, fighter_b_id, index, col_names):
-        """
-        Calculates significant strike features for both fighters in a match.
-
-        Args:
-            df (pd.DataFrame): The dataframe containing fight data.
-            fighter_a_id (str): The ID of fighter A.
-            fighter_b_id (str): The ID of fighter B.
-            index (int): The index of the current row in the dataframe.
-            col_names (list): List of column names to calculate.
-
-        Returns:
-            pd.Series: A series with calculated significant strike features.
-        """
-        # Initialize result list
-        res = []
-        fighter_a_last_3_fights, fighter_a_last_5_fights, fighter_a_prev_fights = self.__get_fighter_fights(df, fighter_a_id, index)
-        fighter_b_last_3_fights, fighter_b_last_5_fights, fighter_b_prev_fights = self.__get_fighter_fights(df, fighter_b_id, index)
-
-        for i in range(len(col_names)):
-            split = col_names[i].split('_')
-            fighter = split[0] # fighter-a, fighter-b
-            stat = split[1] # takedown-landed, takedown-accuracy, takedown-defense, takedown-absorbed
-            round = split[2]  # R1, R2, R3, R4, R5, overall
-            time_period = split[3] # last-3-fights, last-5-fights, alltime
-
-            # Get fights for the fighter
-            all_prev_fights = fighter_a_prev_fights if fighter == 'fighter-a' else fighter_b_prev_fights
-            last_3_fights = fighter_a_last_3_fights if fighter == 'fighter-a' else fighter_b_last_3_fights
-            last_5_fights = fighter_a_last_5_fights if fighter == 'fighter-a' else fighter_b_last_5_fights
-
-            prev_fights = pd.DataFrame()
-
-            if fighter == 'fighter-a':
-                fighter_id = fighter_a_id
-            else:
-                fighter_id = fighter_b_id
-
-            # filter based on time period
-            if time_period == 'l3':
-
-                prev_fights = last_3_fights
-
-            if time_period == 'l5':
-                prev_fights = last_5_fights
-
-            if time_period == 'alltime':
-                prev_fights = all_prev_fights
-
-            # if no fights
-            if prev_fights.empty:
-                    res.append(np.nan)
-                    continue
-            if round == 'overall':
-                round = 0
-            else:
-                round = int(round[1])
-
-            # filter and get the stats for the specific round
-            raw_significant_strike_stats = self.__get_raw_takedowns_stats(prev_fights, round)
-
-            if raw_significant_strike_stats.empty:
-                res.append(np.nan)
-                continue
-
-            if stat == "takedown-landed-per-minute":
-                res.append(self.__calculate_takedowns_landed(raw_significant_strike_stats, fighter_id))
-            if stat == "takedown-accuracy-percentage":
-                res.append(self.__calculate_takedowns_accuracy(raw_significant_strike_stats, fighter_id))
-            if stat == "takedown-defense-percentage":
-                res.append(self.__calculate_takedowns_defense(raw_significant_strike_stats, fighter_id))
-            if stat == "takedown-absorbed-per-minute":
-                res.append(self.__calculate_takedowns_absorbed(raw_significant_strike_stats, fighter_id))
-
-        return pd.Series(res)
-
     def __create_col_names_takedowns(self):
         """
         Generates column names for significant strike statistics.
@@ -754,222 +602,3 @@ class FightStats:
                         col_names.append(col_name)
         return col_names
 
-    def __get_fighter_fights(self, df, fighter_id, index):
-        """
-        Retrieves the most recent fights of a fighter before a given index in the dataframe.
-
-        Args:
-            df (pd.DataFrame): The dataframe containing fight records.
-            fighter_id (str): The ID of the fighter.
-            index (int): The index in the dataframe up to which fights should be considered.
-
-        Returns:
-            tuple: Contains three dataframes - the last 3 fights, the last 5 fights, and all previous fights.
-        """
-
-        all_prev_fights = df.loc[:index-1]
-        col_names = df.columns
-        all_prev_fights_default = pd.DataFrame(columns=col_names)
-
-        if not all_prev_fights.empty:
-            # Filter fights involving the specified fighter
-            fighter_a_id_vals = all_prev_fights.fighter_a_id.values
-            fighter_b_id_vals = all_prev_fights.fighter_b_id.values
-
-            prev_fights = all_prev_fights[((fighter_a_id_vals == fighter_id) | (fighter_b_id_vals == fighter_id))]
-
-            return prev_fights[-3:], prev_fights[-5:], prev_fights
-
-        return all_prev_fights_default(), all_prev_fights_default(), all_prev_fights_default()
-
-    def __get_raw_takedowns_stats(self, df, round):
-        """
-        Extracts raw significant strike stats from the dataframe for a specific round.
-
-        Args:
-            df (pd.DataFrame): The dataframe containing fight records.
-            round (str): The round for which the statistics are required.
-
-        Returns:
-            pd.DataFrame: A dataframe with raw stats for the specified round for fighters a and b.
-        """
-
-        # Define column names based on the round
-        if round == 0:
-            # Use overall stats columns
-            td_cols = [
-                'fighter_a_total_td_landed',
-                'fighter_a_total_td_attempted',
-                'fighter_b_total_td_landed',
-                'fighter_b_total_td_attempted'
-            ]
-        else:
-            # Use specific round stats columns
-            td_cols = [
-                f'fighter_a_round_{round}_td_landed',
-                f'fighter_a_round_{round}_td_attempted',
-                f'fighter_b_round_{round}_td_landed',
-                f'fighter_b_round_{round}_td_attempted'
-            ]
-
-        # Apply vectorization for calculating total fight time
-        total_fight_times = df.apply(lambda row: self.__get_round_time(row['outcome_round'], row['outcome_time'], round), axis=1)
-
-        # Select and rename the significant strike stats columns in the DataFrame to match the target structure
-        td_stats_df = df[td_cols].rename(columns={
-            td_cols[0]: 'fighter_a_td_landed',
-            td_cols[1]: 'fighter_a_td_attempted',
-            td_cols[2]: 'fighter_b_td_landed',
-            td_cols[3]: 'fighter_b_td_attempted'
-        })
-
-        # Concatenate the total fight times with the significant strike stats
-        stats_df = pd.concat([total_fight_times.rename('total_fight_time'), df[['fighter_a_id', 'fighter_b_id']], td_stats_df], axis=1)
-
-        return stats_df
-
-    def __calculate_takedowns_landed(self, stats_by_fight_df, fighter_id):
-        """
-        Calculates the rate of takedowns landed per minute by a fighter.
-
-        Args:
-            stats_by_fight_df (pd.DataFrame): The dataframe containing aggregated fight stats.
-            fighter_id (str): The ID of the fighter.
-
-        Returns:
-            float: The rate of takedowns landed per minute in the given fights.
-        """
-
-        return self.__get_takedowns_return_values(stats_by_fight_df, fighter_id, is_percentage=False, is_defence=False)
-
-    def __calculate_takedowns_accuracy(self, stats_by_fight_df, fighter_id):
-        """
-        Calculates the accuracy of takedowns for a fighter.
-
-        Args:
-            stats_df (pd.DataFrame): The dataframe containing aggregated fight stats.
-            fighter_id (str): The ID of the fighter.
-
-        Returns:
-            float: The accuracy of takedowns as a percentage in the given fights.
-        """
-
-        return self.__get_takedowns_return_values(stats_by_fight_df, fighter_id, is_percentage=True, is_defence=False)
-
-    def __calculate_takedowns_defense(self, stats_by_fight_df, fighter_id):
-        """
-        Calculates the defense rate against takedowns for a fighter.
-
-        Args:
-            stats_df (pd.DataFrame): The dataframe containing aggregated fight stats.
-            fighter_id (str): The ID of the fighter.
-
-        Returns:
-            float: The defense rate against takedowns as a percentage in the given fights.
-        """
-
-        return 1 - self.__get_takedowns_return_values(stats_by_fight_df, fighter_id, is_percentage=True, is_defence= True)
-
-    def __calculate_takedowns_absorbed(self, stats_by_fight_df, fighter_id):
-        """
-        Calculates the rate of takedowns absorbed per minute by a fighter.
-
-        Args:
-            stats_df (pd.DataFrame): The dataframe containing aggregated fight stats.
-            fighter_id (str): The ID of the fighter.
-
-        Returns:
-            float: The rate of takedowns absorbed per minute in the given fights.
-        """
-
-        return self.__get_takedowns_return_values(stats_by_fight_df, fighter_id, is_percentage=False, is_defence=True)
-
-    def __convert_time_to_seconds(self, time_str):
-        """
-        Converts a time string in MM:SS format to total seconds.
-
-        Args:
-            time_str (str): The time string to convert.
-
-        Returns:
-            int: The time in total seconds.
-        """
-
-        if ':' in time_str:
-            minutes, seconds = time_str.split(':')
-            return int(minutes) * 60 + int(seconds)
-        else:
-            return int(time_str)
-
-    def __get_round_time(self, outcome_round, outcome_time, round):
-        """
-        Calculates the total fight time in a specific round.
-
-        Args:
-            outcome_round (int): The round number at the end of the fight.
-            outcome_time (str): The time at which the fight ended in the outcome round.
-            round (str): The round for which the time is to be calculated.
-
-        Returns:
-            float: The total fight time in the specified round in minutes.
-        """
-
-        # Convert outcome_time to seconds
-        outcome_time = self.__convert_time_to_seconds(outcome_time)
-
-        # Handle the "overall" case
-        if round == 0:
-            # Calculate total fight time up to the outcome round
-            total_time = 0
-
-            for r in range(1, outcome_round):
-                total_time += 300  # Add full time for each completed round
-
-            total_time += outcome_time  # Add the time of the last (outcome) round
-
-            return total_time / 60  # Convert to minutes
-
-        # Handle specific rounds
-        if outcome_round == round:
-            return outcome_time/60  # Convert to minutes
-
-        elif outcome_round > round:
-            return 300/60  # Full round time
-
-        else:
-            return 0  # Round did not occur
-
-    def __get_takedowns_return_values(self, stats_by_fight_df, fighter_id, is_percentage, is_defence):
-        """
-        Calculates either the rate or the percentage of takedowns for a fighter.
-
-        Args:
-            stats_by_fight_df (pd.DataFrame): DataFrame containing the statistics of the fights.
-            fighter_id (str): ID of the fighter whose statistics are being calculated.
-            is_percentage (bool): Flag to indicate whether to calculate the percentage (True) or rate (False).
-            is_defence (bool): Flag to indicate whether to calculate for defence (True) or offence (False).
-
-        Returns:
-            float: Calculated rate or percentage of takedowns.
-        """
-
-        # Get the IDs of the fighters in the fights
-        fighter_a_id_vals = stats_by_fight_df.fighter_a_id.values
-        fighter_b_id_vals = stats_by_fight_df.fighter_b_id.values
-
-
-        # Sum up takedowns landed based on whether it's for defence or offence
-        td_landed = stats_by_fight_df[fighter_a_id_vals == fighter_id][f'fighter_a_td_landed' if not is_defence else f'fighter_b_td_landed'].sum() + stats_by_fight_df[fighter_b_id_vals == fighter_id][f'fighter_b_td_landed' if not is_defence else f'fighter_a_td_landed'].sum()
-
-        if not is_percentage:
-            # Sum total fight time and calculate rate of takedowns landed per minute
-            total_fight_time = stats_by_fight_df['total_fight_time'].sum()
-            if total_fight_time == 0:
-                return 0
-            return td_landed / total_fight_time
-        else:
-            # Sum up takedowns attempted and calculate the accuracy percentage
-            td_attempted = stats_by_fight_df[fighter_a_id_vals == fighter_id]['fighter_a_td_attempted'].sum() + stats_by_fight_df[fighter_b_id_vals == fighter_id]['fighter_b_td_attempted'].sum()
-            if td_attempted == 0:
-                return 0
-            return td_landed / td_attempted
\ No newline at end of file
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-import swifter
+from .keyed_counters import lookup_codes
+from .row_apply import apply_fight_rows
 
 class FrequencyStats():
     """
@@ -30,11 +31,62 @@ class FrequencyStats():
         target_df = df.copy()
         result_features = pd.DataFrame(columns=col_names)
 
-        result_features[col_names[:2]] = target_df.swifter.progress_bar(include_progress).apply(lambda row: self.__compute_fights_last_6_months(df, row['fighter_a_id'], row['fighter_b_id'], row.name), axis=1)
-        result_features[col_names[2:]] = target_df.swifter.progress_bar(include_progress).apply(lambda row: self.__compute_weeks_inactive(df, row['fighter_a_id'], row['fighter_b_id'], row.name), axis=1)
+        result_features[col_names[:2]] = apply_fight_rows(target_df, self.__compute_fights_last_6_months, df, include_progress=include_progress)
+        result_features[col_names[2:]] = apply_fight_rows(target_df, self.__compute_weeks_inactive, df, include_progress=include_progress)
 
         return pd.concat([target_df, result_features], axis=1)
 
+    def get_fighter_states(self, df):
+        """
+        Gets the state of every fighter after their latest fight: their fights in the 6 months before the latest fight
+        in the dataset and the date of their latest fight.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+
+        Returns:
+            pd.DataFrame: The fights_l6_months and last_date of every fighter, indexed by fighter ID
+        """
+
+        dates = pd.to_datetime(df['date']).to_numpy()
+        fights = pd.DataFrame({
+            'fighter_id' : np.concatenate([df['fighter_a_id'].to_numpy(dtype=object), df['fighter_b_id'].to_numpy(dtype=object)]),
+            'date' : np.concatenate([dates, dates]),
+            'position' : np.tile(np.arange(len(df)), 2)
+        }).dropna(subset=['fighter_id']).sort_values('position', kind='stable')
+
+        # Like the fight features, the 6 months are counted back from the latest fight in the dataset
+        fights['recent'] = fights['date'] >= pd.Timestamp(dates.max()) - pd.DateOffset(months=6)
+        fighter_fights = fights.groupby('fighter_id', sort=False)
+        return pd.DataFrame({
+            'fights_l6_months' : fighter_fights['recent'].sum(),
+            'last_date' : fighter_fights['date'].last()
+        })
+
+    def create_matchup_feats(self, states, bouts):
+        """
+        Creates the frequency features of upcoming bouts from the states of both fighters.
+
+        Parameters:
+            states (pd.DataFrame): The fighter states, from get_fighter_states
+            bouts (pd.DataFrame): The bouts, with the fighter_a_id, fighter_b_id and date columns
+
+        Returns:
+            pd.DataFrame: The frequency features of every bout
+        """
+
+        codes = lookup_codes(states.index, bouts['fighter_a_id'], bouts['fighter_b_id'])
+        dates = np.repeat(bouts['date'].to_numpy()[:, None], 2, axis=1)
+
+        # Fighters without fights read the appended row, no fights, and count as last fighting on the bout date
+        fights_l6_months = np.append(states['fights_l6_months'].to_numpy(dtype=np.int64), 0)[codes]
+        last_dates = np.append(states['last_date'].to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT'))[codes]
+        last_dates = np.where(np.isnat(last_dates), dates, last_dates)
+        weeks_inactive = (dates - last_dates) // np.timedelta64(1, 'D') // 7
+
+        col_names = ['fighter_a_fights_l6_months', 'fighter_b_fights_l6_months', 'fighter_a_weeks_inactive', 'fighter_b_weeks_inactive']
+        return pd.DataFrame(np.concatenate([fights_l6_months, weeks_inactive], axis=1), index=bouts.index, columns=col_names)
+
     def create_total_rounds_fought_feats(self, df, include_progress=False):
             """
             Creates the total rounds fought features for each fighter in the dataset
@@ -52,7 +104,7 @@ class FrequencyStats():
             target_df = df.copy()
             result_features = pd.DataFrame(columns=col_names)
 
-            result_features[col_names] = target_df.swifter.progress_bar(include_progress).apply(lambda row: self.__compute_total_rounds_fought(df, row['fighter_a_id'], row['fighter_b_id'], row.name), axis=1)
+            result_features[col_names] = apply_fight_rows(target_df, self.__compute_total_rounds_fought, df, include_progress=include_progress)
 
             return pd.concat([target_df, result_features], axis=1)
 
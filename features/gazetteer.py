@@ -0,0 +1,200 @@
+import os
+import unicodedata
+import numpy as np
+import pandas as pd
+
+GAZETTEER_CSV = 'data/gazetteer.csv'
+EARTH_RADIUS_KM = 6371.0088
+
+class Gazetteer():
+    """
+    Offline, file-backed cache of place name -> (latitude, longitude).
+
+    Usage:
+        gazetteer = Gazetteer()
+        coords = gazetteer.resolve(df['location'])
+
+        Every distinct place string is looked up once. Places are matched case, accent and punctuation
+        insensitively, then through the aliases of the known places: a place without its country, e.g. the
+        hometown "Denver, Colorado" for the venue "Denver, Colorado, USA", or its city alone when only one
+        known place has that city. Places missing from the cache are only geocoded when a geocoder is supplied,
+        so the default instance never touches the network; call save afterwards to keep them.
+
+        The shipped data/gazetteer.csv holds the city centres of the event venues, scripts/build_gazetteer.py
+        geocodes the remaining venues and hometowns into it.
+    """
+
+    def __init__(self, path=GAZETTEER_CSV, geocoder=None):
+        """
+        Parameters:
+            path (str): Path to the gazetteer CSV with 'place', 'lat' and 'lon' columns
+            geocoder (callable): Optional function mapping a place string to a (lat, lon) tuple or None
+        """
+
+        self.path = path
+        self.geocoder = geocoder
+        self.coords = self.__load()
+        self.keys = {}
+        self.aliases = {}
+        for place in self.coords:
+            self.__index(place)
+        self.modified = False
+
+    @classmethod
+    def with_google_maps(cls, api_key, path=GAZETTEER_CSV):
+        """
+        Creates a gazetteer that geocodes cache misses through the Google Maps API.
+
+        Parameters:
+            api_key (str): Google Maps API key
+            path (str): Path to the gazetteer CSV
+
+        Returns:
+            Gazetteer: Gazetteer backed by a Google Maps client
+        """
+
+        import googlemaps
+
+        gmaps = googlemaps.Client(key=api_key)
+
+        def geocode(place):
+            geocode_result = gmaps.geocode(place)
+            if geocode_result:
+                return (geocode_result[0]['geometry']['location']['lat'],
+                        geocode_result[0]['geometry']['location']['lng'])
+            return None
+
+        return cls(path, geocode)
+
+    def resolve(self, places):
+        """
+        Resolves place names to coordinates.
+
+        Parameters:
+            places (array-like): Place names, missing values are allowed
+
+        Returns:
+            np.ndarray: Array of shape (n, 2) with latitude and longitude, NaN where unknown
+        """
+
+        codes, uniques = pd.factorize(pd.Series(places, dtype=object).str.strip())
+
+        table = np.array([self.lookup(place) for place in uniques], dtype=float).reshape(-1, 2)
+
+        res = np.full((len(codes), 2), np.nan)
+        known = codes >= 0
+        res[known] = table[codes[known]]
+        return res
+
+    def lookup(self, place):
+        """
+        Looks a place up by name, then by alias, then through the geocoder.
+
+        Parameters:
+            place (str): Place name
+
+        Returns:
+            tuple: Latitude and longitude, NaN when unknown
+        """
+
+        key = normalize_place(place)
+        known = self.keys.get(key, self.aliases.get(key))
+        if known is not None:
+            return self.coords[known]
+
+        if self.geocoder is not None and key not in self.keys:
+            self.coords[place] = self.geocoder(place) or (np.nan, np.nan)
+            self.__index(place)
+            self.modified = True
+            return self.coords[place]
+
+        return (np.nan, np.nan)
+
+    def save(self):
+        """
+        Writes newly geocoded places back to the gazetteer CSV, in the latin-1 encoding it is read with like the
+        scraped CSVs.
+        """
+
+        if not self.modified:
+            return
+
+        places = list(self.coords)
+        coords = np.array([self.coords[place] for place in places], dtype=float).reshape(-1, 2)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        pd.DataFrame({'place': places, 'lat': coords[:, 0], 'lon': coords[:, 1]}).to_csv(self.path, index=False, encoding='latin-1')
+        self.modified = False
+
+    def __load(self):
+        """
+        Loads the gazetteer CSV, if it exists.
+
+        Returns:
+            dict: Mapping of place name to a (lat, lon) tuple
+        """
+
+        if not os.path.exists(self.path):
+            return {}
+
+        gazetteer_df = pd.read_csv(self.path, encoding='latin-1')
+        return dict(zip(gazetteer_df['place'].str.strip(), zip(gazetteer_df['lat'], gazetteer_df['lon'])))
+
+    def __index(self, place):
+        """
+        Indexes a known place under its normalized name and its aliases. An alias shared by places with different
+        names is ambiguous and dropped.
+
+        Parameters:
+            place (str): Place name
+        """
+
+        key = normalize_place(place)
+        self.keys[key] = place
+        parts = key.split(', ')
+        aliases = [', '.join(parts[:-1])] if len(parts) > 2 else []
+        if len(parts) > 1:
+            aliases.append(parts[0])
+
+        for alias in aliases:
+            if alias in self.keys:
+                continue
+            if alias in self.aliases and normalize_place(self.aliases[alias]) != key:
+                self.aliases[alias] = None
+            elif alias not in self.aliases:
+                self.aliases[alias] = place
+
+def normalize_place(place):
+    """
+    Normalizes a place name for lookups: accents, case, dots and extra whitespace are dropped.
+
+    Parameters:
+        place (str): Place name
+
+    Returns:
+        str: The normalized name, parts separated by ', '
+    """
+
+    ascii_place = unicodedata.normalize('NFKD', str(place)).encode('ascii', 'ignore').decode()
+    parts = [' '.join(part.replace('.', ' ').split()) for part in ascii_place.casefold().split(',')]
+    return ', '.join(part for part in parts if part)
+
+def haversine_km(lat_a, lon_a, lat_b, lon_b):
+    """
+    Vectorized great-circle distance.
+
+    Parameters:
+        lat_a, lon_a (np.ndarray): Coordinates of the first points in degrees
+        lat_b, lon_b (np.ndarray): Coordinates of the second points in degrees
+
+    Returns:
+        np.ndarray: Distances in kilometers, NaN where any coordinate is unknown
+    """
+
+    lat_a, lon_a, lat_b, lon_b = (np.radians(np.asarray(x, dtype=float)) for x in (lat_a, lon_a, lat_b, lon_b))
+
+    h = np.sin((lat_b - lat_a) / 2) ** 2 + np.cos(lat_a) * np.cos(lat_b) * np.sin((lon_b - lon_a) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
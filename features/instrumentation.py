@@ -0,0 +1,296 @@
+import datetime
+import json
+import os
+import platform
+import time
+import pandas as pd
+
+MB = 1024 * 1024
+
+class StageMeter():
+    """
+    Usage:
+        with StageMeter('fight_stats', rows=len(df), profile_top=20) as meter:
+            output = run(df)
+        metrics = meter.finish(output)
+
+        Measures one stage in the process running it: wall time, CPU time of the process and of the worker processes
+        it waited for, peak RSS, the memory the stage allocated according to tracemalloc, the throughput and the
+        columns it produced. The peak RSS is reset when the stage starts where Linux allows it, otherwise it is the
+        peak of the process so far, which peak_rss_scope tells apart.
+
+        With profile_top the stage also runs under cProfile and the metrics get its profile_top functions with the
+        most own time. cProfile only sees the thread running the stage, so profile with the serial row mode.
+    """
+
+    def __init__(self, name, rows, trace_memory=True, profile_top=None):
+        """
+        Parameters:
+            name (str): Name of the stage
+            rows (int): Number of rows the stage computes
+            trace_memory (bool): Whether to trace the allocations of the stage with tracemalloc, which slows it down
+            profile_top (int): Number of hotspots to keep from a cProfile run of the stage, None to not profile
+        """
+
+        self.name = name
+        self.rows = rows
+        self.trace_memory = trace_memory
+        self.profile_top = profile_top
+        self.metrics = None
+
+    def __enter__(self):
+        self.peak_rss_scope = 'stage' if reset_peak_rss() else 'process'
+        # tracemalloc and cProfile are only imported by the stages that trace or profile
+        self.started_tracing = False
+        if self.trace_memory:
+            import tracemalloc
+            self.started_tracing = not tracemalloc.is_tracing()
+            if self.started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self.traced_start = tracemalloc.get_traced_memory()[0]
+
+        self.profiler = None
+        if self.profile_top:
+            import cProfile
+            self.profiler = cProfile.Profile()
+        self.children_cpu_start = get_children_cpu_time()
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.profiler is not None:
+            self.profiler.disable()
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        children_cpu = get_children_cpu_time() - self.children_cpu_start
+
+        self.metrics = {
+            'stage' : self.name,
+            'source' : 'run',
+            'wall_s' : wall,
+            'cpu_s' : cpu,
+            'children_cpu_s' : children_cpu,
+            'cpu_utilization' : (cpu + children_cpu) / wall if wall > 0 else 0.0,
+            'peak_rss_mb' : get_peak_rss() / MB,
+            'peak_rss_scope' : self.peak_rss_scope,
+            'rows' : self.rows,
+            'rows_per_s' : self.rows / wall if wall > 0 else 0.0
+        }
+
+        if self.trace_memory:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            self.metrics['traced_delta_mb'] = (current - self.traced_start) / MB
+            self.metrics['traced_peak_mb'] = (peak - self.traced_start) / MB
+            if self.started_tracing:
+                tracemalloc.stop()
+
+        if self.profiler is not None:
+            self.metrics['hotspots'] = get_hotspots(self.profiler, self.profile_top)
+
+    def finish(self, output):
+        """
+        Adds the produced columns to the metrics.
+
+        Parameters:
+            output (pd.DataFrame): Output columns of the stage
+
+        Returns:
+            dict: The metrics of the stage
+        """
+
+        self.metrics['columns'] = len(output.columns)
+        self.metrics['column_names'] = list(output.columns)
+        return self.metrics
+
+class RunReport():
+    """
+    Usage:
+        report = RunReport('reports/features_run.json', profile_top=20)
+        scheduler = StageScheduler(report=report)
+        scheduler.run(cleaned_df, stages)
+        report.write()
+
+        Collects the metrics of every stage of a scheduler run and writes them to a JSON report with the totals of the
+        run, so the stages that dominate the runtime or the memory can be compared between runs. Stages loaded from
+        the cache or with no rows to compute are listed with their source and no measurements.
+    """
+
+    def __init__(self, path, trace_memory=True, profile_top=None):
+        """
+        Parameters:
+            path (str): Path of the JSON report
+            trace_memory (bool): Whether to trace the allocations of every stage with tracemalloc
+            profile_top (int): Number of cProfile hotspots to keep per stage, None to not profile
+        """
+
+        self.path = path
+        self.trace_memory = trace_memory
+        self.profile_top = profile_top
+        self.stages = []
+        self.start = None
+        self.started_at = None
+        self.wall = None
+        self.rows = None
+
+    def get_meter_args(self):
+        """
+        Returns:
+            dict: Keyword arguments of the StageMeter of every stage
+        """
+
+        return {'trace_memory' : self.trace_memory, 'profile_top' : self.profile_top}
+
+    def begin(self, df):
+        """
+        Starts a run, dropping the stages of a previous run.
+
+        Parameters:
+            df (pd.DataFrame): Base dataframe of the run
+        """
+
+        self.stages = []
+        self.start = time.perf_counter()
+        self.started_at = datetime.datetime.now().isoformat(timespec='seconds')
+        self.rows = len(df)
+
+    def add_stage(self, stage_name, metrics=None, source='run', output=None):
+        """
+        Records a stage of the run.
+
+        Parameters:
+            stage_name (str): Name of the stage
+            metrics (dict): Metrics of a StageMeter, None when the stage did not run
+            source (str): 'run', 'cache' when its output was loaded from the cache or 'skipped' when no row changed
+            output (pd.DataFrame): Output columns of a stage that did not run
+        """
+
+        if metrics is None:
+            metrics = {'stage' : stage_name, 'source' : source}
+            if output is not None:
+                metrics.update({'rows' : len(output), 'columns' : len(output.columns)})
+        self.stages.append(metrics)
+
+    def end(self):
+        """
+        Ends the run.
+        """
+
+        self.wall = time.perf_counter() - self.start
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The report, its totals and the metrics of every stage in the order they finished
+        """
+
+        measured = [stage for stage in self.stages if stage['source'] == 'run']
+        return {
+            'started_at' : self.started_at,
+            'python' : platform.python_version(),
+            'pandas' : pd.__version__,
+            'cpus' : os.cpu_count(),
+            'rows' : self.rows,
+            'wall_s' : self.wall,
+            'stage_wall_s' : sum(stage['wall_s'] for stage in measured),
+            'stage_cpu_s' : sum(stage['cpu_s'] + stage['children_cpu_s'] for stage in measured),
+            'peak_rss_mb' : max((stage['peak_rss_mb'] for stage in measured), default=None),
+            'columns' : sum(stage.get('columns', 0) for stage in self.stages),
+            'stages' : self.stages
+        }
+
+    def write(self):
+        """
+        Writes the report to its path.
+
+        Returns:
+            dict: The report
+        """
+
+        report = self.to_dict()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(report, f, indent=4)
+
+        return report
+
+def get_hotspots(profiler, top):
+    """
+    Lists the functions with the most own time in a cProfile run.
+
+    Parameters:
+        profiler (cProfile.Profile): The finished profiler
+        top (int): Number of functions to keep
+
+    Returns:
+        list: function, calls, own time and cumulative time of the top functions
+    """
+
+    import pstats
+
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return [{
+        'function' : f'{os.path.basename(filename)}:{line}({name})',
+        'calls' : calls,
+        'tottime_s' : tottime,
+        'cumtime_s' : cumtime
+    } for (filename, line, name), (_, calls, tottime, cumtime, _) in rows]
+
+def reset_peak_rss():
+    """
+    Resets the peak RSS of the current process, which Linux supports through /proc/self/clear_refs.
+
+    Returns:
+        bool: Whether the peak was reset
+    """
+
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def get_peak_rss():
+    """
+    Returns:
+        int: Peak RSS of the current process in bytes, 0 where it can't be read
+    """
+
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if platform.system() == 'Darwin' else peak * 1024
+
+def get_children_cpu_time():
+    """
+    Returns:
+        float: CPU seconds of the terminated child processes that were waited for, 0 where it can't be read
+    """
+
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+def shared_codes(*columns, return_values=False):
+    """
+    Encodes columns with one lookup table so equal values get the same int code in every column.
+
+    Parameters:
+        columns (pd.Series): Columns to encode, categoricals over the same categories reuse their codes
+        return_values (bool): Whether to also return the value of every code
+
+    Returns:
+        list: One int64 array of codes per column, -1 where the value is missing, followed by a pd.Index of the
+              value of every code when return_values is set
+    """
+
+    dtypes = [column.dtype for column in columns]
+    if all(isinstance(dtype, pd.CategoricalDtype) and dtype.categories.equals(dtypes[0].categories) for dtype in dtypes):
+        codes = [column.cat.codes.to_numpy().astype(np.int64) for column in columns]
+        return codes + [pd.Index(dtypes[0].categories.astype(object))] if return_values else codes
+
+    codes, values = pd.factorize(np.concatenate([column.to_numpy(dtype=object) for column in columns]))
+    codes = np.split(codes.astype(np.int64), len(columns))
+    return codes + [pd.Index(values, dtype=object)] if return_values else codes
+
+def lookup_codes(values, *columns):
+    """
+    Looks up the codes of shared_codes for new rows, e.g. the fighters of upcoming bouts.
+
+    Parameters:
+        values (pd.Index): The value of every code, from shared_codes with return_values set
+        columns (pd.Series): Columns to look up
+
+    Returns:
+        np.ndarray: Int64 array of shape (n, len(columns)) with the code of every value, -1 where the value has no code
+    """
+
+    codes = values.get_indexer(np.concatenate([column.to_numpy(dtype=object) for column in columns]))
+    return codes.astype(np.int64).reshape(len(columns), -1).T
+
+class KeyedCounters():
+    """
+    Usage:
+        counters = KeyedCounters()
+        records = counters.sweep(fighters, winners, {'location' : locations}, order)
+        wins, losses = counters.read('location', fighter, location)
+
+        Keeps a hash map of [wins, losses] per keyed record, e.g. (fighter, location) for the 'location' record.
+        Fights are swept once, each fight reads the pre-fight counts of both fighters before updating them, so
+        every extra record only adds O(N) work to the sweep. The counts persist between sweeps.
+    """
+
+    def __init__(self):
+        self.counts = {}
+
+    def sweep(self, fighters, winners, keys, order=None):
+        """
+        Sweeps the fights and returns the pre-fight counts of every record.
+
+        Parameters:
+            fighters (np.ndarray): Array of shape (n_fights, 2) with the codes of fighter a and fighter b
+            winners (np.ndarray): Array of shape (n_fights,) with the code of the winner
+            keys (dict): Mapping of record name to an array of shape (n_fights, 2) with the key paired with each
+                         fighter, negative keys are missing and are neither counted nor updated
+            order (np.ndarray): Order to sweep the fights in, defaults to the row order
+
+        Returns:
+            dict: Mapping of record name to an int64 array of shape (n_fights, 2, 2) holding the pre-fight
+                  [wins, losses] of each fighter
+        """
+
+        n = len(fighters)
+        order = range(n) if order is None else np.asarray(order).tolist()
+        fighter_list = np.asarray(fighters).tolist()
+        winner_list = np.asarray(winners).tolist()
+
+        key_lists = {name : np.asarray(record_keys).tolist() for name, record_keys in keys.items()}
+        results = {name : [[0, 0, 0, 0]] * n for name in keys}
+        for name in keys:
+            self.counts.setdefault(name, {})
+
+        for i in order:
+            winner = winner_list[i]
+            fighter_a, fighter_b = fighter_list[i]
+            for name, key_list in key_lists.items():
+                counts = self.counts[name]
+                key_a, key_b = key_list[i]
+
+                counter_a = counts.setdefault((fighter_a, key_a), [0, 0]) if key_a >= 0 else [0, 0]
+                counter_b = counts.setdefault((fighter_b, key_b), [0, 0]) if key_b >= 0 else [0, 0]
+                results[name][i] = counter_a + counter_b
+
+                # Anything but a win counts as a loss, draws and no contests included
+                counter_a[0 if winner == fighter_a else 1] += 1
+                counter_b[0 if winner == fighter_b else 1] += 1
+
+        return {name : np.array(result, dtype=np.int64).reshape(n, 2, 2) for name, result in results.items()}
+
+    def read(self, name, fighter, key):
+        """
+        Reads the counts of a fighter for a key of a record, from the fights swept so far.
+
+        Parameters:
+            name (str): Name of the record
+            fighter (int): Code of the fighter
+            key (int): Key paired with the fighter, negative when missing
+
+        Returns:
+            list: The [wins, losses] of the fighter, zeros for a missing key or a record without them
+        """
+
+        if key < 0:
+            return [0, 0]
+        return list(self.counts.get(name, {}).get((fighter, key), [0, 0]))
@@ -0,0 +1,116 @@
+import pandas as pd
+
+# Fields of an upcoming bout, the other columns of the fight are unknown
+BOUT_FIELDS = ['fighter_a_id', 'fighter_b_id', 'date', 'location', 'division', 'rounds']
+
+class MatchupFeatures():
+    """
+    Usage:
+        matchups = MatchupFeatures.from_features(stages, features_df, stage_columns)
+        feature_store.save_states(matchups.states)
+        matchups = MatchupFeatures(stages, feature_store.load_states())
+        features = matchups.features_for_matchup(fighter_a_id, fighter_b_id, '2024-03-09', 'Las Vegas, Nevada, USA', 'Welterweight', 3)
+        card = matchups.features_for_card([{'fighter_a_id' : ..., 'fighter_b_id' : ..., 'date' : ..., ...}, ...])
+
+        Computes the features of upcoming bouts from the state of every fighter after their latest fight, e.g. their
+        ratings, counters and streaks. The states are read from the feature table once, when it is built or updated,
+        and a query only looks up the states of both fighters of every bout, no fight is swept and no stage is run. A
+        bout gets exactly the features it would have as a row of the feature table after the last fight.
+    """
+
+    def __init__(self, stages, states):
+        """
+        Parameters:
+            stages (list): The feature stages
+            states (dict): The states of the feature table, from from_features
+        """
+
+        self.stages = stages
+        self.states = states
+        self.last_date = states['last_date']
+        self.fight_count = states['fights']
+        self.elevations = states['elevations']
+
+    @classmethod
+    def from_features(cls, stages, features_df, stage_columns):
+        """
+        Reads the fighter states of every stage from the feature table.
+
+        Parameters:
+            stages (list): The feature stages
+            features_df (pd.DataFrame): The features of the fights, in fight order
+            stage_columns (dict): Output columns of every stage
+
+        Returns:
+            MatchupFeatures: The matchup features of the states
+        """
+
+        states = {
+            'last_date' : pd.to_datetime(features_df['date']).max(),
+            'fights' : len(features_df),
+            'elevations' : dict(zip(features_df['location'].astype(object), features_df['elevation'])),
+            'stage_columns' : {stage.name : list(stage_columns[stage.name]) for stage in stages},
+            'stages' : {stage.name : stage.state(features_df) for stage in stages if stage.state is not None}
+        }
+        return cls(stages, states)
+
+    def get_state(self, name):
+        """
+        Gets the fighter states of a stage, e.g. the ratings of the 'elo' stage.
+
+        Parameters:
+            name (str): Name of the stage
+
+        Returns:
+            object: The fighter states of the stage
+        """
+
+        return self.states['stages'][name]
+
+    def features_for_matchup(self, fighter_a_id, fighter_b_id, date, location, division, rounds):
+        """
+        Computes the feature vector of an upcoming bout.
+
+        Parameters:
+            fighter_a_id (str): ID of fighter a
+            fighter_b_id (str): ID of fighter b
+            date (str | pd.Timestamp): Date of the bout, after the last fight
+            location (str): Location of the event
+            division (str): Division of the bout
+            rounds (int): Scheduled number of rounds
+
+        Returns:
+            pd.Series: The features of the bout
+        """
+
+        return self.features_for_card([dict(zip(BOUT_FIELDS, [fighter_a_id, fighter_b_id, date, location, division, rounds]))]).iloc[0]
+
+    def features_for_card(self, bouts):
+        """
+        Computes the feature vectors of the bouts of a card. Every bout is computed from the states after the last
+        fight, so no bout reads another one as a past fight.
+
+        Parameters:
+            bouts (list | pd.DataFrame): Bouts with the fields of features_for_matchup
+
+        Returns:
+            pd.DataFrame: The features of every bout, in the order of the bouts
+        """
+
+        bouts = pd.DataFrame(bouts, columns=BOUT_FIELDS).reset_index(drop=True)
+        bouts['date'] = pd.to_datetime(bouts['date'])
+        if (bouts['date'] <= self.last_date).any():
+            raise ValueError(f'Bouts must happen after the last fight on {self.last_date.date()}')
+        bouts['elevation'] = [self.elevations.get(location, 0) for location in bouts['location']]
+
+        results = []
+        for stage in self.stages:
+            if stage.matchup is None:
+                res = stage.func(bouts.copy(), *stage.args)
+            else:
+                res = stage.matchup(self.states['stages'].get(stage.name), bouts)
+
+            columns = self.states['stage_columns'][stage.name]
+            results.append(res if list(res.columns) == columns else res[columns])
+
+        return pd.concat(results, axis=1)
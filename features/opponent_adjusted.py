@@ -0,0 +1,110 @@
+from collections import deque
+import numpy as np
+
+class OpponentAdjustedStats():
+    """
+    Usage:
+        adjusted = OpponentAdjustedStats(windows=[3, 5])
+        means = adjusted.sweep(fighters, landed, minutes, order)
+        adjusted.read_means(fighter, n_stats)
+
+        The opponent-adjusted rate of a fight is what a fighter landed per minute minus what their opponent
+        conceded per minute on average before the fight. Each fighter's conceded totals and minutes are kept as
+        running sums so the opponent's rate is an O(1) lookup, along with the fighter's last adjusted rates and
+        their all-time sum for the window and all-time means.
+    """
+
+    def __init__(self, windows=(3, 5)):
+        self.windows = list(windows)
+        self.conceded = {}
+        self.minutes = {}
+        self.history = {}
+        self.totals = {}
+
+    def sweep(self, fighters, landed, minutes, order=None):
+        """
+        Sweeps the fights and returns each fighter's mean opponent-adjusted rates going into every fight.
+
+        Parameters:
+            fighters (np.ndarray): Array of shape (n_fights, 2) with the codes of fighter a and fighter b
+            landed (np.ndarray): Array of shape (n_fights, 2, n_stats) with what each fighter landed in the fight
+            minutes (np.ndarray): Length of every fight in minutes
+            order (np.ndarray): Order to sweep the fights in, must be chronological, defaults to the row order
+
+        Returns:
+            np.ndarray: Array of shape (n_fights, 2, len(windows) + 1, n_stats) with the mean adjusted rates over
+                        the last fights of every window and over all fights, 0 without any adjusted fight
+        """
+
+        n = len(fighters)
+        order = range(n) if order is None else np.asarray(order).tolist()
+        fighter_list = np.asarray(fighters).tolist()
+        landed = np.asarray(landed, dtype=float)
+        n_stats = landed.shape[2]
+
+        res = np.zeros((n, 2, len(self.windows) + 1, n_stats))
+        for i in order:
+            pair = fighter_list[i]
+            for side, fighter in enumerate(pair):
+                res[i, side] = self.read_means(fighter, n_stats)
+
+            # Adjust against the opponents' pre-fight conceded rates before updating them with this fight
+            adjusted = [None, None]
+            if minutes[i] > 0:
+                for side, fighter in enumerate(pair):
+                    opponent = pair[1 - side]
+                    if self.minutes.get(opponent, 0) > 0:
+                        adjusted[side] = landed[i, side] / minutes[i] - self.conceded[opponent] / self.minutes[opponent]
+
+            for side, fighter in enumerate(pair):
+                self.conceded[fighter] = self.conceded.get(fighter, 0) + landed[i, 1 - side]
+                self.minutes[fighter] = self.minutes.get(fighter, 0) + minutes[i]
+                self.__add_adjusted(fighter, adjusted[side], n_stats)
+
+        return res
+
+    def read_means(self, fighter, n_stats):
+        """
+        Reads the mean adjusted rates of a fighter over every window and all fights.
+
+        Parameters:
+            fighter (int): Code of the fighter
+            n_stats (int): Number of stats
+
+        Returns:
+            np.ndarray: Array of shape (len(windows) + 1, n_stats)
+        """
+
+        means = np.zeros((len(self.windows) + 1, n_stats))
+        history = self.history.get(fighter)
+        if history is None:
+            return means
+
+        for w, window in enumerate(self.windows):
+            values = [value for value in list(history)[-window:] if value is not None]
+            if values:
+                means[w] = np.mean(values, axis=0)
+
+        total, count = self.totals[fighter]
+        if count:
+            means[-1] = total / count
+        return means
+
+    def __add_adjusted(self, fighter, adjusted, n_stats):
+        """
+        Appends the adjusted rates of a fight to a fighter's history.
+
+        Parameters:
+            fighter (int): Code of the fighter
+            adjusted (np.ndarray): Adjusted rates, None when the opponent had no previous fight time
+            n_stats (int): Number of stats
+        """
+
+        if fighter not in self.history:
+            self.history[fighter] = deque(maxlen=max(self.windows, default=1))
+            self.totals[fighter] = [np.zeros(n_stats), 0]
+
+        self.history[fighter].append(adjusted)
+        if adjusted is not None:
+            self.totals[fighter][0] += adjusted
+            self.totals[fighter][1] += 1
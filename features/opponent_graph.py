@@ -0,0 +1,123 @@
+import numpy as np
+
+class OpponentGraph():
+    """
+    Usage:
+        graph = OpponentGraph()
+        counts = graph.sweep(fighters, winners, dates, order)
+        next_counts = graph.read_counts(fighter, opponent)
+
+        Keeps the fight graph as per-fighter bitsets over the fighter codes: everyone a fighter has fought, beaten and
+        lost to. Draws and no contests are only fought, so they never count as a win or a loss in a chain. Common
+        opponents and transitive win chains are then a few ANDs and popcounts per fight. Fights on the same date are
+        read before any of them is added, so every query only sees fights strictly before its date.
+    """
+
+    def __init__(self):
+        self.fought = {}
+        self.beaten = {}
+        self.lost_to = {}
+
+    def sweep(self, fighters, winners, dates, order=None):
+        """
+        Sweeps the fights and returns the common opponent and transitive win counts of both fighters.
+
+        Parameters:
+            fighters (np.ndarray): Array of shape (n_fights, 2) with the codes of fighter a and fighter b, negative
+                                   codes are ignored
+            winners (np.ndarray): Array of shape (n_fights,) with the code of the winner, anything else is a draw or
+                                  no contest
+            dates (np.ndarray): Fight dates as datetime64 values
+            order (np.ndarray): Order to sweep the fights in, must be chronological, defaults to the row order
+
+        Returns:
+            np.ndarray: Int64 array of shape (n_fights, 2, 5) with the number of common opponents, the common
+                        opponents beaten and lost to, and the opponents beaten through whom a win chain of depth 2
+                        and of depth 3 reaches the other fighter
+        """
+
+        n = len(fighters)
+        order = range(n) if order is None else np.asarray(order).tolist()
+        fighter_list = np.asarray(fighters).tolist()
+        winner_list = np.asarray(winners).tolist()
+        date_list = np.asarray(dates, dtype='datetime64[ns]').tolist()
+
+        res = np.zeros((n, 2, 5), dtype=np.int64)
+        pending = []
+        for i in order:
+            if pending and date_list[i] != date_list[pending[0]]:
+                self.__add_fights(pending, fighter_list, winner_list)
+                pending = []
+
+            a, b = fighter_list[i]
+            if a >= 0 and b >= 0:
+                res[i, 0] = self.read_counts(a, b)
+                res[i, 1] = self.read_counts(b, a)
+            pending.append(i)
+
+        self.__add_fights(pending, fighter_list, winner_list)
+        return res
+
+    def add_fight(self, a, b, winner):
+        """
+        Adds a fight to the bitsets of both fighters.
+
+        Parameters:
+            a (int): Code of fighter a
+            b (int): Code of fighter b
+            winner (int): Code of the winner, anything else is a draw or no contest
+        """
+
+        if a < 0 or b < 0:
+            return
+
+        for fighter, opponent in [(a, b), (b, a)]:
+            self.fought[fighter] = self.fought.get(fighter, 0) | (1 << opponent)
+            if winner == fighter:
+                self.beaten[fighter] = self.beaten.get(fighter, 0) | (1 << opponent)
+            elif winner == opponent:
+                self.lost_to[fighter] = self.lost_to.get(fighter, 0) | (1 << opponent)
+
+    def __add_fights(self, fights, fighter_list, winner_list):
+        """
+        Adds a batch of fights to the graph.
+
+        Parameters:
+            fights (list): Row indices of the fights
+            fighter_list (list): Fighter code pairs of every row
+            winner_list (list): Winner code of every row
+        """
+
+        for i in fights:
+            self.add_fight(fighter_list[i][0], fighter_list[i][1], winner_list[i])
+
+    def read_counts(self, fighter, opponent):
+        """
+        Reads the common opponent and transitive win counts of a fighter against an opponent from the fights added so
+        far.
+
+        Parameters:
+            fighter (int): Code of the fighter
+            opponent (int): Code of the opponent
+
+        Returns:
+            list: Common opponents, common opponents beaten, common opponents lost to, depth 2 and depth 3 chains
+        """
+
+        common = self.fought.get(fighter, 0) & self.fought.get(opponent, 0)
+        beaten = self.beaten.get(fighter, 0)
+        beat_opponent = self.lost_to.get(opponent, 0)
+
+        # fighter beat c and c beat opponent
+        depth_2 = (beaten & beat_opponent).bit_count()
+
+        # fighter beat c, c beat d and d beat opponent
+        depth_3 = 0
+        remaining = beaten
+        while remaining:
+            lowest = remaining & -remaining
+            if self.beaten.get(lowest.bit_length() - 1, 0) & beat_opponent:
+                depth_3 += 1
+            remaining ^= lowest
+
+        return [common.bit_count(), (common & beaten).bit_count(), (common & self.lost_to.get(fighter, 0)).bit_count(), depth_2, depth_3]
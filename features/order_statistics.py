@@ -0,0 +1,174 @@
+import numpy as np
+
+# Half-width of the elevation band counted by the "near elevation" features
+ELEVATION_WINDOW_M = 500
+
+class FenwickTree():
+    """
+    Usage:
+        tree = FenwickTree(10)
+        tree.add(3)
+        tree.prefix_sum(4)
+
+        Binary indexed tree over a fixed number of slots, point additions and prefix sums take O(log n).
+    """
+
+    def __init__(self, size):
+        self.tree = [0] * (size + 1)
+
+    def add(self, i, value=1):
+        """
+        Adds value to slot i.
+
+        Parameters:
+            i (int): Slot index starting at 0
+            value (int): Amount to add
+        """
+
+        tree = self.tree
+        i += 1
+        while i < len(tree):
+            tree[i] += value
+            i += i & -i
+
+    def prefix_sum(self, i):
+        """
+        Sums the slots before i.
+
+        Parameters:
+            i (int): Exclusive end slot
+
+        Returns:
+            int: Sum of slots [0, i)
+        """
+
+        tree = self.tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, lo, hi):
+        """
+        Sums the slots in [lo, hi).
+
+        Parameters:
+            lo (int): Inclusive start slot
+            hi (int): Exclusive end slot
+
+        Returns:
+            int: Sum of the slots
+        """
+
+        return self.prefix_sum(hi) - self.prefix_sum(lo)
+
+class ElevationRecords():
+    """
+    Usage:
+        records = ElevationRecords(df['elevation'])
+        counts = records.sweep(fighters, winners, df['elevation'], order)
+        next_counts = records.read(fighter, elevation)
+
+        Keeps a Fenwick tree of wins and one of losses per fighter over the ranks of the distinct fight elevations,
+        so the wins and losses above, below or within window meters of an elevation take O(log n) per query. Any
+        elevation can be read, the ranks of the other levels stay the same whether it is one of them or not.
+    """
+
+    def __init__(self, elevations, window=ELEVATION_WINDOW_M):
+        self.levels = np.unique(np.asarray(elevations, dtype=float))
+        self.window = window
+        self.trees = {}
+
+    def sweep(self, fighters, winners, elevations, order=None):
+        """
+        Sweeps the fights and returns the pre-fight elevation records of both fighters.
+
+        Parameters:
+            fighters (np.ndarray): Array of shape (n_fights, 2) with the codes of fighter a and fighter b
+            winners (np.ndarray): Array of shape (n_fights,) with the code of the winner
+            elevations (np.ndarray): Elevation of every fight, must be one of the levels the records were built with
+            order (np.ndarray): Order to sweep the fights in, defaults to the row order
+
+        Returns:
+            np.ndarray: Int64 array of shape (n_fights, 2, 6) with the wins and losses at or above the fight
+                        elevation, below it and within window meters of it
+        """
+
+        n = len(fighters)
+        order = range(n) if order is None else np.asarray(order).tolist()
+        elevations = np.asarray(elevations, dtype=float)
+
+        ranks = np.searchsorted(self.levels, elevations, side='left').tolist()
+        near_lo = np.searchsorted(self.levels, elevations - self.window, side='left').tolist()
+        near_hi = np.searchsorted(self.levels, elevations + self.window, side='right').tolist()
+        fighter_list = np.asarray(fighters).tolist()
+        winner_list = np.asarray(winners).tolist()
+
+        res = [None] * n
+        for i in order:
+            row = []
+            for fighter in fighter_list[i]:
+                row += self.__read_ranks(fighter, ranks[i], near_lo[i], near_hi[i])
+            res[i] = row
+
+            winner = winner_list[i]
+            for fighter in fighter_list[i]:
+                self.__get_trees(fighter)[0 if winner == fighter else 1].add(ranks[i])
+
+        return np.array(res, dtype=np.int64).reshape(n, 2, 6)
+
+    def read(self, fighter, elevation):
+        """
+        Reads the elevation records of a fighter for a fight at an elevation, from the fights swept so far.
+
+        Parameters:
+            fighter (int): Code of the fighter
+            elevation (float): Elevation of the fight
+
+        Returns:
+            list: The wins and losses at or above the elevation, below it and within window meters of it
+        """
+
+        if fighter not in self.trees:
+            return [0, 0, 0, 0, 0, 0]
+
+        rank = int(np.searchsorted(self.levels, elevation, side='left'))
+        lo = int(np.searchsorted(self.levels, elevation - self.window, side='left'))
+        hi = int(np.searchsorted(self.levels, elevation + self.window, side='right'))
+        return self.__read_ranks(fighter, rank, lo, hi)
+
+    def __read_ranks(self, fighter, rank, lo, hi):
+        """
+        Reads the elevation records of a fighter from the ranks of a fight elevation.
+
+        Parameters:
+            fighter (int): Code of the fighter
+            rank (int): Number of levels below the elevation
+            lo (int): First level within window meters of the elevation
+            hi (int): Level after the last one within window meters of the elevation
+
+        Returns:
+            list: The wins and losses at or above the elevation, below it and within window meters of it
+        """
+
+        wins, losses = self.__get_trees(fighter)
+        wins_below, losses_below = wins.prefix_sum(rank), losses.prefix_sum(rank)
+        return [wins.prefix_sum(len(self.levels)) - wins_below, losses.prefix_sum(len(self.levels)) - losses_below,
+                wins_below, losses_below, wins.range_sum(lo, hi), losses.range_sum(lo, hi)]
+
+    def __get_trees(self, fighter):
+        """
+        Gets the win and loss trees of a fighter, creating them on their first fight.
+
+        Parameters:
+            fighter (int): Code of the fighter
+
+        Returns:
+            tuple: The wins FenwickTree and the losses FenwickTree
+        """
+
+        trees = self.trees.get(fighter)
+        if trees is None:
+            trees = self.trees[fighter] = (FenwickTree(len(self.levels)), FenwickTree(len(self.levels)))
+        return trees
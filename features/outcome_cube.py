@@ -0,0 +1,119 @@
+from collections import deque
+import numpy as np
+
+class OutcomeCube():
+    """
+    Usage:
+        cube = OutcomeCube(n_methods=4, n_divisions=10)
+        all_time, last_year = cube.sweep(fighters, winners, methods, divisions, dates, window_starts, order)
+        next_all_time, next_last_year = cube.read(fighter, window_start)
+
+        Keeps a count cube of shape (2, n_methods, n_divisions) per fighter, indexed by outcome (win, loss), outcome
+        method and division. The last method and the last division are the totals over every method and division.
+        A second cube per fighter only holds the fights inside a sliding window, expired fights are subtracted
+        again as the sweep moves forward in time.
+    """
+
+    def __init__(self, n_methods, n_divisions):
+        self.shape = (2, n_methods, n_divisions)
+        self.cubes = {}
+        self.window_cubes = {}
+        self.windows = {}
+
+    def sweep(self, fighters, winners, methods, divisions, dates, window_starts, order=None):
+        """
+        Sweeps the fights in date order and returns the pre-fight cubes of both fighters.
+
+        Parameters:
+            fighters (np.ndarray): Array of shape (n_fights, 2) with the codes of fighter a and fighter b
+            winners (np.ndarray): Array of shape (n_fights,) with the code of the winner
+            methods (np.ndarray): Method index of every fight, -1 when it only counts towards the total
+            divisions (np.ndarray): Division index of every fight, -1 when it only counts towards the total
+            dates (np.ndarray): Fight dates as datetime64 values
+            window_starts (np.ndarray): Exclusive start of the sliding window of every fight as datetime64 values
+            order (np.ndarray): Order to sweep the fights in, must be chronological, defaults to the row order
+
+        Returns:
+            tuple: Int64 arrays of shape (n_fights, 2, 2 * n_methods * n_divisions) with the all-time and the
+                   sliding window cubes of both fighters, flattened in (outcome, method, division) order
+        """
+
+        n = len(fighters)
+        order = range(n) if order is None else np.asarray(order).tolist()
+        size = int(np.prod(self.shape))
+        _, n_methods, n_divisions = self.shape
+
+        fighter_list = np.asarray(fighters).tolist()
+        winner_list = np.asarray(winners).tolist()
+        date_list = np.asarray(dates, dtype='datetime64[ns]').astype(np.int64).tolist()
+        window_start_list = np.asarray(window_starts, dtype='datetime64[ns]').astype(np.int64).tolist()
+
+        # Cube cells of every fight without the outcome offset: its method and the total, times its division and the total
+        method_cells = [[m, n_methods - 1] if m >= 0 else [n_methods - 1] for m in np.asarray(methods).tolist()]
+        division_cells = [[d, n_divisions - 1] if d >= 0 else [n_divisions - 1] for d in np.asarray(divisions).tolist()]
+
+        all_time = np.zeros((n, 2, size), dtype=np.int64)
+        last_year = np.zeros((n, 2, size), dtype=np.int64)
+        for i in order:
+            cells = [m * n_divisions + d for m in method_cells[i] for d in division_cells[i]]
+            winner = winner_list[i]
+
+            for side, fighter in enumerate(fighter_list[i]):
+                cube, window_cube, window = self.__get_state(fighter, size)
+
+                # Expire fights that are no longer after the window start
+                while window and window[0][0] <= window_start_list[i]:
+                    window_cube[window.popleft()[1]] -= 1
+
+                all_time[i, side] = cube
+                last_year[i, side] = window_cube
+
+                fight_cells = np.array(cells) + (0 if winner == fighter else size // 2)
+                cube[fight_cells] += 1
+                window_cube[fight_cells] += 1
+                window.append((date_list[i], fight_cells))
+
+        return all_time, last_year
+
+    def read(self, fighter, window_start):
+        """
+        Reads the cubes of a fighter for a fight after every fight swept so far, without expiring any fight.
+
+        Parameters:
+            fighter (int): Code of the fighter
+            window_start (np.datetime64): Exclusive start of the sliding window
+
+        Returns:
+            tuple: Int64 arrays of 2 * n_methods * n_divisions cells with the all-time and the sliding window cubes
+        """
+
+        size = int(np.prod(self.shape))
+        if fighter not in self.cubes:
+            return np.zeros(size, dtype=np.int64), np.zeros(size, dtype=np.int64)
+
+        window_cube = self.window_cubes[fighter].copy()
+        window_start = np.datetime64(window_start, 'ns').astype(np.int64)
+        for date, fight_cells in self.windows[fighter]:
+            if date > window_start:
+                break
+            window_cube[fight_cells] -= 1
+
+        return self.cubes[fighter].copy(), window_cube
+
+    def __get_state(self, fighter, size):
+        """
+        Gets the cubes and the sliding window of a fighter, creating them on their first fight.
+
+        Parameters:
+            fighter (int): Code of the fighter
+            size (int): Number of cells in a cube
+
+        Returns:
+            tuple: The all-time cube, the window cube and the deque of (date, cells) in the window
+        """
+
+        if fighter not in self.cubes:
+            self.cubes[fighter] = np.zeros(size, dtype=np.int64)
+            self.window_cubes[fighter] = np.zeros(size, dtype=np.int64)
+            self.windows[fighter] = deque()
+        return self.cubes[fighter], self.window_cubes[fighter], self.windows[fighter]
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+def prior_sums(groups, dates, values, window_starts=None, row_order=None):
+    """
+    Sums values over the earlier rows of the same group in one vectorized pass.
+    Rows are ordered by date within a group, rows on the same date by row_order.
+
+    Parameters:
+        groups (np.ndarray): Int group code of every row, e.g. the fighter
+        dates (np.ndarray): Date of every row as datetime64 values
+        values (np.ndarray): Array of shape (n_rows, n_values) to sum
+        window_starts (np.ndarray): Exclusive start date of the window of every row, only earlier rows dated after
+                                    it are summed when given
+        row_order (np.ndarray): Tie-break of the rows on the same date, e.g. the position of the fight when every
+                                fight has one row per fighter, defaults to the row position
+
+    Returns:
+        np.ndarray: Array of shape (n_rows, n_values) with the sums over the earlier rows of each row's group
+    """
+
+    groups = np.asarray(groups)
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    values = np.asarray(values)
+    n = len(groups)
+    row_order = np.arange(n) if row_order is None else np.asarray(row_order)
+
+    # Dense ranks over the dates and window starts so (group, date) fits in one sortable int64 key
+    if window_starts is not None:
+        window_starts = np.asarray(window_starts, dtype='datetime64[ns]')
+        levels, ranks = np.unique(np.concatenate([dates, window_starts]), return_inverse=True)
+        date_ranks, window_ranks = ranks[:n], ranks[n:]
+    else:
+        levels, date_ranks = np.unique(dates, return_inverse=True)
+
+    group_codes = np.unique(groups, return_inverse=True)[1].astype(np.int64)
+    keys = group_codes * (len(levels) + 1) + date_ranks
+    order = np.lexsort((row_order, date_ranks, group_codes))
+    sorted_keys = keys[order]
+
+    # Running sums restart at every group so a row's sums never depend on the rows of other groups
+    sorted_groups = group_codes[order]
+    group_firsts = np.searchsorted(sorted_groups, sorted_groups, side='left')
+    group_cumsum = pd.DataFrame(values[order].reshape(n, int(np.prod(values.shape[1:])))).groupby(sorted_groups).cumsum().to_numpy()
+    cumsum = np.zeros((n + 1,) + values.shape[1:], dtype=np.result_type(values.dtype, np.int64))
+    cumsum[1:] = group_cumsum.reshape(values.shape)
+    cumsum[:n][group_firsts == np.arange(n)] = 0
+
+    positions = np.empty(n, dtype=np.int64)
+    positions[order] = np.arange(n)
+
+    if window_starts is not None:
+        starts = np.searchsorted(sorted_keys, group_codes * (len(levels) + 1) + window_ranks, side='right')
+    else:
+        starts = np.searchsorted(sorted_keys, group_codes * (len(levels) + 1), side='left')
+
+    return cumsum[positions] - cumsum[starts]
+
+class DatedSums():
+    """
+    Usage:
+        sums = DatedSums(fighters, dates, values)
+        all_time = sums.read(fighter_codes)
+        last_year = sums.read(fighter_codes, window_starts)
+
+        Keeps the running sums of the values of every group in date order, the state prior_sums reaches after the
+        last row. The sums over every row of a group, or over its rows dated after a window start, are then read with
+        a binary search, e.g. for a fight after every row.
+    """
+
+    def __init__(self, groups, dates, values):
+        """
+        Parameters:
+            groups (np.ndarray): Int group code of every row, negative codes are ignored
+            dates (np.ndarray): Date of every row as datetime64 values
+            values (np.ndarray): Array of shape (n_rows, n_values) to sum
+        """
+
+        groups = np.asarray(groups)
+        dates = np.asarray(dates, dtype='datetime64[ns]')
+        values = np.asarray(values)
+
+        kept = np.flatnonzero(groups >= 0)
+        order = kept[np.lexsort((dates[kept], groups[kept]))]
+        self.groups = groups[order]
+        self.dates = dates[order]
+        self.cumsum = np.zeros((len(order) + 1,) + values.shape[1:], dtype=np.result_type(values.dtype, np.int64))
+        np.cumsum(values[order], axis=0, out=self.cumsum[1:])
+
+    def read(self, groups, window_starts=None):
+        """
+        Sums the values of every row of the given groups.
+
+        Parameters:
+            groups (np.ndarray): Int group codes to read, codes without rows read zeros
+            window_starts (np.ndarray): Exclusive start date of the window of every group read, only rows dated after
+                                        it are summed when given
+
+        Returns:
+            np.ndarray: Array of shape (len(groups), n_values) with the sums
+        """
+
+        groups = np.asarray(groups)
+        starts = np.searchsorted(self.groups, groups, side='left')
+        ends = np.searchsorted(self.groups, groups, side='right')
+
+        if window_starts is not None:
+            window_starts = np.asarray(window_starts, dtype='datetime64[ns]')
+            # The rows of a group are in date order, so the rows after the window start end its range
+            starts = np.array([start + np.searchsorted(self.dates[start:end], window_start, side='right')
+                               for start, end, window_start in zip(starts, ends, window_starts)], dtype=np.int64).reshape(len(groups))
+
+        return self.cumsum[ends] - self.cumsum[starts]
@@ -0,0 +1,134 @@
+import sys
+import threading
+import time
+
+class StageProgress():
+    """
+    Usage:
+        progress = StageProgress('fight_stats')
+        progress.start_pass(len(df))
+        progress.advance()
+        progress.close()
+
+        Reports the progress of a stage on one line. A stage goes over its rows once per row-wise pass, the line shows
+        the current pass, its rows done, the throughput and the time left in the pass, and the closing line the totals
+        of the stage. In a terminal or a notebook the line is rewritten in place, otherwise, e.g. when stderr goes to a
+        log file, a line is written every log_interval seconds. Updates from several threads are counted once.
+    """
+
+    def __init__(self, name, enabled=True, stream=None, interval=0.5, log_interval=30.0):
+        """
+        Parameters:
+            name (str): Name of the stage shown at the start of the line
+            enabled (bool): Whether to write anything, a disabled progress only counts the rows
+            stream (io.TextIOBase): Stream to write to, stderr by default
+            interval (float): Minimum seconds between two rewrites of the line
+            log_interval (float): Seconds between two lines when the stream is not interactive
+        """
+
+        self.name = name
+        self.enabled = enabled
+        self.stream = stream or sys.stderr
+        self.interactive = self.__is_interactive()
+        self.interval = interval if self.interactive else log_interval
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.passes = 0
+        self.rows = 0
+        self.pass_rows = 0
+        self.pass_done = 0
+        self.pass_start = self.start
+        self.last_write = 0.0
+        self.width = 0
+
+    def start_pass(self, rows):
+        """
+        Starts a pass over rows.
+
+        Parameters:
+            rows (int): Number of rows of the pass
+        """
+
+        with self.lock:
+            self.passes += 1
+            self.pass_rows = rows
+            self.pass_done = 0
+            self.pass_start = time.perf_counter()
+
+    def advance(self, value=None, rows=1):
+        """
+        Counts rows of the current pass as done.
+
+        Parameters:
+            value: Returned as is, so a row function can be wrapped as lambda row: progress.advance(func(row))
+            rows (int): Number of rows done
+
+        Returns:
+            The value
+        """
+
+        with self.lock:
+            self.rows += rows
+            self.pass_done += rows
+            now = time.perf_counter()
+            if self.enabled and now - self.last_write >= self.interval:
+                self.last_write = now
+                self.__write(self.__get_line(now))
+
+        return value
+
+    def close(self):
+        """
+        Writes the totals of the stage.
+        """
+
+        if not self.enabled:
+            return
+
+        elapsed = time.perf_counter() - self.start
+        rate = self.rows / elapsed if elapsed > 0 else 0.0
+        passes = f'{self.passes} pass' + ('es' if self.passes != 1 else '')
+        self.__write(f'{self.name}: {self.rows} rows in {passes}, {format_seconds(elapsed)}, {rate:.0f} rows/s', end='\n')
+
+    def __get_line(self, now):
+        pass_elapsed = now - self.pass_start
+        rate = self.pass_done / pass_elapsed if pass_elapsed > 0 else 0.0
+        eta = format_seconds((self.pass_rows - self.pass_done) / rate) if rate > 0 else '?'
+        return (f'{self.name}: pass {self.passes} {self.pass_done}/{self.pass_rows} rows, {rate:.0f} rows/s, '
+                f'ETA {eta}, {format_seconds(now - self.start)} elapsed')
+
+    def __write(self, line, end=''):
+        """
+        Writes a line, over the previous one when the stream is interactive.
+
+        Parameters:
+            line (str): The line
+            end (str): Written after the line, a newline to keep it
+        """
+
+        if self.interactive:
+            self.stream.write('\r' + line.ljust(self.width) + end)
+            self.width = 0 if end else len(line)
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+    def __is_interactive(self):
+        # Notebook output streams are not TTYs but render carriage returns like a terminal
+        isatty = getattr(self.stream, 'isatty', None)
+        return bool(isatty and isatty()) or 'ipykernel' in sys.modules
+
+def format_seconds(seconds):
+    """
+    Formats a duration as m:ss, or h:mm:ss from one hour on.
+
+    Parameters:
+        seconds (float): The duration
+
+    Returns:
+        str: The formatted duration
+    """
+
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes:02d}:{seconds:02d}' if hours else f'{minutes}:{seconds:02d}'
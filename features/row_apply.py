@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .executor import ROW_EXECUTOR, STAGE_PROGRESS, RowExecutor
+from .progress import StageProgress
+
+# Index labels apply_rows is restricted to, None to apply to every row
+TARGET_ROWS = ContextVar('target_rows', default=None)
+
+@contextmanager
+def only_rows(rows):
+    """
+    Restricts every apply_rows and apply_fight_rows call inside the block to the given rows, e.g. to only compute the features of new
+    fights while the whole history stays available to the row functions.
+
+    Parameters:
+        rows (pd.Index): Index labels of the rows to apply to
+    """
+
+    token = TARGET_ROWS.set(rows)
+    try:
+        yield
+    finally:
+        TARGET_ROWS.reset(token)
+
+def apply_fight_rows(df, kernel, history_df, *args, include_progress=False, **kwargs):
+    """
+    Applies a per-fight kernel to every row of df, the result of
+    kernel(history_df, row['fighter_a_id'], row['fighter_b_id'], row.name, *args, **kwargs) for every row.
+    Inside a stage_execution block the rows run in the executor of the stage, in processes mode the kernel and its
+    arguments must be picklable; bound methods of the feature classes are.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame whose rows the kernel is applied to
+        kernel (callable): Function or bound method computing the features of one fight
+        history_df (pd.DataFrame): DataFrame of all the fights passed to the kernel
+        args: Extra positional arguments of the kernel
+        include_progress (bool): Whether to show a progress line when called outside of a stage
+        kwargs: Extra keyword arguments of the kernel
+
+    Returns:
+        pd.DataFrame | pd.Series: The result of the row-wise apply
+    """
+
+    rows = TARGET_ROWS.get()
+    if rows is not None:
+        df = df[df.index.isin(rows)]
+
+    with row_progress(kernel, include_progress) as progress:
+        return get_row_executor().map_rows(df, kernel, history_df, args, kwargs, progress)
+
+def apply_rows(df, func, include_progress=False):
+    """
+    Applies func to every row of df, equivalent to df.apply(func, axis=1).
+    Inside an only_rows block func is only applied to the selected rows and the result only has those rows.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame to apply func over
+        func (callable): Function taking a row (pd.Series)
+        include_progress (bool): Whether to show a progress line when called outside of a stage
+
+    Returns:
+        pd.DataFrame | pd.Series: The result of the row-wise apply
+    """
+
+    rows = TARGET_ROWS.get()
+    if rows is not None:
+        df = df[df.index.isin(rows)]
+
+    with row_progress(func, include_progress) as progress:
+        return get_row_executor().apply(df, func, progress)
+
+def get_row_executor():
+    """
+    Returns:
+        RowExecutor: The executor of the running stage, a serial one outside of a stage
+    """
+
+    return ROW_EXECUTOR.get() or SERIAL_EXECUTOR
+
+@contextmanager
+def row_progress(func, include_progress):
+    """
+    Yields the progress a row-wise apply counts its rows in: the line of the running stage, or outside of a stage a
+    line of its own when include_progress is set.
+
+    Parameters:
+        func (callable): The applied function, whose name labels a line of its own
+        include_progress (bool): Whether to show a line outside of a stage
+    """
+
+    progress = STAGE_PROGRESS.get()
+    if progress is not None:
+        yield progress
+        return
+
+    progress = StageProgress(getattr(func, '__name__', 'rows').strip('_'), enabled=include_progress)
+    yield progress
+    progress.close()
+
+SERIAL_EXECUTOR = RowExecutor('serial')
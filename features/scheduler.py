@@ -0,0 +1,599 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+import numpy as np
+import pandas as pd
+from .keyed_counters import shared_codes
+from .executor import stage_execution
+from .instrumentation import StageMeter
+from .row_apply import only_rows
+
+# Fights a stage needs to compute the features of a fight, from the cheapest to the safest
+STAGE_HISTORIES = ['fighters', 'opponents', 'ratings', 'all']
+
+class Stage():
+    """
+    Usage:
+        stage = Stage('strength_of_schedule', sos.create_strength_of_schedule_feats,
+                      columns=['fighter_a_id', 'fighter_b_id', 'winner_id', 'date'], requires=['elo'], history='opponents')
+
+        A feature stage is a function that takes the fights dataframe, plus any extra args, and returns it with its
+        feature columns appended. The function and its args must be picklable to run in a worker process.
+
+        For upcoming bouts a stage declares state, which reads the feature table into the state of every fighter after
+        their latest fight, e.g. their ratings, counters and streaks, and matchup, which turns the states of the two
+        fighters into the feature columns of a bout without reading any fight, see MatchupFeatures.
+    """
+
+    def __init__(self, name, func, args=(), columns=None, requires=(), history='all', state=None, matchup=None):
+        """
+        Parameters:
+            name (str): Unique name of the stage
+            func (callable): Function called as func(df, *args)
+            args (tuple): Extra positional arguments passed after the dataframe
+            columns (list): Columns of the base dataframe the stage reads, None for all of them
+            requires (list): Names of the stages whose output columns the stage reads
+            history (str): Fights the features of a fight depend on: 'fighters' for the earlier fights of both
+                           fighters, 'opponents' for those plus the fights of their opponents, 'ratings' for state that
+                           every fight passes on to both fighters, like a rating, 'all' for every earlier fight
+            state (callable): Called as state(features_df) with the feature table, returns the fighter states of
+                              the stage, None for a stage whose bout features only depend on the bout
+            matchup (callable): Called as matchup(states, bouts) with the fighter states and the bouts, returns the
+                                output columns of the stage for every bout, None to run func on the bouts instead
+        """
+
+        if history not in STAGE_HISTORIES:
+            raise ValueError(f'Unknown stage history {history}, expected one of {STAGE_HISTORIES}')
+
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+        self.columns = None if columns is None else list(columns)
+        self.requires = list(requires)
+        self.history = history
+        self.state = state
+        self.matchup = matchup
+
+class StageScheduler():
+    """
+    Usage:
+        df = StageScheduler(max_workers=4).run(cleaned_df, stages)
+        new_df = StageScheduler(max_workers=4).run(cleaned_df, stages, rows=new_rows, previous=features_df)
+        df, rows = StageScheduler(max_workers=4).recompute(corrected_df, stages, features_df, stage_columns)
+
+        Runs feature stages as a DAG: every stage gets the base columns it declares plus the output columns of the
+        stages it requires, and stages whose requirements are done run at the same time in a process pool. The output
+        columns of every stage are appended to the base dataframe in the order the stages are listed, so the result is
+        identical to running the stages one after another. With a StageCache, stages whose input, parameters and
+        source are unchanged load their output columns from disk instead of running.
+
+        Given rows, only the features of those rows are computed. Every stage then only sees the fights its history
+        declares and apply_rows only evaluates the selected rows, while the output columns of required stages for the
+        other fights are read from the previous feature dataframe. recompute selects the rows of every stage itself,
+        following the changed fights through the stage histories and the stage requirements.
+
+        stage_columns holds the output columns of every stage of the last run. With a RunReport, every stage that runs
+        is measured in the process running it and the report gets the metrics of the stages of the last run.
+    """
+
+    def __init__(self, max_workers=None, cache=None, row_workers=None, row_mode=None, progress=False, report=None):
+        """
+        Parameters:
+            max_workers (int): Number of worker processes, 1 runs every stage in the current process
+            cache (StageCache): Cache of the stage outputs, None to always run the stages
+            row_workers (int): Number of threads or processes the row-wise applies of every stage run in, None for
+                               the number of CPUs
+            row_mode (str): How the row-wise applies run, one of RowExecutor.MODES; None for processes when
+                            row_workers is above 1 and serial otherwise
+            progress (bool): Whether to report the progress of every stage on one line
+            report (RunReport): Report the metrics of every stage of a run are recorded in, None to not measure them
+        """
+
+        if row_mode is None:
+            row_mode = 'processes' if row_workers is not None and row_workers > 1 else 'serial'
+
+        self.max_workers = max_workers
+        self.cache = cache
+        self.execution = {'mode' : row_mode, 'max_workers' : row_workers, 'progress' : progress}
+        self.report = report
+        self.measure = report.get_meter_args() if report is not None else None
+        self.stage_columns = {}
+
+    def run(self, df, stages, rows=None, previous=None):
+        """
+        Runs the stages and assembles their output columns.
+
+        Parameters:
+            df (pd.DataFrame): Base dataframe the stages read from
+            stages (list): Stages in the order their columns are appended
+            rows (pd.Index): Index labels of the rows to compute the features of, None for every row
+            previous (pd.DataFrame): Features of the other rows, required when rows is given
+
+        Returns:
+            pd.DataFrame: The base dataframe, or its selected rows, with the output columns of every stage appended
+        """
+
+        self.__validate(stages)
+        if rows is not None:
+            rows = df.index[df.index.isin(rows)]
+
+        if self.report is not None:
+            self.report.begin(df)
+        outputs = self.__run_stages(df, stages, previous, lambda stage, outputs: rows)
+        self.stage_columns = {stage.name : list(outputs[stage.name][1].columns) for stage in stages}
+        if self.report is not None:
+            self.report.end()
+
+        base = df if rows is None else df.loc[rows]
+        return pd.concat([base] + [outputs[stage.name][1] for stage in stages], axis=1)
+
+    def recompute(self, df, stages, previous, stage_columns):
+        """
+        Recomputes the features of the rows that depend on fights that changed or are missing from the previous
+        features. A fight changed for a stage when a base column the stage reads differs from the previous features,
+        and the stage then recomputes the fight and the later fights its history says depend on it. Rows whose output
+        columns change in turn are changed fights for the stages requiring them. Stages without any such row are not
+        run.
+
+        Parameters:
+            df (pd.DataFrame): Base dataframe, with the previous fights first in the same order
+            stages (list): Stages in the order their columns are appended
+            previous (pd.DataFrame): Features of a previous run
+            stage_columns (dict): Output columns of every stage in the previous run
+
+        Returns:
+            tuple: The base dataframe with the output columns of every stage appended, and the index labels of the
+                   rows recomputed by every stage
+        """
+
+        self.__validate(stages)
+        missing = [stage.name for stage in stages if stage.name not in stage_columns]
+        if missing:
+            raise ValueError(f'No previous output columns for stages {missing}')
+
+        old_rows = df.index[df.index.isin(previous.index)]
+        differs = self.__get_changed_values(df.loc[old_rows], previous.loc[old_rows, df.columns])
+        new_rows = df.index[~df.index.isin(previous.index)]
+
+        def get_rows(stage, outputs):
+            changed = differs.index[differs.any(axis=1).to_numpy() if stage.columns is None else differs[stage.columns].any(axis=1).to_numpy()]
+            for name in stage.requires:
+                changed = changed.union(outputs[name][2])
+
+            return df.index[df.index.isin(new_rows.union(self.__get_dependent_rows(df, previous, changed, stage.history)))]
+
+        if self.report is not None:
+            self.report.begin(df)
+        outputs = self.__run_stages(df, stages, previous, get_rows, stage_columns)
+        self.stage_columns = {stage.name : stage_columns[stage.name] for stage in stages}
+        if self.report is not None:
+            self.report.end()
+
+        features = [df]
+        for stage in stages:
+            stage_rows, output, _ = outputs[stage.name]
+            kept = df.index[~df.index.isin(stage_rows)]
+            features.append(pd.concat([previous.loc[kept, stage_columns[stage.name]], output]).loc[df.index])
+
+        return pd.concat(features, axis=1), {stage.name : outputs[stage.name][0] for stage in stages}
+
+    def __run_stages(self, df, stages, previous, get_rows, stage_columns=None):
+        """
+        Runs the stages on the rows get_rows selects for them, in the current process or in a process pool.
+
+        Parameters:
+            df (pd.DataFrame): Base dataframe the stages read from
+            stages (list): Stages to run
+            previous (pd.DataFrame): Features of the rows that are not computed
+            get_rows (callable): Called with a stage and the outputs of its requirements, returns the index labels of
+                                 the rows to compute or None for every row
+            stage_columns (dict): Output columns every stage must produce, None to accept any
+
+        Returns:
+            dict: The computed rows, the output columns and the rows whose output changed of every stage
+        """
+
+        outputs = {}
+        finish = lambda stage, rows, output: self.__finish_stage(stage, rows, output, previous, stage_columns, outputs)
+
+        if self.max_workers == 1:
+            for stage in self.__topological_order(stages):
+                rows = get_rows(stage, outputs)
+                if rows is not None and len(rows) == 0 and stage_columns is not None:
+                    self.__record(stage, source='skipped')
+                    finish(stage, rows, None)
+                    continue
+
+                stage_input, target = self.__get_stage_input(df, stage, outputs, rows, previous)
+                key, output = self.__load_cached(stage, stage_input, target)
+                if output is None:
+                    output, metrics = run_measured_stage(stage.func, stage.args, stage_input, target, stage.name, self.execution, self.measure)
+                    self.__save_cached(key, output, stage)
+                    self.__record(stage, metrics)
+                else:
+                    self.__record(stage, source='cache', output=output)
+                finish(stage, rows, output)
+            return outputs
+
+        # Importing the process pool loads multiprocessing, only parallel runs pay for it
+        from concurrent.futures import ProcessPoolExecutor
+
+        remaining = list(stages)
+        running = {}
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while remaining or running:
+                    for stage in [stage for stage in remaining if all(name in outputs for name in stage.requires)]:
+                        remaining.remove(stage)
+                        rows = get_rows(stage, outputs)
+                        if rows is not None and len(rows) == 0 and stage_columns is not None:
+                            self.__record(stage, source='skipped')
+                            finish(stage, rows, None)
+                            continue
+
+                        stage_input, target = self.__get_stage_input(df, stage, outputs, rows, previous)
+                        key, output = self.__load_cached(stage, stage_input, target)
+                        if output is not None:
+                            self.__record(stage, source='cache', output=output)
+                            finish(stage, rows, output)
+                            continue
+
+                        future = executor.submit(run_measured_stage, stage.func, stage.args, stage_input, target, stage.name, self.execution, self.measure)
+                        running[future] = (key, stage, rows)
+
+                    if not running:
+                        continue
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key, stage, rows = running.pop(future)
+                        output, metrics = future.result()
+                        self.__save_cached(key, output, stage)
+                        self.__record(stage, metrics)
+                        finish(stage, rows, output)
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+        return outputs
+
+    def __finish_stage(self, stage, rows, output, previous, stage_columns, outputs):
+        """
+        Gives the output of a stage run on a slice of the fights the index labels and dtypes of the previous features
+        and records it with the rows whose output changed.
+
+        Parameters:
+            stage (Stage): The stage
+            rows (pd.Index): Index labels of the computed rows, None when every row was computed
+            output (pd.DataFrame): Output columns of the stage, None when no row was computed
+            previous (pd.DataFrame): Features of the rows that were not computed
+            stage_columns (dict): Output columns every stage must produce, None to accept any
+            outputs (dict): Outputs of the finished stages, filled in place
+        """
+
+        if output is None:
+            output = previous[stage_columns[stage.name]].iloc[:0]
+
+        if stage_columns is not None and list(output.columns) != stage_columns[stage.name]:
+            raise ValueError(f'The output columns of stage {stage.name} changed, rebuild the features')
+
+        if rows is None:
+            outputs[stage.name] = (rows, output, output.index)
+            return
+
+        output.index = rows
+
+        # Row functions applied to a few rows are assigned into the whole frame, which fills the other rows with NaN
+        # and turns integer columns into floats
+        dtypes = {col : previous[col].dtype for col in output.columns
+                  if col in previous.columns and previous[col].dtype != output[col].dtype and not output[col].isna().any()}
+        output = output.astype(dtypes)
+
+        compared = rows[rows.isin(previous.index)]
+        differs = self.__get_changed_values(output.loc[compared], previous.loc[compared, output.columns]).any(axis=1)
+        outputs[stage.name] = (rows, output, rows[~rows.isin(previous.index)].union(compared[differs.to_numpy()]))
+
+    def __get_changed_values(self, df, previous):
+        """
+        Compares two dataframes with the same index and columns, treating missing values as equal.
+
+        Parameters:
+            df (pd.DataFrame): The new values
+            previous (pd.DataFrame): The previous values
+
+        Returns:
+            pd.DataFrame: Whether every value differs
+        """
+
+        df = df.astype(object)
+        previous = previous.astype(object)
+        return (df != previous) & ~(df.isna() & previous.isna())
+
+    def __get_dependent_rows(self, df, previous, changed, history):
+        """
+        Finds the fights whose features depend on the changed fights according to a stage history. A fighter is
+        affected from the first changed fight they were in, or for 'opponents' that one of their opponents was in,
+        and every later fight of an affected fighter is recomputed. For 'ratings' every recomputed fight also affects
+        both of its fighters from then on.
+
+        Parameters:
+            df (pd.DataFrame): Base dataframe, in fight order
+            previous (pd.DataFrame): Previous features, whose fighter ids of the changed fights are affected as well
+            changed (pd.Index): Index labels of the changed fights
+            history (str): History declared by the stage
+
+        Returns:
+            pd.Index: Index labels of the changed fights and the fights that depend on them
+        """
+
+        if len(changed) == 0:
+            return changed
+
+        n = len(df)
+        positions = df.index.get_indexer(changed)
+        if history == 'all':
+            return df.index[positions.min():]
+
+        old = changed[changed.isin(previous.index)]
+        fighter_ids = [df['fighter_a_id'], df['fighter_b_id'], previous.loc[old, 'fighter_a_id'], previous.loc[old, 'fighter_b_id']]
+        codes = shared_codes(pd.concat([ids.astype(object) for ids in fighter_ids], ignore_index=True))[0]
+        fighter_a_codes, fighter_b_codes, old_a_codes, old_b_codes = np.split(codes, [n, 2 * n, 2 * n + len(old)])
+        old_positions = df.index.get_indexer(old)
+
+        # Position of the first fight every fighter is affected by, n when they are not affected
+        seed_codes = np.concatenate([fighter_a_codes[positions], fighter_b_codes[positions], old_a_codes, old_b_codes])
+        seed_positions = np.concatenate([positions, positions, old_positions, old_positions])
+        n_codes = max(fighter_a_codes.max(initial=-1), fighter_b_codes.max(initial=-1), seed_codes.max(initial=-1)) + 1
+        first = np.full(n_codes + 1, n, dtype=np.int64)
+        valid = seed_codes >= 0
+        np.minimum.at(first, seed_codes[valid], seed_positions[valid])
+
+        # Missing fighters map to the extra last slot, which is never affected
+        fighter_a_codes = np.where(fighter_a_codes >= 0, fighter_a_codes, n_codes)
+        fighter_b_codes = np.where(fighter_b_codes >= 0, fighter_b_codes, n_codes)
+
+        if history == 'opponents':
+            spread = first.copy()
+            np.minimum.at(spread, fighter_a_codes, first[fighter_b_codes])
+            np.minimum.at(spread, fighter_b_codes, first[fighter_a_codes])
+            spread[n_codes] = n
+            first = spread
+
+        affected = np.zeros(n, dtype=bool)
+        affected[positions] = True
+        if history == 'ratings':
+            a_list, b_list = fighter_a_codes.tolist(), fighter_b_codes.tolist()
+            first = first.tolist()
+            for i in range(positions.min(), n):
+                a, b = a_list[i], b_list[i]
+                if affected[i] or first[a] < i or first[b] < i:
+                    affected[i] = True
+                    first[a] = min(first[a], i) if a != n_codes else n
+                    first[b] = min(first[b], i) if b != n_codes else n
+        else:
+            fight_positions = np.arange(n)
+            affected |= (fight_positions > first[fighter_a_codes]) | (fight_positions > first[fighter_b_codes])
+
+        return df.index[affected]
+
+    def __load_cached(self, stage, stage_input, target):
+        """
+        Looks up the output of a stage in the cache, only whole-frame outputs are cached.
+
+        Parameters:
+            stage (Stage): The stage
+            stage_input (pd.DataFrame): Input dataframe of the stage
+            target (pd.Index): Rows of stage_input to compute, None for every row
+
+        Returns:
+            tuple: The cache key and the cached output columns, (None, None) without a cache and the key and None on
+                   a miss
+        """
+
+        if self.cache is None or target is not None:
+            return None, None
+
+        key = self.cache.create_key(stage, stage_input)
+        return key, self.cache.load(key, stage_input.index)
+
+    def __save_cached(self, key, output, stage):
+        """
+        Saves the output of a stage to the cache.
+
+        Parameters:
+            key (str): Cache key of the stage, None without a cache
+            output (pd.DataFrame): Output columns of the stage
+            stage (Stage): The stage
+        """
+
+        if key is not None:
+            self.cache.save(key, output, stage.name)
+
+    def __record(self, stage, metrics=None, source='run', output=None):
+        """
+        Records a stage in the run report.
+
+        Parameters:
+            stage (Stage): The stage
+            metrics (dict): Metrics of the stage when it ran
+            source (str): Where its output came from, see RunReport.add_stage
+            output (pd.DataFrame): Output columns of a stage that did not run
+        """
+
+        if self.report is not None:
+            self.report.add_stage(stage.name, metrics, source, output)
+
+    def __get_stage_input(self, df, stage, outputs, rows, previous):
+        """
+        Builds the input dataframe of a stage.
+
+        Parameters:
+            df (pd.DataFrame): Base dataframe
+            stage (Stage): Stage to build the input of
+            outputs (dict): Outputs of the finished stages
+            rows (pd.Index): Index labels of the rows to compute, None for every row
+            previous (pd.DataFrame): Features of the rows the required stages did not compute
+
+        Returns:
+            tuple: The declared base columns followed by the output columns of the required stages, and the positions
+                   of the selected rows in it or None when every row is computed
+        """
+
+        if rows is None:
+            base = df.copy() if stage.columns is None else df[stage.columns].copy()
+            return pd.concat([base] + [self.__get_required(outputs[name], df.index, previous) for name in stage.requires], axis=1), None
+
+        history = self.__get_history_rows(df, stage.history, rows)
+        base = df.loc[history] if stage.columns is None else df.loc[history, stage.columns]
+        required = [self.__get_required(outputs[name], history, previous) for name in stage.requires]
+
+        # The row functions expect a RangeIndex in fight order
+        stage_input = pd.concat([base] + required, axis=1).reset_index(drop=True)
+        return stage_input, pd.RangeIndex(len(history))[history.isin(rows)]
+
+    def __get_required(self, required_output, history, previous):
+        """
+        Reads the output columns of a required stage for some fights, from the previous features for the fights the
+        stage did not compute.
+
+        Parameters:
+            required_output (tuple): Computed rows, output columns and changed rows of the required stage
+            history (pd.Index): Index labels of the fights to read, in fight order
+            previous (pd.DataFrame): Previous features
+
+        Returns:
+            pd.DataFrame: The output columns of the fights
+        """
+
+        rows, output, _ = required_output
+        if rows is None:
+            return output.loc[history]
+
+        earlier = history[~history.isin(rows)]
+        return pd.concat([previous.loc[earlier, output.columns], output.loc[history[history.isin(rows)]]]).loc[history]
+
+    def __get_history_rows(self, df, history, rows):
+        """
+        Finds the fights a stage needs to compute the features of the selected rows.
+
+        Parameters:
+            df (pd.DataFrame): Base dataframe
+            history (str): History declared by the stage
+            rows (pd.Index): Index labels of the selected rows
+
+        Returns:
+            pd.Index: Index labels of the needed fights, in the order of df
+        """
+
+        if history in ['ratings', 'all']:
+            return df.index
+
+        fighter_a_ids = df['fighter_a_id'].astype(object)
+        fighter_b_ids = df['fighter_b_id'].astype(object)
+        fighters = pd.unique(np.concatenate([fighter_a_ids.loc[rows].to_numpy(), fighter_b_ids.loc[rows].to_numpy()]))
+
+        if history == 'opponents':
+            involved = fighter_a_ids.isin(fighters) | fighter_b_ids.isin(fighters)
+            fighters = pd.unique(np.concatenate([fighters, fighter_a_ids[involved].to_numpy(), fighter_b_ids[involved].to_numpy()]))
+
+        needed = fighter_a_ids.isin(fighters) | fighter_b_ids.isin(fighters) | df.index.isin(rows)
+        return df.index[needed.to_numpy()]
+
+    def __validate(self, stages):
+        """
+        Checks that the stage names are unique and the requirements are known stages without cycles.
+
+        Parameters:
+            stages (list): Stages to check
+        """
+
+        names = set()
+        for stage in stages:
+            if stage.name in names:
+                raise ValueError(f'Duplicate stage name: {stage.name}')
+            names.add(stage.name)
+
+        for stage in stages:
+            for name in stage.requires:
+                if name not in names:
+                    raise ValueError(f'Stage {stage.name} requires unknown stage {name}')
+
+        self.__topological_order(stages)
+
+    def __topological_order(self, stages):
+        """
+        Orders the stages so every stage comes after its requirements, keeping the listed order otherwise.
+
+        Parameters:
+            stages (list): Stages to order
+
+        Returns:
+            list: The ordered stages
+        """
+
+        ordered = []
+        done = set()
+        remaining = list(stages)
+        while remaining:
+            ready = [stage for stage in remaining if all(name in done for name in stage.requires)]
+            if not ready:
+                raise ValueError(f'Stage requirements form a cycle: {[stage.name for stage in remaining]}')
+
+            stage = ready[0]
+            ordered.append(stage)
+            done.add(stage.name)
+            remaining.remove(stage)
+
+        return ordered
+
+def run_stage(func, args, df, target=None, name=None, execution=None):
+    """
+    Runs a stage function and keeps the columns it added.
+
+    Parameters:
+        func (callable): Stage function called as func(df, *args)
+        args (tuple): Extra positional arguments
+        df (pd.DataFrame): Input dataframe of the stage
+        target (pd.Index): Rows of df to compute, apply_rows skips the others, None for every row
+        name (str): Name of the stage in its progress line, the name of func by default
+        execution (dict): Keyword arguments of stage_execution, how the row-wise applies run and report progress
+
+    Returns:
+        pd.DataFrame: The columns the stage appended to its input, only for the target rows when given
+    """
+
+    input_columns = set(df.columns)
+    with stage_execution(name or func.__name__, **(execution or {})):
+        if target is None:
+            res = func(df, *args)
+        else:
+            with only_rows(target):
+                res = func(df, *args)
+            res = res.loc[target]
+
+    return res[[col for col in res.columns if col not in input_columns]]
+
+def run_measured_stage(func, args, df, target=None, name=None, execution=None, measure=None):
+    """
+    Runs a stage with run_stage, measured by a StageMeter when measure is given.
+
+    Parameters:
+        func (callable): Stage function called as func(df, *args)
+        args (tuple): Extra positional arguments
+        df (pd.DataFrame): Input dataframe of the stage
+        target (pd.Index): Rows of df to compute, None for every row
+        name (str): Name of the stage, the name of func by default
+        execution (dict): Keyword arguments of stage_execution
+        measure (dict): Keyword arguments of StageMeter, None to not measure the stage
+
+    Returns:
+        tuple: The columns the stage appended to its input and its metrics, None when it was not measured
+    """
+
+    name = name or func.__name__
+    if measure is None:
+        return run_stage(func, args, df, target, name, execution), None
+
+    with StageMeter(name, len(df) if target is None else len(target), **measure) as meter:
+        output = run_stage(func, args, df, target, name, execution)
+
+    return output, meter.finish(output)
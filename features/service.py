@@ -0,0 +1,358 @@
+import asyncio
+import bisect
+import json
+import os
+import time
+import pandas as pd
+from aiohttp import web
+from .elo_features import Elo
+from .matchup_features import BOUT_FIELDS
+
+# Upper bounds of the latency histogram buckets in milliseconds, the last bucket counts everything slower
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+class LatencyHistogram():
+    """
+    Usage:
+        histogram = LatencyHistogram()
+        histogram.observe(0.012)
+        histogram.to_dict()
+
+        Counts request latencies in fixed millisecond buckets, like a Prometheus histogram but with the count of
+        every bucket rather than cumulative counts.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds):
+        """
+        Adds a latency to the histogram.
+
+        Parameters:
+            seconds (float): The latency in seconds
+        """
+
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.total += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The bucket counts keyed by their upper bound, the number of requests and the mean and max latency
+        """
+
+        return {
+            'buckets' : dict(zip([f'le_{bound}ms' for bound in self.buckets] + ['le_inf'], self.counts)),
+            'count' : self.total,
+            'mean_ms' : self.total_ms / self.total if self.total else 0.0,
+            'max_ms' : self.max_ms
+        }
+
+class ServiceState():
+    """
+    Usage:
+        state = ServiceState(FeatureCreation().load_matchup_features())
+
+        Everything a request reads: the fighter states of MatchupFeatures, which include the Glicko-2 rating of every
+        fighter after their latest fight. A state is never modified, a reload builds a new one.
+    """
+
+    def __init__(self, matchups):
+        """
+        Parameters:
+            matchups (MatchupFeatures): The fighter states
+        """
+
+        self.matchups = matchups
+        self.ratings = matchups.get_state('elo')
+        self.last_date = matchups.last_date
+        self.loaded_at = time.time()
+
+class FeatureService():
+    """
+    Usage:
+        service = FeatureService(lambda: ServiceState(FeatureCreation().load_matchup_features()))
+        web.run_app(service.create_app(), port=8080)
+
+        Serves matchup feature vectors and Glicko-2 win probabilities over JSON:
+            POST /features   {"bouts": [{"fighter_a_id": ..., "fighter_b_id": ..., "date": ..., "location": ...,
+                                         "division": ..., "rounds": 3}]}
+            POST /predict    {"bouts": [{"fighter_a_id": ..., "fighter_b_id": ...}]}
+            POST /reload     Reloads the state and swaps it in
+            GET  /health     Watermark of the loaded state
+            GET  /metrics    Latency histograms of every route and of the feature batches
+
+        Feature requests arriving within batch_window seconds of each other are answered by one features_for_card
+        call in a worker thread, so a card sent as separate requests costs one state lookup per batch. Bout dates are
+        checked before a request is queued, and a batch that fails is answered again request by request, so a bad
+        request never fails the other requests of its batch. The state is
+        swapped by replacing one reference: every request and batch reads the state once when it starts and keeps
+        using it, so requests in flight during a reload finish on the state they started with.
+    """
+
+    def __init__(self, load_state, batch_window=0.005, max_batch=64, watch_path=None, watch_interval=5.0):
+        """
+        Parameters:
+            load_state (callable): Builds a ServiceState, called in a worker thread at startup and on every reload
+            batch_window (float): Seconds to wait for more feature requests before running a batch
+            max_batch (int): Maximum number of bouts per batch
+            watch_path (str): File rewritten when the feature table is updated, e.g. the fighter states of the
+                              feature store, the state is reloaded when it changes; None to only reload on request
+            watch_interval (float): Seconds between checks of watch_path
+        """
+
+        self.load_state = load_state
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.watch_path = watch_path
+        self.watch_interval = watch_interval
+        self.state = None
+        self.elo = Elo()
+        self.histograms = {}
+        self.queue = None
+        self.reload_lock = None
+        self.tasks = []
+
+    def create_app(self):
+        """
+        Returns:
+            web.Application: The application, loading the state on startup
+        """
+
+        app = web.Application(middlewares=[self.__time_request])
+        app.add_routes([
+            web.post('/features', self.handle_features),
+            web.post('/predict', self.handle_predict),
+            web.post('/reload', self.handle_reload),
+            web.get('/health', self.handle_health),
+            web.get('/metrics', self.handle_metrics)
+        ])
+        app.on_startup.append(self.__start)
+        app.on_cleanup.append(self.__stop)
+        return app
+
+    async def reload(self):
+        """
+        Builds a new state in a worker thread and swaps it in once it is complete. Concurrent reloads are run one
+        after another.
+
+        Returns:
+            ServiceState: The new state
+        """
+
+        async with self.reload_lock:
+            state = await asyncio.get_running_loop().run_in_executor(None, self.load_state)
+            self.state = state
+            return state
+
+    async def handle_features(self, request):
+        """
+        Answers the feature vectors of the requested bouts, batched with concurrent requests.
+        """
+
+        bouts = await self.__read_bouts(request, BOUT_FIELDS)
+        self.__check_dates(bouts, self.state.last_date)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((bouts, future))
+        try:
+            features = await future
+        except (KeyError, ValueError) as e:
+            raise web.HTTPBadRequest(text=str(e))
+
+        return web.json_response({'features' : features})
+
+    async def handle_predict(self, request):
+        """
+        Answers the probability that fighter a wins every requested bout from the current ratings.
+        """
+
+        state = self.state
+        bouts = await self.__read_bouts(request, ['fighter_a_id', 'fighter_b_id'])
+        predictions = []
+        for bout in bouts:
+            fighter_a_rating = state.ratings.get(bout['fighter_a_id'])
+            fighter_b_rating = state.ratings.get(bout['fighter_b_id'])
+            probability = self.elo.win_probability(fighter_a_rating, fighter_b_rating)
+            predictions.append({
+                'fighter_a_id' : bout['fighter_a_id'],
+                'fighter_b_id' : bout['fighter_b_id'],
+                'fighter_a_win_probability' : probability,
+                'fighter_b_win_probability' : 1 - probability,
+                'fighter_a_rating' : fighter_a_rating,
+                'fighter_b_rating' : fighter_b_rating
+            })
+
+        return web.json_response({'predictions' : predictions})
+
+    async def handle_reload(self, request):
+        state = await self.reload()
+        return web.json_response({'last_date' : str(state.last_date.date()), 'loaded_at' : state.loaded_at})
+
+    async def handle_health(self, request):
+        state = self.state
+        return web.json_response({'last_date' : str(state.last_date.date()), 'loaded_at' : state.loaded_at, 'fights' : state.matchups.fight_count})
+
+    async def handle_metrics(self, request):
+        return web.json_response({name : histogram.to_dict() for name, histogram in self.histograms.items()})
+
+    @web.middleware
+    async def __time_request(self, request, handler):
+        start = time.perf_counter()
+        try:
+            return await handler(request)
+        finally:
+            self.__observe(f'{request.method} {request.path}', time.perf_counter() - start)
+
+    async def __start(self, app):
+        self.queue = asyncio.Queue()
+        self.reload_lock = asyncio.Lock()
+        await self.reload()
+
+        self.tasks = [asyncio.create_task(self.__run_batches())]
+        if self.watch_path is not None:
+            self.tasks.append(asyncio.create_task(self.__watch()))
+
+    async def __stop(self, app):
+        for task in self.tasks:
+            task.cancel()
+
+    async def __run_batches(self):
+        """
+        Collects the queued feature requests into batches and answers each batch with one features_for_card call.
+        """
+
+        loop = asyncio.get_running_loop()
+        while True:
+            requests = [await self.queue.get()]
+            size = len(requests[0][0])
+            deadline = loop.time() + self.batch_window
+            while size < self.max_batch:
+                try:
+                    requests.append(await asyncio.wait_for(self.queue.get(), max(deadline - loop.time(), 0)))
+                except asyncio.TimeoutError:
+                    break
+                size += len(requests[-1][0])
+
+            await self.__answer_batch(self.state, requests)
+
+    async def __answer_batch(self, state, requests):
+        """
+        Answers a batch of feature requests with one features_for_card call. When the call fails, every request of
+        the batch is answered on its own, so only the requests that fail themselves get the exception.
+
+        Parameters:
+            state (ServiceState): The state to answer from
+            requests (list): The bouts and the future of every request
+        """
+
+        bouts = [bout for request_bouts, _ in requests for bout in request_bouts]
+        start = time.perf_counter()
+        try:
+            features = await asyncio.get_running_loop().run_in_executor(None, state.matchups.features_for_card, bouts)
+        except Exception as e:
+            self.__observe('feature batch', time.perf_counter() - start)
+            if len(requests) > 1:
+                for request in requests:
+                    await self.__answer_batch(state, [request])
+            elif not requests[0][1].done():
+                requests[0][1].set_exception(e)
+            return
+
+        self.__observe('feature batch', time.perf_counter() - start)
+        records = self.__to_records(features)
+        for request_bouts, future in requests:
+            if not future.done():
+                future.set_result(records[:len(request_bouts)])
+            records = records[len(request_bouts):]
+
+    async def __watch(self):
+        """
+        Reloads the state whenever the watched file is rewritten by an update of the feature table.
+        """
+
+        last_mtime = self.__get_mtime()
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            mtime = self.__get_mtime()
+            if mtime != last_mtime:
+                last_mtime = mtime
+                await self.reload()
+
+    async def __read_bouts(self, request, fields):
+        """
+        Reads the bouts of a JSON request.
+
+        Parameters:
+            request (web.Request): The request
+            fields (list): Fields every bout must have
+
+        Returns:
+            list: The bouts
+        """
+
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text='The request body must be JSON')
+
+        bouts = body.get('bouts') if isinstance(body, dict) else None
+        if not isinstance(bouts, list) or not bouts:
+            raise web.HTTPBadRequest(text='The request must have a non-empty "bouts" list')
+
+        for bout in bouts:
+            missing = [field for field in fields if not isinstance(bout, dict) or field not in bout]
+            if missing:
+                raise web.HTTPBadRequest(text=f'Bout {bout} is missing {missing}')
+
+        return bouts
+
+    def __check_dates(self, bouts, last_date):
+        """
+        Parses the date of every bout in place and checks that it follows the last fight of the state.
+
+        Parameters:
+            bouts (list): The bouts of a request
+            last_date (pd.Timestamp): Date of the last fight
+        """
+
+        for bout in bouts:
+            try:
+                date = pd.Timestamp(bout['date'])
+            except (TypeError, ValueError):
+                raise web.HTTPBadRequest(text=f'Bout {bout} has an invalid date')
+
+            if pd.isna(date):
+                raise web.HTTPBadRequest(text=f'Bout {bout} has an invalid date')
+            if date <= last_date:
+                raise web.HTTPBadRequest(text=f'Bouts must happen after the last fight on {last_date.date()}')
+            bout['date'] = date
+
+    def __to_records(self, features):
+        """
+        Converts feature vectors to JSON records, NaN becomes null.
+
+        Parameters:
+            features (pd.DataFrame): Features of every bout
+
+        Returns:
+            list: One dict of features per bout
+        """
+
+        return json.loads(features.to_json(orient='records'))
+
+    def __observe(self, name, seconds):
+        self.histograms.setdefault(name, LatencyHistogram()).observe(seconds)
+
+    def __get_mtime(self):
+        try:
+            return os.stat(self.watch_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
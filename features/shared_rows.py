@@ -0,0 +1,346 @@
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from functools import partial
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+# Result kinds of a kernel value, a column is int or bool only when every row returned that kind
+FLOAT, INT, BOOL = 0, 1, 2
+
+class SharedFrame():
+    """
+    Usage:
+        frame = SharedFrame(df)
+        shm, df = attach_frame(frame.spec)
+
+        Copies a dataframe once into one shared memory block so worker processes can rebuild it without pickling the
+        data. Numeric and bool columns are stored as they are, dates as int64 nanoseconds, and categorical and
+        object columns as int codes whose categories travel in the spec. Workers get the columns back with the same
+        values, object columns as categoricals.
+    """
+
+    def __init__(self, df):
+        """
+        Parameters:
+            df (pd.DataFrame): Dataframe to share, with unique column names
+        """
+
+        arrays = [('__index__', 'index', df.index.to_numpy(dtype=np.int64), None)]
+        for col in df.columns:
+            arrays.append(self.__encode_column(col, df[col]))
+
+        offsets = []
+        size = 0
+        for _, _, values, _ in arrays:
+            offsets.append(size)
+            size += -(-values.nbytes // 8) * 8
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 8))
+        self.spec = {'name' : self.shm.name, 'rows' : len(df), 'columns' : []}
+        for (col, kind, values, categories), offset in zip(arrays, offsets):
+            np.ndarray(values.shape, values.dtype, buffer=self.shm.buf, offset=offset)[:] = values
+            self.spec['columns'].append((col, kind, values.dtype.str, offset, categories))
+
+    def close(self):
+        """
+        Frees the shared memory block.
+        """
+
+        self.shm.close()
+        self.shm.unlink()
+
+    def __encode_column(self, col, values):
+        """
+        Converts a column to a numpy array that can live in shared memory.
+
+        Parameters:
+            col (str): Column name
+            values (pd.Series): Column values
+
+        Returns:
+            tuple: The column name, its kind, the array and the categories of coded columns
+        """
+
+        dtype = values.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            return (col, 'category', values.cat.codes.to_numpy().astype(np.int64), values.cat.categories)
+        if pd.api.types.is_datetime64_dtype(dtype):
+            return (col, 'datetime', values.to_numpy(dtype='datetime64[ns]').view(np.int64), None)
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+            return (col, 'numpy', values.to_numpy(), None)
+
+        codes, categories = pd.factorize(values.to_numpy(dtype=object))
+        return (col, 'category', codes.astype(np.int64), pd.Index(categories, dtype=object))
+
+def attach_frame(spec):
+    """
+    Rebuilds a shared dataframe in a worker process. Numeric columns are read-only views of the shared memory.
+
+    Parameters:
+        spec (dict): Spec of a SharedFrame
+
+    Returns:
+        tuple: The attached shared memory block, which must stay referenced while the dataframe is used, and the
+               dataframe
+    """
+
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    n = spec['rows']
+    index = None
+    columns = {}
+    for col, kind, dtype, offset, categories in spec['columns']:
+        values = np.ndarray((n,), np.dtype(dtype), buffer=shm.buf, offset=offset)
+        values.flags.writeable = False
+        if kind == 'index':
+            index = pd.Index(values, copy=False)
+        elif kind == 'category':
+            columns[col] = pd.Categorical.from_codes(values, categories)
+        elif kind == 'datetime':
+            columns[col] = values.view('datetime64[ns]')
+        else:
+            columns[col] = values
+
+    return shm, pd.DataFrame(columns, index=index, copy=False)
+
+class SharedRowExecutor():
+    """
+    Usage:
+        with SharedRowExecutor(max_workers=4) as executor:
+            res = executor.apply(target_df, self.__compute_knockdowns, df, (), {'last_fights' : 3})
+
+        Runs a per-row kernel kernel(history_df, fighter_a_id, fighter_b_id, index, *args, **kwargs) over the rows of a
+        dataframe in a process pool. The history dataframe is placed in shared memory once and reused by every call
+        with the same frame, the rows are split into one contiguous shard per worker and every worker writes its
+        results straight into a shared output array.
+    """
+
+    def __init__(self, max_workers):
+        """
+        Parameters:
+            max_workers (int): Number of worker processes
+        """
+
+        self.max_workers = max_workers
+        self.pool = None
+        self.frames = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Shuts the pool down and frees the shared frames.
+        """
+
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+        for _, frame in self.frames.values():
+            frame.close()
+        self.frames = {}
+
+    def apply(self, rows_df, kernel, history_df, args=(), kwargs=None, progress=None):
+        """
+        Applies a kernel to every row of rows_df, like rows_df.apply with axis=1.
+
+        Parameters:
+            rows_df (pd.DataFrame): Rows to apply the kernel to, with fighter_a_id and fighter_b_id columns
+            kernel (callable): Function or bound method called once per row
+            history_df (pd.DataFrame): Dataframe passed to the kernel
+            args (tuple): Extra positional arguments of the kernel
+            kwargs (dict): Extra keyword arguments of the kernel
+            progress (StageProgress): Progress the rows done by the workers are counted in, None to not count them
+
+        Returns:
+            pd.DataFrame | pd.Series: The results, a dataframe when the kernel returns a pd.Series
+        """
+
+        kwargs = kwargs or {}
+        kernel = picklable_kernel(kernel)
+        rows = list(zip(rows_df['fighter_a_id'].astype(object), rows_df['fighter_b_id'].astype(object), rows_df.index))
+        if progress is not None:
+            progress.start_pass(len(rows))
+        if not rows:
+            return rows_df.apply(lambda row: kernel(history_df, row['fighter_a_id'], row['fighter_b_id'], row.name, *args, **kwargs), axis=1)
+
+        # The first row runs here to find the shape of the results
+        first = kernel(history_df, *rows[0], *args, **kwargs)
+        labels = first.index if isinstance(first, pd.Series) else None
+        width = len(first) if labels is not None else 1
+        if progress is not None:
+            progress.advance()
+
+        bounds = np.linspace(1, len(rows), min(self.max_workers, max(len(rows) - 1, 1)) + 1).astype(int)
+        shards = [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        results = SharedResults(len(rows), width, len(shards))
+        try:
+            results.write(0, first)
+
+            if shards:
+                spec = self.__share(history_df)
+                pending = {self.__get_pool().submit(run_shard, spec, results.names, len(rows), width, len(shards), shard, kernel, rows[start:stop], start, args, kwargs)
+                           for shard, (start, stop) in enumerate(shards)}
+                counted = 0
+                while pending:
+                    done, pending = wait(pending, timeout=0.5, return_when=FIRST_EXCEPTION)
+                    for future in done:
+                        future.result()
+                    if progress is not None:
+                        total = int(results.done.sum())
+                        progress.advance(rows=total - counted)
+                        counted = total
+
+            res = results.values.copy()
+            res_kinds = results.kinds.copy()
+        finally:
+            results.close(unlink=True)
+
+        columns = {}
+        for i in range(width):
+            if (res_kinds[:, i] == BOOL).all():
+                columns[i] = res[:, i].astype(bool)
+            elif (res_kinds[:, i] != FLOAT).all():
+                columns[i] = res[:, i].astype(np.int64)
+            else:
+                columns[i] = res[:, i]
+
+        if labels is None:
+            return pd.Series(columns[0], index=rows_df.index)
+        return pd.DataFrame({label : columns[i] for i, label in enumerate(labels)}, index=rows_df.index)
+
+    def __share(self, df):
+        """
+        Places a dataframe in shared memory, once per frame.
+
+        Parameters:
+            df (pd.DataFrame): The dataframe
+
+        Returns:
+            dict: Spec of the shared frame
+        """
+
+        if id(df) not in self.frames:
+            # Keeps the dataframe referenced so its id is not reused while the frame is shared
+            self.frames[id(df)] = (df, SharedFrame(df))
+        return self.frames[id(df)][1].spec
+
+    def __get_pool(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self.pool
+
+def picklable_kernel(kernel):
+    """
+    Makes a kernel picklable by reference: bound private methods are pickled by their name, which name mangling
+    changes, so they are looked up by their mangled name instead.
+
+    Parameters:
+        kernel (callable): Function or bound method
+
+    Returns:
+        callable: The kernel
+    """
+
+    func = getattr(kernel, '__func__', None)
+    if func is None or not func.__name__.startswith('__') or func.__name__.endswith('__'):
+        return kernel
+
+    class_name = func.__qualname__.split('.')[-2].lstrip('_')
+    return partial(call_method, kernel.__self__, f'_{class_name}{func.__name__}')
+
+def call_method(obj, name, *args, **kwargs):
+    return getattr(obj, name)(*args, **kwargs)
+
+class SharedResults():
+    """
+    Usage:
+        results = SharedResults(n, width, shards)
+        worker_results = SharedResults(n, width, shards, names=results.names)
+
+        Shared output arrays of a sharded apply: the value of every row and result as float64, the kind of every value
+        and the number of rows every shard has done. The creator frees the memory with close(unlink=True).
+    """
+
+    def __init__(self, n, width, shards, names=None):
+        """
+        Parameters:
+            n (int): Number of rows
+            width (int): Number of results per row
+            shards (int): Number of shards
+            names (list): Names of the shared blocks to attach to, None to create them
+        """
+
+        sizes = [n * width * 8, n * width, shards * 8]
+        if names is None:
+            self.blocks = [shared_memory.SharedMemory(create=True, size=max(size, 8)) for size in sizes]
+        else:
+            self.blocks = [shared_memory.SharedMemory(name=name) for name in names]
+
+        self.names = [block.name for block in self.blocks]
+        self.width = width
+        self.values = np.ndarray((n, width), np.float64, buffer=self.blocks[0].buf)
+        self.kinds = np.ndarray((n, width), np.uint8, buffer=self.blocks[1].buf)
+        self.done = np.ndarray((shards,), np.int64, buffer=self.blocks[2].buf)
+
+    def write(self, i, res):
+        """
+        Writes the result of a row.
+
+        Parameters:
+            i (int): Position of the row
+            res: Scalar or pd.Series result of the row
+        """
+
+        row = list(res) if isinstance(res, pd.Series) else [res]
+        if len(row) != self.width:
+            raise ValueError(f'Row kernels must return the same number of values, got {len(row)} instead of {self.width}')
+
+        for j, value in enumerate(row):
+            self.values[i, j] = value
+            self.kinds[i, j] = BOOL if isinstance(value, (bool, np.bool_)) else INT if isinstance(value, (int, np.integer)) else FLOAT
+
+    def close(self, unlink=False):
+        """
+        Detaches from the shared blocks.
+
+        Parameters:
+            unlink (bool): Whether to also free them
+        """
+
+        del self.values, self.kinds, self.done
+        for block in self.blocks:
+            block.close()
+            if unlink:
+                block.unlink()
+
+def run_shard(spec, names, n, width, shards, shard, kernel, rows, start, args, kwargs):
+    """
+    Runs a kernel over a shard of rows in a worker process and writes the results into the shared output arrays.
+
+    Parameters:
+        spec (dict): Spec of the shared history dataframe
+        names (list): Names of the SharedResults blocks
+        n (int): Number of rows of the results
+        width (int): Number of results per row
+        shards (int): Number of shards
+        shard (int): Number of this shard
+        kernel (callable): The kernel
+        rows (list): (fighter_a_id, fighter_b_id, index) of every row of the shard
+        start (int): Position of the first row of the shard in the results
+        args (tuple): Extra positional arguments of the kernel
+        kwargs (dict): Extra keyword arguments of the kernel
+    """
+
+    shm, df = attach_frame(spec)
+    results = SharedResults(n, width, shards, names)
+    try:
+        for i, row in enumerate(rows, start):
+            results.write(i, kernel(df, *row, *args, **kwargs))
+            results.done[shard] += 1
+    finally:
+        results.close()
+        del df
+        shm.close()
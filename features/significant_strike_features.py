@@ -1,9 +1,12 @@
+import numpy as np
 import pandas as pd
-import swifter
+from .keyed_counters import lookup_codes, shared_codes
+from .stat_tensor import FightStatTensor, last_fights_sums, next_fight_sums
 
 class SignificantStrikeFeatures():
-    def _init_(self) -> None:
-        pass
+    def __init__(self) -> None:
+        # Column names of every target, built once since every query reads them
+        self.col_names = {target : self.create_col_names(target) for target in ['distance', 'clinch', 'ground']}
 
     def create_significant_strike_feats(self, df):
         """
@@ -16,373 +19,171 @@ class SignificantStrikeFeatures():
         - pd.Dataframe: The dataframe containing the strikes features for each fighter
         """
 
-        distance_col_names = self.create_col_names('distance')
-        clinch_col_names = self.create_col_names('clinch')
-        ground_col_names = self.create_col_names('ground')
-
         input_df = df.copy()
-        result_features = pd.DataFrame(columns=distance_col_names + clinch_col_names + ground_col_names)
-        result_features[distance_col_names] = input_df.swifter.progress_bar(True).apply(lambda row: self.calculate_strikes(input_df, row['fighter_a_id'], row['fighter_b_id'], row.name, distance_col_names, 'distance'), axis=1)
-        result_features[clinch_col_names] = input_df.swifter.progress_bar(True).apply(lambda row: self.calculate_strikes(input_df, row['fighter_a_id'], row['fighter_b_id'], row.name, clinch_col_names, 'clinch'), axis=1)
-        result_features[ground_col_names] = input_df.swifter.progress_bar(True).apply(lambda row: self.calculate_strikes(input_df, row['fighter_a_id'], row['fighter_b_id'], row.name, ground_col_names, 'ground'), axis=1)
 
-        target_df = pd.concat([input_df, result_features], axis=1)
+        tensor = FightStatTensor.from_df(input_df)
+        fighters = np.column_stack(shared_codes(input_df['fighter_a_id'], input_df['fighter_b_id']))
+        seconds = np.repeat(self.get_period_seconds(input_df)[:, None], 2, axis=1)
+
+        result_features = []
+        for target in ['distance', 'clinch', 'ground']:
+            sums, counts = last_fights_sums(fighters, self.get_strike_values(tensor, seconds, target), [3, 5, None])
+            result_features.append(self.calculate_strikes(sums, counts, target, input_df.index))
 
-        return target_df
+        return pd.concat([input_df] + result_features, axis=1)
 
-    def calculate_strikes(self, df, fighter_a_id, fighter_b_id, index, col_names, target):
+    def get_fighter_states(self, df):
         """
-        Calculates all the strikes features for each fighter in the dataset
+        Sums the strikes of every target of every fighter over their last 3 fights, last 5 fights and all fights,
+        the state after their latest fight
 
         Parameters:
         - df (pd.Dataframe): The original dataframe containing all the fights
-        - fighter_a_id (int): The id of the first fighter
-        - fighter_b_id (int): The id of the second fighter
-        - index (int): The index of the current fight
-        - col_names (list): The list of column names for the strikes features
 
         Returns:
-        - pd.Series: The series containing the strikes features for each fighter
-        """
-
-        res = []
-        for i in range(0, len(col_names), 2):
-            split_a = col_names[i].split('_')
-            stat = split_a[1]
-            round = split_a[2]
-            time_period = split_a[3]
-
-            if time_period == 'l3':
-                last_fights = 3
-            elif time_period == 'l5':
-                last_fights = 5
-            else:
-                last_fights = 0
-
-            if round == 'overall':
-                round_number = 0
-            else:
-                round_number = int(round[1])
-
-            has_diff = 'diff' in stat
-            if stat in f'{target}-strikes-attempted-per-minute-diff':
-                fighter_a_strikes_attempted, fighter_b_strikes_attempted = self.compute_strikes_attempted_per_minute(df, fighter_a_id, fighter_b_id, index, round_number, target, differential=has_diff, last_fights=last_fights)
-                res.append(fighter_a_strikes_attempted)
-                res.append(fighter_b_strikes_attempted)
-            elif stat in f'{target}-strikes-landed-per-minute-diff':
-                fighter_a_strikes_landed, fighter_b_strikes_landed = self.compute_strikes_landed_per_minute(df, fighter_a_id, fighter_b_id, index, round_number, target, differential=has_diff, last_fights=last_fights)
-                res.append(fighter_a_strikes_landed)
-                res.append(fighter_b_strikes_landed)
-            elif stat in f'{target}-strikes-accuracy-percentage-diff':
-                fighter_a_strikes_accuracy_percentage, fighter_b_strikes_accuracy_percentage = self.compute_strikes_accuracy_percentage(df, fighter_a_id, fighter_b_id, index, round_number, target, differential=has_diff, last_fights=last_fights)
-                res.append(fighter_a_strikes_accuracy_percentage)
-                res.append(fighter_b_strikes_accuracy_percentage)
-            elif stat in f'{target}-strikes-absorbed-per-minute-diff':
-                fighter_a_strikes_absorbed_per_minute, fighter_b_strikes_absorbed_per_minute = self.compute_strikes_absorbed_per_minute(df, fighter_a_id, fighter_b_id, index, round_number, target, differential=has_diff, last_fights=last_fights)
-                res.append(fighter_a_strikes_absorbed_per_minute)
-                res.append(fighter_b_strikes_absorbed_per_minute)
-            elif stat in f'{target}-strikes-received-per-minute-diff':
-                fighter_a_strikes_received_per_minute, fighter_b_strikes_received_per_minute = self.compute_strikes_received_per_minute(df, fighter_a_id, fighter_b_id, index, round_number, target, differential=has_diff, last_fights=last_fights)
-                res.append(fighter_a_strikes_received_per_minute)
-                res.append(fighter_b_strikes_received_per_minute)
-            elif stat in f'{target}-strikes-defended-percentage-diff':
-                fighter_a_strikes_defended_percentage, fighter_b_strikes_defended_percentage = self.compute_strikes_defended_percentage(df, fighter_a_id, fighter_b_id, index, round_number, target, differential=has_diff, last_fights=last_fights)
-                res.append(fighter_a_strikes_defended_percentage)
-                res.append(fighter_b_strikes_defended_percentage)
-
-        return pd.Series(res)
-
-    def compute_strikes_attempted_per_minute(self, df, fighter_a_id, fighter_b_id, index, round_number, target, differential=False, last_fights=0):
+        - dict: The fighter IDs and the sums and fight counts of every target
         """
-        Computes the strikes attempted per minute for each fighter in the dataset
 
-        Parameters:
-            df (pd.Dataframe): The original dataframe containing all the fights
-            fighter_a_id (int): The id of the first fighter
-            fighter_b_id (int): The id of the second fighter
-            index (int): The index of the current fight
-            round_number (int): The round number of the current fight
-            differential (bool): Whether to compute the differential or not
-            last_fights (int): The number of last fights to consider
+        tensor = FightStatTensor.from_df(df)
+        fighter_a_codes, fighter_b_codes, fighter_ids = shared_codes(df['fighter_a_id'], df['fighter_b_id'], return_values=True)
+        fighters = np.column_stack([fighter_a_codes, fighter_b_codes])
+        seconds = np.repeat(self.get_period_seconds(df)[:, None], 2, axis=1)
 
-        Returns:
-            (float, float): The strikes attempted per minute for each fighter as a tuple
-        """
-        return self.compute_strikes(df, fighter_a_id, fighter_b_id, index, round_number, last_fights, column_name=f"{target}_shots_attempted", differential=differential, is_defense=False, is_percentage=False)
+        states = {target : next_fight_sums(fighters, self.get_strike_values(tensor, seconds, target), [3, 5, None]) for target in ['distance', 'clinch', 'ground']}
+        states['fighter_ids'] = fighter_ids
+        return states
 
-    def compute_strikes_landed_per_minute(self, df, fighter_a_id, fighter_b_id, index, round_number, target, differential=False, last_fights=0):
+    def create_matchup_feats(self, states, bouts):
         """
-        Computes the strikes landed per minute for each fighter in the dataset
+        Creates the strikes features of upcoming bouts from the states of both fighters
 
         Parameters:
-            df (pd.Dataframe): The original dataframe containing all the fights
-            fighter_a_id (int): The id of the first fighter
-            fighter_b_id (int): The id of the second fighter
-            index (int): The index of the current fight
-            round_number (int): The round number of the current fight
-            differential (bool): Whether to compute the differential or not
-            last_fights (int): The number of last fights to consider
+        - states (dict): The fighter states, from get_fighter_states
+        - bouts (pd.Dataframe): The bouts, with the fighter_a_id and fighter_b_id columns
 
         Returns:
-            (float, float): The strikes landed per minute for each fighter as a tuple
+        - pd.Dataframe: The strikes features of every bout
         """
-        return self.compute_strikes(df, fighter_a_id, fighter_b_id, index, round_number, last_fights, column_name=f"{target}_shots_landed", differential=differential, is_defense=False, is_percentage=False)
 
+        fighter_ids = states['fighter_ids']
+        codes = lookup_codes(fighter_ids, bouts['fighter_a_id'], bouts['fighter_b_id'])
+        return pd.concat([self.calculate_strikes(states[target][0][codes], states[target][1][codes], target, bouts.index) for target in ['distance', 'clinch', 'ground']], axis=1)
 
-    def compute_strikes_accuracy_percentage(self, df, fighter_a_id, fighter_b_id, index, round_number, target, differential=False, last_fights=0):
+    def get_strike_values(self, tensor, seconds, target):
         """
-        Computes the strikes accuracy percentage for each fighter in the dataset
+        Gets the strikes of a target each fighter landed, attempted, absorbed and received in every period, with the
+        seconds counted for the period
 
         Parameters:
-            df (pd.Dataframe): The original dataframe containing all the fights
-            fighter_a_id (int): The id of the first fighter
-            fighter_b_id (int): The id of the second fighter
-            index (int): The index of the current fight
-            round_number (int): The round number of the current fight
-            differential (bool): Whether to compute the differential or not
-            last_fights (int): The number of last fights to consider
+        - tensor (FightStatTensor): The stats of all the fights
+        - seconds (np.ndarray): The seconds counted for every fighter and period, shape (n_fights, 2, 6)
+        - target (str): distance, clinch or ground
 
         Returns:
-            (float, float): The strikes accuracy percentage for each fighter as a tuple
+        - np.ndarray: Int64 array of shape (n_fights, 2, 6, 5)
         """
-        fighter_a_strikes_landed, fighter_b_strikes_landed = self.compute_strikes(df, fighter_a_id, fighter_b_id, index, round_number, last_fights, column_name=f"{target}_shots_landed", differential=differential, is_defense=False, is_percentage=True)
-        fighter_a_strikes_attempted, fighter_b_strikes_attempted = self.compute_strikes(df, fighter_a_id, fighter_b_id, index, round_number, last_fights, column_name=f"{target}_shots_attempted", differential=differential, is_defense=False, is_percentage=True)
-        return self.compute_strikes_percentages(fighter_a_strikes_landed, fighter_a_strikes_attempted, fighter_b_strikes_landed, fighter_b_strikes_attempted, differential=differential)
 
+        landed = tensor.stat(f'{target}_shots_landed')
+        attempted = tensor.stat(f'{target}_shots_attempted')
+        return np.stack([landed, attempted, landed[:, ::-1], attempted[:, ::-1], seconds], axis=-1).astype(np.int64)
 
-    def compute_strikes_absorbed_per_minute(self, df, fighter_a_id, fighter_b_id, index, round_number, target, differential=False, last_fights=0):
+    def calculate_strikes(self, sums, counts, target, index):
         """
-        Computes the strikes absorbed per minute for each fighter in the dataset
+        Calculates all the strikes features of a target from the strikes of each fighter summed over their last 3
+        fights, last 5 fights and all previous fights
 
         Parameters:
-            df (pd.Dataframe): The original dataframe containing all the fights
-            fighter_a_id (int): The id of the first fighter
-            fighter_b_id (int): The id of the second fighter
-            index (int): The index of the current fight
-            round_number (int): The round number of the current fight
-            differential (bool): Whether to compute the differential or not
-            last_fights (int): The number of last fights to consider
+        - sums (np.ndarray): The sums of get_strike_values, shape (n_fights, 2, 3, 6, 5)
+        - counts (np.ndarray): The number of fights summed, shape (n_fights, 2, 3)
+        - target (str): distance, clinch or ground
+        - index (pd.Index): The index of the fights
 
         Returns:
-            (float, float): The strikes absorbed per minute for each fighter as a tuple
+        - pd.Dataframe: The strikes features of the target, in the order of create_col_names
         """
-        return self.compute_strikes(df, fighter_a_id, fighter_b_id, index, round_number, last_fights, column_name=f"{target}_shots_landed", differential=differential, is_defense=True, is_percentage=False)
 
+        # Arrays of shape (n_fights, 2, time period, period), a fighter without previous fights has 0 strikes in 1 minute
+        landed, attempted, absorbed, received, minutes = np.moveaxis(sums.astype(float), -1, 0)
+        minutes = np.where(counts[..., None] > 0, minutes / 60, 1)
+        rates = [self.compute_rate(strikes, minutes) for strikes in [attempted, landed]]
+        percentages = [(landed, attempted)]
+        defense_rates = [self.compute_rate(strikes, minutes) for strikes in [absorbed, received]]
+        defense_percentages = [(absorbed, received)]
 
-    def compute_strikes_received_per_minute(self, df, fighter_a_id, fighter_b_id, index, round_number, target, differential=False, last_fights=0):
-        """
-        Computes the strikes received per minute for each fighter in the dataset
+        stat_values = rates + [self.compute_percentage(hit, taken) for hit, taken in percentages] + \
+                      defense_rates + [self.compute_percentage(hit, taken) for hit, taken in defense_percentages]
 
-        Parameters:
-            df (pd.Dataframe): The original dataframe containing all the fights
-            fighter_a_id (int): The id of the first fighter
-            fighter_b_id (int): The id of the second fighter
-            index (int): The index of the current fight
-            round_number (int): The round number of the current fight
-            differential (bool): Whether to compute the differential or not
-            last_fights (int): The number of last fights to consider
+        # The differentials of the percentages are taken on the differences of the sums before dividing them
+        differentials = [value - value[:, ::-1] for value in rates] + \
+                        [self.compute_percentage_differential(hit, taken) for hit, taken in percentages] + \
+                        [value - value[:, ::-1] for value in defense_rates] + \
+                        [self.compute_percentage_differential(hit, taken) for hit, taken in defense_percentages]
 
-        Returns:
-            (float, float): The strikes received per minute for each fighter as a tuple
-        """
-        return self.compute_strikes(df, fighter_a_id, fighter_b_id, index, round_number, last_fights, column_name=f"{target}_shots_attempted", differential=differential, is_defense=True, is_percentage=False)
+        # Columns are ordered by stat, period, time period and fighter, R1 to R5 then overall as in FightStatTensor.PERIODS
+        features = np.stack(stat_values + differentials, axis=1).transpose(0, 1, 4, 3, 2)
+        return pd.DataFrame(features.reshape(len(index), -1), index=index, columns=self.col_names[target])
 
-    def compute_strikes_defended_percentage(self, df, fighter_a_id, fighter_b_id, index, round_number, target, differential=False, last_fights=0):
+    def compute_rate(self, strikes, minutes):
         """
-        Computes the strikes defended percentage for each fighter in the dataset
+        Computes strikes per minute, 1 where no time was fought
 
         Parameters:
-            df (pd.Dataframe): The original dataframe containing all the fights
-            fighter_a_id (int): The id of the first fighter
-            fighter_b_id (int): The id of the second fighter
-            index (int): The index of the current fight
-            round_number (int): The round number of the current fight
-            differential (bool): Whether to compute the differential or not
-            last_fights (int): The number of last fights to consider
+            strikes (np.ndarray): The summed strikes
+            minutes (np.ndarray): The summed minutes
 
         Returns:
-            (float, float): The strikes defended percentage for each fighter as a tuple
+            (np.ndarray): The strikes per minute
         """
 
-        fighter_a_strikes_absorbed, fighter_b_strikes_absorbed = self.compute_strikes(df, fighter_a_id, fighter_b_id, index, round_number, last_fights, column_name=f"{target}_shots_landed", differential=differential, is_defense=True, is_percentage=True)
-        fighter_a_strikes_received, fighter_b_strikes_received = self.compute_strikes(df, fighter_a_id, fighter_b_id, index, round_number, last_fights, column_name=f"{target}_shots_attempted", differential=differential, is_defense=True, is_percentage=True)
-        return self.compute_strikes_percentages(fighter_a_strikes_absorbed, fighter_a_strikes_received, fighter_b_strikes_absorbed, fighter_b_strikes_received, differential=differential)
+        return np.divide(strikes, minutes, out=np.ones_like(strikes), where=minutes > 0)
 
-    def compute_strikes_percentages(self, fighter_a_strikes_hit, fighter_a_strikes_taken, fighter_b_strikes_hit, fighter_b_strikes_taken, differential=False):
+    def compute_percentage(self, strikes_hit, strikes_taken):
         """
-        Computes the distance strikes percentages for each fighter in the dataset
+        Computes the share of strikes hit, 0 where no strike was taken
 
         Parameters:
-            fighter_a_strikes_hit (float): The number of distance strikes hit by fighter a
-            fighter_a_strikes_taken (float): The number of distance strikes taken by fighter a
-            fighter_b_strikes_hit (float): The number of distance strikes hit by fighter b
-            fighter_b_strikes_taken (float): The number of distance strikes taken by fighter b
-            differential (bool): Whether to compute the differential or not
+            strikes_hit (np.ndarray): The summed strikes hit
+            strikes_taken (np.ndarray): The summed strikes taken
 
         Returns:
-            (float, float): The distance strikes percentages for each fighter as a tuple
+            (np.ndarray): The strikes percentages
         """
 
-        fighter_a_strikes = fighter_a_strikes_hit / fighter_a_strikes_taken if fighter_a_strikes_taken != 0 else 0
-        fighter_b_strikes = fighter_b_strikes_hit / fighter_b_strikes_taken if fighter_b_strikes_taken != 0 else 0
-
-        if differential:
-            return fighter_a_strikes - fighter_b_strikes, fighter_b_strikes - fighter_a_strikes
-        else:
-            return fighter_a_strikes, fighter_b_strikes
+        return np.divide(strikes_hit, strikes_taken, out=np.zeros_like(strikes_hit), where=strikes_taken != 0)
 
-    def compute_strikes_percentages(self, fighter_a_strikes_landed, fighter_a_strikes_attempted, fighter_b_strikes_landed, fighter_b_strikes_attempted, differential=False):
+    def compute_percentage_differential(self, strikes_hit, strikes_taken):
         """
-        Computes the strikes percentages for each fighter in the dataset
+        Computes the percentage differentials from the differences of the summed strikes of both fighters
 
         Parameters:
-            fighter_a_strikes_hit (float): The number of strikes hit by fighter a
-            fighter_a_strikes_taken (float): The number of strikes taken by fighter a
-            fighter_b_strikes_hit (float): The number of strikes hit by fighter b
-            fighter_b_strikes_taken (float): The number of strikes taken by fighter b
-            differential (bool): Whether to compute the differential or not
+            strikes_hit (np.ndarray): The summed strikes hit, shape (n_fights, 2, ...)
+            strikes_taken (np.ndarray): The summed strikes taken, shape (n_fights, 2, ...)
 
         Returns:
-            float, float): The strikes percentages for each fighter as a tuple
+            (np.ndarray): The percentage differentials of both fighters
         """
 
-        fighter_a_strikes = fighter_a_strikes_landed / fighter_a_strikes_attempted if fighter_a_strikes_attempted != 0 else 0
-        fighter_b_strikes = fighter_b_strikes_landed / fighter_b_strikes_attempted if fighter_b_strikes_attempted != 0 else 0
+        percentages = self.compute_percentage(strikes_hit - strikes_hit[:, ::-1], strikes_taken - strikes_taken[:, ::-1])
+        return percentages - percentages[:, ::-1]
 
-        if differential:
-            return fighter_a_strikes - fighter_b_strikes, fighter_b_strikes - fighter_a_strikes
-        else:
-            return fighter_a_strikes, fighter_b_strikes
-
-    def compute_strikes(self, df, fighter_a_id, fighter_b_id, index, round_number, last_fights, column_name, differential=False, is_defense=False, is_percentage=False):
+    def get_period_seconds(self, df):
         """
-        Computes the strikes for each fighter in the dataset based on column_name
+        Computes the seconds counted for every round and overall: the finish time in the finish round and a full
+        round in any other round
 
         Parameters:
             df (pd.Dataframe): The original dataframe containing all the fights
-            fighter_a_id (int): The id of the first fighter
-            fighter_b_id (int): The id of the second fighter
-            index (int): The index of the current fight
-            round_number (int): The round number of the current fight
-            last_fights (int): The number of last fights to consider
-            column_name (string): The name of the column to compute
-            differential (bool): Whether to compute the differential or not
-            is_defense (bool): Whether to compute the defense or not
-            is_percentage (bool): Whether to compute the percentage or not
-
-        Returns:
-            (float, float): The strikes for each fighter as a tuple
-        """
-
-        all_prev_fights = df.loc[:index-1]
-
-        if not all_prev_fights.empty:
-            fighter_a_id_vals = all_prev_fights.fighter_a_id.values
-            fighter_b_id_vals = all_prev_fights.fighter_b_id.values
-
-            fighter_a_fights = all_prev_fights[(fighter_a_id_vals == fighter_a_id) | (fighter_b_id_vals == fighter_a_id)][-last_fights:]
-            fighter_b_fights = all_prev_fights[(fighter_b_id_vals == fighter_b_id) | (fighter_a_id_vals == fighter_b_id)][-last_fights:]
-
-            sum_a, time_a = self.get_fighter_strike_details(fighter_a_fights, fighter_a_id, round_number, f'total_{column_name}' if round_number == 0 else f'round_{round_number}_{column_name}', is_defense)
-            sum_b, time_b = self.get_fighter_strike_details(fighter_b_fights, fighter_b_id, round_number, f'total_{column_name}' if round_number == 0 else f'round_{round_number}_{column_name}', is_defense)
-
-            return self.get_strike_return_values(sum_a, time_a, sum_b, time_b, differential, is_percentage)
-
-        return 0, 0
-
-    def get_strike_return_values(self, sum_a, time_a, sum_b, time_b, differential, is_percentage):
-        """
-        Computes the strikes averages
-
-        Parameters:
-            sum_a (float): The sum of strikes for fighter a
-            sum_b (float): The sum of strikes for fighter b
-            count_a (int): The number of fights for fighter a
-            count_b (int): The number of fights for fighter b
-            differential (bool): Whether to compute the differential or not
-
-        Returns:
-            (float, float): The strikes for each fighter as a tuple
-        """
-
-        fighter_a_strikes = (sum_a / time_a if time_a > 0 else 1) if not is_percentage else sum_a
-        fighter_b_strikes = (sum_b / time_b if time_b > 0 else 1) if not is_percentage else sum_b
-
-        if differential:
-            return fighter_a_strikes - fighter_b_strikes, fighter_b_strikes - fighter_a_strikes
-        else:
-            return fighter_a_strikes, fighter_b_strikes
-
-    def get_fighter_strike_details(self, fighter_past_fights, fighter_id, round_number, column_name, is_defense=False):
-        """
-        Computes the strikes for each fighter in the dataset based on column_name
-
-        Parameters:
-            fighter_past_fights (pd.Dataframe): The dataframe containing all the past fights for the fighter
-            fighter_id (int): The id of the fighter
-            round_number (int): The round number of the current fight
-            column_name (string): The name of the column to compute
-            is_defense (bool): Whether to compute the defense or not
 
         Returns:
-            (float, float) : The strike sum and time sum for each fighter as a tuple
-        """
-
-        if fighter_past_fights.empty:
-            return 0, 1
-
-        fights_as_a = fighter_past_fights[(fighter_past_fights['fighter_a_id'] == fighter_id)]
-        fights_as_b = fighter_past_fights[fighter_past_fights['fighter_b_id'] == fighter_id]
-
-        strike_sum_a, time_sum_a = self.get_strike_detail_sums(round_number, f'fighter_a_{column_name}' if not is_defense else f'fighter_b_{column_name}', fights_as_a)
-        strike_sum_b, time_sum_b = self.get_strike_detail_sums(round_number, f'fighter_b_{column_name}' if not is_defense else f'fighter_a_{column_name}', fights_as_b)
-
-        return strike_sum_a + strike_sum_b, time_sum_a + time_sum_b
-
-    def get_strike_detail_sums(self, round_number, column_name, fights):
+            (np.ndarray): Int64 array of shape (n_fights, 6) in FightStatTensor.PERIODS order
         """
-        Computes the sum from each of the fights for the strikes stats
 
-        Parameters:
-            round_number (int): The round number of the current fight
-            column_name (string): The name of the column to compute
-            fights (pd.Dataframe): The dataframe containing all the past fights for the fighter
-
-        Returns:
-            (float, float): The sum of the strikes stats and the total time
-        """
-
-        strike_sum = 0
-        time_sum = 0
-
-        for _, row in fights.iterrows():
-            if row[column_name] == "":
-                continue
-
-            strike_sum += float(row[column_name])
-            if round_number == 0:
-                time_sum += self.convert_time_to_minutes(row["outcome_time"]) + (int(row["outcome_round"])-1)*5
-            elif row["outcome_round"] is round_number:
-                time_sum += self.convert_time_to_minutes(row["outcome_time"])
-            else:
-                time_sum += 5
-
-        return strike_sum, time_sum
-
-    def convert_time_to_minutes(self, time):
-        """
-        Converts the time from the fights to minutes
-
-        Parameters:
-            time (string): The time from the fights
-
-        Returns:
-            (float): The time in minutes
-        """
+        time = df['outcome_time'].astype(str).str.extract(r'^\s*(\d+):(\d+)\s*$').astype(float).fillna(0)
+        finish = (time[0] * 60 + time[1]).to_numpy(dtype=np.int64)
+        outcome_round = df['outcome_round'].to_numpy(dtype=np.int64)
 
-        minutes, seconds = map(int, time.split(':'))
-        total_minutes = minutes + seconds / 60
-        return total_minutes
+        round_seconds = np.where(outcome_round[:, None] == np.arange(1, 6), finish[:, None], 300)
+        return np.column_stack([round_seconds, (outcome_round - 1) * 300 + finish])
 
     def create_col_names(self, target):
         """
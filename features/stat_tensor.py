@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+
+class FightStatTensor():
+    """
+    Usage:
+        tensor = FightStatTensor.from_df(cleaned_df)
+        tensor.get('a', 'total', 'sig_str_landed')
+        tensor.values[:, :, tensor.period_index('round_1'), tensor.stat_index('td_landed')]
+
+        Holds the per-round count stats of every fight in an int16 array of shape (n_fights, 2, 6, n_stats),
+        indexed by fighter (a, b), period (round_1..round_5, total) and stat. The percentage columns are left
+        out since they are derived from the landed and attempted counts.
+    """
+
+    FIGHTERS = ['a', 'b']
+    PERIODS = ['round_1', 'round_2', 'round_3', 'round_4', 'round_5', 'total']
+    STATS = ['kd', 'sig_str_landed', 'sig_str_attempted', 'total_str_landed', 'total_str_attempted', 'td_landed', 'td_attempted', 'sub_att', 'rev', 'ctrl'] + \
+            [f'{shot}_shots_{acc}' for shot in ['head', 'body', 'leg', 'distance', 'clinch', 'ground'] for acc in ['landed', 'attempted']]
+
+    def __init__(self, values):
+        expected_shape = (len(self.FIGHTERS), len(self.PERIODS), len(self.STATS))
+        if values.ndim != 4 or values.shape[1:] != expected_shape:
+            raise ValueError(f"Expected an array of shape (n_fights, {', '.join(map(str, expected_shape))}), got {values.shape}")
+
+        self.values = values
+        self.__fighter_lookup = {fighter : i for i, fighter in enumerate(self.FIGHTERS)}
+        self.__period_lookup = {period : i for i, period in enumerate(self.PERIODS)}
+        self.__stat_lookup = {stat : i for i, stat in enumerate(self.STATS)}
+
+    def __len__(self):
+        return self.values.shape[0]
+
+    @classmethod
+    def col_names(cls):
+        """
+        Creates the wide column names in tensor order.
+
+        Returns:
+            list: Column names of the form fighter_{fighter}_{period}_{stat}
+        """
+
+        return [f'fighter_{f}_{period}_{stat}' for f in cls.FIGHTERS for period in cls.PERIODS for stat in cls.STATS]
+
+    @classmethod
+    def from_df(cls, df):
+        """
+        Builds the tensor from the wide stat columns of a cleaned fights dataframe.
+
+        Parameters:
+            df (pd.DataFrame): Cleaned fights dataframe
+
+        Returns:
+            FightStatTensor: The stat tensor
+        """
+
+        values = df[cls.col_names()].to_numpy(dtype=np.int16)
+        return cls(values.reshape(len(df), len(cls.FIGHTERS), len(cls.PERIODS), len(cls.STATS)))
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Loads a tensor saved with save(), memory-mapped by default.
+
+        Parameters:
+            path (str): Path to the .npy file
+            mmap_mode (str): Passed to np.load, None reads the whole array into memory
+
+        Returns:
+            FightStatTensor: The stat tensor
+        """
+
+        return cls(np.load(path, mmap_mode=mmap_mode))
+
+    def save(self, path):
+        """
+        Saves the tensor as a .npy file.
+
+        Parameters:
+            path (str): Path to the .npy file
+        """
+
+        np.save(path, np.ascontiguousarray(self.values))
+
+    def to_df(self, index=None):
+        """
+        Converts the tensor back to the wide stat columns.
+
+        Parameters:
+            index (pd.Index): Index of the returned dataframe, defaults to a RangeIndex
+
+        Returns:
+            pd.DataFrame: Dataframe with the columns from col_names()
+        """
+
+        return pd.DataFrame(self.values.reshape(len(self), -1), index=index, columns=self.col_names())
+
+    def fighter_index(self, fighter):
+        return self.__fighter_lookup[fighter]
+
+    def period_index(self, period):
+        return self.__period_lookup[period]
+
+    def stat_index(self, stat):
+        return self.__stat_lookup[stat]
+
+    def get(self, fighter, period, stat):
+        """
+        Gets one stat for every fight.
+
+        Parameters:
+            fighter (str): 'a' or 'b'
+            period (str): 'round_1' to 'round_5' or 'total'
+            stat (str): One of STATS
+
+        Returns:
+            np.ndarray: View of shape (n_fights,)
+        """
+
+        return self.values[:, self.fighter_index(fighter), self.period_index(period), self.stat_index(stat)]
+
+    def stat(self, stat):
+        """
+        Gets one stat for both fighters and every period.
+
+        Parameters:
+            stat (str): One of STATS
+
+        Returns:
+            np.ndarray: View of shape (n_fights, 2, 6)
+        """
+
+        return self.values[:, :, :, self.stat_index(stat)]
+
+def last_fights_sums(fighters, values, windows):
+    """
+    Sums the values of every fighter over their previous fights in row order, the fights the per-fight kernels
+    read from df.loc[:index - 1], in one vectorized pass per window.
+
+    Parameters:
+        fighters (np.ndarray): Array of shape (n_fights, 2) with the codes of fighter a and fighter b
+        values (np.ndarray): Array of shape (n_fights, 2, ...) with the values of each fighter in each fight,
+                             usually a slice of FightStatTensor.values
+        windows (list): Numbers of last fights to sum over, None for all previous fights
+
+    Returns:
+        tuple: Sums of shape (n_fights, 2, len(windows), ...) and the number of fights summed of shape
+               (n_fights, 2, len(windows))
+    """
+
+    fighters = np.asarray(fighters)
+    values = np.asarray(values)
+    n = len(fighters)
+    value_shape = values.shape[2:]
+
+    # One row per fighter and fight, fighter a's rows followed by fighter b's rows, sorted by fighter then fight
+    codes = np.concatenate([fighters[:, 0], fighters[:, 1]])
+    positions = np.tile(np.arange(n), 2)
+    order = np.lexsort((positions, codes))
+    sorted_codes = codes[order]
+
+    rows = np.arange(2 * n)
+    group_firsts = np.searchsorted(sorted_codes, sorted_codes, side='left')
+    flat_values = np.concatenate([values[:, 0], values[:, 1]])[order].reshape(2 * n, -1)
+    cumsum = np.zeros((2 * n + 1, flat_values.shape[1]), dtype=np.result_type(flat_values.dtype, np.int64))
+    np.cumsum(flat_values, axis=0, out=cumsum[1:])
+
+    sums = np.empty((2 * n, len(windows), flat_values.shape[1]), dtype=cumsum.dtype)
+    counts = np.empty((2 * n, len(windows)), dtype=np.int64)
+    for w, window in enumerate(windows):
+        starts = group_firsts if window is None else np.maximum(group_firsts, rows - window)
+        sums[order, w] = cumsum[rows] - cumsum[starts]
+        counts[order, w] = rows - starts
+
+    sums = sums.reshape((2, n, len(windows)) + value_shape)
+    return np.moveaxis(sums, 0, 1), np.moveaxis(counts.reshape(2, n, len(windows)), 0, 1)
+
+def next_fight_sums(fighters, values, windows):
+    """
+    Sums the values of every fighter over their last fights, the sums last_fights_sums gives a fight of the fighter
+    after all the others. This is the state the features of an upcoming bout are read from.
+
+    Parameters:
+        fighters (np.ndarray): Array of shape (n_fights, 2) with the codes of fighter a and fighter b, codes run from
+                               0 to the number of fighters and negative codes are ignored
+        values (np.ndarray): Array of shape (n_fights, 2, ...) with the values of each fighter in each fight
+        windows (list): Numbers of last fights to sum over, None for all fights
+
+    Returns:
+        tuple: Sums of shape (n_codes + 1, len(windows), ...) and the number of fights summed of shape
+               (n_codes + 1, len(windows)), indexed by code with a last row of zeros for the code -1
+    """
+
+    fighters = np.asarray(fighters)
+    values = np.asarray(values)
+    n_codes = int(fighters.max(initial=-1)) + 1
+    value_shape = values.shape[2:]
+
+    # One row per fighter and fight sorted by fighter then fight, as in last_fights_sums
+    codes = np.concatenate([fighters[:, 0], fighters[:, 1]])
+    order = np.lexsort((np.tile(np.arange(len(fighters)), 2), codes))
+    order = order[codes[order] >= 0]
+    sorted_codes = codes[order]
+
+    flat_values = np.concatenate([values[:, 0], values[:, 1]])[order].reshape(len(order), -1)
+    cumsum = np.zeros((len(order) + 1, flat_values.shape[1]), dtype=np.result_type(flat_values.dtype, np.int64))
+    np.cumsum(flat_values, axis=0, out=cumsum[1:])
+
+    fighter_codes = np.unique(sorted_codes)
+    firsts = np.searchsorted(sorted_codes, fighter_codes, side='left')
+    ends = np.searchsorted(sorted_codes, fighter_codes, side='right')
+
+    sums = np.zeros((n_codes + 1, len(windows), flat_values.shape[1]), dtype=cumsum.dtype)
+    counts = np.zeros((n_codes + 1, len(windows)), dtype=np.int64)
+    for w, window in enumerate(windows):
+        starts = firsts if window is None else np.maximum(firsts, ends - window)
+        sums[fighter_codes, w] = cumsum[ends] - cumsum[starts]
+        counts[fighter_codes, w] = ends - starts
+
+    return sums.reshape((n_codes + 1, len(windows)) + value_shape), counts
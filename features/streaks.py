@@ -0,0 +1,109 @@
+from collections import deque
+import numpy as np
+
+class StreakRecords():
+    """
+    Usage:
+        streaks = StreakRecords(window=5)
+        counts = streaks.sweep(fighters, winners, order)
+        next_streaks = streaks.get_streaks(fighter)
+
+        Keeps each fighter's results as a run-length encoding, the current run, the longest win and loss runs so far
+        and the runs covering the last window fights. Every fight reads the pre-fight streaks of both fighters
+        before appending its result, so a sweep is a single pass over the fights.
+    """
+
+    def __init__(self, window=5):
+        self.window = window
+        self.current = {}
+        self.longest = {}
+        self.runs = {}
+
+    def sweep(self, fighters, winners, order=None):
+        """
+        Sweeps the fights and returns the pre-fight streaks of both fighters.
+
+        Parameters:
+            fighters (np.ndarray): Array of shape (n_fights, 2) with the codes of fighter a and fighter b
+            winners (np.ndarray): Array of shape (n_fights,) with the code of the winner
+            order (np.ndarray): Order to sweep the fights in, defaults to the row order
+
+        Returns:
+            np.ndarray: Int64 array of shape (n_fights, 2, 3, 2) with the (wins, losses) streaks of each fighter for
+                        the current streak, the longest streak in the last window fights and the longest streak ever
+        """
+
+        n = len(fighters)
+        order = range(n) if order is None else np.asarray(order).tolist()
+        fighter_list = np.asarray(fighters).tolist()
+        winner_list = np.asarray(winners).tolist()
+
+        res = [None] * n
+        for i in order:
+            row = []
+            for fighter in fighter_list[i]:
+                row += self.get_streaks(fighter)
+            res[i] = row
+
+            for fighter in fighter_list[i]:
+                self.__add_result(fighter, winner_list[i] == fighter)
+
+        return np.array(res, dtype=np.int64).reshape(n, 2, 3, 2)
+
+    def get_streaks(self, fighter):
+        """
+        Reads the streaks of a fighter, the streaks before their next fight after a sweep.
+
+        Parameters:
+            fighter (int): Code of the fighter
+
+        Returns:
+            list: Current, last window and longest (wins, losses) streaks, flattened
+        """
+
+        runs = self.runs.get(fighter)
+        if not runs:
+            return [0, 0, 0, 0, 0, 0]
+
+        won, length = self.current[fighter]
+        window_longest = [0, 0]
+        for run_won, run_length in runs:
+            outcome = 0 if run_won else 1
+            window_longest[outcome] = max(window_longest[outcome], run_length)
+
+        return [length if won else 0, 0 if won else length] + window_longest + self.longest[fighter]
+
+    def __add_result(self, fighter, won):
+        """
+        Appends a result to the run-length encoding of a fighter.
+
+        Parameters:
+            fighter (int): Code of the fighter
+            won (bool): Whether the fighter won, anything else counts as a loss
+        """
+
+        runs = self.runs.setdefault(fighter, deque())
+        longest = self.longest.setdefault(fighter, [0, 0])
+        current = self.current.get(fighter)
+
+        if current is not None and current[0] == won:
+            current[1] += 1
+        else:
+            current = self.current[fighter] = [won, 1]
+
+        if runs and runs[-1][0] == won:
+            runs[-1][1] += 1
+        else:
+            runs.append([won, 1])
+
+        outcome = 0 if won else 1
+        longest[outcome] = max(longest[outcome], current[1])
+
+        # Only keep the runs covering the last window fights
+        excess = sum(length for _, length in runs) - self.window
+        while excess > 0:
+            dropped = min(excess, runs[0][1])
+            runs[0][1] -= dropped
+            excess -= dropped
+            if runs[0][1] == 0:
+                runs.popleft()
@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+from .keyed_counters import lookup_codes, shared_codes
+from .prior_sums import prior_sums
+
+class StrengthOfSchedule():
+    """
+    Usage:
+        df = StrengthOfSchedule().create_strength_of_schedule_feats(elo_df)
+
+        Creates strength-of-schedule features from the pre-fight Glicko ratings emitted by Elo: the mean rating of
+        past opponents, the mean rating of the opponents beaten and the combined record of past opponents.
+    """
+
+    def __init__(self):
+        pass
+
+    def create_strength_of_schedule_feats(self, df):
+        """
+        Creates the strength-of-schedule features for each fighter in the dataset
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights with the fighter_{a,b}_elo_rating columns
+
+        Returns:
+            pd.DataFrame: DataFrame with the strength-of-schedule features appended
+        """
+
+        target_df = df.copy()
+        n = len(target_df)
+
+        fighter_a_codes, fighter_b_codes, winner_codes = shared_codes(target_df['fighter_a_id'], target_df['fighter_b_id'], target_df['winner_id'])
+        dates = pd.to_datetime(target_df['date']).to_numpy()
+
+        # One row per fighter and fight: fighter a's rows followed by fighter b's rows
+        fighters = np.concatenate([fighter_a_codes, fighter_b_codes])
+        opponents = np.concatenate([fighter_b_codes, fighter_a_codes])
+        won = (fighters == np.concatenate([winner_codes, winner_codes])).astype(float)
+        opponent_ratings = np.concatenate([target_df['fighter_b_elo_rating'].to_numpy(dtype=float), target_df['fighter_a_elo_rating'].to_numpy(dtype=float)])
+        row_dates = np.concatenate([dates, dates])
+
+        rating_sums = prior_sums(fighters, row_dates, np.column_stack([opponent_ratings, won * opponent_ratings, won, np.ones(2 * n)]), row_order=np.tile(np.arange(n), 2))
+
+        # Dense date ranks, so opponents' records only count fights strictly before the fight date
+        date_ranks = np.unique(dates, return_inverse=True)[1].astype(np.int64)
+        opponent_wins, opponent_fights = self.__get_opponents_records(fighters, opponents, won.astype(bool), np.concatenate([date_ranks, date_ranks]))
+
+        return pd.concat([target_df, self.__create_feats(rating_sums, opponent_wins, opponent_fights, target_df.index)], axis=1)
+
+    def get_fighter_states(self, df):
+        """
+        Sums the past opponents' ratings and records of every fighter after their latest fight.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights with the fighter_{a,b}_elo_rating columns
+
+        Returns:
+            tuple: The fighter IDs and an array of shape (n_fighters + 1, 6) with the summed opponent ratings, the
+                   summed ratings of the opponents beaten, the wins, the fights and the opponents' combined wins and
+                   fights of every fighter, the last row is a fighter without fights
+        """
+
+        n = len(df)
+        fighter_a_codes, fighter_b_codes, winner_codes, fighter_ids = shared_codes(df['fighter_a_id'], df['fighter_b_id'], df['winner_id'], return_values=True)
+        dates = pd.to_datetime(df['date']).to_numpy()
+
+        fighters = np.concatenate([fighter_a_codes, fighter_b_codes])
+        opponents = np.concatenate([fighter_b_codes, fighter_a_codes])
+        won = (fighters == np.concatenate([winner_codes, winner_codes])).astype(float)
+        opponent_ratings = np.concatenate([df['fighter_b_elo_rating'].to_numpy(dtype=float), df['fighter_a_elo_rating'].to_numpy(dtype=float)])
+        values = np.column_stack([opponent_ratings, won * opponent_ratings, won, np.ones(2 * n)])
+
+        # Summed in the order prior_sums sums them: by date, then by fight
+        order = np.lexsort((np.tile(np.arange(n), 2), np.concatenate([dates, dates]), fighters))
+        order = order[fighters[order] >= 0]
+        states = np.zeros((len(fighter_ids) + 1, 6))
+        np.add.at(states[:, :4], fighters[order], values[order])
+
+        # Every past opponent's record now covers all of their fights, the last row counts nothing
+        wins = np.bincount(fighters[order][won[order] > 0], minlength=len(fighter_ids) + 1)
+        fights = np.bincount(fighters[order], minlength=len(fighter_ids) + 1)
+        states[:, 4] = np.bincount(fighters[order], weights=wins[opponents[order]], minlength=len(fighter_ids) + 1)
+        states[:, 5] = np.bincount(fighters[order], weights=fights[opponents[order]], minlength=len(fighter_ids) + 1)
+        return fighter_ids, states
+
+    def create_matchup_feats(self, states, bouts):
+        """
+        Creates the strength-of-schedule features of upcoming bouts from the states of both fighters.
+
+        Parameters:
+            states (tuple): The fighter IDs and their states, from get_fighter_states
+            bouts (pd.DataFrame): The bouts, with the fighter_a_id and fighter_b_id columns
+
+        Returns:
+            pd.DataFrame: The strength-of-schedule features of every bout
+        """
+
+        fighter_ids, fighter_states = states
+        bout_states = fighter_states[lookup_codes(fighter_ids, bouts['fighter_a_id'], bouts['fighter_b_id']).T.ravel()]
+        return self.__create_feats(bout_states[:, :4], bout_states[:, 4], bout_states[:, 5], bouts.index)
+
+    def __create_feats(self, rating_sums, opponent_wins, opponent_fights, index):
+        """
+        Creates the strength-of-schedule features from the sums of both fighters.
+
+        Parameters:
+            rating_sums (np.ndarray): Array of shape (2 * n_fights, 4) with the summed opponent ratings, the summed
+                                      ratings of the opponents beaten, the wins and the fights, fighter a's rows
+                                      followed by fighter b's rows
+            opponent_wins (np.ndarray): The opponents' combined wins of every row
+            opponent_fights (np.ndarray): The opponents' combined fights of every row
+            index (pd.Index): The index of the fights
+
+        Returns:
+            pd.DataFrame: The strength-of-schedule features
+        """
+
+        n = len(index)
+        opponent_rating, beaten_rating_sum, wins, fights = rating_sums.T
+
+        stats = {
+            'sos_opp_rating_mean' : self.__safe_divide(opponent_rating, fights),
+            'sos_beaten_opp_rating_mean' : self.__safe_divide(beaten_rating_sum, wins),
+            'sos_opp_wins' : opponent_wins,
+            'sos_opp_losses' : opponent_fights - opponent_wins,
+            'sos_opp_win_pct' : self.__safe_divide(opponent_wins, opponent_fights)
+        }
+
+        result_features = {}
+        for side, fighter in enumerate(['fighter_a', 'fighter_b']):
+            for stat, values in stats.items():
+                result_features[f'{fighter}_{stat}'] = values[side * n:(side + 1) * n]
+        for stat in ['sos_opp_rating_mean', 'sos_beaten_opp_rating_mean', 'sos_opp_win_pct']:
+            result_features[f'fighter_a_{stat}_diff'] = result_features[f'fighter_a_{stat}'] - result_features[f'fighter_b_{stat}']
+            result_features[f'fighter_b_{stat}_diff'] = -result_features[f'fighter_a_{stat}_diff']
+
+        return pd.DataFrame(result_features, index=index)
+
+    def __get_opponents_records(self, fighters, opponents, won, date_ranks):
+        """
+        Sums the records of every past opponent of a fighter as they stand going into the current fight.
+        Every (fight, past fight of the same fighter) pair is an entry of the sparse two-hop product between the
+        fighter x fight incidence and the opponents' running records, built as flat index arrays.
+
+        Parameters:
+            fighters (np.ndarray): Fighter code of every row
+            opponents (np.ndarray): Opponent code of every row
+            won (np.ndarray): Whether the fighter of the row won
+            date_ranks (np.ndarray): Dense rank of the row's fight date
+
+        Returns:
+            tuple: The opponents' combined wins and combined fights of every row
+        """
+
+        m = len(fighters)
+        stride = date_ranks.max(initial=0) + 1
+
+        # Rows sorted by fighter and date, each row is paired with the rows of the same fighter on earlier dates
+        order = np.lexsort((date_ranks, fighters))
+        keys = (fighters * stride + date_ranks)[order]
+        group_starts = np.searchsorted(keys, fighters[order] * stride, side='left')
+        counts = np.searchsorted(keys, keys, side='left') - group_starts
+
+        queries = np.repeat(np.arange(m), counts)
+        past = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(group_starts, counts)
+        query_rows, past_rows = order[queries], order[past]
+
+        # Running records from the sorted (fighter, date) keys: fights and wins of a fighter before a date
+        win_keys = np.sort(fighters[won] * stride + date_ranks[won])
+        pair_opponents = opponents[past_rows]
+        lookup = pair_opponents * stride + date_ranks[query_rows]
+        pair_fights = np.searchsorted(keys, lookup) - np.searchsorted(keys, pair_opponents * stride)
+        pair_wins = np.searchsorted(win_keys, lookup) - np.searchsorted(win_keys, pair_opponents * stride)
+
+        opponent_wins = np.bincount(query_rows, weights=pair_wins, minlength=m)
+        opponent_fights = np.bincount(query_rows, weights=pair_fights, minlength=m)
+        return opponent_wins, opponent_fights
+
+    def __safe_divide(self, numerator, denominator):
+        """
+        Divides element-wise, returning 0 where the denominator is 0.
+
+        Parameters:
+            numerator (np.ndarray): Numerators
+            denominator (np.ndarray): Denominators
+
+        Returns:
+            np.ndarray: The quotients
+        """
+
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator, dtype=float), where=denominator > 0)
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
-import swifter
+from .keyed_counters import lookup_codes
+from .row_apply import apply_rows
 
 class TapedStats:
     def __init__(self):
@@ -24,7 +26,7 @@ class TapedStats:
         # Copy the input dataframe and calculate significant strike features
         input_df = df.copy()
         result_features = pd.DataFrame(columns=col_names)
-        result_features[col_names] = input_df.swifter.progress_bar(True).apply(lambda row: self.calculate_taped_stats(input_df, static_stats_df, row['fighter_a_id'], row['fighter_b_id'], row.name), axis=1)
+        result_features[col_names] = apply_rows(input_df, lambda row: self.calculate_taped_stats(input_df, static_stats_df, row['fighter_a_id'], row['fighter_b_id'], row.name), True)
 
         # Combine the input dataframe with the calculated features
         result_df = pd.concat([input_df, result_features], axis=1)
@@ -33,6 +35,68 @@ class TapedStats:
 
         return result_df
 
+    def get_fighter_states(self, df, static_stats_df):
+        """
+        Reads the height, reach and date of birth of every fighter and sums their fight time and fights, the state after
+        their latest fight.
+
+        Args:
+            df (pd.DataFrame): The original dataframe containing fight data.
+            static_stats_df (pd.DataFrame): The dataframe containing static fighter statistics.
+
+        Returns:
+            pd.DataFrame: The height and reach in centimeters, the date of birth, the total fight time in seconds and the
+                          number of fights of every fighter, indexed by ID.
+        """
+
+        profiles = static_stats_df.drop_duplicates('ID').set_index('ID')
+        states = pd.DataFrame({
+            'height' : [self.convert_to_cm(height, 'height') for height in profiles['Height']],
+            'reach' : [self.convert_to_cm(reach, 'reach') for reach in profiles['Reach']],
+            'dob' : [pd.NaT if dob == '--' else pd.to_datetime(dob) for dob in profiles['DOB']]
+        }, index=profiles.index.astype(object))
+
+        fight_times = (df['outcome_round'] - 1) * 60 + df['outcome_time'].apply(lambda x: self.convert_time_to_seconds(x))
+        fighter_ids = pd.concat([df['fighter_a_id'], df['fighter_b_id']]).astype(object).to_numpy()
+        totals = pd.concat([fight_times, fight_times]).groupby(fighter_ids).agg(['sum', 'count'])
+
+        states['total_time'] = totals['sum'].reindex(states.index, fill_value=0).to_numpy()
+        states['fights'] = totals['count'].reindex(states.index, fill_value=0).to_numpy()
+        return states
+
+    def create_matchup_feats(self, states, bouts):
+        """
+        Creates the taped stats features of upcoming bouts and their differentials.
+
+        Args:
+            states (pd.DataFrame): The fighter states, from get_fighter_states.
+            bouts (pd.DataFrame): The bouts, with the fighter_a_id, fighter_b_id and date columns.
+
+        Returns:
+            pd.DataFrame: The taped stats features of every bout.
+        """
+
+        codes = lookup_codes(states.index, bouts['fighter_a_id'], bouts['fighter_b_id'])
+        if (codes < 0).any():
+            raise KeyError(f'Fighters without static stats: {list(bouts[["fighter_a_id", "fighter_b_id"]].to_numpy()[codes < 0])}')
+
+        fights = states['fights'].to_numpy()[codes]
+        ave_fight_times = np.divide(states['total_time'].to_numpy(dtype=float)[codes], fights, out=np.zeros(codes.shape), where=fights > 0)
+        dobs = states['dob'].to_numpy()
+
+        features = {}
+        for side, fighter in enumerate(['fighter-a', 'fighter-b']):
+            features[f'{fighter}_height'] = states['height'].to_numpy()[codes[:, side]]
+            features[f'{fighter}_reach'] = states['reach'].to_numpy()[codes[:, side]]
+            features[f'{fighter}_age'] = np.array([self.get_age_on(dob, fight_date) for dob, fight_date in zip(pd.DatetimeIndex(dobs[codes[:, side]]), bouts['date'])], dtype=float)
+            features[f'{fighter}_avg-fight-time'] = ave_fight_times[:, side]
+
+        for stat in ['height', 'reach', 'age']:
+            features[f'fighter-a_{stat}-diff'] = features[f'fighter-a_{stat}'] - features[f'fighter-b_{stat}']
+            features[f'fighter-b_{stat}-diff'] = -features[f'fighter-a_{stat}-diff']
+
+        return pd.DataFrame(features, index=bouts.index)
+
     def calculate_taped_stats_differentials(self, df):
         """
         Calculates the differential of taped stats (height, reach, age) between two fighters.
@@ -47,16 +111,12 @@ class TapedStats:
         input_df = df.copy()
 
         # Calculate differentials for height, reach, and age
-        input_df['fighter-a_height-diff'] = input_df['fighter-a_height'] - input_df['fighter-b_height']
-        input_df['fighter-b_height-diff'] = -input_df['fighter-a_height-diff']
-
-        input_df['fighter-a_reach-diff'] = input_df['fighter-a_reach'] - input_df['fighter-b_reach']
-        input_df['fighter-b_reach-diff'] = -input_df['fighter-a_reach-diff']
+        differentials = {}
+        for stat in ['height', 'reach', 'age']:
+            differentials[f'fighter-a_{stat}-diff'] = input_df[f'fighter-a_{stat}'] - input_df[f'fighter-b_{stat}']
+            differentials[f'fighter-b_{stat}-diff'] = -differentials[f'fighter-a_{stat}-diff']
 
-        input_df['fighter-a_age-diff'] = input_df['fighter-a_age'] - input_df['fighter-b_age']
-        input_df['fighter-b_age-diff'] = -input_df['fighter-a_age-diff']
-
-        return input_df
+        return pd.concat([input_df, pd.DataFrame(differentials, index=input_df.index)], axis=1)
 
     def calculate_taped_stats(self, df, static_stats_df, fighter_a_id, fighter_b_id, index):
         res = []
@@ -67,6 +127,29 @@ class TapedStats:
         return pd.Series(res)
 
     def get_taped_stats(self, df: pd.DataFrame, static_stats_df: pd.DataFrame, fighter_id: pd.DataFrame, index):
+        # Retrieve the date of the fight from the df DataFrame
+        fight_date = df.loc[index, 'date']  # Assuming 'date' column exists and represents the fight date
+
+        res = self.get_static_stats(static_stats_df, fighter_id, fight_date)
+
+        # Append the average fight time
+        res.append(self.get_ave_fight_time(df, fighter_id, index))
+
+        return res
+
+    def get_static_stats(self, static_stats_df, fighter_id, fight_date):
+        """
+        Gets the height, reach and age of a fighter on the date of a fight.
+
+        Args:
+            static_stats_df (pd.DataFrame): The dataframe containing static fighter statistics.
+            fighter_id (str): The ID of the fighter.
+            fight_date (datetime): The date of the fight.
+
+        Returns:
+            list: The height and reach in centimeters and the age.
+        """
+
         res = []
 
         # Retrieve the fighter's stats
@@ -74,9 +157,6 @@ class TapedStats:
         fighter_stats = fighter_stats.iloc[0]
         fighter_stats = fighter_stats[['Height', 'Reach', 'DOB']]
 
-        # Retrieve the date of the fight from the df DataFrame
-        fight_date = df.loc[index, 'date']  # Assuming 'date' column exists and represents the fight date
-
         for i in range(3):
             if i == 0:
                 res.append(self.convert_to_cm(fighter_stats[i], 'height'))
@@ -85,9 +165,6 @@ class TapedStats:
             elif i == 2:
                 res.append(self.get_age(fighter_stats[i], fight_date))  # Pass fight_date to get_age
 
-        # Append the average fight time
-        res.append(self.get_ave_fight_time(df, fighter_id, index))
-
         return res
 
     def get_ave_fight_time(self, df, fighter_id, index):
@@ -182,12 +259,23 @@ class TapedStats:
         if dob_str == "--":
             return 0
 
-        dob = pd.to_datetime(dob_str)
-        fight_date = pd.to_datetime(fight_date)
+        return self.get_age_on(pd.to_datetime(dob_str), pd.to_datetime(fight_date))
 
-        age = fight_date.year - dob.year - ((fight_date.month, fight_date.day) < (dob.month, dob.day))
+    def get_age_on(self, dob, fight_date):
+        """
+        Calculates the age of the fighter on the date of the fight.
+
+        Args:
+            dob (pd.Timestamp): The date of birth of the fighter, NaT when unknown.
+            fight_date (pd.Timestamp): The date of the fight.
+
+        Returns:
+            int: The age of the fighter at the time of the fight, 0 when the date of birth is unknown.
+        """
+        if pd.isna(dob):
+            return 0
 
-        return age
+        return fight_date.year - dob.year - ((fight_date.month, fight_date.day) < (dob.month, dob.day))
 
 
     def convert_to_cm(self, input_str, measurement_type):
@@ -1,590 +1,700 @@
 import pandas as pd
 import numpy as np
-import swifter
+from .keyed_counters import KeyedCounters, lookup_codes, shared_codes
+from .opponent_graph import OpponentGraph
+from .order_statistics import ElevationRecords
+from .outcome_cube import OutcomeCube
+from .prior_sums import DatedSums, prior_sums
+from .streaks import StreakRecords
 
 class WinLossStats:
     def __init__(self) -> None:
-        pass
-
-    def create_win_loss_stat_features(self, df):
-        df = self.create_h2h_feats(df)
-        df = self.create_win_loss_location_feats(df)
+        self.keyed_record_suffixes = {
+            'location' : 'in_location',
+            'referee' : 'with_referee',
+            'stance' : 'vs_stance'
+        }
+
+        # Cube indices of the methods and divisions of the win/loss features, the last index of each is the total
+        self.win_loss_methods = {
+            'KO/TKO' : 0,
+            'TKO - Doctor\'s Stoppage' : 0,
+            'Submission' : 1,
+            'Decision - Unanimous' : 2,
+            'Decision - Split' : 2,
+            'Decision - Majority' : 2
+        }
+        self.win_loss_divisions = {
+            'Flyweight' : 0,
+            'Bantamweight' : 1,
+            'Featherweight' : 2,
+            'Lightweight' : 3,
+            'Welterweight' : 4,
+            'Middleweight' : 5,
+            'Light Heavyweight' : 6,
+            'Heavyweight' : 7,
+            'Catchweight' : 8
+        }
+
+        # Column names of the round and win/loss features, built once since every query reads them
+        self.col_names_win_loss_round = self.__create_col_names_win_loss_round()
+        self.col_names_win_loss = self.__create_col_names_win_loss()
+
+    def create_win_loss_stat_features(self, df, fighter_df=None):
+        df = self.create_keyed_record_feats(df, fighter_df)
         df = self.create_win_loss_round_feats(df)
         df = self.create_win_loss_feats(df)
         df = self.create_win_loss_elevation_feats(df)
+        df = self.create_streak_feats(df)
+        df = self.create_common_opponent_feats(df)
         return df
 
-    """
-    Creates the head to head features for each fighter in the dataset
+    def get_fighter_states(self, df, fighter_df=None):
+        """
+        Sweeps the fights once per record and keeps the records of every fighter after their latest fight.
 
-    Usage:
-        df = HeadToHead().create_h2h_feats(df)
-    """
-    def create_h2h_feats(self, df):
-        target_df = df.copy()
-        col_names = ['fighter_a_h2h_wins', 'fighter_b_h2h_wins']
-        result_features = pd.DataFrame(columns=col_names)
+        Args:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+            fighter_df (pd.DataFrame): DataFrame containing all the fighters, the opponent stance records are only kept
+                                       when it is given
+
+        Returns:
+            dict: The fighter IDs, the keyed records and the value of their keys, the stance key of every fighter, and
+                  the round, outcome, elevation, streak and common opponent records
+        """
 
-        result_features[col_names] = target_df.swifter.progress_bar(True).apply(lambda row: self.__compute_h2h(target_df, row['fighter_a_id'], row['fighter_b_id'], row.name), axis=1)
+        records = ['h2h', 'location', 'referee'] + (['stance'] if fighter_df is not None else [])
+        keyed_counters, key_values = self.__sweep_keyed_records(df, records, fighter_df)[1:]
+        fighters, dates, indicators = self.__get_round_indicators(df)
 
-        result_df = pd.concat([target_df, result_features], axis=1)
-        return result_df
+        return {
+            'fighter_ids' : shared_codes(df['fighter_a_id'], df['fighter_b_id'], df['winner_id'], return_values=True)[-1],
+            'records' : records,
+            'key_values' : key_values,
+            'stances' : self.__get_fighter_stance_keys(fighter_df, key_values['stance']) if fighter_df is not None else None,
+            'keyed' : keyed_counters,
+            'rounds' : DatedSums(fighters, dates, indicators),
+            'outcomes' : self.__sweep_outcomes(df)[2],
+            'elevations' : self.__sweep_elevations(df)[1],
+            'streaks' : self.__sweep_streaks(df)[1],
+            'opponents' : self.__sweep_opponents(df)[1]
+        }
 
-    def create_win_loss_location_feats(self, df, include_progress=False):
+    def create_matchup_feats(self, states, bouts):
         """
-        Creates the win/loss location features for each fighter in the dataset
+        Creates the win/loss features of upcoming bouts from the records of both fighters.
 
-        Parameters:
-            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+        Args:
+            states (dict): The fighter states, from get_fighter_states
+            bouts (pd.DataFrame): The bouts, with the fighter_a_id, fighter_b_id, date, location and elevation columns
 
         Returns:
-            pd.DataFrame: DataFrame containing the win/loss location features for each fighter in the dataset
+            pd.DataFrame: The win/loss features of every bout
         """
 
-        col_names = ['fighter_a_wins_in_location', 'fighter_a_losses_in_location', \
-                    'fighter_b_wins_in_location', 'fighter_b_losses_in_location']
+        n = len(bouts)
+        fighter_ids = states['fighter_ids']
+        # Fighters without fights get a code no fight has, so every record reads them empty
+        codes = lookup_codes(fighter_ids, bouts['fighter_a_id'], bouts['fighter_b_id'])
+        codes[codes < 0] = len(fighter_ids)
+        year_ago = (pd.DatetimeIndex(bouts['date']) - pd.DateOffset(years=1)).to_numpy()
+        elevations = bouts['elevation'].to_numpy(dtype=float)
+        code_list = codes.tolist()
 
-        target_df = df.copy()
-        result_features = pd.DataFrame(columns=col_names)
+        keyed = {}
+        for record in states['records']:
+            keys = self.__get_matchup_keys(states, record, bouts, codes).tolist()
+            keyed[record] = np.array([[states['keyed'].read(record, fighter, key) for fighter, key in zip(code_list[i], keys[i])] for i in range(n)],
+                                     dtype=np.int64).reshape(n, 2, 2)
 
-        result_features[col_names] = target_df.swifter.progress_bar(include_progress).apply(lambda row: self.__compute_win_loss_location(df, row['fighter_a_id'], row['fighter_b_id'], row['location'], row.name), axis=1)
+        round_codes = np.concatenate([codes[:, 0], codes[:, 1]])
+        round_all_time = states['rounds'].read(round_codes)
+        round_last_year = states['rounds'].read(round_codes, np.tile(year_ago, 2))
 
-        return pd.concat([target_df, result_features], axis=1)
+        cubes = [[states['outcomes'].read(fighter, year_ago[i]) for fighter in code_list[i]] for i in range(n)]
+        outcome_all_time = np.array([[cube[0] for cube in row] for row in cubes], dtype=np.int64).reshape(n, 2, -1)
+        outcome_last_year = np.array([[cube[1] for cube in row] for row in cubes], dtype=np.int64).reshape(n, 2, -1)
 
-    def create_win_loss_round_feats(self, df):
+        elevation_counts = np.array([[states['elevations'].read(fighter, elevations[i]) for fighter in code_list[i]] for i in range(n)], dtype=np.int64).reshape(n, 2, 6)
+        streaks = np.array([[states['streaks'].get_streaks(fighter) for fighter in code_list[i]] for i in range(n)], dtype=np.int64).reshape(n, 2, 3, 2)
+        opponent_counts = np.array([[states['opponents'].read_counts(a, b), states['opponents'].read_counts(b, a)] for a, b in code_list], dtype=np.int64).reshape(n, 2, 5)
+
+        return pd.concat([
+            self.__create_keyed_cols(keyed, states['records'], bouts.index),
+            self.__create_round_cols(round_all_time, round_last_year, bouts.index),
+            self.__create_outcome_cols(outcome_all_time, outcome_last_year, bouts.index),
+            self.__create_elevation_cols(elevation_counts, bouts.index),
+            self.__create_streak_cols(streaks, bouts.index),
+            self.__create_common_opponent_cols(opponent_counts, bouts.index)
+        ], axis=1)
+
+    def __get_matchup_keys(self, states, record, bouts, codes):
         """
-        Creates a dataframe with added features for significant strikes and their differentials.
+        Looks up the key codes of a keyed record for the fighters of upcoming bouts.
 
         Args:
-            df (pd.DataFrame): The original dataframe containing fight data.
+            states (dict): The fighter states, from get_fighter_states
+            record (str): Name of the record
+            bouts (pd.DataFrame): The bouts
+            codes (np.ndarray): Array of shape (n_bouts, 2) with the codes of fighter a and fighter b
 
         Returns:
-            pd.DataFrame: A dataframe with additional columns for significant strike features and differentials.
+            np.ndarray: Array of shape (n_bouts, 2) with the key of each fighter, -1 when unknown
         """
 
-        # Generate column names for significant strikes and differentials
-        col_names = self.__create_col_names_win_loss_round()
+        key_values = states['key_values'].get(record)
+        if record == 'h2h':
+            return codes[:, ::-1]
+        if record == 'stance':
+            stances = states['stances']
+            fighters = np.concatenate([bouts['fighter_b_id'].to_numpy(dtype=object), bouts['fighter_a_id'].to_numpy(dtype=object)])
+            # Each fighter's record is keyed by the stance of their opponent, an unknown fighter reads the appended -1
+            return np.append(stances.to_numpy(), -1)[stances.index.get_indexer(fighters)].reshape(2, -1).T
+        if record == 'referee':
+            # The referee of an upcoming bout isn't known yet
+            return np.full((len(bouts), 2), -1)
 
-        df['date'] = pd.to_datetime(df['date'])
+        location_codes = key_values.get_indexer(bouts[record].to_numpy(dtype=object))
+        return np.column_stack([location_codes, location_codes])
 
-        # Copy the input dataframe and calculate significant strike features
-        input_df = df.copy()
-        result_features = pd.DataFrame(columns=col_names)
-        result_features[col_names] = input_df.swifter.progress_bar(True).apply(lambda row: self.__calculate_win_loss_round(input_df, row['fighter_a_id'], row['fighter_b_id'], row.name, col_names), axis=1)
+    def create_keyed_record_feats(self, df, fighter_df=None):
+        """
+        Creates the head to head, location, referee and opponent stance win/loss features in one sweep over the fights.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+            fighter_df (pd.DataFrame): DataFrame containing all the fighters, the opponent stance features are only
+                                       created when it is given
 
-        # Combine the input dataframe with the calculated features
-        result_df = pd.concat([input_df, result_features], axis=1)
+        Returns:
+            pd.DataFrame: DataFrame with the keyed win/loss features appended
+        """
 
-        return result_df
+        records = ['h2h', 'location', 'referee'] + (['stance'] if fighter_df is not None else [])
+        return self.__create_keyed_feats(df, records, fighter_df)
 
-    def create_win_loss_feats(self, df):
+    def create_h2h_feats(self, df):
         """
-        Creates the win/loss features for each fighter in the dataset
+        Creates the head to head features for each fighter in the dataset
 
-        Args:
-            df (pd.DataFrame): The dataframe containing the fighter data
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
 
         Returns:
-            pd.DataFrame: The dataframe with the win/loss features appended
+            pd.DataFrame: DataFrame with the head to head features appended
         """
 
-        col_names = self.__create_col_names_win_loss()
-        target_df = df
-
-        target_df[col_names] = target_df.swifter.progress_bar(True).apply(lambda row: self.__compute_win_loss(target_df, row['fighter_a_id'], row['fighter_b_id'], row.name, col_names), axis=1)
-        return target_df
+        return self.__create_keyed_feats(df, ['h2h'])
 
-    def create_win_loss_elevation_feats(self, df):
+    def create_win_loss_location_feats(self, df, include_progress=False):
         """
-        Creates the win/loss elevation features for each fighter in the dataset
+        Creates the win/loss location features for each fighter in the dataset
 
-        Args:
-            df (pd.DataFrame): The dataframe containing the fighter data
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
 
         Returns:
-            pd.DataFrame: The dataframe with the win/loss elevation features appended
+            pd.DataFrame: DataFrame containing the win/loss location features for each fighter in the dataset
         """
 
-        target_df = df.copy()
-        col_names = ['fighter_a_wins_above_elevation', 'fighter_a_losses_above_elevation',
-                    'fighter_a_wins_below_elevation', 'fighter_a_losses_below_elevation',
-                'fighter_b_wins_above_elevation', 'fighter_b_losses_above_elevation',
-                'fighter_b_wins_below_elevation', 'fighter_b_losses_below_elevation']
-        result_features = pd.DataFrame(columns=col_names)
+        return self.__create_keyed_feats(df, ['location'])
+
+    def create_win_loss_referee_feats(self, df):
+        """
+        Creates the win/loss features of each fighter under the referee of the fight
 
-        result_features[col_names] = target_df.swifter.progress_bar(True).apply(lambda row: self.__compute_win_loss_elevation(target_df, row['fighter_a_id'], row['fighter_b_id'], row['elevation'], row.name), axis=1)
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
 
-        result_df = pd.concat([target_df, result_features], axis=1)
+        Returns:
+            pd.DataFrame: DataFrame with the win/loss referee features appended
+        """
 
-        return result_df
+        return self.__create_keyed_feats(df, ['referee'])
 
-    def __compute_h2h(self, df, fighter_a_id, fighter_b_id, index):
+    def create_win_loss_stance_feats(self, df, fighter_df):
         """
-        Computes the head to head features for a single example in the dataset
+        Creates the win/loss features of each fighter against opponents of the same stance as their current opponent
 
-        Args:
-            df (pd.DataFrame): The dataframe containing the fighter data
-            fighter_a_id (int): The id of fighter a
-            fighter_b_id (int): The id of fighter b
-            index (int): The index of the example in the dataset
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+            fighter_df (pd.DataFrame): DataFrame containing all the fighters in the dataset
 
         Returns:
-            pd.Series: The head to head features for the example
+            pd.DataFrame: DataFrame with the win/loss stance features appended
+        """
+
+        return self.__create_keyed_feats(df, ['stance'], fighter_df)
+
+    def __create_keyed_feats(self, df, records, fighter_df=None):
         """
+        Sweeps the fights in date order with a KeyedCounters and appends the pre-fight counts of the given records.
 
-        all_prev_fights = df.loc[:index-1]
-        if not all_prev_fights.empty:
-            fighter_a_id_vals = all_prev_fights.fighter_a_id.values
-            fighter_b_id_vals = all_prev_fights.fighter_b_id.values
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+            records (list): Names of the records to create, any of 'h2h', 'location', 'referee' and 'stance'
+            fighter_df (pd.DataFrame): DataFrame containing all the fighters, needed for the 'stance' record
 
-            prev_fights = all_prev_fights[((fighter_a_id_vals == fighter_a_id) & (fighter_b_id_vals == fighter_b_id)) | ((fighter_a_id_vals == fighter_b_id) & (fighter_b_id_vals == fighter_a_id))]
-            if not prev_fights.empty:
-                prev_fight_len = len(prev_fights)
-                fighter_a_h2h_wins = (prev_fights['winner_id'] == fighter_a_id).sum()
-                fighter_b_h2h_wins = prev_fight_len - fighter_a_h2h_wins
-                return pd.Series([fighter_a_h2h_wins, fighter_b_h2h_wins])
-        return pd.Series([0, 0])
+        Returns:
+            pd.DataFrame: DataFrame with the features of the records appended
+        """
+
+        target_df = df.copy()
+        counts = self.__sweep_keyed_records(target_df, records, fighter_df)[0]
+        return pd.concat([target_df, self.__create_keyed_cols(counts, records, target_df.index)], axis=1)
 
-    def __compute_win_loss_location(self, df, fighter_a_id, fighter_b_id, location, index):
+    def __sweep_keyed_records(self, df, records, fighter_df=None):
         """
-        Computes the win/loss location features for a single example in the dataset
+        Sweeps the fights in date order with a KeyedCounters.
 
         Parameters:
-            df (pd.DataFrame): The dataframe containing the fighter data
-            fighter_a_id (int): The id of fighter a
-            fighter_b_id (int): The id of fighter b
-            location (str): The location of the fight
-            index (int): The index of the example in the dataset
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+            records (list): Names of the records to sweep, any of 'h2h', 'location', 'referee' and 'stance'
+            fighter_df (pd.DataFrame): DataFrame containing all the fighters, needed for the 'stance' record
 
         Returns:
-            pd.Series: The win/loss location features for the example
+            tuple: The pre-fight counts of every record, the KeyedCounters after the last fight and the value of every
+                   key code of every record
         """
 
-        all_prev_fights = df.loc[:index-1]
-        if not all_prev_fights.empty:
-            fighter_a_id_vals = all_prev_fights.fighter_a_id.values
-            fighter_b_id_vals = all_prev_fights.fighter_b_id.values
-            location_vals = all_prev_fights.location.values
+        fighter_a_codes, fighter_b_codes, winner_codes, fighter_ids = shared_codes(df['fighter_a_id'], df['fighter_b_id'], df['winner_id'], return_values=True)
+        fighters = np.column_stack([fighter_a_codes, fighter_b_codes])
 
-            fighter_a_fights = all_prev_fights[((fighter_a_id_vals == fighter_a_id) | (fighter_b_id_vals == fighter_a_id)) & (location_vals == location)]
-            fighter_b_fights = all_prev_fights[((fighter_a_id_vals == fighter_b_id) | (fighter_b_id_vals == fighter_b_id)) & (location_vals == location)]
+        keys = {}
+        key_values = {}
+        for record in records:
+            if record == 'h2h':
+                keys[record] = fighters[:, ::-1]
+                key_values[record] = fighter_ids
+            elif record == 'stance':
+                keys[record], key_values[record] = self.__get_opponent_stance_codes(df, fighter_df)
+            else:
+                codes, key_values[record] = shared_codes(df[record], return_values=True)
+                keys[record] = np.column_stack([codes, codes])
 
-            winner_id_vals = fighter_a_fights.winner_id.values
-            fighter_a_wins_in_location = len(fighter_a_fights[winner_id_vals == fighter_a_id])
-            fighter_a_losses_in_location = len(fighter_a_fights) - fighter_a_wins_in_location
+        # A stable sort keeps the row order of fights on the same date
+        order = np.argsort(pd.to_datetime(df['date']).to_numpy(), kind='stable')
+        counters = KeyedCounters()
+        counts = counters.sweep(fighters, winner_codes, keys, order)
+        return counts, counters, key_values
 
-            winner_id_vals = fighter_b_fights.winner_id.values
-            fighter_b_wins_in_location = len(fighter_b_fights[winner_id_vals == fighter_b_id])
-            fighter_b_losses_in_location = len(fighter_b_fights) - fighter_b_wins_in_location
+    def __create_keyed_cols(self, counts, records, index):
+        """
+        Creates the columns of the keyed records.
 
-            return pd.Series([fighter_a_wins_in_location, fighter_a_losses_in_location, fighter_b_wins_in_location, fighter_b_losses_in_location])
+        Parameters:
+            counts (dict): Mapping of record name to an array of shape (n_fights, 2, 2) with the pre-fight [wins, losses]
+                           of each fighter
+            records (list): Names of the records, in column order
+            index (pd.Index): The index of the fights
 
-        return pd.Series([0, 0, 0, 0])
+        Returns:
+            pd.DataFrame: The keyed win/loss features
+        """
 
-    def __create_col_names_win_loss_round(self):
-            """
-            Generates column names for significant strike statistics.
+        result_features = {}
+        for record in records:
+            record_counts = counts[record]
+            if record == 'h2h':
+                # Fighter b is credited with every h2h fight fighter a didn't win
+                result_features['fighter_a_h2h_wins'] = record_counts[:, 0, 0]
+                result_features['fighter_b_h2h_wins'] = record_counts[:, 0, 1]
+                continue
 
-            Returns:
-                list: A list of strings, each representing a column name for a specific significant strike statistic.
-            """
-            col_names = []
-            fighters = ['fighter-a', 'fighter-b']
-            fight_rounds = ['3R', '5R']
-            win_loss = ['wins', 'losses']
-            rounds = ['R1', 'R2', 'R3', 'R4', 'R5', 'decision', 'overall']
-            time_periods = ['alltime', '1y']
-            for fighter in fighters:
-                for num_rounds in fight_rounds:
-                    for wl in win_loss:
-                        for dec_round in rounds:
-                            for time_period in time_periods:
-                                if num_rounds == '3R' and (dec_round == 'R4' or dec_round == 'R5'):
-                                    continue
-                                col_name = f"{fighter.replace(' ', '_')}_{num_rounds.replace(' ', '_')}_{dec_round}_{wl}_{time_period.replace(' ', '_')}"
-                                col_names.append(col_name)
-            return col_names
+            suffix = self.keyed_record_suffixes[record]
+            for side, fighter in enumerate(['a', 'b']):
+                result_features[f'fighter_{fighter}_wins_{suffix}'] = record_counts[:, side, 0]
+                result_features[f'fighter_{fighter}_losses_{suffix}'] = record_counts[:, side, 1]
+
+        return pd.DataFrame(result_features, index=index)
 
-    def __compute_year_ago(self, df):
+    def __get_opponent_stance_codes(self, df, fighter_df):
         """
-        Calculates the date one year ago from each date in the dataframe's 'date' column.
+        Looks up the stance of each fighter's opponent.
 
-        Args:
-            df (pd.DataFrame): The dataframe containing a 'date' column.
+        Parameters:
+            df (pd.DataFrame): DataFrame containing all the fights in the dataset
+            fighter_df (pd.DataFrame): DataFrame containing all the fighters in the dataset
 
         Returns:
-            pd.Series: A Series object with dates that are one year before the corresponding dates in df's 'date' column.
+            tuple: Array of shape (n_fights, 2) with the stance code of fighter b and fighter a, -1 when unknown, and
+                   the stance of every code
         """
 
-        temp_year_ago_df = pd.to_datetime(df['date'])
-        temp_year_ago_df = temp_year_ago_df - pd.DateOffset(years=1)
-        return temp_year_ago_df
+        stances = self.__get_fighter_stances(fighter_df)
 
-    def __get_fighter_fights_win_loss_round(self, df, fighter_id, index):
-            """
-            Retrieves the most recent fights of a fighter before a given index in the dataframe.
-
-            Args:
-                df (pd.DataFrame): The dataframe containing fight records.
-                fighter_id (str): The ID of the fighter.
-                index (int): The index in the dataframe up to which fights should be considered.
+        fighter_a_stances = df['fighter_a_id'].astype(object).map(stances)
+        fighter_b_stances = df['fighter_b_id'].astype(object).map(stances)
+        fighter_a_codes, fighter_b_codes, stance_values = shared_codes(fighter_a_stances, fighter_b_stances, return_values=True)
 
-            Returns:
-                tuple: Contains three dataframes - the last 3 fights, the last 5 fights, and all previous fights.
-            """
-            year_ago = self.__compute_year_ago(df)
-            all_prev_fights = df.loc[:index-1]
-            col_names = df.columns
+        return np.column_stack([fighter_b_codes, fighter_a_codes]), stance_values
 
-            all_prev_fights_3R = pd.DataFrame(columns=col_names)
-            all_prev_fights_5R = pd.DataFrame(columns=col_names)
+    def __get_fighter_stance_keys(self, fighter_df, stance_values):
+        """
+        Looks up the key of the stance of every fighter, fighters without fights included.
 
-            if not all_prev_fights.empty:
-                # Filter fights involving the specified fighter
-                fighter_a_id_vals = all_prev_fights.fighter_a_id.values
-                fighter_b_id_vals = all_prev_fights.fighter_b_id.values
+        Parameters:
+            fighter_df (pd.DataFrame): DataFrame containing all the fighters in the dataset
+            stance_values (pd.Index): The stance of every key of the 'stance' record
 
-                prev_fights = all_prev_fights[((fighter_a_id_vals == fighter_id) | (fighter_b_id_vals == fighter_id))]
+        Returns:
+            pd.Series: The stance key of every fighter, indexed by ID, -1 when the stance is unknown
+        """
 
-                if not prev_fights.empty:
-                    outcome_format_values = prev_fights.outcome_format.values
+        stances = self.__get_fighter_stances(fighter_df)
+        return pd.Series(stance_values.get_indexer(stances.to_numpy(dtype=object)), index=stances.index.astype(object))
 
-                    # Filter fights that are 3R or 5R
-                    all_prev_fights_3R[col_names] = prev_fights[outcome_format_values == "(5-5-5)"]
-                    all_prev_fights_5R[col_names] = prev_fights[outcome_format_values == "(5-5-5-5-5)"]
+    def __get_fighter_stances(self, fighter_df):
+        """
+        Gets the stance of every fighter.
 
-                    return all_prev_fights_3R, all_prev_fights_5R, year_ago[index]
+        Parameters:
+            fighter_df (pd.DataFrame): DataFrame containing all the fighters in the dataset
 
-                else:
-                    return all_prev_fights_3R, all_prev_fights_5R, year_ago[index]
+        Returns:
+            pd.Series: The stance of every fighter, indexed by ID
+        """
 
-            return all_prev_fights_3R, all_prev_fights_5R, year_ago[index]
+        stance_col = 'STANCE' if 'STANCE' in fighter_df.columns else 'Stance'
+        return fighter_df.drop_duplicates('ID').set_index('ID')[stance_col]
 
-    def __get_wins_losses(self, df, fighter_id):
+    def create_win_loss_round_feats(self, df):
         """
-        Retrieves the wins and losses of a fighter.
+        Creates the win/loss features by finish round for 3 and 5 round fights, all-time and over the last year.
 
         Args:
-            df (pd.DataFrame): The dataframe containing fight records.
-            fighter_id (str): The ID of the fighter.
-            colnames (list): A list of column names to be used for the dataframe.
+            df (pd.DataFrame): The original dataframe containing fight data.
 
         Returns:
-            tuple: Contains two dataframes - one containing the wins of the fighter, and the other containing the losses of the fighter.
+            pd.DataFrame: A dataframe with the additional win/loss round columns.
         """
-        col_names = df.columns
-        fighter_wins = pd.DataFrame(columns=col_names)
-        fighter_losses = pd.DataFrame(columns=col_names)
-
-        if df.empty:
-            return fighter_wins, fighter_losses
 
-        fighter_wins[col_names] = df[(df['winner_id'] == fighter_id)]
-        fighter_losses[col_names] = df[(df['winner_id'] != fighter_id)]
+        df['date'] = pd.to_datetime(df['date'])
+        input_df = df.copy()
 
-        assert len(fighter_wins) + len(fighter_losses) == len(df)
+        fighters, dates, indicators = self.__get_round_indicators(input_df)
+        year_ago = np.tile((input_df['date'] - pd.DateOffset(years=1)).to_numpy(), 2)
+        # Fights on the same date count in fight order, whichever side the fighter was on
+        fight_order = np.tile(np.arange(len(input_df)), 2)
+        all_time = prior_sums(fighters, dates, indicators, row_order=fight_order)
+        last_year = prior_sums(fighters, dates, indicators, year_ago, fight_order)
 
-        return fighter_wins, fighter_losses
+        return pd.concat([input_df, self.__create_round_cols(all_time, last_year, input_df.index)], axis=1)
 
-    def __isDecision(self, outcome_methods):
+    def __get_round_indicators(self, df):
         """
-        Checks if the fight outcome method involves a decision.
+        Flags the (format, outcome, round) cells of the win/loss round features every fighter of every fight falls in.
 
         Args:
-            outcome_methods (pd.Series): A pandas Series containing fight outcome methods.
+            df (pd.DataFrame): The original dataframe containing fight data, with datetime dates.
 
         Returns:
-            pd.Series: A boolean Series where True indicates the outcome method is a decision.
+            tuple: The fighter codes, the dates and the int32 indicators of fighter a's rows followed by fighter b's rows
         """
-        return outcome_methods.str.contains("Decision", case=False, na=False)
 
-    def __compute_win_loss_round_details_alltime(self, fights_df, round_num):
+        n = len(df)
+        fighter_a_codes, fighter_b_codes, winner_codes = shared_codes(df['fighter_a_id'], df['fighter_b_id'], df['winner_id'])
+        outcome_format = df['outcome_format'].astype(object)
+        is_decision = self.__isDecision(df['outcome_method']).to_numpy()
+        outcome_round = df['outcome_round'].to_numpy()
+
+        # One indicator per (format, outcome, round) cell of a fighter, in column order
+        format_masks = {
+            '3R' : outcome_format.isin([3, '3', '(5-5-5)']).to_numpy(),
+            '5R' : outcome_format.isin([5, '5', '(5-5-5-5-5)']).to_numpy()
+        }
+        round_masks = {f'R{r}' : (outcome_round == r) & ~is_decision for r in range(1, 6)}
+        round_masks['decision'] = is_decision
+        round_masks['overall'] = np.ones(n, dtype=bool)
+
+        fighters = np.concatenate([fighter_a_codes, fighter_b_codes])
+        won = fighters == np.concatenate([winner_codes, winner_codes])
+        indicators = []
+        for num_rounds, format_mask in format_masks.items():
+            for outcome_mask in [won, ~won]:
+                for dec_round in ['R1', 'R2', 'R3', 'R4', 'R5', 'decision', 'overall']:
+                    if num_rounds == '3R' and dec_round in ['R4', 'R5']:
+                        continue
+                    indicators.append(np.tile(format_mask & round_masks[dec_round], 2) & outcome_mask)
+
+        return fighters, np.tile(df['date'].to_numpy(), 2), np.column_stack(indicators).astype(np.int32)
+
+    def __create_round_cols(self, all_time, last_year, index):
         """
-        Filters fights based on the specified round number and whether the outcome was not by decision.
+        Creates the columns of the win/loss round features.
 
         Args:
-            fights_df (pd.DataFrame): The dataframe containing fight records.
-            round_num (int): The specific round number to filter fights on.
+            all_time (np.ndarray): The all-time counts of fighter a's rows followed by fighter b's rows
+            last_year (np.ndarray): The last year counts, in the same order
+            index (pd.Index): The index of the fights
 
         Returns:
-            pd.DataFrame: A filtered DataFrame containing fights that match the specified criteria.
+            pd.DataFrame: The win/loss round features
         """
-        col_names = fights_df.columns
-        round_outcome_fights = pd.DataFrame(columns=col_names)
-
-        if fights_df.empty:
-            return round_outcome_fights
 
-        round_outcome_fights[col_names] = fights_df[(fights_df['outcome_round'] == round_num) & (~self.__isDecision(fights_df['outcome_method']))]
-        return round_outcome_fights
+        counts = np.stack([all_time, last_year], axis=-1).reshape(2, len(index), -1)
+        return pd.DataFrame(np.concatenate([counts[0], counts[1]], axis=1), index=index, columns=self.col_names_win_loss_round)
 
-    def __get_win_loss_round_details(self, fights_won, fights_lost, fighter_id, colnames, year_ago):
+    def create_win_loss_feats(self, df):
         """
-        Calculates win/loss statistics for each fighter based on specific criteria defined in colnames.
+        Creates the win/loss features for each fighter in the dataset
 
         Args:
-            fights_won (pd.DataFrame): DataFrame containing fights that the fighter won.
-            fights_lost (pd.DataFrame): DataFrame containing fights that the fighter lost.
-            fighter_id (str): The ID of the fighter.
-            colnames (list): List of column names defining specific criteria for win/loss calculation.
-            year_ago (pd.Series): Series object with dates that are one year before the corresponding dates in fights' date column.
+            df (pd.DataFrame): The dataframe containing the fighter data
 
         Returns:
-            list: A list containing calculated win/loss statistics based on the specified criteria.
+            pd.DataFrame: The dataframe with the win/loss features appended
         """
 
-        res = []
-        for i in range(0, len(colnames), 2):
+        target_df = df
+        all_time, last_year = self.__sweep_outcomes(target_df)[:2]
+        return pd.concat([target_df, self.__create_outcome_cols(all_time, last_year, target_df.index)], axis=1)
+
+    def __sweep_outcomes(self, df):
+        """
+        Sweeps the fights in date order with an OutcomeCube over the win/loss methods and divisions.
 
-            split = colnames[i].split('_')
-            round_num = split[2]
-            outcome = split[3]
+        Args:
+            df (pd.DataFrame): The dataframe containing the fighter data
 
-            if round_num[0] == 'R':
-                round_num = int(round_num[1:])
+        Returns:
+            tuple: The all-time and last year cubes of both fighters before every fight and the OutcomeCube after the
+                   last fight
+        """
 
-            if outcome == 'wins':
-                outcome = 1
-            else:
-                outcome = 0
-
-            # print(index)
-            if round_num == 'overall':
-                if outcome:
-                    res.append(len(fights_won))
-                    res.append(len(fights_won[(pd.to_datetime(fights_won['date'])> year_ago)]))
-                else:
-                    res.append(len(fights_lost))
-                    res.append(len(fights_lost[(pd.to_datetime(fights_lost['date']) > year_ago)]))
-                continue
+        fighter_a_codes, fighter_b_codes, winner_codes = shared_codes(df['fighter_a_id'], df['fighter_b_id'], df['winner_id'])
+        methods = df['outcome_method'].astype(object).map(self.win_loss_methods).fillna(-1).to_numpy(dtype=int)
+        divisions = df['division'].astype(object).map(self.win_loss_divisions).fillna(-1).to_numpy(dtype=int)
 
+        dates = pd.to_datetime(df['date'])
+        order = np.argsort(dates.to_numpy(), kind='stable')
 
-            if round_num == 'decision':
-                if outcome:
-                    res.append(len(fights_won[self.__isDecision(fights_won['outcome_method'])]))
-                    res.append(len(fights_won[self.__isDecision(fights_won['outcome_method']) & (pd.to_datetime(fights_won['date']) > year_ago)]))
+        cube = OutcomeCube(n_methods=4, n_divisions=10)
+        all_time, last_year = cube.sweep(np.column_stack([fighter_a_codes, fighter_b_codes]), winner_codes, methods, divisions,
+                                         dates.to_numpy(), (dates - pd.DateOffset(years=1)).to_numpy(), order)
+        return all_time, last_year, cube
 
-                else:
-                    res.append(len(fights_lost[self.__isDecision(fights_lost['outcome_method'])]))
-                    res.append(len(fights_lost[self.__isDecision(fights_lost['outcome_method']) & (pd.to_datetime(fights_lost['date']) > year_ago)]))
+    def __create_outcome_cols(self, all_time, last_year, index):
+        """
+        Creates the columns of the win/loss features.
 
-                continue
+        Args:
+            all_time (np.ndarray): The all-time cubes of both fighters, shape (n_fights, 2, n_cells)
+            last_year (np.ndarray): The last year cubes of both fighters, shape (n_fights, 2, n_cells)
+            index (pd.Index): The index of the fights
 
-            elif outcome:
-                round_outcome_fights = self.__compute_win_loss_round_details_alltime(fights_won, round_num)
+        Returns:
+            pd.DataFrame: The win/loss features
+        """
 
-                res.append(len(round_outcome_fights))
-                res.append(len(round_outcome_fights[(pd.to_datetime(round_outcome_fights['date']) > year_ago)]))
+        # Columns are ordered by fighter, outcome, method, division and then last-year, all-time
+        counts = np.stack([last_year, all_time], axis=-1).reshape(len(index), -1)
+        return pd.DataFrame(counts, index=index, columns=self.col_names_win_loss)
 
-                continue
-            else:
-                round_outcome_fights = self.__compute_win_loss_round_details_alltime(fights_lost, round_num)
+    def create_win_loss_elevation_feats(self, df):
+        """
+        Creates the win/loss elevation features for each fighter in the dataset
 
-                res.append(len(round_outcome_fights))
-                res.append(len(round_outcome_fights[(pd.to_datetime(round_outcome_fights['date']) > year_ago)]))
+        Args:
+            df (pd.DataFrame): The dataframe containing the fighter data
 
-                continue
+        Returns:
+            pd.DataFrame: The dataframe with the win/loss elevation features appended
+        """
 
-        return res
+        target_df = df.copy()
+        counts = self.__sweep_elevations(target_df)[0]
+        return pd.concat([target_df, self.__create_elevation_cols(counts, target_df.index)], axis=1)
 
-    def __get_win_loss_round_feats(self, df, fighter_id, index, colnames):
+    def __sweep_elevations(self, df):
         """
-        Generates win/loss statistics for a fighter at a specific index in the dataframe.
+        Sweeps the fights in date order with an ElevationRecords over the fight elevations.
 
         Args:
-            df (pd.DataFrame): The dataframe containing fight records.
-            fighter_id (str): The ID of the fighter.
-            index (int): The index in the dataframe to consider for generating statistics.
-            colnames (list): List of column names for generating statistics.
+            df (pd.DataFrame): The dataframe containing the fighter data
 
         Returns:
-            list: A list of calculated win/loss statistics for the specified fighter.
+            tuple: The elevation records of both fighters before every fight and the ElevationRecords after the last
+                   fight
         """
-        res = []
-        all_prev_fights_3R, all_prev_fights_5R, year_ago= self.__get_fighter_fights_win_loss_round(df, fighter_id, index)
-
-        fights_won_3R, fights_lost_3R = self.__get_wins_losses(all_prev_fights_3R, fighter_id)
-        fights_won_5R, fights_lost_5R = self.__get_wins_losses(all_prev_fights_5R, fighter_id)
 
-        res += self.__get_win_loss_round_details(fights_won_3R, fights_lost_3R, fighter_id, colnames[:20], year_ago)
-        res += self.__get_win_loss_round_details(fights_won_5R, fights_lost_5R, fighter_id, colnames[20:], year_ago)
+        fighter_a_codes, fighter_b_codes, winner_codes = shared_codes(df['fighter_a_id'], df['fighter_b_id'], df['winner_id'])
+        order = np.argsort(pd.to_datetime(df['date']).to_numpy(), kind='stable')
 
-        return res
+        elevations = df['elevation'].to_numpy(dtype=float)
+        records = ElevationRecords(elevations)
+        return records.sweep(np.column_stack([fighter_a_codes, fighter_b_codes]), winner_codes, elevations, order), records
 
-    def __calculate_win_loss_round(self, df, fighter_a_id, fighter_b_id, index, colnames):
+    def __create_elevation_cols(self, counts, index):
         """
-        Computes win/loss round features for two fighters in a match.
+        Creates the columns of the win/loss elevation features.
 
         Args:
-            df (pd.DataFrame): The dataframe containing fight data.
-            fighter_a_id (str): The ID of fighter A.
-            fighter_b_id (str): The ID of fighter B.
-            index (int): The index of the current row in the dataframe.
-            colnames (list): List of column names for feature calculation.
+            counts (np.ndarray): The elevation records of both fighters, shape (n_fights, 2, 6)
+            index (pd.Index): The index of the fights
 
         Returns:
-            pd.Series: A series containing calculated win/loss round features for both fighters.
+            pd.DataFrame: The win/loss elevation features
         """
-        res = []
 
-        res += self.__get_win_loss_round_feats(df, fighter_a_id, index, colnames[:48]) # has all of fighter_a's cols
-        res += self.__get_win_loss_round_feats(df, fighter_b_id, index, colnames[48:]) # has all of fighter_b's cols
+        col_names = [f'fighter_{fighter}_{outcome}_{band}_elevation' for fighter in ['a', 'b'] for band in ['above', 'below'] for outcome in ['wins', 'losses']] + \
+                    [f'fighter_{fighter}_{outcome}_near_elevation' for fighter in ['a', 'b'] for outcome in ['wins', 'losses']]
 
-        return pd.Series(res)
+        # Above/below columns of both fighters first, then the within-window columns
+        counts = np.concatenate([counts[:, :, :4].reshape(len(index), -1), counts[:, :, 4:].reshape(len(index), -1)], axis=1)
+        return pd.DataFrame(counts, index=index, columns=col_names)
 
-    def __compute_win_loss(self, df, fighter_a_id, fighter_b_id, index, col_names):
+    def create_streak_feats(self, df):
         """
-        Computes the win/loss features for a single example in the dataset
+        Creates the consecutive win/loss features for each fighter in the dataset: the current streak, the longest
+        streak in the last 5 fights and the longest streak ever, plus the differences between the two fighters.
 
         Args:
-            df (pd.DataFrame): The dataframe containing the fighter data
-            fighter_a_id (int): The id of fighter a
-            fighter_b_id (int): The id of fighter b
-            index (int): The index of the example in the dataset
-            col_names (list): The list of column names for the win/loss features
+            df (pd.DataFrame): The dataframe containing the fight data
 
         Returns:
-            pd.Series: The win/loss features for the example
+            pd.DataFrame: The dataframe with the streak features appended
         """
 
-        res = []
-        fighter_a_prev_fights, fighter_a_prev_fights_last_year = self.__get_fighter_fights_win_loss(df, fighter_a_id, index)
-        fighter_b_prev_fights, fighter_b_prev_fights_last_year = self.__get_fighter_fights_win_loss(df, fighter_b_id, index)
+        target_df = df.copy()
+        streaks = self.__sweep_streaks(target_df)[0]
+        return pd.concat([target_df, self.__create_streak_cols(streaks, target_df.index)], axis=1)
 
-        for i in range(len(col_names)):
-            split = col_names[i].split('_')
-            fighter = split[0]
-            outcome = split[1]
-            method = split[2]
-            weight_class = split[3]
-            time_period = split[4]
+    def __sweep_streaks(self, df):
+        """
+        Sweeps the fights in date order with a StreakRecords.
 
-            print(f'{fighter} {outcome} {method} {weight_class} {time_period}')
+        Args:
+            df (pd.DataFrame): The dataframe containing the fight data
 
-            prev_fights = fighter_a_prev_fights if fighter == 'fighter-a' else fighter_b_prev_fights
-            prev_fights_last_year = fighter_a_prev_fights_last_year if fighter == 'fighter-a' else fighter_b_prev_fights_last_year
+        Returns:
+            tuple: The streaks of both fighters before every fight and the StreakRecords after the last fight
+        """
 
-            prev_fights = prev_fights if time_period == 'all-time' else prev_fights_last_year
+        fighter_a_codes, fighter_b_codes, winner_codes = shared_codes(df['fighter_a_id'], df['fighter_b_id'], df['winner_id'])
+        order = np.argsort(pd.to_datetime(df['date']).to_numpy(), kind='stable')
 
-            if prev_fights.empty:
-                res.append(0)
-                continue
+        records = StreakRecords(window=5)
+        return records.sweep(np.column_stack([fighter_a_codes, fighter_b_codes]), winner_codes, order), records
 
-            fight_outcomes = self.__get_fighter_outcomes_win_loss(prev_fights, fighter_a_id if fighter == 'fighter-a' else fighter_b_id)
-            prev_fights = fight_outcomes[0] if outcome == 'wins' else fight_outcomes[1]
+    def __create_streak_cols(self, streaks, index):
+        """
+        Creates the columns of the consecutive win/loss features.
 
-            if prev_fights.empty:
-                res.append(0)
-                continue
+        Args:
+            streaks (np.ndarray): The streaks of both fighters, shape (n_fights, 2, 3, 2)
+            index (pd.Index): The index of the fights
 
-            fight_outcome_methods = self.__get_fighter_outcome_methods(prev_fights)
-            prev_fights = fight_outcome_methods[0] if method == 'KO/TKO' \
-                else fight_outcome_methods[1] if method == 'submission' \
-                else fight_outcome_methods[2] if method == 'decision' \
-                else fight_outcome_methods[3]
+        Returns:
+            pd.DataFrame: The streak features
+        """
 
-            if prev_fights.empty:
-                res.append(0)
-                continue
+        col_names = []
+        values = []
+        for period_index, period in enumerate(['current', 'l5', 'alltime']):
+            period_streaks = streaks[:, :, period_index]
+            for side, fighter in enumerate(['fighter-a', 'fighter-b']):
+                col_names += [f'{fighter}_cwins_{period}', f'{fighter}_closses_{period}']
+                values += [period_streaks[:, side, 0], period_streaks[:, side, 1]]
+            for side, fighter in enumerate(['fighter-a', 'fighter-b']):
+                col_names += [f'{fighter}_cwins_{period}_diff', f'{fighter}_closses_{period}_diff']
+                values += [period_streaks[:, side, 0] - period_streaks[:, 1 - side, 0], period_streaks[:, side, 1] - period_streaks[:, 1 - side, 1]]
 
-            fight_division = self.__get_fighter_division(prev_fights)
-            prev_fights = fight_division[0] if weight_class == 'flyweight' \
-                else fight_division[1] if weight_class == 'bantamweight' \
-                else fight_division[2] if weight_class == 'featherweight' \
-                else fight_division[3] if weight_class == 'lightweight' \
-                else fight_division[4] if weight_class == 'welterweight' \
-                else fight_division[5] if weight_class == 'middleweight' \
-                else fight_division[6] if weight_class == 'light-heavyweight' \
-                else fight_division[7] if weight_class == 'heavyweight' \
-                else fight_division[8] if weight_class == 'catchweight' \
-                else fight_division[9]
-
-            if not prev_fights.empty:
-                res.append(len(prev_fights))
-            else:
-                res.append(0)
-        return pd.Series(res)
+        return pd.DataFrame(np.column_stack(values), index=index, columns=col_names)
 
-    def __get_fighter_division(self, df):
+    def create_common_opponent_feats(self, df):
         """
-        Filters the data by division
+        Creates the common opponent and transitive win features for each fighter in the dataset: the number of common
+        past opponents, the common opponents beaten and lost to, and the opponents beaten who beat the other fighter
+        (depth 2) or beat someone who beat the other fighter (depth 3). Only fights strictly before the fight date count.
 
         Args:
-            df (pd.DataFrame): The dataframe containing the fighter data
+            df (pd.DataFrame): The dataframe containing the fight data
 
         Returns:
-            pd.DataFrame: The dataframe containing the fighter data filtered by division
+            pd.DataFrame: The dataframe with the common opponent features appended
         """
 
-        fighter_flyweight = df[df['division'] == 'Flyweight']
-        fighter_bantamweight = df[df['division'] == 'Bantamweight']
-        fighter_featherweight = df[df['division'] == 'Featherweight']
-        fighter_lightweight = df[df['division'] == 'Lightweight']
-        fighter_welterweight = df[df['division'] == 'Welterweight']
-        fighter_middleweight = df[df['division'] == 'Middleweight']
-        fighter_light_heavyweight = df[df['division'] == 'Light Heavyweight']
-        fighter_heavyweight = df[df['division'] == 'Heavyweight']
-        fighter_catchweight = df[df['division'] == 'Catchweight']
-        fighter_overall = df
-        return fighter_flyweight, fighter_bantamweight, fighter_featherweight, fighter_lightweight, fighter_welterweight, fighter_middleweight, fighter_light_heavyweight, fighter_heavyweight, fighter_catchweight, fighter_overall
+        target_df = df.copy()
+        counts = self.__sweep_opponents(target_df)[0]
+        return pd.concat([target_df, self.__create_common_opponent_cols(counts, target_df.index)], axis=1)
 
-    def __get_fighter_outcome_methods(self, df):
+    def __sweep_opponents(self, df):
         """
-        Filters the data by outcome method
+        Sweeps the fights in date order with an OpponentGraph.
 
         Args:
-            df (pd.DataFrame): The dataframe containing the fighter data
+            df (pd.DataFrame): The dataframe containing the fight data
 
         Returns:
-            pd.DataFrame: The dataframe containing the fighter data filtered by outcome method
+            tuple: The common opponent counts of both fighters before every fight and the OpponentGraph after the last
+                   fight
         """
 
-        fighter_ko = df[(df['outcome_method'] == 'KO/TKO') | (df['outcome_method'] == 'TKO - Doctor\'s Stoppage')]
-        fighter_sub = df[df['outcome_method'] == 'Submission']
-        fighter_decision = df[(df['outcome_method'] == 'Decision - Unanimous') | (df['outcome_method'] == 'Decision - Split') | (df['outcome_method'] == 'Decision - Majority')]
-        fighter_total = df
-        return fighter_ko, fighter_sub, fighter_decision, fighter_total
+        fighter_a_codes, fighter_b_codes, winner_codes = shared_codes(df['fighter_a_id'], df['fighter_b_id'], df['winner_id'])
+        dates = pd.to_datetime(df['date']).to_numpy()
+        order = np.argsort(dates, kind='stable')
+
+        graph = OpponentGraph()
+        return graph.sweep(np.column_stack([fighter_a_codes, fighter_b_codes]), winner_codes, dates, order), graph
 
-    def __get_fighter_outcomes_win_loss(self, df, fighter_id):
+    def __create_common_opponent_cols(self, counts, index):
         """
-        Filters the data by outcome
+        Creates the columns of the common opponent features.
 
         Args:
-            df (pd.DataFrame): The dataframe containing the fighter data
-            fighter_id (int): The id of the fighter
+            counts (np.ndarray): The common opponent counts of both fighters, shape (n_fights, 2, 5)
+            index (pd.Index): The index of the fights
 
         Returns:
-            pd.DataFrame: The dataframe containing the fighter data filtered by outcome
+            pd.DataFrame: The common opponent features
         """
 
-        fighter_wins = df[df['winner_id'] == fighter_id]
-        fighter_losses = df[df['winner_id'] != fighter_id]
-        return fighter_wins, fighter_losses
+        col_names = [f'{fighter}_{count}' for fighter in ['fighter_a', 'fighter_b']
+                     for count in ['common_opponents', 'wins_vs_common_opponents', 'losses_vs_common_opponents', 'transitive_wins_depth_2', 'transitive_wins_depth_3']]
+        return pd.DataFrame(counts.reshape(len(index), -1), index=index, columns=col_names)
 
-    def __get_fighter_fights_win_loss(self, df, fighter_id, index):
+    def __create_col_names_win_loss_round(self):
+            """
+            Generates column names for significant strike statistics.
+
+            Returns:
+                list: A list of strings, each representing a column name for a specific significant strike statistic.
+            """
+            col_names = []
+            fighters = ['fighter-a', 'fighter-b']
+            fight_rounds = ['3R', '5R']
+            win_loss = ['wins', 'losses']
+            rounds = ['R1', 'R2', 'R3', 'R4', 'R5', 'decision', 'overall']
+            time_periods = ['alltime', '1y']
+            for fighter in fighters:
+                for num_rounds in fight_rounds:
+                    for wl in win_loss:
+                        for dec_round in rounds:
+                            for time_period in time_periods:
+                                if num_rounds == '3R' and (dec_round == 'R4' or dec_round == 'R5'):
+                                    continue
+                                col_name = f"{fighter.replace(' ', '_')}_{num_rounds.replace(' ', '_')}_{dec_round}_{wl}_{time_period.replace(' ', '_')}"
+                                col_names.append(col_name)
+            return col_names
+
+    def __isDecision(self, outcome_methods):
         """
-        Filters the data by a specific fighter
+        Checks if the fight outcome method involves a decision.
 
         Args:
-            df (pd.DataFrame): The dataframe containing the fighter data
-            fighter_id (int): The id of the fighter
-            index (int): The index of the example in the dataset
+            outcome_methods (pd.Series): A pandas Series containing fight outcome methods.
 
         Returns:
-            pd.DataFrame: The dataframe containing the fighter data filtered by fighter
+            pd.Series: A boolean Series where True indicates the outcome method is a decision.
         """
+        if isinstance(outcome_methods.dtype, pd.CategoricalDtype):
+            # Check each category once and look the result up by code
+            categories = pd.Series(outcome_methods.cat.categories, dtype=object)
+            is_decision = np.append(categories.str.contains("Decision", case=False, na=False).to_numpy(), False)
+            return pd.Series(is_decision[outcome_methods.cat.codes.to_numpy()], index=outcome_methods.index)
 
-        year_ago = self.__compute_year_ago(df)
-        all_prev_fights = df.loc[:index-1]
-        if not all_prev_fights.empty:
-            fighter_a_id_vals = all_prev_fights.fighter_a_id.values
-            fighter_b_id_vals = all_prev_fights.fighter_b_id.values
-
-            prev_fights = all_prev_fights[((fighter_a_id_vals == fighter_id) | (fighter_b_id_vals == fighter_id))]
-            prev_fights_last_year = all_prev_fights[((fighter_a_id_vals == fighter_id) | (fighter_b_id_vals == fighter_id)) & (pd.to_datetime(all_prev_fights['date']) > year_ago[index])]
-
-            return prev_fights, prev_fights_last_year
-        return pd.DataFrame(), pd.DataFrame()
+        return outcome_methods.str.contains("Decision", case=False, na=False)
 
     def __create_col_names_win_loss(self):
         """
@@ -609,41 +719,3 @@ class WinLossStats:
                             col_name = f"{fighter.replace(' ', '_')}_{outcome}_{method}_{weight_class.replace(' ', '_')}_{time_period}"
                             col_names.append(col_name)
         return col_names
-
-    def __compute_win_loss_elevation(self, df, fighter_a_id, fighter_b_id, elevation, index):
-        all_prev_fights = df.loc[:index-1]
-        if not all_prev_fights.empty:
-            fighter_a_id_vals = all_prev_fights.fighter_a_id.values
-            fighter_b_id_vals = all_prev_fights.fighter_b_id.values
-            fighter_a_wins_above_elevation = fighter_a_losses_above_elevation = fighter_a_wins_below_elevation = fighter_a_losses_below_elevation = 0
-            fighter_b_wins_above_elevation = fighter_b_losses_above_elevation = fighter_b_wins_below_elevation = fighter_b_losses_below_elevation = 0
-
-            fighter_a_fights = all_prev_fights[((fighter_a_id_vals == fighter_a_id) | (fighter_b_id_vals == fighter_a_id))]
-            fighter_b_fights = all_prev_fights[((fighter_a_id_vals == fighter_b_id) | (fighter_b_id_vals == fighter_b_id))]
-
-            elevation_vals = fighter_a_fights.elevation.values
-            winner_id_vals = all_prev_fights.winner_id.values
-
-            if not fighter_a_fights.empty:
-                elevation_vals = fighter_a_fights.elevation.values
-                winner_id_vals = fighter_a_fights.winner_id.values
-                fighter_a_wins_above_elevation = fighter_a_fights[((winner_id_vals == fighter_a_id) & (elevation_vals >= elevation))].shape[0]
-                fighter_a_losses_above_elevation = fighter_a_fights[((winner_id_vals != fighter_a_id) & (elevation_vals >= elevation))].shape[0]
-                fighter_a_wins_below_elevation = fighter_a_fights[((winner_id_vals == fighter_a_id) & (elevation_vals < elevation))].shape[0]
-                fighter_a_losses_below_elevation = fighter_a_fights[((winner_id_vals != fighter_a_id) & (elevation_vals < elevation))].shape[0]
-
-            if not fighter_b_fights.empty:
-                elevation_vals = fighter_b_fights.elevation.values
-                winner_id_vals = fighter_b_fights.winner_id.values
-                fighter_b_wins_above_elevation = fighter_b_fights[((winner_id_vals == fighter_b_id) & (elevation_vals >= elevation))].shape[0]
-                fighter_b_losses_above_elevation = fighter_b_fights[((winner_id_vals != fighter_b_id) & (elevation_vals >= elevation))].shape[0]
-                fighter_b_wins_below_elevation = fighter_b_fights[((winner_id_vals == fighter_b_id) & (elevation_vals < elevation))].shape[0]
-                fighter_b_losses_below_elevation = fighter_b_fights[((winner_id_vals != fighter_b_id) & (elevation_vals < elevation))].shape[0]
-
-            return pd.Series([fighter_a_wins_above_elevation, fighter_a_losses_above_elevation,
-                            fighter_a_wins_below_elevation, fighter_a_losses_below_elevation,
-                    fighter_b_wins_above_elevation, fighter_b_losses_above_elevation,
-                    fighter_b_wins_below_elevation, fighter_b_losses_below_elevation])
-
-        return pd.Series([0, 0, 0, 0, 0, 0, 0, 0])
-
@@ -0,0 +1,35 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.features import FIGHT_CSV, FIGHTERS_CSV
+from features.gazetteer import GAZETTEER_CSV, Gazetteer
+
+def main():
+    parser = argparse.ArgumentParser(description='Geocode the venues and hometowns missing from the gazetteer')
+    parser.add_argument('--api_key', type=str, help='Google Maps API key, defaults to the GMAPS_KEY environment variable', default=os.environ.get('GMAPS_KEY'))
+    parser.add_argument('--fights', type=str, help='Fights CSV with the venues', default=FIGHT_CSV)
+    parser.add_argument('--fighters', type=str, help='Fighters CSV with the hometowns', default=FIGHTERS_CSV)
+    parser.add_argument('--gazetteer', type=str, help='Gazetteer CSV to extend', default=GAZETTEER_CSV)
+    args = parser.parse_args()
+
+    places = pd.concat([
+        pd.read_csv(args.fights, encoding='latin-1', usecols=['location'])['location'],
+        pd.read_csv(args.fighters, encoding='latin-1', usecols=['Hometown'])['Hometown']
+    ]).dropna().str.strip().unique()
+
+    if args.api_key is None:
+        gazetteer = Gazetteer(args.gazetteer)
+        known = np.isfinite(gazetteer.resolve(places)[:, 0]).sum()
+        print(f'{known} of {len(places)} places are in {args.gazetteer}, pass --api_key or set GMAPS_KEY to geocode the rest')
+        return
+
+    gazetteer = Gazetteer.with_google_maps(args.api_key, args.gazetteer)
+    known = np.isfinite(gazetteer.resolve(places)[:, 0]).sum()
+    gazetteer.save()
+    print(f'Resolved {known} of {len(places)} places into {args.gazetteer}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from benchmarks.suite import BenchmarkSuite, compare_results, format_comparisons, load_results, write_results
+from benchmarks.synthetic_fights import SIZES, SyntheticFights
+
+BENCHMARKS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../benchmarks'))
+BASELINE_JSON = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+
+def parse_size(size):
+    """
+    Parses a size, a preset of SIZES or a number of fights.
+
+    Parameters:
+        size (str): The size
+
+    Returns:
+        int: The number of fights
+    """
+
+    if size.lower() in SIZES:
+        return SIZES[size.lower()]
+    return int(size)
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the feature pipeline on synthetic fight histories and flag regressions against a baseline')
+    parser.add_argument('--sizes', nargs='+', type=parse_size, help=f'Numbers of fights or presets {list(SIZES)}', default=[SIZES['10k']])
+    parser.add_argument('--stages', nargs='+', help='Stages to time with the stages they require, all stages by default', default=None)
+    parser.add_argument('--seed', type=int, help='Seed of the synthetic histories', default=0)
+    parser.add_argument('--max_workers', type=int, help='Number of processes running stages', default=1)
+    parser.add_argument('--row_workers', type=int, help='Number of threads or processes of the row-wise applies', default=None)
+    parser.add_argument('--row_mode', choices=['serial', 'threads', 'processes'], help='How the row-wise applies run', default=None)
+    parser.add_argument('--progress', action='store_true', help='Report the progress of every stage')
+    parser.add_argument('--workdir', type=str, help='Directory to keep the synthetic histories in, a temporary directory by default', default=None)
+    parser.add_argument('--output', type=str, help='Directory of the timestamped results', default=RESULTS_DIR)
+    parser.add_argument('--baseline', type=str, help='Results to compare with', default=BASELINE_JSON)
+    parser.add_argument('--threshold', type=float, help='Relative slowdown flagged as a regression', default=0.2)
+    parser.add_argument('--save_baseline', action='store_true', help='Save the results as the new baseline')
+    parser.add_argument('--generate_only', type=str, help='Only write the synthetic CSVs of the first size into this directory', default=None)
+    args = parser.parse_args()
+
+    if args.generate_only is not None:
+        fights_path, fighters_path = SyntheticFights(seed=args.seed).write(args.generate_only, args.sizes[0])
+        print(f'Wrote {fights_path} and {fighters_path}')
+        return
+
+    suite = BenchmarkSuite(args.sizes, args.stages, args.seed, args.max_workers, args.row_workers, args.row_mode, args.progress, args.workdir)
+    results = suite.run()
+    print(f'Saved the results to {suite.save(results, args.output)}')
+
+    if args.save_baseline:
+        write_results(results, args.baseline)
+        print(f'Saved the results as the baseline {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}, run with --save_baseline to create one')
+        return
+
+    comparisons = compare_results(results, load_results(args.baseline), args.threshold)
+    print(format_comparisons(comparisons))
+    regressions = [comparison for comparison in comparisons if comparison['regression']]
+    if regressions:
+        print(f'{len(regressions)} regression(s) above {args.threshold:.0%}')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
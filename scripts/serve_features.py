@@ -0,0 +1,34 @@
+import argparse
+import os
+import sys
+from aiohttp import web
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features import FeatureCreation
+from features.feature_store import STATES_PATH
+from features.service import FeatureService, ServiceState
+
+def load_state():
+    """
+    Loads the fighter states saved by scripts/update_features.py into memory
+
+    Returns:
+        ServiceState: The state served to requests
+    """
+
+    return ServiceState(FeatureCreation().load_matchup_features())
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve matchup features and win probabilities over HTTP')
+    parser.add_argument('--host', type=str, help='Host to listen on', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='Port to listen on', default=8080)
+    parser.add_argument('--batch_window_ms', type=float, help='Milliseconds to wait for more feature requests before running a batch', default=5)
+    parser.add_argument('--max_batch', type=int, help='Maximum number of bouts per batch', default=64)
+    parser.add_argument('--watch_interval', type=float, help='Seconds between checks for updated fighter states, 0 to only reload on request', default=5)
+    args = parser.parse_args()
+
+    watch_path = STATES_PATH if args.watch_interval > 0 else None
+    service = FeatureService(load_state, args.batch_window_ms / 1000, args.max_batch, watch_path, args.watch_interval)
+    web.run_app(service.create_app(), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.cache import CACHE_DIR, StageCache
+
+def format_bytes(size):
+    """
+    Formats a size in bytes for display
+
+    Parameters:
+        size (int): Size in bytes
+
+    Returns:
+        str: The size with a binary unit
+    """
+
+    for unit in ['B', 'KiB', 'MiB', 'GiB']:
+        if size < 1024 or unit == 'GiB':
+            return f'{size:.1f} {unit}' if unit != 'B' else f'{size} B'
+        size /= 1024
+
+def list_entries(cache):
+    """
+    Prints the cache entries from the most to the least recently used
+
+    Parameters:
+        cache (StageCache): The stage cache
+    """
+
+    entries = cache.entries()
+    print(f"{'stage':<24} {'key':<14} {'rows':>8} {'columns':>8} {'size':>11}  last used")
+    for entry in entries:
+        last_used = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['last_used']))
+        print(f"{entry['stage']:<24} {entry['key'][:12]:<14} {entry['rows']:>8} {entry['columns']:>8} {format_bytes(entry['bytes']):>11}  {last_used}")
+
+    total = sum(entry['bytes'] for entry in entries)
+    print(f'{len(entries)} entries, {format_bytes(total)} of {format_bytes(cache.max_bytes)}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect and clear the feature stage cache')
+    parser.add_argument('--cache_dir', type=str, help='Directory of the feature cache', default=CACHE_DIR)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help='List the cached stage outputs')
+    clear_parser = subparsers.add_parser('clear', help='Remove cached stage outputs')
+    clear_parser.add_argument('--stage', type=str, help='Only remove the outputs of this stage', default=None)
+    args = parser.parse_args()
+
+    cache = StageCache(args.cache_dir)
+    if args.command == 'list':
+        list_entries(cache)
+    else:
+        print(f'Removed {cache.clear(args.stage)} entries')
+
+if __name__ == "__main__":
+    main()
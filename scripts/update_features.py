@@ -0,0 +1,17 @@
+import argparse
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features import FeatureCreation
+
+def main():
+    parser = argparse.ArgumentParser(description='Bring the feature table and the fighter states matchup queries read up to date with the scraped fights')
+    parser.add_argument('--max_workers', type=int, help='Number of processes running stages', default=None)
+    parser.add_argument('--no_cache', action='store_true', help='Run every stage instead of loading cached outputs')
+    args = parser.parse_args()
+
+    features_df = FeatureCreation(use_cache=not args.no_cache, max_workers=args.max_workers).update_features()
+    print(f'Feature table holds {len(features_df)} fights')
+
+if __name__ == '__main__':
+    main()
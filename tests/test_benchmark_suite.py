@@ -0,0 +1,50 @@
+import os
+import sys
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from benchmarks.suite import BenchmarkSuite, compare_results, format_comparisons, load_results
+
+def create_results(pipeline_s, stage_times):
+    stages = {name : {'stage' : name, 'source' : 'run', 'wall_s' : wall_s} for name, wall_s in stage_times.items()}
+    return {'sizes' : {'1000' : {'pipeline' : {'wall_s' : pipeline_s}, 'stages' : stages}}}
+
+def test_compare_results_flags_slowdowns_above_the_threshold():
+    baseline = create_results(10.0, {'elo' : 2.0, 'date' : 0.01, 'fight_stats' : 5.0})
+    results = create_results(10.5, {'elo' : 3.0, 'date' : 0.03, 'fight_stats' : 4.0})
+
+    comparisons = {comparison['name'] : comparison for comparison in compare_results(results, baseline, threshold=0.2)}
+
+    assert comparisons['elo']['regression']
+    assert comparisons['elo']['ratio'] == pytest.approx(1.5)
+    # Tripled but by less than min_delta_s
+    assert not comparisons['date']['regression']
+    assert not comparisons['fight_stats']['regression']
+    assert not comparisons['pipeline']['regression']
+    assert 'REGRESSION' in format_comparisons(list(comparisons.values()))
+
+def test_compare_results_skips_sizes_and_stages_missing_from_the_baseline():
+    baseline = create_results(10.0, {'elo' : 2.0})
+    results = create_results(10.0, {'elo' : 2.0, 'date' : 1.0})
+    results['sizes']['5000'] = results['sizes']['1000']
+
+    comparisons = compare_results(results, baseline)
+
+    assert sorted((comparison['size'], comparison['name']) for comparison in comparisons) == [(1000, 'elo'), (1000, 'pipeline')]
+
+def test_run_times_the_pipeline_and_the_selected_stages(tmp_path):
+    suite = BenchmarkSuite([150], stages=['strength_of_schedule', 'date'], workdir=str(tmp_path))
+
+    results = suite.run()
+    path = suite.save(results, str(tmp_path / 'results'))
+
+    size_results = results['sizes']['150']
+    assert size_results['fights'] == 150
+    assert size_results['pipeline']['rows'] == 150
+    assert set(size_results['stages']) == {'elo', 'strength_of_schedule', 'date'}
+    assert all(stage['source'] == 'run' and stage['wall_s'] > 0 for stage in size_results['stages'].values())
+    assert load_results(path) == results
+    assert all(not comparison['regression'] for comparison in compare_results(results, results))
+
+def test_unknown_stages_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        BenchmarkSuite([50], stages=['elo', 'missing'], workdir=str(tmp_path)).run()
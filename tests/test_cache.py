@@ -0,0 +1,95 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.cache import CleanedDataCache, StageCache
+from features.clean_data import CleanData
+from features.scheduler import Stage, StageScheduler
+
+TEST_FIGHTS_CSV = os.path.join(os.path.dirname(__file__), 'test_fights.csv')
+
+def write_fights_csv(tmp_path):
+    """
+    Copies the test fights into tmp_path with the columns the current scraper writes.
+
+    Returns:
+        str: Path to the copied CSV
+    """
+
+    fights = pd.read_csv(TEST_FIGHTS_CSV, encoding='latin-1')
+    fights['outcome_detail'] = ''
+    csv_path = str(tmp_path / 'fights.csv')
+    fights.to_csv(csv_path, index=False, encoding='latin-1')
+    return csv_path
+
+def test_cached_fights_match_cleaned_fights(tmp_path):
+    csv_path = write_fights_csv(tmp_path)
+    cache = CleanedDataCache(str(tmp_path / 'cache'))
+    expected = CleanData().clean_data(pd.read_csv(csv_path, encoding='latin-1'))
+
+    cache.load_or_clean(csv_path, CleanData())
+    cached = cache.load_or_clean(csv_path, CleanData())
+
+    pd.testing.assert_frame_equal(cached, expected)
+
+def is_memory_mapped(values):
+    base = values
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    return base is not None
+
+def test_cached_numeric_columns_are_memory_mapped(tmp_path):
+    csv_path = write_fights_csv(tmp_path)
+    cache = CleanedDataCache(str(tmp_path / 'cache'))
+    cache.load_or_clean(csv_path, CleanData())
+    cached = cache.load_or_clean(csv_path, CleanData())
+
+    numeric_cols = [col for col in cached.columns if cached[col].dtype.kind in 'iuf']
+    assert numeric_cols and all(is_memory_mapped(cached[col].to_numpy()) for col in numeric_cols)
+
+    # The maps are copy-on-write, changing the frame never changes the cache
+    col = numeric_cols[0]
+    original = cached.loc[0, col]
+    cached.loc[0, col] = original + 1
+    assert cache.load_or_clean(csv_path, CleanData()).loc[0, col] == original
+
+def test_changed_csv_invalidates_cache(tmp_path):
+    csv_path = write_fights_csv(tmp_path)
+    cache = CleanedDataCache(str(tmp_path / 'cache'))
+    cache.load_or_clean(csv_path, CleanData())
+
+    fights = pd.read_csv(csv_path, encoding='latin-1')
+    fights.loc[0, 'fighter_a_total_kd'] = 7
+    fights.to_csv(csv_path, index=False, encoding='latin-1')
+
+    assert cache.load_or_clean(csv_path, CleanData()).loc[0, 'fighter_a_total_kd'] == 7
+    assert len(os.listdir(tmp_path / 'cache' / 'cleaned')) == 1
+
+def add_double(df):
+    add_double.calls += 1
+    df['double'] = df['x'] * 2
+    return df
+
+add_double.calls = 0
+
+def test_unchanged_stages_load_from_stage_cache(tmp_path):
+    df = pd.DataFrame({'x': [1, 2, 3]})
+    scheduler = StageScheduler(1, StageCache(str(tmp_path)))
+    calls = add_double.calls
+
+    first = scheduler.run(df, [Stage('double', add_double)])
+    second = scheduler.run(df, [Stage('double', add_double)])
+    changed = scheduler.run(pd.DataFrame({'x': [1, 2, 4]}), [Stage('double', add_double)])
+
+    pd.testing.assert_frame_equal(first, second)
+    assert changed['double'].tolist() == [2, 4, 8]
+    assert add_double.calls - calls == 2
+
+def test_stage_cache_evicts_least_recently_used(tmp_path):
+    cache = StageCache(str(tmp_path), max_bytes=0)
+    cache.save('old', pd.DataFrame({'x': [1.0]}), 'stage')
+    cache.save('new', pd.DataFrame({'x': [2.0]}), 'stage')
+
+    assert [entry['key'] for entry in cache.entries()] == ['new']
+    assert cache.clear('stage') == 1
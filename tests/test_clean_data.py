@@ -0,0 +1,107 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.clean_data import CleanData
+
+TEST_FIGHTS_CSV = os.path.join(os.path.dirname(__file__), 'test_fights.csv')
+
+def load_fights():
+    # The test fights predate the scraper's outcome_detail and elevation columns
+    fights_df = pd.read_csv(TEST_FIGHTS_CSV, encoding='latin-1')
+    fights_df['outcome_detail'] = ''
+    fights_df['elevation'] = np.linspace(0, 2000, len(fights_df))
+    return fights_df
+
+def test_stats_are_parsed_into_the_schema_types():
+    fights_df = load_fights()
+    fights_df['fighter_a_round_1_sig_str_landed'] = fights_df['fighter_a_round_1_sig_str_landed'].astype(object)
+    fights_df['fighter_a_round_1_td_pct'] = fights_df['fighter_a_round_1_td_pct'].astype(object)
+    fights_df['fighter_a_round_1_ctrl'] = fights_df['fighter_a_round_1_ctrl'].astype(object)
+    fights_df.loc[:2, 'fighter_a_round_1_sig_str_landed'] = ['12 of 30', 7, ' 3 of 4 ']
+    fights_df.loc[:2, 'fighter_a_round_1_td_pct'] = ['2 of 4', '0 of 0', '75%']
+    fights_df.loc[:2, 'fighter_a_round_1_ctrl'] = ['2:05', '0:00', 90]
+
+    cleaner = CleanData()
+    cleaned_df = cleaner.clean_data(fights_df)
+
+    np.testing.assert_array_equal(cleaned_df.loc[:2, 'fighter_a_round_1_sig_str_landed'], [12, 7, 3])
+    # 0 of 0 has no ratio and is rejected to 0
+    np.testing.assert_allclose(cleaned_df.loc[:2, 'fighter_a_round_1_td_pct'], [0.5, 0.0, 0.75])
+    np.testing.assert_array_equal(cleaned_df.loc[:2, 'fighter_a_round_1_ctrl'], [125, 0, 90])
+    for col, (dtype, _) in cleaner.schema.items():
+        assert cleaned_df[col].dtype == dtype, col
+
+def test_percentages_share_one_scale():
+    fights_df = load_fights()
+    # Numbers above 1 make every number of the column a percentage, including 1 and 0.5
+    fights_df['fighter_a_round_1_sig_str_pct'] = pd.Series(['45%', 45, 0.5, '9 of 20', 0, 1, 100, 150, '---', '12 of 5'], dtype=object)
+    # Without them every number is a fraction, and 1 is 100%
+    fights_df['fighter_a_round_1_td_pct'] = pd.Series(['45%', 0.45, 0.5, '9 of 20', 0, 1, 0.9, '---'], dtype=object)
+
+    cleaner = CleanData()
+    cleaned_df = cleaner.clean_data(fights_df)
+
+    np.testing.assert_allclose(cleaned_df.loc[:9, 'fighter_a_round_1_sig_str_pct'], [0.45, 0.45, 0.005, 0.45, 0.0, 0.01, 1.0, 0.0, 0.0, 0.0], rtol=1e-6)
+    np.testing.assert_allclose(cleaned_df.loc[:7, 'fighter_a_round_1_td_pct'], [0.45, 0.45, 0.5, 0.45, 0.0, 1.0, 0.9, 0.0], rtol=1e-6)
+    assert cleaned_df['fighter_a_round_1_sig_str_pct'].dtype == 'float32'
+
+def test_rejected_cells_are_counted_per_rule():
+    fights_df = load_fights()
+    baseline = CleanData()
+    baseline.clean_data(load_fights())
+
+    for col in ['fighter_a_round_1_kd', 'fighter_b_total_td_pct', 'fighter_a_total_ctrl']:
+        fights_df[col] = fights_df[col].astype(object)
+    fights_df.loc[0, 'fighter_a_round_1_kd'] = 'two'
+    fights_df.loc[:1, 'fighter_b_total_td_pct'] = ['250%', 'n/a']
+    fights_df.loc[0, 'fighter_a_total_ctrl'] = '1:5'
+
+    cleaner = CleanData()
+    cleaned_df = cleaner.clean_data(fights_df)
+
+    assert cleaner.rejected_cells['count'] == baseline.rejected_cells['count'] + 1
+    assert cleaner.rejected_cells['duration'] == baseline.rejected_cells['duration'] + 1
+    # The fixture's '100%' becomes a rejected '250%', its '---' was already rejected
+    assert cleaner.rejected_cells['percent'] == baseline.rejected_cells['percent'] + 1
+    assert cleaned_df.loc[0, 'fighter_a_round_1_kd'] == 0
+    assert cleaned_df.loc[0, 'fighter_a_total_ctrl'] == 0
+
+def decode_categories(df):
+    decoded_df = df.copy()
+    for col in decoded_df.columns:
+        if isinstance(decoded_df[col].dtype, pd.CategoricalDtype):
+            decoded_df[col] = decoded_df[col].astype(object)
+    return decoded_df
+
+def test_interned_categories_round_trip():
+    fights_df = load_fights()
+
+    cleaner = CleanData()
+    cleaned_df = cleaner.clean_data(load_fights())
+    decoded_df = decode_categories(cleaned_df)
+
+    for group, cols in cleaner.category_groups.items():
+        for col in cols:
+            assert isinstance(cleaned_df[col].dtype, pd.CategoricalDtype)
+            assert cleaned_df[col].cat.categories.equals(cleaner.categories[group])
+            if col != 'division':
+                assert decoded_df[col].tolist() == fights_df[col].fillna(0).tolist()
+
+    # Fighter a, fighter b and the winner share one lookup table, so equal IDs have equal codes
+    codes = {col : cleaned_df[col].cat.codes.to_numpy() for col in cleaner.category_groups['fighter_id']}
+    np.testing.assert_array_equal(codes['winner_id'] == codes['fighter_a_id'], fights_df['winner_id'] == fights_df['fighter_a_id'])
+    np.testing.assert_array_equal(codes['winner_id'] == codes['fighter_b_id'], fights_df['winner_id'] == fights_df['fighter_b_id'])
+
+def test_stages_match_on_interned_and_string_columns():
+    from features.elo_features import Elo
+    from features.win_loss_stats_features import WinLossStats
+
+    cleaned_df = CleanData().clean_data(load_fights())
+    decoded_df = decode_categories(cleaned_df)
+    fighter_df = pd.read_csv(os.path.join(os.path.dirname(__file__), 'test_fighters.csv'), encoding='latin-1')
+
+    pd.testing.assert_frame_equal(decode_categories(Elo().compute_elo_features(cleaned_df)), Elo().compute_elo_features(decoded_df))
+    pd.testing.assert_frame_equal(decode_categories(WinLossStats().create_win_loss_stat_features(cleaned_df, fighter_df)),
+                                  WinLossStats().create_win_loss_stat_features(decoded_df, fighter_df))
@@ -0,0 +1,24 @@
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.decayed_stats import DecayedStats
+
+def test_sums_halve_after_each_half_life():
+    decayed = DecayedStats(half_lives=[10, 20], n_values=2)
+    decayed.update(0, np.datetime64('2020-01-01'), [4, 8])
+
+    np.testing.assert_allclose(decayed.read(0, np.datetime64('2020-01-21')), [[1, 2], [2, 4]])
+    np.testing.assert_array_equal(decayed.read(1, np.datetime64('2020-01-21')), 0)
+
+def test_sweep_matches_online_updates():
+    fighters = np.array([[0, 1], [1, 0], [0, 2]])
+    dates = np.array(['2020-01-01', '2020-03-01', '2020-09-01'], dtype='datetime64[ns]')
+    values = np.arange(12, dtype=float).reshape(3, 2, 2)
+
+    sums = DecayedStats(half_lives=[90], n_values=2).sweep(fighters, dates, values)
+
+    online = DecayedStats(half_lives=[90], n_values=2)
+    online.update(0, dates[0], values[0, 0])
+    online.update(0, dates[1], values[1, 1])
+    np.testing.assert_allclose(sums[2, 0], online.read(0, dates[2]))
@@ -0,0 +1,60 @@
+import io
+import os
+import sys
+import pandas as pd
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.executor import RowExecutor, stage_execution
+from features.progress import StageProgress, format_seconds
+from features.row_apply import apply_fight_rows, apply_rows
+
+def count_prior_fights(df, fighter_a_id, fighter_b_id, index, scale=1):
+    prior_df = df.loc[:index - 1]
+    fights = int(((prior_df['fighter_a_id'] == fighter_a_id) | (prior_df['fighter_b_id'] == fighter_a_id)).sum())
+    return pd.Series([fights, fights * scale])
+
+def double_rounds(block):
+    return block['rounds'] * 2
+
+def create_fights():
+    return pd.DataFrame({
+        'fighter_a_id': ['a', 'b', 'a', 'c', 'a', 'b', 'c', 'a', 'b'],
+        'fighter_b_id': ['b', 'c', 'c', 'a', 'b', 'a', 'b', 'c', 'c'],
+        'rounds': [3, 3, 5, 3, 3, 5, 3, 3, 3]
+    })
+
+@pytest.mark.parametrize('mode', RowExecutor.MODES)
+def test_modes_match_pandas_apply(mode):
+    df = create_fights()
+    expected = df.apply(lambda row: count_prior_fights(df, row['fighter_a_id'], row['fighter_b_id'], row.name, scale=0.5), axis=1)
+    with RowExecutor(mode, max_workers=2) as executor:
+        res = executor.map_rows(df, count_prior_fights, df, kwargs={'scale': 0.5})
+        blocks = executor.map_blocks(df, double_rounds)
+        rows = executor.apply(df, lambda row: row['rounds'] + 1)
+
+    pd.testing.assert_frame_equal(res, expected)
+    pd.testing.assert_series_equal(blocks, df['rounds'] * 2)
+    pd.testing.assert_series_equal(rows, df.apply(lambda row: row['rounds'] + 1, axis=1))
+
+def test_stage_reports_one_line():
+    df = create_fights()
+    stream = io.StringIO()
+    with stage_execution('prior_fights', 'threads', 2):
+        from features.executor import STAGE_PROGRESS
+        progress = STAGE_PROGRESS.get()
+        progress.enabled, progress.stream, progress.interactive = True, stream, False
+        apply_fight_rows(df, count_prior_fights, df)
+        apply_rows(df, lambda row: row['rounds'], include_progress=True)
+
+    assert stream.getvalue().splitlines()[-1].startswith('prior_fights: 18 rows in 2 passes')
+
+def test_progress_is_silent_when_disabled():
+    stream = io.StringIO()
+    progress = StageProgress('silent', enabled=False, stream=stream)
+    progress.start_pass(2)
+    assert progress.advance('value') == 'value'
+    progress.close()
+
+    assert stream.getvalue() == ''
+    assert format_seconds(59.6) == '1:00'
+    assert format_seconds(3725) == '1:02:05'
@@ -0,0 +1,83 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.date_features import DateFeatures
+from features.gazetteer import EARTH_RADIUS_KM, Gazetteer, haversine_km
+
+def write_gazetteer(tmp_path):
+    path = str(tmp_path / 'gazetteer.csv')
+    pd.DataFrame({
+        'place' : ['Denver, Colorado, USA', 'Sao Paulo, Sao Paulo, Brazil', 'Birmingham, Alabama, USA', 'Birmingham, England, United Kingdom'],
+        'lat' : [39.74, -23.55, 33.52, 52.49],
+        'lon' : [-104.99, -46.63, -86.80, -1.89]
+    }).to_csv(path, index=False)
+    return path
+
+def test_resolve_hits_misses_and_aliases(tmp_path):
+    gazetteer = Gazetteer(write_gazetteer(tmp_path))
+
+    coords = gazetteer.resolve(['Denver, Colorado, USA', ' denver,  colorado ', 'São Paulo', 'Makhachkala, Dagestan', None, 'Birmingham'])
+
+    np.testing.assert_allclose(coords[:3], [[39.74, -104.99], [39.74, -104.99], [-23.55, -46.63]])
+    # Unknown, missing and ambiguous places
+    assert np.isnan(coords[3:]).all()
+    np.testing.assert_allclose(gazetteer.resolve(['Birmingham, England'])[0], [52.49, -1.89])
+
+def test_misses_are_geocoded_once_and_only_saved_on_request(tmp_path):
+    path = write_gazetteer(tmp_path)
+    calls = []
+    def geocode(place):
+        calls.append(place)
+        return (42.98, 47.50) if place.startswith('Makhachkala') else None
+    gazetteer = Gazetteer(path, geocode)
+
+    coords = gazetteer.resolve(['Makhachkala, Dagestan', 'Makhachkala, Dagestan', 'Nowhere', 'Denver, Colorado'])
+
+    assert calls == ['Makhachkala, Dagestan', 'Nowhere']
+    np.testing.assert_allclose(coords[0], [42.98, 47.50])
+    assert len(pd.read_csv(path)) == 4
+
+    gazetteer.save()
+    np.testing.assert_allclose(Gazetteer(path).resolve(['Makhachkala'])[0], [42.98, 47.50])
+
+def test_saved_places_with_accents_resolve_after_a_reload(tmp_path):
+    path = write_gazetteer(tmp_path)
+    gazetteer = Gazetteer(path, lambda place: (45.50, -73.57))
+
+    np.testing.assert_allclose(gazetteer.resolve(['Montréal, Québec, Canada'])[0], [45.50, -73.57])
+    gazetteer.save()
+
+    reloaded = Gazetteer(path)
+    np.testing.assert_allclose(reloaded.resolve(['Montréal, Québec, Canada', 'Montréal'])[0:2], [[45.50, -73.57], [45.50, -73.57]])
+    np.testing.assert_allclose(reloaded.resolve(['Denver, Colorado'])[0], [39.74, -104.99])
+
+def test_haversine_known_distances():
+    lat_a = np.array([51.5074, 40.7128, 0.0, 0.0, np.nan])
+    lon_a = np.array([-0.1278, -74.0060, 0.0, 0.0, 0.0])
+    lat_b = np.array([48.8566, 34.0522, 0.0, 0.0, 0.0])
+    lon_b = np.array([2.3522, -118.2437, 1.0, 180.0, 0.0])
+
+    distances = haversine_km(lat_a, lon_a, lat_b, lon_b)
+
+    # London to Paris, New York to Los Angeles, one degree and half the equator
+    np.testing.assert_allclose(distances[:2], [343.6, 3935.7], atol=1)
+    assert distances[2] == pytest.approx(2 * np.pi * EARTH_RADIUS_KM / 360)
+    assert distances[3] == pytest.approx(np.pi * EARTH_RADIUS_KM)
+    assert np.isnan(distances[4])
+
+def test_home_advantage_does_not_write_the_gazetteer(tmp_path):
+    path = write_gazetteer(tmp_path)
+    fighter_df = pd.DataFrame({'ID' : ['a', 'b'], 'Hometown' : ['Denver, Colorado', 'Makhachkala, Dagestan']})
+    fights_df = pd.DataFrame({'fighter_a_id' : ['a'], 'fighter_b_id' : ['b'], 'location' : ['Denver, Colorado, USA']})
+    date_features = DateFeatures(Gazetteer(path, lambda place: (42.98, 47.50)))
+
+    features_df = date_features.create_home_adv_features(fighter_df, fights_df)
+
+    assert features_df.loc[0, 'fighter_a_home_advantage'] == 1
+    assert features_df.loc[0, 'fighter_a_travel_distance'] == pytest.approx(0)
+    assert features_df.loc[0, 'fighter_b_home_advantage'] == 0
+    assert features_df.loc[0, 'fighter_b_travel_distance'] > 10000
+    assert len(pd.read_csv(path)) == 4
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+
+# Budget for the package's own import, timed after numpy and pandas are loaded so it measures features alone
+IMPORT_BUDGET_SECONDS = 0.25
+OPTIONAL_MODULES = ['swifter', 'googlemaps', 'geopy', 'requests', 'bs4', 'tqdm', 'aiohttp']
+# Standard library modules only the profiled, traced or parallel runs need
+ON_USE_MODULES = ['multiprocessing', 'cProfile', 'pstats', 'tracemalloc']
+
+IMPORT_SCRIPT = """
+import sys
+import time
+import numpy
+import pandas
+
+start = time.perf_counter()
+from features import FeatureCreation
+print(time.perf_counter() - start)
+print(','.join(sorted(m for m in {modules} if m in sys.modules)))
+"""
+
+def run_import(modules):
+    """
+    Imports the features package in a fresh interpreter that already imported numpy and pandas.
+
+    Parameters:
+        modules (list): Modules to check for
+
+    Returns:
+        tuple: The import time in seconds and the list of the modules that got imported
+    """
+
+    output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT.format(modules=modules)], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True).stdout.splitlines()
+    return float(output[0]), [m for m in output[1].split(',') if m]
+
+def test_import_does_not_load_optional_dependencies():
+    _, loaded = run_import(OPTIONAL_MODULES)
+    assert loaded == [], f"Importing features loaded optional dependencies: {loaded}"
+
+def test_import_does_not_load_profiling_or_process_pools():
+    _, loaded = run_import(ON_USE_MODULES)
+    assert loaded == [], f"Importing features loaded modules only some runs use: {loaded}"
+
+def test_import_time_budget():
+    # Best of three runs to keep the test stable on noisy machines
+    import_time = min(run_import(OPTIONAL_MODULES)[0] for _ in range(3))
+    assert import_time < IMPORT_BUDGET_SECONDS, f"Importing features took {import_time:.2f}s on top of pandas, budget is {IMPORT_BUDGET_SECONDS}s"
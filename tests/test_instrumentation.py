@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+import pandas as pd
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.instrumentation import RunReport
+from features.scheduler import Stage, StageScheduler
+
+def add_double(df):
+    df['double'] = df['x'] * 2
+    return df
+
+def add_powers(df):
+    df['square'] = df['double'] ** 2
+    df['cube'] = df['double'] ** 3
+    return df
+
+def create_stages():
+    return [
+        Stage('double', add_double, columns=['x']),
+        Stage('powers', add_powers, columns=[], requires=['double'])
+    ]
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_report_has_metrics_of_every_stage(tmp_path, max_workers):
+    df = pd.DataFrame({'x': range(100)})
+    report = RunReport(str(tmp_path / 'reports' / 'run.json'), profile_top=5)
+    StageScheduler(max_workers=max_workers, report=report).run(df, create_stages())
+    report.write()
+
+    with open(tmp_path / 'reports' / 'run.json') as f:
+        res = json.load(f)
+
+    assert [stage['stage'] for stage in res['stages']] == ['double', 'powers']
+    assert [stage['columns'] for stage in res['stages']] == [1, 2]
+    assert res['columns'] == 3 and res['rows'] == 100
+    for stage in res['stages']:
+        assert stage['source'] == 'run' and stage['rows'] == 100
+        assert stage['wall_s'] > 0 and stage['rows_per_s'] > 0 and stage['peak_rss_mb'] > 0
+        assert 'traced_peak_mb' in stage
+        assert 0 < len(stage['hotspots']) <= 5
+
+def test_skipped_stages_are_listed_without_metrics(tmp_path):
+    df = pd.DataFrame({'x': range(10), 'fighter_a_id': ['a'] * 10, 'fighter_b_id': ['b'] * 10})
+    stages = [Stage('double', add_double, columns=['x'], history='fighters')]
+    scheduler = StageScheduler(max_workers=1)
+    previous = scheduler.run(df, stages)
+
+    report = RunReport(str(tmp_path / 'run.json'), trace_memory=False)
+    StageScheduler(max_workers=1, report=report).recompute(df, stages, previous, scheduler.stage_columns)
+
+    assert report.to_dict()['stages'] == [{'stage': 'double', 'source': 'skipped'}]
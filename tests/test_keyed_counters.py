@@ -0,0 +1,47 @@
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+import pandas as pd
+from features.keyed_counters import KeyedCounters, lookup_codes, shared_codes
+
+def test_sweep_emits_pre_fight_counts():
+    # Fighters 0 and 1 fight three times at location 7, the last fight is a draw
+    fighters = np.array([[0, 1], [1, 0], [0, 1], [0, 2]])
+    winners = np.array([0, 1, -1, 2])
+    locations = np.array([[7, 7], [7, 7], [7, 7], [-1, -1]])
+
+    counts = KeyedCounters().sweep(fighters, winners, {'h2h' : fighters[:, ::-1], 'location' : locations})
+
+    np.testing.assert_array_equal(counts['h2h'][:, 0], [[0, 0], [0, 1], [1, 1], [0, 0]])
+    np.testing.assert_array_equal(counts['location'][2], [[1, 1], [1, 1]])
+    np.testing.assert_array_equal(counts['location'][3], [[0, 0], [0, 0]])
+
+def test_sweep_follows_order():
+    fighters = np.array([[0, 1], [0, 1]])
+    winners = np.array([0, 0])
+
+    counts = KeyedCounters().sweep(fighters, winners, {'h2h' : fighters[:, ::-1]}, order=[1, 0])
+
+    np.testing.assert_array_equal(counts['h2h'][:, 0], [[1, 0], [0, 0]])
+
+def test_read_matches_the_next_fight():
+    fighters = np.array([[0, 1], [1, 0], [0, 1], [0, 1]])
+    winners = np.array([0, 1, -1, 0])
+    locations = np.array([[7, 7], [7, 7], [7, 7], [7, 7]])
+
+    counts = KeyedCounters().sweep(fighters, winners, {'h2h' : fighters[:, ::-1], 'location' : locations})
+    counters = KeyedCounters()
+    counters.sweep(fighters[:3], winners[:3], {'h2h' : fighters[:3, ::-1], 'location' : locations[:3]})
+
+    assert counters.read('h2h', 0, 1) == list(counts['h2h'][3, 0])
+    assert counters.read('location', 1, 7) == list(counts['location'][3, 1])
+    assert counters.read('location', 1, -1) == [0, 0]
+    assert counters.read('referee', 1, 3) == [0, 0]
+
+def test_lookup_codes_of_new_rows():
+    fighter_a_codes, fighter_b_codes, values = shared_codes(pd.Series(['f1', 'f2']), pd.Series(['f3', 'f1']), return_values=True)
+
+    codes = lookup_codes(values, pd.Series(['f2', 'f9']), pd.Series(['f1', 'f3']))
+
+    np.testing.assert_array_equal(codes, [[fighter_a_codes[1], fighter_a_codes[0]], [-1, fighter_b_codes[0]]])
@@ -0,0 +1,155 @@
+import os
+import pickle
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from benchmarks.synthetic_fights import SyntheticFights
+from features.features import FeatureCreation
+from features.matchup_features import MatchupFeatures
+from features.row_apply import apply_rows
+from features.scheduler import Stage, StageScheduler
+
+def add_prior_fights(df):
+    df['prior_fights'] = apply_rows(df, lambda row: (df.loc[:row.name - 1, ['fighter_a_id', 'fighter_b_id']] == row['fighter_a_id']).any(axis=1).sum())
+    return df
+
+def get_fight_counts(df):
+    return pd.concat([df['fighter_a_id'], df['fighter_b_id']]).value_counts().to_dict()
+
+def create_matchup_prior_fights(fight_counts, bouts):
+    return pd.DataFrame({'prior_fights': [fight_counts.get(fighter_id, 0) for fighter_id in bouts['fighter_a_id']]}, index=bouts.index)
+
+def add_opponent_wins(df):
+    # Wins of fighter b's past opponents before the fight
+    def count(row):
+        past = df.loc[:row.name - 1]
+        opponents = set(past.loc[past['fighter_a_id'] == row['fighter_b_id'], 'fighter_b_id']) | set(past.loc[past['fighter_b_id'] == row['fighter_b_id'], 'fighter_a_id'])
+        return past['winner_id'].isin(opponents).sum()
+
+    df['opponent_wins'] = apply_rows(df, count)
+    return df
+
+def get_opponents_and_wins(df):
+    opponents = {}
+    for fighter_a_id, fighter_b_id in zip(df['fighter_a_id'], df['fighter_b_id']):
+        opponents.setdefault(fighter_a_id, set()).add(fighter_b_id)
+        opponents.setdefault(fighter_b_id, set()).add(fighter_a_id)
+    return opponents, df['winner_id'].value_counts().to_dict()
+
+def create_matchup_opponent_wins(states, bouts):
+    opponents, wins = states
+    return pd.DataFrame({'opponent_wins': [sum(wins.get(opponent, 0) for opponent in opponents.get(fighter_id, set())) for fighter_id in bouts['fighter_b_id']]}, index=bouts.index)
+
+def add_month(df):
+    df['month'] = pd.to_datetime(df['date']).dt.month
+    return df
+
+def create_matchup_month(states, bouts):
+    return pd.DataFrame({'month': pd.DatetimeIndex(bouts['date']).month}, index=bouts.index)
+
+def create_stages():
+    return [
+        Stage('prior_fights', add_prior_fights, history='fighters', state=get_fight_counts, matchup=create_matchup_prior_fights),
+        Stage('opponent_wins', add_opponent_wins, history='opponents', state=get_opponents_and_wins, matchup=create_matchup_opponent_wins),
+        Stage('month', add_month, matchup=create_matchup_month)
+    ]
+
+def create_fights():
+    fighter_a_ids = ['f1', 'f3', 'f1', 'f5', 'f2']
+    fighter_b_ids = ['f2', 'f4', 'f3', 'f6', 'f4']
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2020-01-01', '2020-02-01', '2020-03-01', '2020-04-01', '2020-05-01']),
+        'location': ['Las Vegas, Nevada, USA'] * 5,
+        'elevation': [610.0] * 5,
+        'fighter_a': [fighter_id.upper() for fighter_id in fighter_a_ids],
+        'fighter_a_id': fighter_a_ids,
+        'fighter_b': [fighter_id.upper() for fighter_id in fighter_b_ids],
+        'fighter_b_id': fighter_b_ids,
+        'winner_id': ['f1', 'f3', 'f3', 'f5', 'f2'],
+        'division': ['Lightweight'] * 5,
+        'outcome_format': [3] * 5
+    })
+
+def create_matchups(stages, fights_df):
+    stage_columns = {'prior_fights': ['prior_fights'], 'opponent_wins': ['opponent_wins'], 'month': ['month']}
+    return MatchupFeatures.from_features(stages, StageScheduler(1).run(fights_df, stages), stage_columns)
+
+def test_card_matches_fights_appended_to_full_run():
+    stages = create_stages()
+    fights_df = create_fights()
+    # The states are all a query reads, they are saved and loaded on their own
+    matchups = MatchupFeatures(stages, pickle.loads(pickle.dumps(create_matchups(stages, fights_df).states)))
+
+    # f1 fights twice and f3 is a past opponent of f1, none of the bouts reads another one
+    bouts = [
+        {'fighter_a_id': 'f1', 'fighter_b_id': 'f4', 'date': '2020-06-01', 'location': 'Las Vegas, Nevada, USA', 'division': 'Lightweight', 'rounds': 3},
+        {'fighter_a_id': 'f3', 'fighter_b_id': 'f6', 'date': '2020-07-01', 'location': 'Las Vegas, Nevada, USA', 'division': 'Lightweight', 'rounds': 3},
+        {'fighter_a_id': 'f2', 'fighter_b_id': 'f1', 'date': '2020-06-01', 'location': 'Las Vegas, Nevada, USA', 'division': 'Lightweight', 'rounds': 5},
+        {'fighter_a_id': 'f7', 'fighter_b_id': 'f8', 'date': '2020-06-01', 'location': 'Las Vegas, Nevada, USA', 'division': 'Lightweight', 'rounds': 3}
+    ]
+    card = matchups.features_for_card(bouts)
+
+    assert list(card.columns) == ['prior_fights', 'opponent_wins', 'month']
+    for i, bout in enumerate(bouts):
+        fight = create_fights().iloc[:1].assign(date=pd.Timestamp(bout['date']), fighter_a_id=bout['fighter_a_id'], fighter_b_id=bout['fighter_b_id'], winner_id=0, outcome_format=bout['rounds'])
+        full = StageScheduler(1).run(pd.concat([fights_df, fight], ignore_index=True), stages)
+        assert list(card.iloc[i]) == list(full[['prior_fights', 'opponent_wins', 'month']].iloc[-1])
+
+    single = matchups.features_for_matchup('f1', 'f4', '2020-06-01', 'Las Vegas, Nevada, USA', 'Lightweight', 3)
+    assert list(single) == list(card.iloc[0])
+
+def test_bouts_must_follow_the_last_fight():
+    matchups = create_matchups(create_stages(), create_fights())
+
+    with pytest.raises(ValueError):
+        matchups.features_for_matchup('f1', 'f4', '2020-05-01', 'Las Vegas, Nevada, USA', 'Lightweight', 3)
+
+def append_bout(cleaned_df, bout, elevations):
+    # The bout as the next row of the fights, the fields an upcoming bout doesn't have are left from the last fight
+    df = cleaned_df.copy()
+    for col in ['fighter_a_id', 'fighter_b_id', 'winner_id']:
+        df[col] = df[col].cat.set_categories(df[col].cat.categories.union(pd.Index([bout['fighter_a_id'], bout['fighter_b_id']], dtype=object)))
+
+    row = df.iloc[[-1]].copy()
+    row.index = [len(df)]
+    row['fighter_a_id'] = bout['fighter_a_id']
+    row['fighter_b_id'] = bout['fighter_b_id']
+    row['date'] = pd.Timestamp(bout['date'])
+    row['elevation'] = elevations.get(bout['location'], 0)
+    row['outcome_format'] = bout['rounds']
+    row['referee'] = np.nan
+    return pd.concat([df, row])
+
+def test_feature_creation_matchups_match_a_full_run(tmp_path, monkeypatch):
+    _, fighters_path = SyntheticFights(seed=7).write(str(tmp_path / 'data'), 60)
+    # A fighter without fights yet, only known from the fighters
+    fighters_df = pd.read_csv(fighters_path, encoding='latin-1')
+    pd.concat([fighters_df, fighters_df.iloc[:1].assign(ID='debutant')]).to_csv(fighters_path, index=False, encoding='latin-1')
+    monkeypatch.chdir(tmp_path)
+
+    creation = FeatureCreation(use_cache=False, max_workers=1, progress=False)
+    creation.update_features()
+    matchups = creation.load_matchup_features()
+
+    cleaned_df = creation.load_cleaned_fights()
+    last_fight = cleaned_df.iloc[-1]
+    bouts = [
+        {'fighter_a_id': last_fight['fighter_a_id'], 'fighter_b_id': last_fight['fighter_b_id'], 'date': last_fight['date'] + pd.Timedelta(days=30),
+         'location': last_fight['location'], 'division': last_fight['division'], 'rounds': 5},
+        {'fighter_a_id': cleaned_df['fighter_b_id'].iloc[0], 'fighter_b_id': 'debutant', 'date': last_fight['date'] + pd.Timedelta(days=400),
+         'location': last_fight['location'], 'division': last_fight['division'], 'rounds': 3}
+    ]
+    for bout in bouts:
+        for field in ['location', 'division']:
+            if bout[field] not in cleaned_df[field].cat.categories:
+                cleaned_df[field] = cleaned_df[field].cat.add_categories([bout[field]])
+
+    card = matchups.features_for_card(bouts)
+
+    elevations = dict(zip(cleaned_df['location'].astype(object), cleaned_df['elevation']))
+    for i, bout in enumerate(bouts):
+        full = StageScheduler(1).run(append_bout(cleaned_df, bout, elevations), creation.create_stages())
+        expected = full[card.columns].iloc[-1]
+        np.testing.assert_allclose(card.iloc[i].to_numpy(dtype=float), expected.to_numpy(dtype=float), equal_nan=True)
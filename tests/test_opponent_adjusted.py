@@ -0,0 +1,17 @@
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.opponent_adjusted import OpponentAdjustedStats
+
+def test_rates_are_adjusted_by_opponents_pre_fight_conceded_rate():
+    # Fighter 2 concedes 10 per minute to fighter 1, then fighter 0 lands 15 per minute on fighter 2
+    fighters = np.array([[1, 2], [0, 2], [0, 3]])
+    landed = np.array([[[100], [0]], [[150], [50]], [[0], [0]]])
+    minutes = np.array([10.0, 10.0, 10.0])
+
+    means = OpponentAdjustedStats(windows=[1]).sweep(fighters, landed, minutes)
+
+    # Fighter 0 debuts against an opponent with history, so only fighter 0's rate is adjusted
+    np.testing.assert_allclose(means[2, 0, :, 0], [5, 5])
+    np.testing.assert_array_equal(means[1], 0)
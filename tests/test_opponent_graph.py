@@ -0,0 +1,62 @@
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.opponent_graph import OpponentGraph
+
+def test_common_opponents_and_win_chains():
+    # 0 beats 2, 2 beats 3, 3 beats 1, 1 beats 2 on the same date as 0 meets 1
+    fighters = np.array([[0, 2], [2, 3], [3, 1], [1, 2], [0, 1]])
+    winners = np.array([0, 2, 3, 1, 0])
+    dates = np.array(['2020-01-01', '2020-02-01', '2020-03-01', '2020-04-01', '2020-04-01'], dtype='datetime64[ns]')
+
+    counts = OpponentGraph().sweep(fighters, winners, dates)
+
+    # 1 vs 2 on the last date is not visible yet, so 0 and 1 have no common opponent
+    np.testing.assert_array_equal(counts[4, 0], [0, 0, 0, 0, 1])
+    np.testing.assert_array_equal(counts[4, 1], [0, 0, 0, 0, 0])
+    # 3 is common to 1 and 2: 1 lost to 3, 2 beat 3 who beat 1
+    np.testing.assert_array_equal(counts[3, 0], [1, 0, 1, 0, 0])
+    np.testing.assert_array_equal(counts[3, 1], [1, 1, 0, 1, 0])
+
+def test_draws_and_no_contests_leave_the_win_chains_unchanged():
+    # 0 beats 2, 2 beats 3, 3 beats 1, then 0 meets 1
+    fighters = np.array([[0, 2], [2, 3], [3, 1], [0, 1]])
+    winners = np.array([0, 2, 3, 0])
+    dates = np.array(['2020-01-01', '2020-02-01', '2020-03-01', '2020-05-01'], dtype='datetime64[ns]')
+
+    # 2 draws with 1 and 0 has a no contest with 3 before 0 meets 1, neither has a winner
+    with_draws = OpponentGraph().sweep(np.insert(fighters, 3, [[2, 1], [0, 3]], axis=0), np.insert(winners, 3, [-1, -1]),
+                                       np.insert(dates, 3, np.array(['2020-04-01', '2020-04-01'], dtype='datetime64[ns]')))
+    counts = OpponentGraph().sweep(fighters, winners, dates)
+
+    np.testing.assert_array_equal(counts[3, 0], [0, 0, 0, 0, 1])
+    np.testing.assert_array_equal(counts[3, 1], [0, 0, 0, 0, 0])
+    # 2 and 3 become common opponents, but only 0 beating 2 counts and the chains stay the same
+    np.testing.assert_array_equal(with_draws[5, 0], [2, 1, 0, 0, 1])
+    np.testing.assert_array_equal(with_draws[5, 1], [2, 0, 1, 0, 0])
+    np.testing.assert_array_equal(with_draws[5, :, 3:], counts[3, :, 3:])
+
+def test_a_draw_with_the_opponent_is_not_a_win_chain():
+    # 0 beats 2 and 2 draws with 1, so 2 is a common opponent 0 beat but not one who beat 1
+    fighters = np.array([[0, 2], [2, 1], [0, 1]])
+    winners = np.array([0, -1, 0])
+    dates = np.array(['2020-01-01', '2020-02-01', '2020-03-01'], dtype='datetime64[ns]')
+
+    counts = OpponentGraph().sweep(fighters, winners, dates)
+
+    np.testing.assert_array_equal(counts[2, 0], [1, 1, 0, 0, 0])
+    np.testing.assert_array_equal(counts[2, 1], [1, 0, 0, 0, 0])
+
+def test_read_counts_matches_the_next_fight():
+    fighters = np.array([[0, 2], [2, 3], [3, 1], [1, 2], [0, 1]])
+    winners = np.array([0, 2, 3, 1, 0])
+    dates = np.array(['2020-01-01', '2020-02-01', '2020-03-01', '2020-04-01', '2020-05-01'], dtype='datetime64[ns]')
+
+    counts = OpponentGraph().sweep(fighters, winners, dates)
+    graph = OpponentGraph()
+    graph.sweep(fighters[:4], winners[:4], dates[:4])
+
+    np.testing.assert_array_equal(graph.read_counts(0, 1), counts[4, 0])
+    np.testing.assert_array_equal(graph.read_counts(1, 0), counts[4, 1])
+    np.testing.assert_array_equal(graph.read_counts(0, 9), [0, 0, 0, 0, 0])
@@ -0,0 +1,39 @@
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.order_statistics import ElevationRecords, FenwickTree
+
+def test_fenwick_tree_prefix_and_range_sums():
+    values = [3, 0, 2, 5, 1, 4]
+    tree = FenwickTree(len(values))
+    for i, value in enumerate(values):
+        tree.add(i, value)
+
+    assert [tree.prefix_sum(i) for i in range(len(values) + 1)] == list(np.cumsum([0] + values))
+    assert tree.range_sum(2, 5) == 8
+
+def test_elevation_records_count_previous_fights():
+    # Fighter 0 wins at 100m, loses at 2000m, then fights at 600m
+    fighters = np.array([[0, 1], [0, 2], [0, 3]])
+    winners = np.array([0, 2, 3])
+    elevations = np.array([100.0, 2000.0, 600.0])
+
+    counts = ElevationRecords(elevations, window=500).sweep(fighters, winners, elevations)
+
+    # Wins/losses above, below and within 500m
+    np.testing.assert_array_equal(counts[2, 0], [0, 1, 1, 0, 1, 0])
+    np.testing.assert_array_equal(counts[0], 0)
+
+def test_elevation_records_read_any_elevation():
+    fighters = np.array([[0, 1], [0, 2], [0, 3]])
+    winners = np.array([0, 2, 3])
+    elevations = np.array([100.0, 2000.0, 600.0])
+
+    counts = ElevationRecords(elevations, window=500).sweep(fighters, winners, elevations)
+    # Built without the 600m level, which is only read afterwards
+    records = ElevationRecords(elevations[:2], window=500)
+    records.sweep(fighters[:2], winners[:2], elevations[:2])
+
+    np.testing.assert_array_equal(records.read(0, 600.0), counts[2, 0])
+    np.testing.assert_array_equal(records.read(3, 600.0), 0)
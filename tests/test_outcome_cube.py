@@ -0,0 +1,41 @@
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.outcome_cube import OutcomeCube
+
+def test_sliding_window_expires_old_fights():
+    # Fighter 0 wins by method 0 in division 0, loses by an untracked method, then fights 13 months after the first fight
+    fighters = np.array([[0, 1], [0, 2], [0, 3]])
+    winners = np.array([0, 2, 0])
+    methods = np.array([0, -1, 0])
+    divisions = np.array([0, 0, 0])
+    dates = np.array(['2020-01-01', '2020-06-01', '2021-02-01'], dtype='datetime64[ns]')
+    window_starts = np.array(['2019-01-01', '2019-06-01', '2020-02-01'], dtype='datetime64[ns]')
+
+    all_time, last_year = OutcomeCube(n_methods=2, n_divisions=2).sweep(fighters, winners, methods, divisions, dates, window_starts)
+
+    # Cells are (outcome, method, division) with method 1 and division 1 as the totals
+    np.testing.assert_array_equal(all_time[2, 0].reshape(2, 2, 2), [[[1, 1], [1, 1]], [[0, 0], [1, 1]]])
+    np.testing.assert_array_equal(last_year[2, 0].reshape(2, 2, 2), [[[0, 0], [0, 0]], [[0, 0], [1, 1]]])
+
+def test_read_matches_the_next_fight():
+    fighters = np.array([[0, 1], [0, 2], [0, 3]])
+    winners = np.array([0, 2, 0])
+    methods = np.array([0, -1, 0])
+    divisions = np.array([0, 0, 0])
+    dates = np.array(['2020-01-01', '2020-06-01', '2021-02-01'], dtype='datetime64[ns]')
+    window_starts = np.array(['2019-01-01', '2019-06-01', '2020-02-01'], dtype='datetime64[ns]')
+
+    all_time, last_year = OutcomeCube(n_methods=2, n_divisions=2).sweep(fighters, winners, methods, divisions, dates, window_starts)
+    cube = OutcomeCube(n_methods=2, n_divisions=2)
+    cube.sweep(fighters[:2], winners[:2], methods[:2], divisions[:2], dates[:2], window_starts[:2])
+
+    # Reading leaves the window as it is, so the same fighter can be read again for another date
+    for _ in range(2):
+        read_all_time, read_last_year = cube.read(0, window_starts[2])
+        np.testing.assert_array_equal(read_all_time, all_time[2, 0])
+        np.testing.assert_array_equal(read_last_year, last_year[2, 0])
+
+    np.testing.assert_array_equal(cube.read(0, window_starts[0])[1], all_time[2, 0])
+    np.testing.assert_array_equal(cube.read(5, window_starts[2])[0], 0)
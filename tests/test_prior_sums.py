@@ -0,0 +1,53 @@
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.prior_sums import DatedSums, prior_sums
+
+def test_prior_sums_by_group_and_window():
+    groups = np.array([1, 2, 1, 1, 2])
+    dates = np.array(['2020-01-01', '2020-01-01', '2020-06-01', '2021-03-01', '2021-01-01'], dtype='datetime64[ns]')
+    values = np.array([[1], [10], [2], [4], [20]])
+    window_starts = dates - np.timedelta64(365, 'D')
+
+    np.testing.assert_array_equal(prior_sums(groups, dates, values)[:, 0], [0, 0, 1, 3, 10])
+    np.testing.assert_array_equal(prior_sums(groups, dates, values, window_starts)[:, 0], [0, 0, 1, 2, 0])
+
+def test_prior_sums_follows_dates_not_rows():
+    groups = np.array([0, 0])
+    dates = np.array(['2021-01-01', '2020-01-01'], dtype='datetime64[ns]')
+
+    np.testing.assert_array_equal(prior_sums(groups, dates, np.array([[1], [2]]))[:, 0], [2, 0])
+
+def test_prior_sums_orders_same_date_rows_by_fight():
+    # Fighter 0 fights twice on one card, on side b in fight 0 and on side a in fight 1, rows are side a then side b
+    fighter_a = np.array([1, 0])
+    fighter_b = np.array([0, 2])
+    dates = np.tile(np.array(['2020-01-01', '2020-01-01'], dtype='datetime64[ns]'), 2)
+    values = np.array([[1], [2], [4], [8]])
+
+    by_fight = prior_sums(np.concatenate([fighter_a, fighter_b]), dates, values, row_order=np.tile(np.arange(2), 2))
+
+    # Fight 0 is fighter 0's first, so its side b row has nothing before it and fight 1 sees it
+    np.testing.assert_array_equal(by_fight[:, 0], [0, 4, 0, 0])
+    # By row position fight 1's side a row would come first
+    np.testing.assert_array_equal(prior_sums(np.concatenate([fighter_a, fighter_b]), dates, values)[:, 0], [0, 0, 2, 0])
+
+def test_dated_sums_read_like_a_row_after_the_last():
+    groups = np.array([1, 2, 1, 1, 2, -1])
+    dates = np.array(['2020-01-01', '2020-01-01', '2020-06-01', '2021-03-01', '2021-01-01', '2021-01-01'], dtype='datetime64[ns]')
+    values = np.array([[1], [10], [2], [4], [20], [100]])
+    sums = DatedSums(groups, dates, values)
+
+    # Group 1 then group 3, which has no rows, on a date after every row
+    next_groups = np.array([1, 3])
+    next_dates = np.array(['2021-06-01', '2021-06-01'], dtype='datetime64[ns]')
+    window_starts = next_dates - np.timedelta64(365, 'D')
+    expected = [prior_sums(np.append(groups, group), np.append(dates, date), np.append(values, [[0]], axis=0))[-1, 0] for group, date in zip(next_groups, next_dates)]
+    expected_window = [prior_sums(np.append(groups, group), np.append(dates, date), np.append(values, [[0]], axis=0), np.append(dates - np.timedelta64(365, 'D'), start))[-1, 0]
+                       for group, date, start in zip(next_groups, next_dates, window_starts)]
+
+    np.testing.assert_array_equal(sums.read(next_groups)[:, 0], expected)
+    np.testing.assert_array_equal(sums.read(next_groups, window_starts)[:, 0], expected_window)
+    np.testing.assert_array_equal(expected, [7, 0])
+    np.testing.assert_array_equal(expected_window, [4, 0])
@@ -0,0 +1,99 @@
+import os
+import sys
+import pandas as pd
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.row_apply import apply_rows
+from features.scheduler import Stage, StageScheduler
+
+def add_double(df):
+    df['double'] = df['x'] * 2
+    return df
+
+def add_sum(df, offset):
+    df['sum'] = df['double'] + df['y'] + offset
+    return df
+
+def add_square(df):
+    df['square'] = df['x'] ** 2
+    return df
+
+def create_stages():
+    return [
+        Stage('double', add_double, columns=['x']),
+        Stage('sum', add_sum, args=(1,), columns=['y'], requires=['double']),
+        Stage('square', add_square)
+    ]
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_scheduled_stages_match_serial_run(max_workers):
+    df = pd.DataFrame({'x': [1, 2, 3], 'y': [10, 20, 30]})
+    serial = add_square(add_sum(add_double(df.copy()), 1))
+
+    res = StageScheduler(max_workers).run(df, create_stages())
+
+    pd.testing.assert_frame_equal(res, serial)
+    assert list(df.columns) == ['x', 'y']
+
+def test_requirement_cycles_are_rejected():
+    stages = [Stage('a', add_double, requires=['b']), Stage('b', add_square, requires=['a'])]
+
+    with pytest.raises(ValueError):
+        StageScheduler(1).run(pd.DataFrame({'x': [1]}), stages)
+
+def add_prior_fights(df):
+    # Counts each fighter's earlier fights the way the row kernels do, from the rows before in the frame
+    df['prior_fights'] = apply_rows(df, lambda row: ((df.loc[:row.name - 1, 'fighter_a_id'] == row['fighter_a_id']) | (df.loc[:row.name - 1, 'fighter_b_id'] == row['fighter_a_id'])).sum())
+    return df
+
+def add_prior_total(df):
+    df['prior_total'] = df.groupby('fighter_a_id')['prior_fights'].cumsum() - df['prior_fights']
+    return df
+
+def test_selected_rows_match_full_run():
+    df = pd.DataFrame({
+        'fighter_a_id': ['f1', 'f2', 'f1', 'f3', 'f2', 'f1'],
+        'fighter_b_id': ['f2', 'f3', 'f3', 'f4', 'f4', 'f2']
+    })
+    stages = [
+        Stage('prior_fights', add_prior_fights, history='fighters'),
+        Stage('prior_total', add_prior_total, columns=['fighter_a_id'], requires=['prior_fights'])
+    ]
+    full = StageScheduler(1).run(df, stages)
+
+    res = StageScheduler(1).run(df, stages, rows=df.index[4:], previous=full.iloc[:4])
+
+    pd.testing.assert_frame_equal(res, full.iloc[4:], check_dtype=False)
+
+def add_prior_wins(df):
+    df['prior_wins'] = apply_rows(df, lambda row: (df.loc[:row.name - 1, 'winner_id'] == row['fighter_a_id']).sum())
+    return df
+
+def add_prior_stat(df):
+    df['prior_stat'] = apply_rows(df, lambda row: df.loc[:row.name - 1, 'stat'][df.loc[:row.name - 1, 'fighter_a_id'] == row['fighter_a_id']].sum())
+    return df
+
+def test_recompute_after_correction_matches_full_run():
+    df = pd.DataFrame({
+        'fighter_a_id': ['f1', 'f3', 'f1', 'f3', 'f5', 'f2'],
+        'fighter_b_id': ['f2', 'f4', 'f4', 'f1', 'f6', 'f1'],
+        'winner_id': ['f1', 'f3', 'f1', 'f3', 'f5', 'f2'],
+        'stat': [1, 2, 3, 4, 5, 6]
+    })
+    stages = [
+        Stage('prior_wins', add_prior_wins, columns=['fighter_a_id', 'fighter_b_id', 'winner_id'], history='fighters'),
+        Stage('prior_stat', add_prior_stat, columns=['fighter_a_id', 'fighter_b_id', 'stat'], history='fighters')
+    ]
+    scheduler = StageScheduler(1)
+    previous = scheduler.run(df.iloc[:5], stages)
+    stage_columns = scheduler.stage_columns
+
+    # The first fight is overturned and a new fight is appended
+    corrected = df.copy()
+    corrected.loc[0, 'winner_id'] = 'f2'
+
+    res, rows = StageScheduler(1).recompute(corrected, stages, previous, stage_columns)
+
+    pd.testing.assert_frame_equal(res, StageScheduler(1).run(corrected, stages))
+    assert list(rows['prior_wins']) == [0, 2, 3, 5]
+    assert list(rows['prior_stat']) == [5]
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import sys
+import threading
+import pandas as pd
+from aiohttp.test_utils import TestClient, TestServer
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.elo_features import Elo
+from features.service import FeatureService, ServiceState
+
+class FakeMatchups():
+    # Stands in for MatchupFeatures: answers the version it was loaded with and records every batch
+    def __init__(self, version, batches, release=None):
+        self.fights_df = pd.DataFrame({
+            'fighter_a_id': ['f1', 'f1'],
+            'fighter_b_id': ['f2', 'f3'],
+            'winner_id': ['f1', 'f1'],
+            'date': pd.to_datetime(['2020-01-01', '2020-02-01'])
+        })
+        self.last_date = self.fights_df['date'].max()
+        self.fight_count = len(self.fights_df)
+        self.version = version
+        self.batches = batches
+        self.release = release
+
+    def get_state(self, name):
+        return {'elo': Elo().get_ratings(self.fights_df)}[name]
+
+    def features_for_card(self, bouts):
+        self.batches.append(len(bouts))
+        if any(bout['fighter_a_id'] == 'unknown' for bout in bouts):
+            raise KeyError('unknown')
+        if self.release is not None:
+            self.release.wait()
+        return pd.DataFrame({'version': [self.version] * len(bouts), 'fighter': [bout['fighter_a_id'] for bout in bouts]})
+
+def create_bout(fighter_a_id):
+    return {'fighter_a_id': fighter_a_id, 'fighter_b_id': 'f2', 'date': '2020-06-01', 'location': 'Las Vegas, Nevada, USA', 'division': 'Lightweight', 'rounds': 3}
+
+def run_service(load_state, test, **kwargs):
+    async def run():
+        async with TestClient(TestServer(FeatureService(load_state, **kwargs).create_app())) as client:
+            await test(client)
+
+    asyncio.run(run())
+
+def test_concurrent_feature_requests_are_batched():
+    batches = []
+
+    async def test(client):
+        responses = await asyncio.gather(*[client.post('/features', json={'bouts': [create_bout(fighter_id)]}) for fighter_id in ['f1', 'f3', 'f4']])
+        features = [(await response.json())['features'] for response in responses]
+
+        assert [feature[0]['fighter'] for feature in features] == ['f1', 'f3', 'f4']
+        assert batches == [3]
+
+        metrics = await (await client.get('/metrics')).json()
+        assert metrics['POST /features']['count'] == 3
+        assert metrics['feature batch']['count'] == 1
+
+    run_service(lambda: ServiceState(FakeMatchups(1, batches)), test, batch_window=0.2)
+
+def test_bad_request_does_not_fail_its_batch():
+    batches = []
+
+    async def test(client):
+        bouts = [create_bout('f1'), dict(create_bout('f3'), date='2020-01-01'), create_bout('unknown'), dict(create_bout('f4'), date='not a date')]
+        responses = await asyncio.gather(*[client.post('/features', json={'bouts': [bout]}) for bout in bouts])
+
+        assert [response.status for response in responses] == [200, 400, 400, 400]
+        assert (await responses[0].json())['features'][0]['fighter'] == 'f1'
+        assert 'after the last fight' in await responses[1].text()
+        # The dates are checked before queueing, the unknown fighter fails the batch which is answered per request
+        assert batches == [2, 1, 1]
+
+    run_service(lambda: ServiceState(FakeMatchups(1, batches)), test, batch_window=0.2)
+
+def test_win_probabilities_favour_the_higher_rated_fighter():
+    async def test(client):
+        response = await client.post('/predict', json={'bouts': [{'fighter_a_id': 'f1', 'fighter_b_id': 'f2'}, {'fighter_a_id': 'f9', 'fighter_b_id': 'f8'}]})
+        predictions = (await response.json())['predictions']
+
+        assert predictions[0]['fighter_a_win_probability'] > 0.5
+        assert abs(predictions[1]['fighter_a_win_probability'] - 0.5) < 1e-12
+
+        assert (await client.post('/predict', json={'bouts': []})).status == 400
+
+    run_service(lambda: ServiceState(FakeMatchups(1, [])), test)
+
+def test_reload_keeps_in_flight_requests_on_their_state():
+    release = threading.Event()
+    versions = iter([1, 2])
+
+    async def test(client):
+        in_flight = asyncio.ensure_future(client.post('/features', json={'bouts': [create_bout('f1')]}))
+        await asyncio.sleep(0.1)
+
+        assert (await client.post('/reload')).status == 200
+        release.set()
+
+        assert (await (await in_flight).json())['features'][0]['version'] == 1
+        response = await client.post('/features', json={'bouts': [create_bout('f1')]})
+        assert (await response.json())['features'][0]['version'] == 2
+
+    run_service(lambda: ServiceState(FakeMatchups(next(versions), [], release)), test, batch_window=0)
@@ -0,0 +1,59 @@
+import os
+import sys
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.executor import stage_execution
+from features.row_apply import apply_fight_rows, only_rows
+from features.shared_rows import SharedRowExecutor, attach_frame, SharedFrame
+
+class PriorWins():
+    def compute(self, df):
+        return apply_fight_rows(df, self.__count_prior_wins, df, 'won', scale=0.5)
+
+    def __count_prior_wins(self, df, fighter_a_id, fighter_b_id, index, col, scale=1.0):
+        prior_df = df.loc[:index - 1]
+        fighter_a_wins = int((prior_df['winner'] == fighter_a_id).sum())
+        return pd.Series([fighter_a_wins, fighter_a_wins * scale, fighter_b_id == 'b'])
+
+def create_fights():
+    return pd.DataFrame({
+        'fighter_a_id': ['a', 'b', 'a', 'c', 'a', 'b', 'c'],
+        'fighter_b_id': ['b', 'c', 'c', 'a', 'b', 'a', 'b'],
+        'winner': pd.Categorical(['a', 'b', 'c', 'a', 'a', 'b', 'c']),
+        'date': pd.date_range('2020-01-01', periods=7, freq='MS')
+    })
+
+def test_shared_frame_round_trip():
+    df = create_fights()
+    frame = SharedFrame(df)
+    try:
+        shm, shared_df = attach_frame(frame.spec)
+        pd.testing.assert_frame_equal(shared_df, df.astype({'fighter_a_id': 'category', 'fighter_b_id': 'category'}), check_categorical=False)
+        del shared_df
+        shm.close()
+    finally:
+        frame.close()
+
+def test_sharded_rows_match_serial_apply():
+    df = create_fights()
+    serial = PriorWins().compute(df)
+    with stage_execution('prior_wins', 'processes', 2):
+        sharded = PriorWins().compute(df)
+        with only_rows(df.index[4:]):
+            targeted = PriorWins().compute(df)
+
+    pd.testing.assert_frame_equal(sharded, serial)
+    pd.testing.assert_frame_equal(targeted, serial.iloc[4:])
+
+def test_scalar_kernel_returns_series():
+    df = create_fights()
+    with SharedRowExecutor(2) as executor:
+        res = executor.apply(df, count_fights, df)
+
+    serial = apply_fight_rows(df, count_fights, df)
+    pd.testing.assert_series_equal(res, serial)
+    assert res.tolist() == [0, 1, 1, 2, 3, 3, 3]
+
+def count_fights(df, fighter_a_id, fighter_b_id, index):
+    prior_df = df.loc[:index - 1]
+    return int(((prior_df['fighter_a_id'] == fighter_a_id) | (prior_df['fighter_b_id'] == fighter_a_id)).sum())
@@ -0,0 +1,81 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.clean_data import CleanData
+from features.significant_strike_features import SignificantStrikeFeatures
+from features.stat_tensor import FightStatTensor, last_fights_sums, next_fight_sums
+
+TEST_FIGHTS_CSV = os.path.join(os.path.dirname(__file__), 'test_fights.csv')
+
+def load_cleaned_fights():
+    fights = pd.read_csv(TEST_FIGHTS_CSV, encoding='latin-1')
+    fights['outcome_detail'] = ''
+    return CleanData().clean_data(fights)
+
+def test_named_lookups_match_columns():
+    df = load_cleaned_fights()
+    tensor = FightStatTensor.from_df(df)
+
+    assert tensor.values.shape == (len(df), 2, 6, len(FightStatTensor.STATS))
+    assert tensor.values.dtype == np.int16
+    np.testing.assert_array_equal(tensor.get('b', 'round_3', 'td_landed'), df['fighter_b_round_3_td_landed'])
+    np.testing.assert_array_equal(tensor.get('a', 'total', 'head_shots_attempted'), df['fighter_a_total_head_shots_attempted'])
+    np.testing.assert_array_equal(tensor.stat('ctrl')[:, 1, 5], df['fighter_b_total_ctrl'])
+
+def test_save_and_memory_map(tmp_path):
+    df = load_cleaned_fights()
+    tensor = FightStatTensor.from_df(df)
+    path = str(tmp_path / 'stats.npy')
+    tensor.save(path)
+
+    loaded = FightStatTensor.load(path)
+
+    assert isinstance(loaded.values, np.memmap)
+    pd.testing.assert_frame_equal(loaded.to_df(), df[FightStatTensor.col_names()])
+
+def test_last_fights_sums():
+    # 0 fights 1, 2 and 1 again, 1 also fights 2 in between
+    fighters = np.array([[0, 1], [0, 2], [1, 2], [0, 1]])
+    values = np.array([[1, 10], [2, 20], [3, 30], [4, 40]])
+
+    sums, counts = last_fights_sums(fighters, values, [1, None])
+
+    assert sums.shape == (4, 2, 2) and counts.shape == (4, 2, 2)
+    np.testing.assert_array_equal(sums[0], [[0, 0], [0, 0]])
+    np.testing.assert_array_equal(sums[2], [[10, 10], [20, 20]])
+    # 0 last fought 2 with a value of 2 and 1 last fought 2 with a value of 3
+    np.testing.assert_array_equal(sums[3], [[2, 3], [3, 13]])
+    np.testing.assert_array_equal(counts[3], [[1, 2], [1, 2]])
+
+def test_strikes_per_minute_from_previous_fights():
+    df = load_cleaned_fights()
+    features = SignificantStrikeFeatures().create_significant_strike_feats(df)
+
+    last = len(df) - 1
+    fighter = df.loc[last, 'fighter_a_id']
+    previous = df.loc[:last - 1]
+    landed, minutes = 0, 0
+    for _, fight in previous[(previous['fighter_a_id'] == fighter) | (previous['fighter_b_id'] == fighter)].iterrows():
+        side = 'a' if fight['fighter_a_id'] == fighter else 'b'
+        mins, secs = fight['outcome_time'].split(':')
+        landed += fight[f'fighter_{side}_total_distance_shots_landed']
+        minutes += int(mins) + int(secs) / 60 + (fight['outcome_round'] - 1) * 5
+    expected = landed / minutes if minutes else 0
+
+    assert features.loc[0, 'fighter-a_distance-strikes-landed-per-minute_overall_alltime'] == 0
+    assert np.isclose(features.loc[last, 'fighter-a_distance-strikes-landed-per-minute_overall_alltime'], expected)
+
+def test_next_fight_sums_match_a_fight_after_the_others():
+    fighters = np.array([[0, 1], [0, 2], [1, 2], [0, 1]])
+    values = np.array([[1, 10], [2, 20], [3, 30], [4, 40]])
+
+    sums, counts = next_fight_sums(fighters, values, [1, None])
+    # Fighters 0 and 2 fight next, fighter 3 has no fights
+    next_sums, next_counts = last_fights_sums(np.append(fighters, [[0, 2]], axis=0), np.append(values, [[0, 0]], axis=0), [1, None])
+
+    np.testing.assert_array_equal(sums[[0, 2]], next_sums[4])
+    np.testing.assert_array_equal(counts[[0, 2]], next_counts[4])
+    np.testing.assert_array_equal(sums[-1], 0)
+    np.testing.assert_array_equal(counts[-1], 0)
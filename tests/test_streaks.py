@@ -0,0 +1,31 @@
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.streaks import StreakRecords
+
+def test_streaks_before_each_fight():
+    # Fighter 0 loses twice, then wins six times in a row
+    results = [False, False] + [True] * 6
+    fighters = np.array([[0, i + 1] for i in range(len(results) + 1)])
+    winners = np.array([0 if won else i + 1 for i, won in enumerate(results)] + [0])
+
+    streaks = StreakRecords(window=5).sweep(fighters, winners)
+
+    # (wins, losses) for the current streak, the longest in the last 5 fights and the longest ever
+    np.testing.assert_array_equal(streaks[2, 0], [[0, 2], [0, 2], [0, 2]])
+    np.testing.assert_array_equal(streaks[8, 0], [[6, 0], [5, 0], [6, 2]])
+    np.testing.assert_array_equal(streaks[0], 0)
+
+def test_get_streaks_matches_the_next_fight():
+    results = [False, False] + [True] * 6
+    fighters = np.array([[0, i + 1] for i in range(len(results) + 1)])
+    winners = np.array([0 if won else i + 1 for i, won in enumerate(results)] + [0])
+
+    streaks = StreakRecords(window=5).sweep(fighters, winners)
+    records = StreakRecords(window=5)
+    records.sweep(fighters[:-1], winners[:-1])
+
+    np.testing.assert_array_equal(records.get_streaks(0), streaks[-1, 0].ravel())
+    np.testing.assert_array_equal(records.get_streaks(1), [1, 0, 1, 0, 1, 0])
+    np.testing.assert_array_equal(records.get_streaks(100), 0)
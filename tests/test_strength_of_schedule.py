@@ -0,0 +1,30 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from features.strength_of_schedule_features import StrengthOfSchedule
+
+def test_schedule_uses_pre_fight_ratings_and_opponents_current_records():
+    # Fighter 1 beats 2, 2 beats 3, then 1 meets 3 and 2 meets 4 on the same card
+    df = pd.DataFrame({
+        'fighter_a_id': ['f1', 'f2', 'f1', 'f2', 'f1'],
+        'fighter_b_id': ['f2', 'f3', 'f3', 'f4', 'f4'],
+        'winner_id': ['f1', 'f2', 'f3', 'f2', 'f1'],
+        'date': ['2020-01-01', '2020-02-01', '2020-03-01', '2020-03-01', '2020-04-01'],
+        'fighter_a_elo_rating': [1500.0, 1400.0, 1600.0, 1450.0, 1550.0],
+        'fighter_b_elo_rating': [1500.0, 1500.0, 1450.0, 1500.0, 1480.0]
+    })
+
+    res = StrengthOfSchedule().create_strength_of_schedule_feats(df)
+
+    # Fighter 1 has faced 2 (rated 1500, beaten) and 3 (rated 1450, lost)
+    assert res.loc[4, 'fighter_a_sos_opp_rating_mean'] == 1475
+    assert res.loc[4, 'fighter_a_sos_beaten_opp_rating_mean'] == 1500
+    # Going into the last fight fighter 2 is 2-1 and fighter 3 is 1-1
+    assert res.loc[4, 'fighter_a_sos_opp_wins'] == 3
+    assert res.loc[4, 'fighter_a_sos_opp_losses'] == 2
+    # Fighter 2 is 1-1 going into fight 2, only fight 0 counts for fighter 1's opponent record
+    assert res.loc[2, 'fighter_a_sos_opp_wins'] == 1
+    assert res.loc[2, 'fighter_a_sos_opp_losses'] == 1
+    np.testing.assert_array_equal(res.loc[0, ['fighter_a_sos_opp_wins', 'fighter_b_sos_opp_rating_mean']], 0)
@@ -0,0 +1,59 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from benchmarks.synthetic_fights import SyntheticFights
+from features.clean_data import CleanData
+from scripts.scrape_fights import COLS
+
+def test_generate_matches_the_scraped_schema():
+    fights_df, fighters_df = SyntheticFights(seed=1).generate(2000)
+
+    assert list(fights_df.columns) == COLS
+    assert len(fights_df) == 2000
+    assert (fights_df['fighter_a_id'] != fights_df['fighter_b_id']).all()
+    assert pd.to_datetime(fights_df['date'], format='%B %d, %Y').is_monotonic_increasing
+    assert set(fights_df['fighter_a_id']).union(fights_df['fighter_b_id']) <= set(fighters_df['ID'])
+
+def test_totals_are_the_sum_of_the_rounds():
+    fights_df, _ = SyntheticFights(seed=2).generate(500)
+
+    for col in ['fighter_a_{}_kd', 'fighter_b_{}_td_landed', 'fighter_a_{}_head_shots_attempted']:
+        rounds = fights_df[[col.format(f'round_{r}') for r in range(1, 6)]].fillna(0).sum(axis=1)
+        assert (rounds == fights_df[col.format('total')]).all()
+
+def test_activity_is_heavy_tailed():
+    fights_df, _ = SyntheticFights(seed=3).generate(5000)
+
+    counts = pd.concat([fights_df['fighter_a_id'], fights_df['fighter_b_id']]).value_counts()
+    assert counts.median() <= 2
+    assert counts.max() >= 10 * counts.median()
+
+def test_write_streams_the_generated_fights(tmp_path):
+    generator = SyntheticFights(seed=4, chunk_size=70)
+    fights_path, fighters_path = generator.write(str(tmp_path), 300)
+
+    written_df = pd.read_csv(fights_path)
+    generated_df, fighters_df = SyntheticFights(seed=4, chunk_size=70).generate(300)
+    generated_df.to_csv(tmp_path / 'generated.csv', index=False)
+    pd.testing.assert_frame_equal(written_df, pd.read_csv(tmp_path / 'generated.csv'))
+    assert len(pd.read_csv(fighters_path)) == len(fighters_df)
+
+def test_clean_data_parses_every_count_and_duration(tmp_path):
+    fights_path, _ = SyntheticFights(seed=5).write(str(tmp_path), 400)
+
+    cleaner = CleanData()
+    cleaned_df = cleaner.clean_data(pd.read_csv(fights_path))
+
+    assert len(cleaned_df) == 400
+    assert cleaner.rejected_cells['count'] == 0
+    assert cleaner.rejected_cells['duration'] == 0
+
+def test_same_seed_same_fights():
+    first_df, _ = SyntheticFights(seed=6).generate(300)
+    second_df, _ = SyntheticFights(seed=6).generate(300)
+    other_df, _ = SyntheticFights(seed=7).generate(300)
+
+    pd.testing.assert_frame_equal(first_df, second_df)
+    assert not np.array_equal(first_df['fighter_a_id'], other_df['fighter_a_id'])